@@ -2,6 +2,10 @@ import base64
 import json
 import logging
 import secrets
+import statistics
+import subprocess
+import sys
+import time
 from typing import Optional
 
 import click
@@ -10,9 +14,11 @@ from werkzeug.exceptions import NotFound
 
 from configs import dify_config
 from constants.languages import languages
+from core.app.features.annotation_reply.annotation_reply import AnnotationReplyFeature
+from core.model_runtime.model_providers.model_provider_manifest import ModelProviderManifest
 from core.rag.datasource.vdb.vector_factory import Vector
-from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
+from core.tools.provider.builtin_tool_provider_manifest import BuiltinToolProviderManifest
 from events.app_event import app_was_created
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
@@ -21,7 +27,6 @@ from libs.password import hash_password, password_pattern, valid_password
 from libs.rsa import generate_key_pair
 from models import Tenant
 from models.dataset import Dataset, DatasetCollectionBinding, DocumentSegment
-from models.dataset import Document as DatasetDocument
 from models.model import Account, App, AppAnnotationSetting, AppMode, Conversation, MessageAnnotation
 from models.provider import Provider, ProviderModel
 from services.account_service import RegisterService, TenantService
@@ -139,9 +144,11 @@ def reset_encrypt_key_pair():
 
 @click.command("vdb-migrate", help="Migrate vector db.")
 @click.option("--scope", default="all", prompt=False, help="The scope of vector database to migrate, Default is All.")
-def vdb_migrate(scope: str):
+@click.option("--workers", default=4, show_default=True, help="Datasets migrated concurrently.")
+@click.option("--batch-size", default=500, show_default=True, help="Segments migrated and checkpointed together.")
+def vdb_migrate(scope: str, workers: int, batch_size: int):
     if scope in {"knowledge", "all"}:
-        migrate_knowledge_vector_database()
+        migrate_knowledge_vector_database(workers, batch_size)
     if scope in {"annotation", "all"}:
         migrate_annotation_vector_database()
 
@@ -250,188 +257,24 @@ def migrate_annotation_vector_database():
     )
 
 
-def migrate_knowledge_vector_database():
+def migrate_knowledge_vector_database(workers: int = 4, batch_size: int = 500):
     """
     Migrate vector database datas to target vector database .
     """
-    click.echo(click.style("Starting vector database migration.", fg="green"))
-    create_count = 0
-    skipped_count = 0
-    total_count = 0
-    vector_type = dify_config.VECTOR_STORE
-    page = 1
-    while True:
-        try:
-            datasets = (
-                db.session.query(Dataset)
-                .filter(Dataset.indexing_technique == "high_quality")
-                .order_by(Dataset.created_at.desc())
-                .paginate(page=page, per_page=50)
-            )
-        except NotFound:
-            break
-
-        page += 1
-        for dataset in datasets:
-            total_count = total_count + 1
-            click.echo(
-                f"Processing the {total_count} dataset {dataset.id}. {create_count} created, {skipped_count} skipped."
-            )
-            try:
-                click.echo("Creating dataset vector database index: {}".format(dataset.id))
-                if dataset.index_struct_dict:
-                    if dataset.index_struct_dict["type"] == vector_type:
-                        skipped_count = skipped_count + 1
-                        continue
-                collection_name = ""
-                if vector_type == VectorType.WEAVIATE:
-                    dataset_id = dataset.id
-                    collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {"type": VectorType.WEAVIATE, "vector_store": {"class_prefix": collection_name}}
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                elif vector_type == VectorType.QDRANT:
-                    if dataset.collection_binding_id:
-                        dataset_collection_binding = (
-                            db.session.query(DatasetCollectionBinding)
-                            .filter(DatasetCollectionBinding.id == dataset.collection_binding_id)
-                            .one_or_none()
-                        )
-                        if dataset_collection_binding:
-                            collection_name = dataset_collection_binding.collection_name
-                        else:
-                            raise ValueError("Dataset Collection Binding not found")
-                    else:
-                        dataset_id = dataset.id
-                        collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {"type": VectorType.QDRANT, "vector_store": {"class_prefix": collection_name}}
-                    dataset.index_struct = json.dumps(index_struct_dict)
-
-                elif vector_type == VectorType.MILVUS:
-                    dataset_id = dataset.id
-                    collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {"type": VectorType.MILVUS, "vector_store": {"class_prefix": collection_name}}
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                elif vector_type == VectorType.RELYT:
-                    dataset_id = dataset.id
-                    collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {"type": "relyt", "vector_store": {"class_prefix": collection_name}}
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                elif vector_type == VectorType.TENCENT:
-                    dataset_id = dataset.id
-                    collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {"type": VectorType.TENCENT, "vector_store": {"class_prefix": collection_name}}
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                elif vector_type == VectorType.PGVECTOR:
-                    dataset_id = dataset.id
-                    collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {"type": VectorType.PGVECTOR, "vector_store": {"class_prefix": collection_name}}
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                elif vector_type == VectorType.OPENSEARCH:
-                    dataset_id = dataset.id
-                    collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {
-                        "type": VectorType.OPENSEARCH,
-                        "vector_store": {"class_prefix": collection_name},
-                    }
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                elif vector_type == VectorType.ANALYTICDB:
-                    dataset_id = dataset.id
-                    collection_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {
-                        "type": VectorType.ANALYTICDB,
-                        "vector_store": {"class_prefix": collection_name},
-                    }
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                elif vector_type == VectorType.ELASTICSEARCH:
-                    dataset_id = dataset.id
-                    index_name = Dataset.gen_collection_name_by_id(dataset_id)
-                    index_struct_dict = {"type": "elasticsearch", "vector_store": {"class_prefix": index_name}}
-                    dataset.index_struct = json.dumps(index_struct_dict)
-                else:
-                    raise ValueError(f"Vector store {vector_type} is not supported.")
-
-                vector = Vector(dataset)
-                click.echo(f"Migrating dataset {dataset.id}.")
-
-                try:
-                    vector.delete()
-                    click.echo(
-                        click.style(f"Deleted vector index {collection_name} for dataset {dataset.id}.", fg="green")
-                    )
-                except Exception as e:
-                    click.echo(
-                        click.style(
-                            f"Failed to delete vector index {collection_name} for dataset {dataset.id}.", fg="red"
-                        )
-                    )
-                    raise e
-
-                dataset_documents = (
-                    db.session.query(DatasetDocument)
-                    .filter(
-                        DatasetDocument.dataset_id == dataset.id,
-                        DatasetDocument.indexing_status == "completed",
-                        DatasetDocument.enabled == True,
-                        DatasetDocument.archived == False,
-                    )
-                    .all()
-                )
-
-                documents = []
-                segments_count = 0
-                for dataset_document in dataset_documents:
-                    segments = (
-                        db.session.query(DocumentSegment)
-                        .filter(
-                            DocumentSegment.document_id == dataset_document.id,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.enabled == True,
-                        )
-                        .all()
-                    )
-
-                    for segment in segments:
-                        document = Document(
-                            page_content=segment.content,
-                            metadata={
-                                "doc_id": segment.index_node_id,
-                                "doc_hash": segment.index_node_hash,
-                                "document_id": segment.document_id,
-                                "dataset_id": segment.dataset_id,
-                            },
-                        )
-
-                        documents.append(document)
-                        segments_count = segments_count + 1
-
-                if documents:
-                    try:
-                        click.echo(
-                            click.style(
-                                f"Creating vector index with {len(documents)} documents of {segments_count}"
-                                f" segments for dataset {dataset.id}.",
-                                fg="green",
-                            )
-                        )
-                        vector.create(documents)
-                        click.echo(click.style(f"Created vector index for dataset {dataset.id}.", fg="green"))
-                    except Exception as e:
-                        click.echo(click.style(f"Failed to created vector index for dataset {dataset.id}.", fg="red"))
-                        raise e
-                db.session.add(dataset)
-                db.session.commit()
-                click.echo(f"Successfully migrated dataset {dataset.id}.")
-                create_count += 1
-            except Exception as e:
-                db.session.rollback()
-                click.echo(
-                    click.style("Error creating dataset index: {} {}".format(e.__class__.__name__, str(e)), fg="red")
-                )
-                continue
+    from services.vector_migration_service import VectorMigrationService
 
+    click.echo(click.style("Starting vector database migration.", fg="green"))
+    progress = VectorMigrationService(
+        max_workers=workers,
+        batch_size=batch_size,
+        on_progress=lambda progress: click.echo(str(progress)),
+    ).migrate()
     click.echo(
         click.style(
-            f"Migration complete. Created {create_count} dataset indexes. Skipped {skipped_count} datasets.", fg="green"
+            f"Migration complete. Created {progress.migrated_datasets} dataset indexes."
+            f" Skipped {progress.skipped_datasets} datasets. Failed {progress.failed_datasets} datasets,"
+            " run the command again to resume them.",
+            fg="green" if not progress.failed_datasets else "yellow",
         )
     )
 
@@ -662,6 +505,321 @@ where sites.id is null limit 1000"""
     click.echo(click.style("Fix for missing app-related sites completed successfully!", fg="green"))
 
 
+@click.command("generate-manifests", help="Generate the model provider and builtin tool manifests.")
+def generate_manifests():
+    """
+    Snapshot the provider and tool YAML files at build time, so that processes boot
+    without parsing them and import the provider modules on first use.
+    """
+    click.echo(click.style("Generating manifests.", fg="green"))
+    for manifest_class in (ModelProviderManifest, BuiltinToolProviderManifest):
+        path = manifest_class.generate()
+        click.echo(click.style(f"Generated {path}.", fg="green"))
+
+
+@click.command("benchmark-startup", help="Measure the boot time of the API and the Celery worker.")
+@click.option("--rounds", default=5, show_default=True, help="Boots per process type.")
+def benchmark_startup(rounds: int):
+    """
+    Boot each process type in a fresh interpreter, run it before and after `flask generate-manifests`
+    to compare both loading modes.
+    """
+    boot_scripts = {
+        "api": "import app",
+        "worker": "import app; app.celery.loader.import_default_modules()",
+    }
+    for process_type, boot_script in boot_scripts.items():
+        durations = []
+        for _ in range(rounds):
+            start_at = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-c", boot_script], cwd=current_app.root_path, check=True, capture_output=True
+            )
+            durations.append(time.perf_counter() - start_at)
+
+        click.echo(
+            f"{process_type}: min {min(durations):.2f}s, median {statistics.median(durations):.2f}s,"
+            f" max {max(durations):.2f}s over {rounds} boots"
+        )
+
+
+@click.command("benchmark-annotation-reply", help="Measure the annotation reply latency of an app.")
+@click.option("--app-id", prompt=True, help="App id with annotation reply enabled.")
+@click.option("--query", "queries", multiple=True, required=True, help="Query to match, can be repeated.")
+@click.option("--rounds", default=20, show_default=True, help="Matches per query and mode.")
+def benchmark_annotation_reply(app_id: str, queries: tuple[str, ...], rounds: int):
+    """
+    Match the queries against the annotations of an app, with the exact match and in-memory index
+    fast paths and with the vector store only, to compare the chat pre-processing latency.
+    """
+    app = db.session.query(App).filter(App.id == app_id).first()
+    annotation_setting = db.session.query(AppAnnotationSetting).filter(AppAnnotationSetting.app_id == app_id).first()
+    if not app or not annotation_setting:
+        click.echo(click.style(f"App {app_id} not found or annotation reply is not enabled.", fg="red"))
+        return
+
+    feature = AnnotationReplyFeature()
+    for mode, fast_paths in (("fast paths", True), ("vector store", False)):
+        for query in queries:
+            # the first match builds the index and caches the query embedding
+            result = feature.match(app, annotation_setting, query, fast_paths=fast_paths)
+            durations = []
+            for _ in range(rounds):
+                start_at = time.perf_counter()
+                feature.match(app, annotation_setting, query, fast_paths=fast_paths)
+                durations.append((time.perf_counter() - start_at) * 1000)
+
+            hit = f"hit {result[0].id} ({result[1]:.3f})" if result else "miss"
+            click.echo(
+                f"{mode} | {query!r}: {hit}, min {min(durations):.1f}ms,"
+                f" median {statistics.median(durations):.1f}ms, max {max(durations):.1f}ms over {rounds} matches"
+            )
+
+
+@click.command("benchmark-keyword-extraction", help="Measure the keyword extraction throughput of the Jieba index.")
+@click.option("--dataset-id", prompt=True, help="Dataset whose segments are used as texts.")
+@click.option("--segments", default=100000, show_default=True, help="Number of texts, segments are repeated.")
+def benchmark_keyword_extraction(dataset_id: str, segments: int):
+    """
+    Extract the keywords of the segments of a dataset in the calling process and in the process pool
+    of `KEYWORD_EXTRACTION_WORKERS` workers.
+    """
+    # jieba takes a second to import, keep it out of the boot of the other commands
+    from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+
+    contents = [
+        content
+        for (content,) in db.session.query(DocumentSegment.content)
+        .filter(DocumentSegment.dataset_id == dataset_id)
+        .limit(segments)
+        .all()
+    ]
+    if not contents:
+        click.echo(click.style(f"No segments found for dataset {dataset_id}.", fg="red"))
+        return
+    texts = [contents[i % len(contents)] for i in range(segments)]
+
+    keyword_table_handler = JiebaKeywordTableHandler()
+    # start the pool and load the dictionaries before measuring
+    keyword_table_handler.extract_keywords_batch(texts[: dify_config.KEYWORD_EXTRACTION_MIN_BATCH_SIZE])
+
+    start_at = time.perf_counter()
+    for text in texts:
+        keyword_table_handler.extract_keywords(text)
+    serial_duration = time.perf_counter() - start_at
+
+    start_at = time.perf_counter()
+    keyword_table_handler.extract_keywords_batch(texts)
+    batch_duration = time.perf_counter() - start_at
+
+    click.echo(f"serial: {serial_duration:.1f}s, {segments / serial_duration:.0f} segments/s")
+    click.echo(
+        f"batch ({dify_config.KEYWORD_EXTRACTION_WORKERS} workers): {batch_duration:.1f}s,"
+        f" {segments / batch_duration:.0f} segments/s"
+    )
+
+
+def _start_mock_embeddings_server(latency: float = 0):
+    """
+    Serve a mock of the OpenAI embeddings API on a local port, answering after `latency` seconds
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from threading import Thread
+
+    class MockEmbeddingsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):  # noqa: N802
+            inputs = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["input"]
+            time.sleep(latency)
+            body = json.dumps(
+                {
+                    "object": "list",
+                    "data": [
+                        {"object": "embedding", "index": i, "embedding": [0.1] * 1536} for i in range(len(inputs))
+                    ],
+                    "model": "text-embedding-3-small",
+                    "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockEmbeddingsHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@click.command("benchmark-model-client-pool", help="Measure sequential model invocations with and without pooling.")
+@click.option("--calls", default=200, show_default=True, help="Sequential calls per mode.")
+def benchmark_model_client_pool(calls: int):
+    """
+    Call a local mock of the OpenAI embeddings API with a new SDK client per call, as before the pool,
+    and with the pooled client, which keeps its connection alive.
+    """
+    from openai import OpenAI
+
+    from core.model_runtime.utils.client_pool import ModelClientPool, create_http_client
+
+    server = _start_mock_embeddings_server()
+    credentials_kwargs = {"api_key": "benchmark", "base_url": f"http://127.0.0.1:{server.server_port}/v1"}
+    clients = {
+        "new client per call": lambda: OpenAI(**credentials_kwargs),
+        "pooled client": lambda: ModelClientPool.get_client(
+            "openai",
+            credentials_kwargs["base_url"],
+            credentials_kwargs,
+            lambda: OpenAI(**credentials_kwargs, http_client=create_http_client()),
+        ),
+    }
+    try:
+        for mode, get_client in clients.items():
+            durations = []
+            for _ in range(calls):
+                start_at = time.perf_counter()
+                get_client().embeddings.create(input=["ping"], model="text-embedding-3-small")
+                durations.append((time.perf_counter() - start_at) * 1000)
+
+            click.echo(
+                f"{mode}: median {statistics.median(durations):.2f}ms,"
+                f" p95 {statistics.quantiles(durations, n=20)[-1]:.2f}ms over {calls} calls"
+            )
+    finally:
+        server.shutdown()
+        ModelClientPool.clear()
+
+
+@click.command(
+    "benchmark-embedding-dispatch", help="Measure the embedding throughput of serial and concurrent batches."
+)
+@click.option("--texts", default=2000, show_default=True, help="Number of texts to embed.")
+@click.option("--batch-size", default=16, show_default=True, help="Texts per embedding request.")
+@click.option("--latency-ms", default=100, show_default=True, help="Response latency of the mock server.")
+def benchmark_embedding_dispatch(texts: int, batch_size: int, latency_ms: int):
+    """
+    Embed texts with a local mock of the OpenAI embeddings API one batch at a time, as before the dispatcher,
+    and with the dispatcher, which sends up to `EMBEDDING_MAX_CONCURRENT_REQUESTS` batches at once.
+    """
+    from types import SimpleNamespace
+
+    from openai import OpenAI
+
+    from core.embedding.embedding_dispatcher import EmbeddingDispatcher
+    from core.model_runtime.utils.client_pool import create_http_client
+
+    server = _start_mock_embeddings_server(latency=latency_ms / 1000)
+    client = OpenAI(
+        api_key="benchmark",
+        base_url=f"http://127.0.0.1:{server.server_port}/v1",
+        http_client=create_http_client(),
+    )
+
+    def invoke_text_embedding(texts, user=None, input_type=None):
+        response = client.embeddings.create(input=texts, model="text-embedding-3-small")
+        return SimpleNamespace(embeddings=[data.embedding for data in response.data])
+
+    model_instance = SimpleNamespace(
+        provider="openai",
+        model="text-embedding-3-small",
+        credentials={"api_key": "benchmark"},
+        load_balancing_manager=None,
+        invoke_text_embedding=invoke_text_embedding,
+    )
+    batches = [
+        [f"text {i}" for i in range(start, min(start + batch_size, texts))] for start in range(0, texts, batch_size)
+    ]
+    try:
+        start_at = time.perf_counter()
+        for batch in batches:
+            invoke_text_embedding(batch)
+        serial_duration = time.perf_counter() - start_at
+
+        start_at = time.perf_counter()
+        EmbeddingDispatcher(model_instance).embed_batches(batches)
+        dispatch_duration = time.perf_counter() - start_at
+    finally:
+        server.shutdown()
+
+    click.echo(f"serial: {serial_duration:.2f}s, {texts / serial_duration:.0f} texts/s")
+    click.echo(
+        f"dispatcher ({dify_config.EMBEDDING_MAX_CONCURRENT_REQUESTS} concurrent requests):"
+        f" {dispatch_duration:.2f}s, {texts / dispatch_duration:.0f} texts/s"
+    )
+
+
+@click.command("benchmark-bulk-delete", help="Measure the deletion of the data of a synthetic app.")
+@click.option("--messages", default=10_000_000, show_default=True, help="Number of messages of the synthetic app.")
+@click.option("--per-row-sample", default=10_000, show_default=True, help="Messages deleted one row at a time.")
+def benchmark_bulk_delete(messages: int, per_row_sample: int):
+    """
+    Seed a synthetic app with messages and a conversation per ten messages, delete a sample of the messages
+    one row and commit at a time, as before the bulk deleter, then delete the rest of the app with the bulk
+    deleter of `remove_app_and_related_data_task`.
+    """
+    import uuid
+
+    from libs.bulk_delete import BulkDeleter
+    from tasks.remove_app_and_related_data_task import _get_related_data_targets
+
+    tenant_id, app_id = str(uuid.uuid4()), str(uuid.uuid4())
+    click.echo(f"Seeding app {app_id} with {messages} messages...")
+    seed_batch_size = 1_000_000
+    start_at = time.perf_counter()
+    for start in range(0, messages, seed_batch_size):
+        end = min(start + seed_batch_size, messages)
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.text(
+                    """insert into messages (id, app_id, conversation_id, query, message, message_unit_price,
+                    answer, answer_unit_price, currency, from_source, created_at)
+                    select uuid_generate_v4(), :app_id, uuid_generate_v4(), 'query', '{}', 0, 'answer', 0, 'USD',
+                    'api', now() - make_interval(secs => g) from generate_series(:start, :end) g"""
+                ),
+                {"app_id": app_id, "start": start + 1, "end": end},
+            )
+            conn.execute(
+                db.text(
+                    """insert into conversations (id, app_id, mode, name, status, from_source)
+                    select uuid_generate_v4(), :app_id, 'chat', 'benchmark', 'normal', 'api'
+                    from generate_series(:start, :end)"""
+                ),
+                {"app_id": app_id, "start": start // 10 + 1, "end": end // 10},
+            )
+    click.echo(f"seeded in {time.perf_counter() - start_at:.1f}s")
+
+    targets = _get_related_data_targets(tenant_id, app_id)
+    message_target = next(target for target in targets if target.name == "message")
+    with db.engine.connect() as conn:
+        sample_ids = conn.scalars(
+            db.select(message_target.model.id).where(message_target.where).limit(per_row_sample)
+        ).all()
+    start_at = time.perf_counter()
+    with db.engine.connect() as conn:
+        for message_id in sample_ids:
+            for child_column in message_target.children:
+                conn.execute(db.delete(child_column.class_).where(child_column == message_id))
+            conn.execute(db.delete(message_target.model).where(message_target.model.id == message_id))
+            conn.commit()
+    per_row_rate = len(sample_ids) / (time.perf_counter() - start_at)
+    click.echo(f"per row: {per_row_rate:.0f} messages/s, {messages / per_row_rate / 3600:.1f}h estimated for the app")
+
+    start_at = time.perf_counter()
+    deleted = BulkDeleter(job_id=f"benchmark:{app_id}").delete(targets)
+    duration = time.perf_counter() - start_at
+    click.echo(
+        f"bulk ({dify_config.BULK_DELETE_BATCH_SIZE} rows per batch, {dify_config.BULK_DELETE_MAX_WORKERS} workers):"
+        f" {deleted['message']} messages and {deleted['conversation']} conversations in {duration:.1f}s,"
+        f" {deleted['message'] / duration:.0f} messages/s"
+    )
+
+
 def register_commands(app):
     app.cli.add_command(reset_password)
     app.cli.add_command(reset_email)
@@ -672,3 +830,10 @@ def register_commands(app):
     app.cli.add_command(create_tenant)
     app.cli.add_command(upgrade_db)
     app.cli.add_command(fix_app_site_missing)
+    app.cli.add_command(generate_manifests)
+    app.cli.add_command(benchmark_startup)
+    app.cli.add_command(benchmark_annotation_reply)
+    app.cli.add_command(benchmark_keyword_extraction)
+    app.cli.add_command(benchmark_model_client_pool)
+    app.cli.add_command(benchmark_embedding_dispatch)
+    app.cli.add_command(benchmark_bulk_delete)
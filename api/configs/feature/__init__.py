@@ -23,6 +23,16 @@ class SecurityConfig(BaseSettings):
         default=24,
     )
 
+    API_TOKEN_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a validated service API token is cached in Redis",
+        default=300,
+    )
+
+    API_TOKEN_LAST_USED_UPDATE_INTERVAL: PositiveInt = Field(
+        description="Interval in seconds between flushes of buffered API token last_used_at timestamps",
+        default=60,
+    )
+
 
 class AppExecutionConfig(BaseSettings):
     """
@@ -37,6 +47,38 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of concurrent active requests per app (0 for unlimited)",
         default=0,
     )
+    APP_REQUESTS_PER_MINUTE: NonNegativeInt = Field(
+        description="Maximum number of requests per minute per app (0 for unlimited)",
+        default=0,
+    )
+    APP_LLM_TOKENS_PER_MINUTE: NonNegativeInt = Field(
+        description="Maximum number of LLM tokens per minute per app (0 for unlimited)",
+        default=0,
+    )
+    API_KEY_MAX_ACTIVE_REQUESTS: NonNegativeInt = Field(
+        description="Maximum number of concurrent active requests per app API key (0 for unlimited)",
+        default=0,
+    )
+    API_KEY_REQUESTS_PER_MINUTE: NonNegativeInt = Field(
+        description="Maximum number of requests per minute per app API key (0 for unlimited)",
+        default=0,
+    )
+    API_KEY_LLM_TOKENS_PER_MINUTE: NonNegativeInt = Field(
+        description="Maximum number of LLM tokens per minute per app API key (0 for unlimited)",
+        default=0,
+    )
+    END_USER_MAX_ACTIVE_REQUESTS: NonNegativeInt = Field(
+        description="Maximum number of concurrent active requests per end user (0 for unlimited)",
+        default=0,
+    )
+    END_USER_REQUESTS_PER_MINUTE: NonNegativeInt = Field(
+        description="Maximum number of requests per minute per end user (0 for unlimited)",
+        default=0,
+    )
+    END_USER_LLM_TOKENS_PER_MINUTE: NonNegativeInt = Field(
+        description="Maximum number of LLM tokens per minute per end user (0 for unlimited)",
+        default=0,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -257,6 +299,22 @@ class HttpConfig(BaseSettings):
         default=None,
     )
 
+    MODEL_CLIENT_POOL_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of model provider clients kept for reuse, one per provider, endpoint and"
+        " credentials (0 to create a client per invocation)",
+        default=256,
+    )
+
+    MODEL_CLIENT_POOL_IDLE_TIMEOUT: PositiveInt = Field(
+        description="Seconds after which unused model provider clients and idle connections are dropped",
+        default=300,
+    )
+
+    MODEL_CLIENT_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of connections of a pooled model provider client",
+        default=100,
+    )
+
 
 class InnerAPIConfig(BaseSettings):
     """
@@ -326,6 +384,15 @@ class BillingConfig(BaseSettings):
         default=True,
     )
 
+    BILLING_ENTITLEMENT_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a tenant billing entitlement snapshot is kept in Redis",
+        default=600,
+    )
+
+    BILLING_ENTITLEMENT_RECONCILE_INTERVAL: PositiveInt = Field(
+        description="Interval in minutes between reconciliations of billing entitlement snapshots with Stripe",
+        default=60,
+    )
 
 
 class UpdateConfig(BaseSettings):
@@ -364,6 +431,17 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_NODE_PAYLOAD_OFFLOAD_THRESHOLD: NonNegativeInt = Field(
+        description="Size in characters above which the inputs, process data or outputs of a node execution are"
+        " stored in the storage, with a preview in the database and in the stream (0 to keep them all inline)",
+        default=64 * 1024,
+    )
+
+    WORKFLOW_NODE_PAYLOAD_PREVIEW_LENGTH: PositiveInt = Field(
+        description="Number of characters of the strings kept in the preview of an offloaded node payload",
+        default=4 * 1024,
+    )
+
 
 class OAuthConfig(BaseSettings):
     """
@@ -491,6 +569,17 @@ class RagEtlConfig(BaseSettings):
         default="database",
     )
 
+    KEYWORD_EXTRACTION_WORKERS: NonNegativeInt = Field(
+        description="Number of processes extracting keywords for the Jieba keyword index (0 or 1 to extract them"
+        " in the calling process)",
+        default=4,
+    )
+
+    KEYWORD_EXTRACTION_MIN_BATCH_SIZE: PositiveInt = Field(
+        description="Minimum number of texts for keywords to be extracted in the process pool",
+        default=500,
+    )
+
     UNSTRUCTURED_API_URL: Optional[str] = Field(
         description="API URL for Unstructured.io service",
         default=None,
@@ -502,6 +591,52 @@ class RagEtlConfig(BaseSettings):
     )
 
 
+class DataArchiveConfig(BaseSettings):
+    """
+    Configuration for archiving the messages and workflow runs of apps to the storage
+    """
+
+    APP_DATA_ARCHIVE_RETENTION_DAYS: NonNegativeInt = Field(
+        description="Days messages and workflow runs are kept in the database before the months they belong to"
+        " are archived to the storage (0 to disable archiving)",
+        default=0,
+    )
+
+
+class AppStatisticConfig(BaseSettings):
+    """
+    Configuration for the daily rollups the console statistics of apps are read from
+    """
+
+    APP_STATISTIC_ROLLUP_REBUILD_DAYS: PositiveInt = Field(
+        description="Number of past days whose statistic rollups are rebuilt every night, so that the feedback"
+        " and messages that arrive after a day ended are counted",
+        default=7,
+    )
+
+
+class DataDeletionConfig(BaseSettings):
+    """
+    Configuration for deleting the data of apps, datasets and documents in bulk
+    """
+
+    BULK_DELETE_BATCH_SIZE: PositiveInt = Field(
+        description="Number of rows deleted and committed together when deleting the data of an app, dataset"
+        " or document",
+        default=1000,
+    )
+
+    BULK_DELETE_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of tables a deletion task deletes rows from concurrently",
+        default=1,
+    )
+
+    BULK_DELETE_BATCH_INTERVAL_MS: NonNegativeInt = Field(
+        description="Milliseconds a deletion task sleeps between batches, to throttle its load on the database",
+        default=0,
+    )
+
+
 class DataSetConfig(BaseSettings):
     """
     Configuration for dataset management
@@ -517,6 +652,22 @@ class DataSetConfig(BaseSettings):
         default=False,
     )
 
+    ANNOTATION_IN_MEMORY_INDEX_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of annotations of an app searched in memory instead of in the vector store"
+        " for annotation reply (0 to always use the vector store)",
+        default=1000,
+    )
+
+    HIT_TESTING_BATCH_MAX_QUERIES: PositiveInt = Field(
+        description="Maximum number of queries of a batch hit testing",
+        default=100,
+    )
+
+    HIT_TESTING_BATCH_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of queries of a batch hit testing retrieved concurrently",
+        default=4,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -539,6 +690,41 @@ class IndexingConfig(BaseSettings):
         default=1000,
     )
 
+    SEGMENT_BATCH_IMPORT_CHUNK_SIZE: PositiveInt = Field(
+        description="Number of CSV rows tokenized, inserted and indexed together during a segment batch import",
+        default=1000,
+    )
+
+    EMBEDDING_MAX_CONCURRENT_REQUESTS: PositiveInt = Field(
+        description="Maximum number of concurrent embedding requests of a process per provider credentials,"
+        " lowered while the provider rate limits them",
+        default=4,
+    )
+
+    EMBEDDING_TOKENS_PER_MINUTE: NonNegativeInt = Field(
+        description="Estimated embedding tokens a process sends per minute per provider credentials"
+        " (0 for no limit)",
+        default=0,
+    )
+
+    DATASET_VECTOR_REBUILD_BATCH_SIZE: PositiveInt = Field(
+        description="Number of segments embedded and checkpointed together when the vector index of a dataset is"
+        " rebuilt for a new embedding model",
+        default=500,
+    )
+
+    DATASET_VECTOR_REBUILD_STALE_MINUTES: PositiveInt = Field(
+        description="Minutes without progress after which a vector index rebuild is considered interrupted and"
+        " resumed by the scheduler",
+        default=30,
+    )
+
+    DATASET_VECTOR_REBUILD_MAX_ATTEMPTS: PositiveInt = Field(
+        description="Maximum number of times the scheduler resumes an interrupted vector index rebuild before"
+        " marking it failed",
+        default=3,
+    )
+
 
 class ImageFormatConfig(BaseSettings):
     MULTIMODAL_SEND_IMAGE_FORMAT: Literal["base64", "url"] = Field(
@@ -613,8 +799,11 @@ class PositionConfig(BaseSettings):
 class FeatureConfig(
     # place the configs in alphabet order
     AppExecutionConfig,
+    AppStatisticConfig,
     BillingConfig,
     CodeExecutionSandboxConfig,
+    DataArchiveConfig,
+    DataDeletionConfig,
     DataSetConfig,
     EndpointConfig,
     FileAccessConfig,
@@ -49,6 +49,11 @@ class VectorStoreConfig(BaseSettings):
         default=None,
     )
 
+    VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL: PositiveInt = Field(
+        description="Minimum interval in seconds between health checks of a shared vector store client",
+        default=30,
+    )
+
 
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
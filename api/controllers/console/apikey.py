@@ -3,6 +3,7 @@ from flask_login import current_user
 from flask_restful import Resource, fields, marshal_with
 from werkzeug.exceptions import Forbidden
 
+from core.helper.api_token_cache import ApiTokenCache
 from extensions.ext_database import db
 from libs.helper import TimestampField
 from libs.login import login_required
@@ -113,8 +114,10 @@ class BaseApiKeyResource(Resource):
         if key is None:
             flask_restful.abort(404, message="API key not found")
 
+        api_token_cache = ApiTokenCache(key.token, key.type)
         db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
         db.session.commit()
+        api_token_cache.delete()
 
         return {"result": "success"}, 204
 
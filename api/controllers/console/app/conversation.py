@@ -24,6 +24,7 @@ from libs.helper import DatetimeString
 from libs.login import login_required
 from models import Conversation, EndUser, Message, MessageAnnotation
 from models.model import AppMode
+from services.data_loader_service import ConversationDataLoader
 
 
 class CompletionConversationApi(Resource):
@@ -92,6 +93,7 @@ class CompletionConversationApi(Resource):
         query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        ConversationDataLoader.load(conversations.items)
 
         return conversations
 
@@ -256,6 +258,7 @@ class ChatConversationApi(Resource):
                 query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        ConversationDataLoader.load(conversations.items)
 
         return conversations
 
@@ -26,6 +26,7 @@ from libs.infinite_scroll_pagination import InfiniteScrollPagination
 from libs.login import login_required
 from models.model import AppMode, Conversation, Message, MessageAnnotation, MessageFeedback
 from services.annotation_service import AppAnnotationService
+from services.app_data_archive_service import AppDataArchiveService
 from services.errors.conversation import ConversationNotExistsError
 from services.errors.message import MessageNotExistsError, SuggestedQuestionsAfterAnswerDisabledError
 from services.message_service import MessageService
@@ -59,12 +60,13 @@ class ChatMessageListApi(Resource):
         if not conversation:
             raise NotFound("Conversation Not Exists.")
 
+        first_message = None
         if args["first_id"]:
             first_message = (
                 db.session.query(Message)
                 .filter(Message.conversation_id == conversation.id, Message.id == args["first_id"])
                 .first()
-            )
+            ) or AppDataArchiveService.get_message(app_model.id, conversation, args["first_id"])
 
             if not first_message:
                 raise NotFound("First message not found")
@@ -89,6 +91,13 @@ class ChatMessageListApi(Resource):
                 .all()
             )
 
+        # continue with the archived months once the messages left in the database run out
+        if len(history_messages) < args["limit"]:
+            before = history_messages[-1].created_at if history_messages else getattr(first_message, "created_at", None)
+            history_messages += AppDataArchiveService.get_messages(
+                app_model.id, conversation, before, args["limit"] - len(history_messages)
+            )
+
         has_more = False
         if len(history_messages) == args["limit"]:
             current_page_first_message = history_messages[-1]
@@ -102,7 +111,9 @@ class ChatMessageListApi(Resource):
                 .count()
             )
 
-            if rest_count > 0:
+            if rest_count > 0 or AppDataArchiveService.get_messages(
+                app_model.id, conversation, current_page_first_message.created_at, 1
+            ):
                 has_more = True
 
         return InfiniteScrollPagination(data=history_messages, limit=args["limit"], has_more=has_more)
@@ -1,3 +1,7 @@
+import logging
+
+import stripe
+from flask import request
 from flask_login import current_user
 from flask_restful import Resource, reqparse
 from controllers.console import api
@@ -5,6 +9,7 @@ from controllers.console.setup import setup_required
 from controllers.console.wraps import account_initialization_required, only_edition_cloud
 from libs.login import login_required
 from services.billing_service import BillingService
+from tasks.refresh_billing_entitlement_task import refresh_billing_entitlement_task
 
 
 class Subscription(Resource):
@@ -79,8 +84,25 @@ class CreateSubscriptionApi(Resource):
             return {"error": "Erro inesperado ao processar a assinatura."}, 500
 
 
+# Webhook do Stripe: mantém o snapshot local de billing atualizado
+class StripeWebhookApi(Resource):
+    def post(self):
+        try:
+            tenant_id = BillingService.get_tenant_id_from_webhook(
+                request.get_data(), request.headers.get("Stripe-Signature", "")
+            )
+        except (ValueError, stripe.error.SignatureVerificationError) as e:
+            logging.warning(f"Webhook do Stripe rejeitado: {str(e)}")
+            return {"error": "Webhook inválido."}, 400
+
+        if tenant_id:
+            refresh_billing_entitlement_task.delay(tenant_id)
+
+        return {"result": "success"}, 200
+
+
 # Adicionando as rotas à API
 api.add_resource(Subscription, "/billing/subscription")  # Mantém a rota para obter assinaturas
 api.add_resource(Invoices, "/billing/invoices")  # Mantém a rota para listar faturas
 api.add_resource(CreateSubscriptionApi, "/billing/create-subscription")  # Nova rota adicionada para criar assinaturas
-
+api.add_resource(StripeWebhookApi, "/billing/webhook")  # Webhook do Stripe para o snapshot de billing
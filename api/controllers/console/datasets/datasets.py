@@ -13,6 +13,7 @@ from controllers.console.datasets.error import DatasetInUseError, DatasetNameDup
 from controllers.console.setup import setup_required
 from controllers.console.wraps import account_initialization_required
 from core.errors.error import LLMBadRequestError, ProviderTokenNotInitError
+from core.helper.api_token_cache import ApiTokenCache
 from core.indexing_runner import IndexingRunner
 from core.model_runtime.entities.model_entities import ModelType
 from core.provider_manager import ProviderManager
@@ -589,8 +590,10 @@ class DatasetApiDeleteApi(Resource):
         if key is None:
             flask_restful.abort(404, message="API key not found")
 
+        api_token_cache = ApiTokenCache(key.token, key.type)
         db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
         db.session.commit()
+        api_token_cache.delete()
 
         return {"result": "success"}, 204
 
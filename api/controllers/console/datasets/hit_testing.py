@@ -85,4 +85,56 @@ class HitTestingApi(Resource):
             raise InternalServerError(str(e))
 
 
+class HitTestingBatchApi(Resource):
+    @setup_required
+    @login_required
+    @account_initialization_required
+    def post(self, dataset_id):
+        dataset_id_str = str(dataset_id)
+
+        dataset = DatasetService.get_dataset(dataset_id_str)
+        if dataset is None:
+            raise NotFound("Dataset not found.")
+
+        try:
+            DatasetService.check_dataset_permission(dataset, current_user)
+        except services.errors.account.NoPermissionError as e:
+            raise Forbidden(str(e))
+
+        parser = reqparse.RequestParser()
+        parser.add_argument("queries", type=list, required=True, location="json")
+        parser.add_argument("retrieval_models", type=list, required=False, location="json")
+        args = parser.parse_args()
+
+        HitTestingService.batch_hit_testing_args_check(args)
+
+        try:
+            return HitTestingService.batch_retrieve(
+                dataset=dataset,
+                queries=args["queries"],
+                retrieval_models=args["retrieval_models"],
+            )
+        except services.errors.index.IndexNotInitializedError:
+            raise DatasetNotInitializedError()
+        except ProviderTokenNotInitError as ex:
+            raise ProviderNotInitializeError(ex.description)
+        except QuotaExceededError:
+            raise ProviderQuotaExceededError()
+        except ModelCurrentlyNotSupportError:
+            raise ProviderModelCurrentlyNotSupportError()
+        except LLMBadRequestError:
+            raise ProviderNotInitializeError(
+                "No Embedding Model or Reranking Model available. Please configure a valid provider "
+                "in the Settings -> Model Provider."
+            )
+        except InvokeError as e:
+            raise CompletionRequestError(e.description)
+        except ValueError as e:
+            raise ValueError(str(e))
+        except Exception as e:
+            logging.exception("Batch hit testing failed.")
+            raise InternalServerError(str(e))
+
+
 api.add_resource(HitTestingApi, "/datasets/<uuid:dataset_id>/hit-testing")
+api.add_resource(HitTestingBatchApi, "/datasets/<uuid:dataset_id>/hit-testing/batch")
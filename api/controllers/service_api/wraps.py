@@ -4,12 +4,13 @@ from enum import Enum
 from functools import wraps
 from typing import Optional
 
-from flask import current_app, request
+from flask import current_app, g, request
 from flask_login import user_logged_in
 from flask_restful import Resource
 from pydantic import BaseModel
 from werkzeug.exceptions import Forbidden, Unauthorized
 
+from core.helper.api_token_cache import ApiTokenCache, ApiTokenLastUsedRecorder
 from extensions.ext_database import db
 from libs.login import _get_user
 from models.account import Account, Tenant, TenantAccountJoin, TenantStatus
@@ -37,19 +38,27 @@ def validate_app_token(view: Optional[Callable] = None, *, fetch_user_arg: Optio
         @wraps(view_func)
         def decorated_view(*args, **kwargs):
             api_token = validate_and_get_api_token("app")
-
-            app_model = db.session.query(App).filter(App.id == api_token.app_id).first()
-            if not app_model:
+            # rate limits of the API key
+            g.api_token_id = api_token.id
+
+            app_and_tenant_status = (
+                db.session.query(App, Tenant.status)
+                .join(Tenant, Tenant.id == App.tenant_id)
+                .filter(App.id == api_token.app_id)
+                .first()
+            )
+            if not app_and_tenant_status:
                 raise Forbidden("The app no longer exists.")
 
+            app_model, tenant_status = app_and_tenant_status
+
             if app_model.status != "normal":
                 raise Forbidden("The app's status is abnormal.")
 
             if not app_model.enable_api:
                 raise Forbidden("The app's API service has been disabled.")
 
-            tenant = db.session.query(Tenant).filter(Tenant.id == app_model.tenant_id).first()
-            if tenant.status == TenantStatus.ARCHIVE:
+            if tenant_status == TenantStatus.ARCHIVE:
                 raise Forbidden("The workspace's status is archived.")
 
             kwargs["app_model"] = app_model
@@ -186,20 +195,35 @@ def validate_and_get_api_token(scope=None):
     if auth_scheme != "bearer":
         raise Unauthorized("Authorization scheme must be 'Bearer'")
 
-    api_token = (
-        db.session.query(ApiToken)
-        .filter(
-            ApiToken.token == auth_token,
-            ApiToken.type == scope,
+    api_token_cache = ApiTokenCache(auth_token, scope)
+    cached_api_token = api_token_cache.get()
+    if cached_api_token:
+        # detached instance, only the identity fields are populated
+        api_token = ApiToken(**cached_api_token)
+    else:
+        api_token = (
+            db.session.query(ApiToken)
+            .filter(
+                ApiToken.token == auth_token,
+                ApiToken.type == scope,
+            )
+            .first()
         )
-        .first()
-    )
 
-    if not api_token:
-        raise Unauthorized("Access token is invalid")
+        if not api_token:
+            raise Unauthorized("Access token is invalid")
+
+        api_token_cache.set(
+            {
+                "id": api_token.id,
+                "app_id": api_token.app_id,
+                "tenant_id": api_token.tenant_id,
+                "type": api_token.type,
+            }
+        )
 
-    api_token.last_used_at = datetime.now(timezone.utc).replace(tzinfo=None)
-    db.session.commit()
+    # last_used_at is flushed to the database in the background, at most once per interval
+    ApiTokenLastUsedRecorder.record(api_token.id, datetime.now(timezone.utc).replace(tzinfo=None))
 
     return api_token
 
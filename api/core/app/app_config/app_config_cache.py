@@ -0,0 +1,69 @@
+from collections.abc import Callable, Hashable
+from threading import Lock
+from typing import NamedTuple, TypeVar
+
+from core.app.app_config.entities import AppConfig
+from core.helper.lru_cache import LRUCache
+from extensions.ext_redis import redis_client
+
+APP_CONFIG_CACHE_CAPACITY = 1024
+
+AppConfigT = TypeVar("AppConfigT", bound=AppConfig)
+
+
+class AppConfigCacheEntry(NamedTuple):
+    generation: bytes
+    app_config: AppConfig
+
+
+class AppConfigCache:
+    """
+    Process-local cache of the app configs built from app model configs and published workflows.
+
+    Both are new rows on every config update or publish, so an entry is keyed by the id of its source.
+    Every app also has a generation counter in Redis that config updates increment, for the settings
+    read from other tables, and an entry is only served while the generation it was built at is
+    current. Setting up a request then costs one Redis read instead of parsing the JSON columns of
+    the config and building it.
+    """
+
+    _entries = LRUCache(APP_CONFIG_CACHE_CAPACITY)
+    _lock = Lock()
+
+    @classmethod
+    def get_or_build(cls, app_id: str, source_key: Hashable, builder: Callable[[], AppConfigT]) -> AppConfigT:
+        """
+        Get the app config of an app, building it on a miss
+
+        :param source_key: identifies the config the app config is built from
+        :param builder: builds the app config
+        :return: a copy of the app config, which callers may modify
+        """
+        cache_key = (app_id, source_key)
+        # read before building, an update committed while building makes the entry stale
+        generation = redis_client.get(cls._get_generation_key(app_id)) or b"0"
+
+        with cls._lock:
+            entry: AppConfigCacheEntry = cls._entries.get(cache_key)
+        if entry is None or entry.generation != generation:
+            entry = AppConfigCacheEntry(generation=generation, app_config=builder())
+            with cls._lock:
+                cls._entries.put(cache_key, entry)
+
+        return entry.app_config.model_copy(deep=True)
+
+    @classmethod
+    def invalidate(cls, app_id: str) -> None:
+        """
+        Invalidate the entries of an app in every process, called after its config is updated
+        """
+        redis_client.incr(cls._get_generation_key(app_id))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries = LRUCache(APP_CONFIG_CACHE_CAPACITY)
+
+    @staticmethod
+    def _get_generation_key(app_id: str) -> str:
+        return f"app_config_generation:app_id:{app_id}"
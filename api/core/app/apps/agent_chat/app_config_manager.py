@@ -2,6 +2,7 @@ import uuid
 from typing import Optional
 
 from core.agent.entities import AgentEntity
+from core.app.app_config.app_config_cache import AppConfigCache
 from core.app.app_config.base_app_config_manager import BaseAppConfigManager
 from core.app.app_config.common.sensitive_word_avoidance.manager import SensitiveWordAvoidanceConfigManager
 from core.app.app_config.easy_ui_based_app.agent.manager import AgentConfigManager
@@ -57,11 +58,22 @@ class AgentChatAppConfigManager(BaseAppConfigManager):
             config_from = EasyUIBasedAppModelConfigFrom.APP_LATEST_CONFIG
 
         if config_from != EasyUIBasedAppModelConfigFrom.ARGS:
-            app_model_config_dict = app_model_config.to_dict()
-            config_dict = app_model_config_dict.copy()
-        else:
-            config_dict = override_config_dict
+            return AppConfigCache.get_or_build(
+                app_model.id,
+                (app_model_config.id, config_from),
+                lambda: cls._build_app_config(app_model, app_model_config, config_from, app_model_config.to_dict()),
+            )
+
+        return cls._build_app_config(app_model, app_model_config, config_from, override_config_dict)
 
+    @classmethod
+    def _build_app_config(
+        cls,
+        app_model: App,
+        app_model_config: AppModelConfig,
+        config_from: EasyUIBasedAppModelConfigFrom,
+        config_dict: dict,
+    ) -> AgentChatAppConfig:
         app_mode = AppMode.value_of(app_model.mode)
         app_config = AgentChatAppConfig(
             tenant_id=app_model.tenant_id,
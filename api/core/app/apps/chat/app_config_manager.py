@@ -1,5 +1,6 @@
 from typing import Optional
 
+from core.app.app_config.app_config_cache import AppConfigCache
 from core.app.app_config.base_app_config_manager import BaseAppConfigManager
 from core.app.app_config.common.sensitive_word_avoidance.manager import SensitiveWordAvoidanceConfigManager
 from core.app.app_config.easy_ui_based_app.dataset.manager import DatasetConfigManager
@@ -51,14 +52,25 @@ class ChatAppConfigManager(BaseAppConfigManager):
             config_from = EasyUIBasedAppModelConfigFrom.APP_LATEST_CONFIG
 
         if config_from != EasyUIBasedAppModelConfigFrom.ARGS:
-            app_model_config_dict = app_model_config.to_dict()
-            config_dict = app_model_config_dict.copy()
-        else:
-            if not override_config_dict:
-                raise Exception("override_config_dict is required when config_from is ARGS")
+            return AppConfigCache.get_or_build(
+                app_model.id,
+                (app_model_config.id, config_from),
+                lambda: cls._build_app_config(app_model, app_model_config, config_from, app_model_config.to_dict()),
+            )
+
+        if not override_config_dict:
+            raise Exception("override_config_dict is required when config_from is ARGS")
 
-            config_dict = override_config_dict
+        return cls._build_app_config(app_model, app_model_config, config_from, override_config_dict)
 
+    @classmethod
+    def _build_app_config(
+        cls,
+        app_model: App,
+        app_model_config: AppModelConfig,
+        config_from: EasyUIBasedAppModelConfigFrom,
+        config_dict: dict,
+    ) -> ChatAppConfig:
         app_mode = AppMode.value_of(app_model.mode)
         app_config = ChatAppConfig(
             tenant_id=app_model.tenant_id,
@@ -1,3 +1,4 @@
+from core.app.app_config.app_config_cache import AppConfigCache
 from core.app.app_config.base_app_config_manager import BaseAppConfigManager
 from core.app.app_config.common.sensitive_word_avoidance.manager import SensitiveWordAvoidanceConfigManager
 from core.app.app_config.entities import WorkflowUIBasedAppConfig
@@ -19,6 +20,16 @@ class WorkflowAppConfig(WorkflowUIBasedAppConfig):
 class WorkflowAppConfigManager(BaseAppConfigManager):
     @classmethod
     def get_app_config(cls, app_model: App, workflow: Workflow) -> WorkflowAppConfig:
+        if workflow.version == "draft":
+            # draft workflows are updated in place
+            return cls._build_app_config(app_model, workflow)
+
+        return AppConfigCache.get_or_build(
+            app_model.id, (workflow.id,), lambda: cls._build_app_config(app_model, workflow)
+        )
+
+    @classmethod
+    def _build_app_config(cls, app_model: App, workflow: Workflow) -> WorkflowAppConfig:
         features_dict = workflow.features_dict
 
         app_mode = AppMode.value_of(app_model.mode)
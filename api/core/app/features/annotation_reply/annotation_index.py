@@ -0,0 +1,126 @@
+from threading import Lock
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from configs import dify_config
+from core.embedding.cached_embedding import CacheEmbedding
+from core.helper.lru_cache import LRUCache
+from core.model_manager import ModelManager
+from core.model_runtime.entities.model_entities import ModelType
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.dataset import Dataset
+from models.model import MessageAnnotation
+
+ANNOTATION_INDEX_CACHE_CAPACITY = 256
+
+
+class AnnotationIndexCacheEntry(NamedTuple):
+    generation: bytes
+    embedding_model: tuple[str, str]
+    # None when the app has too many annotations to be searched in memory
+    index: Optional["AnnotationIndex"]
+
+
+class AnnotationIndex:
+    """
+    In-memory index of the annotation questions of an app with few annotations.
+
+    Searching it is an exact nearest neighbour search over the question embeddings, so annotation reply
+    needs no vector store round trip. Every app has a generation counter in Redis that the annotation
+    index tasks increment, indexes are rebuilt once their generation is outdated.
+    """
+
+    _indexes = LRUCache(ANNOTATION_INDEX_CACHE_CAPACITY)
+    _lock = Lock()
+
+    def __init__(self, annotation_ids: list[str], embeddings: np.ndarray, embedding: CacheEmbedding):
+        self.annotation_ids = annotation_ids
+        self.embeddings = embeddings
+        self.embedding = embedding
+
+    @classmethod
+    def get(cls, dataset: Dataset) -> Optional["AnnotationIndex"]:
+        """
+        Get the index of the annotations of an app, None when they should be searched in the vector store
+
+        :param dataset: the annotation dataset of the app
+        """
+        if dify_config.ANNOTATION_IN_MEMORY_INDEX_MAX_SIZE <= 0:
+            return None
+
+        embedding_model = (dataset.embedding_model_provider, dataset.embedding_model)
+        # read before building, a change committed while building makes the index outdated
+        generation = redis_client.get(cls._get_generation_key(dataset.id)) or b"0"
+
+        with cls._lock:
+            entry: AnnotationIndexCacheEntry = cls._indexes.get(dataset.id)
+        if entry is None or entry.generation != generation or entry.embedding_model != embedding_model:
+            entry = AnnotationIndexCacheEntry(
+                generation=generation, embedding_model=embedding_model, index=cls._build(dataset)
+            )
+            with cls._lock:
+                cls._indexes.put(dataset.id, entry)
+
+        return entry.index
+
+    @classmethod
+    def invalidate(cls, app_id: str) -> None:
+        """
+        Invalidate the index of an app in every process, called after its annotations were indexed
+        """
+        redis_client.incr(cls._get_generation_key(app_id))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._indexes = LRUCache(ANNOTATION_INDEX_CACHE_CAPACITY)
+
+    def search(self, query: str, score_threshold: float) -> Optional[tuple[str, float]]:
+        """
+        Get the id and score of the annotation whose question is closest to the query, if it reaches the threshold
+        """
+        if not self.annotation_ids:
+            return None
+
+        query_embedding = np.array(self.embedding.embed_query(query), dtype=np.float32)
+        scores = self.embeddings @ (query_embedding / np.linalg.norm(query_embedding))
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < score_threshold:
+            return None
+        return self.annotation_ids[best], score
+
+    @classmethod
+    def _build(cls, dataset: Dataset) -> Optional["AnnotationIndex"]:
+        max_size = dify_config.ANNOTATION_IN_MEMORY_INDEX_MAX_SIZE
+        annotations = (
+            db.session.query(MessageAnnotation.id, MessageAnnotation.question)
+            .filter(MessageAnnotation.app_id == dataset.id)
+            .limit(max_size + 1)
+            .all()
+        )
+        if len(annotations) > max_size:
+            return None
+        annotations = [annotation for annotation in annotations if annotation.question]
+
+        model_instance = ModelManager().get_model_instance(
+            tenant_id=dataset.tenant_id,
+            provider=dataset.embedding_model_provider,
+            model_type=ModelType.TEXT_EMBEDDING,
+            model=dataset.embedding_model,
+        )
+        embedding = CacheEmbedding(model_instance)
+
+        questions = [annotation.question for annotation in annotations]
+        # cached question embeddings are read in bulk, only new questions are embedded
+        embeddings = np.array(embedding.embed_documents(questions), dtype=np.float32)
+        if len(embeddings):
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        return cls([annotation.id for annotation in annotations], embeddings, embedding)
+
+    @staticmethod
+    def _get_generation_key(app_id: str) -> str:
+        return f"annotation_index_generation:app_id:{app_id}"
@@ -2,6 +2,7 @@ import logging
 from typing import Optional
 
 from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from extensions.ext_database import db
 from models.dataset import Dataset
@@ -32,58 +33,88 @@ class AnnotationReplyFeature:
         if not annotation_setting:
             return None
 
-        collection_binding_detail = annotation_setting.collection_binding_detail
-
         try:
-            score_threshold = annotation_setting.score_threshold or 1
-            embedding_provider_name = collection_binding_detail.provider_name
-            embedding_model_name = collection_binding_detail.model_name
+            result = self.match(app_record, annotation_setting, query)
+            if result:
+                annotation, score = result
+                if invoke_from in {InvokeFrom.SERVICE_API, InvokeFrom.WEB_APP}:
+                    from_source = "api"
+                else:
+                    from_source = "console"
 
-            dataset_collection_binding = DatasetCollectionBindingService.get_dataset_collection_binding(
-                embedding_provider_name, embedding_model_name, "annotation"
-            )
+                # insert annotation history
+                AppAnnotationService.add_annotation_history(
+                    annotation.id,
+                    app_record.id,
+                    annotation.question,
+                    annotation.content,
+                    query,
+                    user_id,
+                    message.id,
+                    from_source,
+                    score,
+                )
 
-            dataset = Dataset(
-                id=app_record.id,
-                tenant_id=app_record.tenant_id,
-                indexing_technique="high_quality",
-                embedding_model_provider=embedding_provider_name,
-                embedding_model=embedding_model_name,
-                collection_binding_id=dataset_collection_binding.id,
-            )
+                return annotation
+        except Exception as e:
+            logger.warning(f"Query annotation failed, exception: {str(e)}.")
+            return None
+
+        return None
+
+    def match(
+        self, app_record: App, annotation_setting: AppAnnotationSetting, query: str, fast_paths: bool = True
+    ) -> Optional[tuple[MessageAnnotation, float]]:
+        """
+        Match the query against the app annotations, without recording the hit
+        :param app_record: app record
+        :param annotation_setting: annotation setting of the app
+        :param query: query
+        :param fast_paths: whether to try the exact match and the in-memory index before the vector store
+        :return: the annotation and its score
+        """
+        if fast_paths:
+            # repeated questions hit the question hash index without embedding the query
+            annotation = AppAnnotationService.get_annotation_by_question(app_record.id, query)
+            if annotation:
+                return annotation, 1.0
+
+        collection_binding_detail = annotation_setting.collection_binding_detail
+        score_threshold = annotation_setting.score_threshold or 1
+        embedding_provider_name = collection_binding_detail.provider_name
+        embedding_model_name = collection_binding_detail.model_name
+
+        dataset_collection_binding = DatasetCollectionBindingService.get_dataset_collection_binding(
+            embedding_provider_name, embedding_model_name, "annotation"
+        )
 
+        dataset = Dataset(
+            id=app_record.id,
+            tenant_id=app_record.tenant_id,
+            indexing_technique="high_quality",
+            embedding_model_provider=embedding_provider_name,
+            embedding_model=embedding_model_name,
+            collection_binding_id=dataset_collection_binding.id,
+        )
+
+        annotation_index = AnnotationIndex.get(dataset) if fast_paths else None
+        if annotation_index is not None:
+            result = annotation_index.search(query, score_threshold)
+            if not result:
+                return None
+            annotation_id, score = result
+        else:
             vector = Vector(dataset, attributes=["doc_id", "annotation_id", "app_id"])
 
             documents = vector.search_by_vector(
                 query=query, top_k=1, score_threshold=score_threshold, filter={"group_id": [dataset.id]}
             )
+            if not documents:
+                return None
+            annotation_id = documents[0].metadata["annotation_id"]
+            score = documents[0].metadata["score"]
 
-            if documents:
-                annotation_id = documents[0].metadata["annotation_id"]
-                score = documents[0].metadata["score"]
-                annotation = AppAnnotationService.get_annotation_by_id(annotation_id)
-                if annotation:
-                    if invoke_from in {InvokeFrom.SERVICE_API, InvokeFrom.WEB_APP}:
-                        from_source = "api"
-                    else:
-                        from_source = "console"
-
-                    # insert annotation history
-                    AppAnnotationService.add_annotation_history(
-                        annotation.id,
-                        app_record.id,
-                        annotation.question,
-                        annotation.content,
-                        query,
-                        user_id,
-                        message.id,
-                        from_source,
-                        score,
-                    )
-
-                    return annotation
-        except Exception as e:
-            logger.warning(f"Query annotation failed, exception: {str(e)}.")
+        annotation = AppAnnotationService.get_annotation_by_id(annotation_id)
+        if not annotation:
             return None
-
-        return None
+        return annotation, score
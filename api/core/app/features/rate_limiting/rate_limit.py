@@ -1,88 +1,258 @@
 import logging
+import math
 import time
 import uuid
-from collections.abc import Generator
-from datetime import timedelta
-from typing import Optional, Union
+from collections.abc import Generator, Sequence
+from enum import Enum
+from threading import Lock
+from typing import NamedTuple, Optional, Union
 
+from flask import g, has_app_context
+
+from configs import dify_config
+from core.app.features.rate_limiting.rate_limit_metrics import REJECTIONS_KEY, RateLimitMetrics
+from core.app.features.rate_limiting.redis_script import RedisScript
 from core.errors.error import AppInvokeQuotaExceededError
+from core.helper.lru_cache import LRUCache
 from extensions.ext_redis import redis_client
 
 logger = logging.getLogger(__name__)
 
+# Admits a request when every check passes, in one round trip.
+# KEYS[1] is the rejection counter hash, KEYS[2..] are the concurrency checks followed by the token buckets.
+# ARGV: now in ms, request id, request max alive time in ms, number of concurrency checks,
+# then limit, cost and label of every check.
+_ACQUIRE_SCRIPT = RedisScript("""
+local now = tonumber(ARGV[1])
+local max_alive = tonumber(ARGV[3])
+local concurrency_checks = tonumber(ARGV[4])
+local buckets = {}
+for i = 2, #KEYS do
+    local base = 4 + (i - 2) * 3
+    local limit = tonumber(ARGV[base + 1])
+    local cost = tonumber(ARGV[base + 2])
+    if i - 1 <= concurrency_checks then
+        redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now - max_alive)
+        if redis.call('ZCARD', KEYS[i]) >= limit then
+            redis.call('HINCRBY', KEYS[1], ARGV[base + 3], 1)
+            return {i - 1, 0}
+        end
+    else
+        local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'updated_at')
+        local tokens = tonumber(bucket[1]) or limit
+        local updated_at = tonumber(bucket[2]) or now
+        tokens = math.min(limit, tokens + math.max(0, now - updated_at) * limit / 60000)
+        local required = math.max(cost, 1)
+        if tokens < required then
+            redis.call('HINCRBY', KEYS[1], ARGV[base + 3], 1)
+            return {i - 1, math.ceil((required - tokens) * 60000 / limit)}
+        end
+        buckets[i] = tokens - cost
+    end
+end
+for i = 2, concurrency_checks + 1 do
+    redis.call('ZADD', KEYS[i], now, ARGV[2])
+    redis.call('PEXPIRE', KEYS[i], max_alive)
+end
+for i, tokens in pairs(buckets) do
+    redis.call('HSET', KEYS[i], 'tokens', tokens, 'updated_at', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+end
+return {0, 0}
+""")
+
+# Takes tokens from the buckets after they were used, a bucket can go into debt down to minus its limit.
+# ARGV: now in ms, cost, then the limit of every bucket. Returns the time in ms until each bucket admits again.
+_CONSUME_SCRIPT = RedisScript("""
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local retry_after = {}
+for i = 1, #KEYS do
+    local limit = tonumber(ARGV[2 + i])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'updated_at')
+    local tokens = tonumber(bucket[1]) or limit
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(limit, tokens + math.max(0, now - updated_at) * limit / 60000)
+    tokens = math.max(tokens - cost, -limit)
+    redis.call('HSET', KEYS[i], 'tokens', tokens, 'updated_at', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+    if tokens < 1 then
+        retry_after[i] = math.ceil((1 - tokens) * 60000 / limit)
+    else
+        retry_after[i] = 0
+    end
+end
+return retry_after
+""")
+
+
+class RateLimitScope(str, Enum):
+    APP = "app"
+    API_KEY = "api_key"
+    END_USER = "end_user"
+
+
+class RateLimitType(str, Enum):
+    ACTIVE_REQUESTS = "active_requests"
+    REQUESTS_PER_MINUTE = "requests_per_minute"
+    LLM_TOKENS_PER_MINUTE = "llm_tokens_per_minute"
+
+
+class RateLimitRule(NamedTuple):
+    """
+    Limits of one scope, a limit of 0 is unlimited
+    """
+
+    scope: RateLimitScope
+    scope_id: str
+    max_active_requests: int = 0
+    requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+
+
+class RateLimitCheck(NamedTuple):
+    key: str
+    scope: RateLimitScope
+    limit_type: RateLimitType
+    limit: int
+    cost: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.scope.value}:{self.limit_type.value}"
+
 
 class RateLimit:
-    _MAX_ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:max_active_requests"
-    _ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:active_requests"
+    """
+    Concurrency limits and token buckets of requests per minute and LLM tokens per minute,
+    checked together by a Lua script in a single Redis round trip.
+
+    Before touching Redis, requests are checked against what this process already knows:
+    its own active requests, and the buckets Redis reported as empty until a point in time.
+    """
+
+    _KEY = "dify:rate_limit:{}:{}:{}"
     _UNLIMITED_REQUEST_ID = "unlimited_request_id"
     _REQUEST_MAX_ALIVE_TIME = 10 * 60  # 10 minutes
-    _ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL = 5 * 60  # recalculate request_count from request_detail every 5 minutes
-    _instance_dict = {}
-
-    def __new__(cls: type["RateLimit"], client_id: str, max_active_requests: int):
-        if client_id not in cls._instance_dict:
-            instance = super().__new__(cls)
-            cls._instance_dict[client_id] = instance
-        return cls._instance_dict[client_id]
-
-    def __init__(self, client_id: str, max_active_requests: int):
-        self.max_active_requests = max_active_requests
-        if hasattr(self, "initialized"):
-            return
-        self.initialized = True
-        self.client_id = client_id
-        self.active_requests_key = self._ACTIVE_REQUESTS_KEY.format(client_id)
-        self.max_active_requests_key = self._MAX_ACTIVE_REQUESTS_KEY.format(client_id)
-        self.last_recalculate_time = float("-inf")
-        self.flush_cache(use_local_value=True)
-
-    def flush_cache(self, use_local_value=False):
-        self.last_recalculate_time = time.time()
-        # flush max active requests
-        if use_local_value or not redis_client.exists(self.max_active_requests_key):
-            with redis_client.pipeline() as pipe:
-                pipe.set(self.max_active_requests_key, self.max_active_requests)
-                pipe.expire(self.max_active_requests_key, timedelta(days=1))
-                pipe.execute()
-        else:
-            with redis_client.pipeline() as pipe:
-                self.max_active_requests = int(redis_client.get(self.max_active_requests_key).decode("utf-8"))
-                redis_client.expire(self.max_active_requests_key, timedelta(days=1))
+    _BLOCKED_KEYS_CAPACITY = 10000
 
-        # flush max active requests (in-transit request list)
-        if not redis_client.exists(self.active_requests_key):
-            return
-        request_details = redis_client.hgetall(self.active_requests_key)
-        redis_client.expire(self.active_requests_key, timedelta(days=1))
-        timeout_requests = [
-            k
-            for k, v in request_details.items()
-            if time.time() - float(v.decode("utf-8")) > RateLimit._REQUEST_MAX_ALIVE_TIME
+    # active requests of this process by concurrency key, request id to enter time
+    _local_active_requests: dict[str, dict[str, float]] = {}
+    # time until which a bucket is known to be empty, by bucket key
+    _blocked_until = LRUCache(_BLOCKED_KEYS_CAPACITY)
+    _lock = Lock()
+
+    def __init__(self, rules: Sequence[RateLimitRule]):
+        self.rules = rules
+
+    @classmethod
+    def for_app(cls, app_id: str, max_active_requests: int, end_user_id: Optional[str] = None) -> "RateLimit":
+        """
+        Get the rate limit of a request to an app, with the limits of the API key and the end user if any
+        """
+        rules = [
+            RateLimitRule(
+                scope=RateLimitScope.APP,
+                scope_id=app_id,
+                max_active_requests=max_active_requests,
+                requests_per_minute=dify_config.APP_REQUESTS_PER_MINUTE,
+                llm_tokens_per_minute=dify_config.APP_LLM_TOKENS_PER_MINUTE,
+            )
         ]
-        if timeout_requests:
-            redis_client.hdel(self.active_requests_key, *timeout_requests)
+
+        api_token_id = g.get("api_token_id") if has_app_context() else None
+        if api_token_id:
+            rules.append(
+                RateLimitRule(
+                    scope=RateLimitScope.API_KEY,
+                    scope_id=api_token_id,
+                    max_active_requests=dify_config.API_KEY_MAX_ACTIVE_REQUESTS,
+                    requests_per_minute=dify_config.API_KEY_REQUESTS_PER_MINUTE,
+                    llm_tokens_per_minute=dify_config.API_KEY_LLM_TOKENS_PER_MINUTE,
+                )
+            )
+
+        if end_user_id:
+            rules.append(
+                RateLimitRule(
+                    scope=RateLimitScope.END_USER,
+                    scope_id=end_user_id,
+                    max_active_requests=dify_config.END_USER_MAX_ACTIVE_REQUESTS,
+                    requests_per_minute=dify_config.END_USER_REQUESTS_PER_MINUTE,
+                    llm_tokens_per_minute=dify_config.END_USER_LLM_TOKENS_PER_MINUTE,
+                )
+            )
+
+        return cls(rules)
 
     def enter(self, request_id: Optional[str] = None) -> str:
-        if time.time() - self.last_recalculate_time > RateLimit._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
-            self.flush_cache()
-        if self.max_active_requests <= 0:
+        concurrency_checks = self._get_checks(RateLimitType.ACTIVE_REQUESTS)
+        bucket_checks = self._get_checks(RateLimitType.REQUESTS_PER_MINUTE) + self._get_checks(
+            RateLimitType.LLM_TOKENS_PER_MINUTE
+        )
+        if not concurrency_checks and not bucket_checks:
             return RateLimit._UNLIMITED_REQUEST_ID
         if not request_id:
             request_id = RateLimit.gen_request_key()
 
-        active_requests_count = redis_client.hlen(self.active_requests_key)
-        if active_requests_count >= self.max_active_requests:
-            raise AppInvokeQuotaExceededError(
-                "Too many requests. Please try again later. The current maximum "
-                "concurrent requests allowed is {}.".format(self.max_active_requests)
-            )
-        redis_client.hset(self.active_requests_key, request_id, str(time.time()))
+        now = time.time()
+        self._precheck(concurrency_checks, bucket_checks, now)
+
+        checks = concurrency_checks + bucket_checks
+        args = [int(now * 1000), request_id, RateLimit._REQUEST_MAX_ALIVE_TIME * 1000, len(concurrency_checks)]
+        for check in checks:
+            args.extend([check.limit, check.cost, check.label])
+
+        rejected, retry_after = _ACQUIRE_SCRIPT(keys=[REJECTIONS_KEY, *[check.key for check in checks]], args=args)
+        if rejected:
+            check = checks[int(rejected) - 1]
+            if retry_after:
+                self._block(check.key, now + int(retry_after) / 1000)
+                raise self._get_error(check, math.ceil(int(retry_after) / 1000))
+            raise self._get_error(check)
+
+        with RateLimit._lock:
+            for check in concurrency_checks:
+                RateLimit._local_active_requests.setdefault(check.key, {})[request_id] = now
+
         return request_id
 
     def exit(self, request_id: str):
         if request_id == RateLimit._UNLIMITED_REQUEST_ID:
             return
-        redis_client.hdel(self.active_requests_key, request_id)
+
+        concurrency_checks = self._get_checks(RateLimitType.ACTIVE_REQUESTS)
+        if not concurrency_checks:
+            return
+
+        with RateLimit._lock:
+            for check in concurrency_checks:
+                active_requests = RateLimit._local_active_requests.get(check.key)
+                if active_requests is not None:
+                    active_requests.pop(request_id, None)
+                    if not active_requests:
+                        del RateLimit._local_active_requests[check.key]
+
+        with redis_client.pipeline(transaction=False) as pipe:
+            for check in concurrency_checks:
+                pipe.zrem(check.key, request_id)
+            pipe.execute()
+
+    def consume_llm_tokens(self, tokens: int) -> None:
+        """
+        Take the LLM tokens used by a request from the LLM token buckets
+        """
+        checks = self._get_checks(RateLimitType.LLM_TOKENS_PER_MINUTE)
+        if not checks or tokens <= 0:
+            return
+
+        now = time.time()
+        retry_after = _CONSUME_SCRIPT(
+            keys=[check.key for check in checks], args=[int(now * 1000), tokens, *[check.limit for check in checks]]
+        )
+        for check, check_retry_after in zip(checks, retry_after):
+            if check_retry_after:
+                self._block(check.key, now + int(check_retry_after) / 1000)
 
     @staticmethod
     def gen_request_key() -> str:
@@ -94,6 +264,82 @@ class RateLimit:
         else:
             return RateLimitGenerator(self, generator, request_id)
 
+    @classmethod
+    def clear_local_state(cls) -> None:
+        with cls._lock:
+            cls._local_active_requests = {}
+            cls._blocked_until = LRUCache(cls._BLOCKED_KEYS_CAPACITY)
+
+    def _get_checks(self, limit_type: RateLimitType) -> list[RateLimitCheck]:
+        checks = []
+        for rule in self.rules:
+            if limit_type == RateLimitType.ACTIVE_REQUESTS:
+                limit, cost = rule.max_active_requests, 0
+            elif limit_type == RateLimitType.REQUESTS_PER_MINUTE:
+                limit, cost = rule.requests_per_minute, 1
+            else:
+                # LLM tokens are taken once used, a request is admitted while tokens are left
+                limit, cost = rule.llm_tokens_per_minute, 0
+
+            if limit > 0:
+                checks.append(
+                    RateLimitCheck(
+                        key=self._KEY.format(rule.scope.value, rule.scope_id, limit_type.value),
+                        scope=rule.scope,
+                        limit_type=limit_type,
+                        limit=limit,
+                        cost=cost,
+                    )
+                )
+        return checks
+
+    def _precheck(
+        self, concurrency_checks: Sequence[RateLimitCheck], bucket_checks: Sequence[RateLimitCheck], now: float
+    ) -> None:
+        """
+        Reject requests that Redis would reject too, without a round trip
+        """
+        with RateLimit._lock:
+            for check in concurrency_checks:
+                active_requests = RateLimit._local_active_requests.get(check.key)
+                if not active_requests:
+                    continue
+                # requests that never exited expire like in Redis
+                for request_id, entered_at in list(active_requests.items()):
+                    if now - entered_at > RateLimit._REQUEST_MAX_ALIVE_TIME:
+                        del active_requests[request_id]
+                # the active requests of this process are a lower bound of the active requests of all processes
+                if len(active_requests) >= check.limit:
+                    RateLimitMetrics.record_local_rejection(check.label)
+                    raise self._get_error(check)
+
+            for check in bucket_checks:
+                blocked_until = RateLimit._blocked_until.get(check.key)
+                if blocked_until is not None and now < blocked_until:
+                    RateLimitMetrics.record_local_rejection(check.label)
+                    raise self._get_error(check, math.ceil(blocked_until - now))
+
+    @staticmethod
+    def _block(key: str, until: float) -> None:
+        with RateLimit._lock:
+            RateLimit._blocked_until.put(key, until)
+
+    @staticmethod
+    def _get_error(check: RateLimitCheck, retry_after: Optional[int] = None) -> AppInvokeQuotaExceededError:
+        logger.debug("Request rejected by rate limit %s of %s", check.label, check.key)
+        scope = check.scope.value.replace("_", " ")
+        if check.limit_type == RateLimitType.ACTIVE_REQUESTS:
+            message = "The current maximum concurrent requests allowed is {}".format(check.limit)
+        elif check.limit_type == RateLimitType.REQUESTS_PER_MINUTE:
+            message = "The current maximum requests per minute allowed is {}".format(check.limit)
+        else:
+            message = "The current maximum LLM tokens per minute allowed is {}".format(check.limit)
+
+        return AppInvokeQuotaExceededError(
+            "Too many requests. Please try again later. {} for this {}.".format(message, scope)
+            + (" Retry after {} seconds.".format(retry_after) if retry_after else "")
+        )
+
 
 class RateLimitGenerator:
     def __init__(self, rate_limit: RateLimit, generator: Union[Generator, callable], request_id: str):
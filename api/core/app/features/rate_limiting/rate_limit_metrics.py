@@ -0,0 +1,40 @@
+from collections import Counter
+from threading import Lock
+
+from extensions.ext_redis import redis_client
+
+REJECTIONS_KEY = "dify:rate_limit:rejections"
+
+
+class RateLimitMetrics:
+    """
+    Counters of rejected requests by scope and limit.
+
+    Rejections by the local pre-check are counted in this process only, rejections by Redis are
+    also counted by the Lua scripts in a Redis hash shared by all processes.
+    """
+
+    _local_rejections: Counter = Counter()
+    _lock = Lock()
+
+    @classmethod
+    def record_local_rejection(cls, label: str) -> None:
+        with cls._lock:
+            cls._local_rejections[label] += 1
+
+    @classmethod
+    def get_local_rejections(cls) -> dict[str, int]:
+        with cls._lock:
+            return dict(cls._local_rejections)
+
+    @classmethod
+    def get_rejections(cls) -> dict[str, int]:
+        """
+        Get the rejections by Redis of all processes
+        """
+        return {key.decode("utf-8"): int(value) for key, value in redis_client.hgetall(REJECTIONS_KEY).items()}
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._local_rejections = Counter()
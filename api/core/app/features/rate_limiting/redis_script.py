@@ -0,0 +1,24 @@
+import hashlib
+from collections.abc import Sequence
+from typing import Any
+
+from redis.exceptions import NoScriptError
+
+from extensions.ext_redis import redis_client
+
+
+class RedisScript:
+    """
+    Lua script run with EVALSHA, the script is sent again only when the server does not have it cached.
+    """
+
+    def __init__(self, script: str):
+        self.script = script
+        self.sha = hashlib.sha1(script.encode("utf-8")).hexdigest()
+
+    def __call__(self, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        try:
+            return redis_client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            # EVAL caches the script for the following calls
+            return redis_client.eval(self.script, len(keys), *keys, *args)
@@ -1,11 +1,15 @@
 import base64
 import logging
+import time
+from threading import Lock
 from typing import Optional, cast
 
 import numpy as np
 from sqlalchemy.exc import IntegrityError
 
 from core.embedding.embedding_constant import EmbeddingInputType
+from core.embedding.embedding_dispatcher import EmbeddingDispatcher
+from core.helper.lru_cache import LRUCache
 from core.model_manager import ModelInstance
 from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
@@ -19,6 +23,12 @@ logger = logging.getLogger(__name__)
 
 
 class CacheEmbedding(Embeddings):
+    # query embeddings of the last minute, so that a query embedded for annotation reply and then
+    # for dataset retrieval of the same message skips the Redis round trips
+    _local_query_embeddings = LRUCache(1000)
+    _local_query_embeddings_lock = Lock()
+    _LOCAL_QUERY_EMBEDDING_TTL = 60
+
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
         self._model_instance = model_instance
         self._user = user
@@ -27,18 +37,25 @@ class CacheEmbedding(Embeddings):
         """Embed search docs in batches of 10."""
         # use doc embedding cache or store if not exists
         text_embeddings = [None for _ in range(len(texts))]
-        embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = (
+        hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = {}
+        unique_hashes = list(set(hashes))
+        for i in range(0, len(unique_hashes), 1000):
+            embeddings = (
                 db.session.query(Embedding)
-                .filter_by(
-                    model_name=self._model_instance.model, hash=hash, provider_name=self._model_instance.provider
+                .filter(
+                    Embedding.model_name == self._model_instance.model,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(unique_hashes[i : i + 1000]),
                 )
-                .first()
+                .all()
             )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+            cached_embeddings.update({embedding.hash: embedding for embedding in embeddings})
+
+        embedding_queue_indices = []
+        for i, hash in enumerate(hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash].get_embedding()
             else:
                 embedding_queue_indices.append(i)
         if embedding_queue_indices:
@@ -54,13 +71,14 @@ class CacheEmbedding(Embeddings):
                     if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties
                     else 1
                 )
-                for i in range(0, len(embedding_queue_texts), max_chunks):
-                    batch_texts = embedding_queue_texts[i : i + max_chunks]
-
-                    embedding_result = self._model_instance.invoke_text_embedding(
-                        texts=batch_texts, user=self._user, input_type=EmbeddingInputType.DOCUMENT
-                    )
+                batches = [
+                    embedding_queue_texts[i : i + max_chunks] for i in range(0, len(embedding_queue_texts), max_chunks)
+                ]
+                embedding_results = EmbeddingDispatcher(self._model_instance, self._user).embed_batches(
+                    batches, input_type=EmbeddingInputType.DOCUMENT
+                )
 
+                for embedding_result in embedding_results:
                     for vector in embedding_result.embeddings:
                         try:
                             normalized_embedding = (vector / np.linalg.norm(vector)).tolist()
@@ -98,10 +116,17 @@ class CacheEmbedding(Embeddings):
         # use doc embedding cache or store if not exists
         hash = helper.generate_text_hash(text)
         embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model}_{hash}"
+        with self._local_query_embeddings_lock:
+            local_embedding = self._local_query_embeddings.get(embedding_cache_key)
+        if local_embedding is not None and local_embedding[0] > time.monotonic():
+            return list(local_embedding[1])
+
         embedding = redis_client.get(embedding_cache_key)
         if embedding:
             redis_client.expire(embedding_cache_key, 600)
-            return list(np.frombuffer(base64.b64decode(embedding), dtype="float"))
+            embedding_results = list(np.frombuffer(base64.b64decode(embedding), dtype="float"))
+            self._cache_local_query_embedding(embedding_cache_key, embedding_results)
+            return embedding_results
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text], user=self._user, input_type=EmbeddingInputType.QUERY
@@ -124,4 +149,12 @@ class CacheEmbedding(Embeddings):
         except Exception as ex:
             logging.exception("Failed to add embedding to redis %s", ex)
 
+        self._cache_local_query_embedding(embedding_cache_key, embedding_results)
         return embedding_results
+
+    @classmethod
+    def _cache_local_query_embedding(cls, embedding_cache_key: str, embedding: list[float]) -> None:
+        with cls._local_query_embeddings_lock:
+            cls._local_query_embeddings.put(
+                embedding_cache_key, (time.monotonic() + cls._LOCAL_QUERY_EMBEDDING_TTL, tuple(embedding))
+            )
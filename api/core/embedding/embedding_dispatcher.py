@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Lock
+from typing import Optional
+
+from configs import dify_config
+from core.embedding.embedding_constant import EmbeddingInputType
+from core.helper.lru_cache import LRUCache
+from core.model_manager import ModelInstance
+from core.model_runtime.entities.text_embedding_entities import TextEmbeddingResult
+from core.model_runtime.errors.invoke import InvokeRateLimitError
+
+logger = logging.getLogger(__name__)
+
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RATE_LIMIT_WAIT = 60
+EMBEDDING_BUDGET_CACHE_CAPACITY = 1024
+
+
+class EmbeddingBudget:
+    """
+    Concurrency and tokens per minute budget of one provider credentials in this process.
+
+    The concurrency is halved on every rate limited request and grows back by one on every
+    successful request, up to EMBEDDING_MAX_CONCURRENT_REQUESTS.
+    """
+
+    def __init__(self, max_concurrency: int, tokens_per_minute: int):
+        self.max_concurrency = max_concurrency
+        self.concurrency = max_concurrency
+        self.active = 0
+        self.tokens_per_minute = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.refilled_at = time.monotonic()
+        self._condition = Condition()
+
+    def acquire(self, tokens: int) -> None:
+        with self._condition:
+            while self.active >= self.concurrency:
+                self._condition.wait()
+            self.active += 1
+
+        if not self.tokens_per_minute:
+            return
+        # a batch larger than the budget waits for a full bucket
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._condition:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.tokens_per_minute, self.tokens + (now - self.refilled_at) * self.tokens_per_minute / 60
+                )
+                self.refilled_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) * 60 / self.tokens_per_minute
+            time.sleep(wait)
+
+    def release(self, rate_limited: bool) -> None:
+        with self._condition:
+            self.active -= 1
+            if rate_limited:
+                self.concurrency = max(1, self.concurrency // 2)
+            elif self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+            self._condition.notify_all()
+
+
+class EmbeddingDispatcher:
+    """
+    Embed batches of texts concurrently, within the budget of the provider credentials, and return
+    their results in the order of the batches.
+    """
+
+    _budgets = LRUCache(EMBEDDING_BUDGET_CACHE_CAPACITY)
+    _budgets_lock = Lock()
+
+    def __init__(self, model_instance: ModelInstance, user: Optional[str] = None):
+        self._model_instance = model_instance
+        self._user = user
+        self._budget = self._get_budget(model_instance)
+
+    def embed_batches(
+        self, batches: list[list[str]], input_type: EmbeddingInputType = EmbeddingInputType.DOCUMENT
+    ) -> list[TextEmbeddingResult]:
+        if len(batches) <= 1 or self._budget.max_concurrency <= 1:
+            return [self._embed_batch(batch, input_type) for batch in batches]
+
+        with ThreadPoolExecutor(max_workers=min(len(batches), self._budget.max_concurrency)) as executor:
+            futures = [executor.submit(self._embed_batch, batch, input_type) for batch in batches]
+            return [future.result() for future in futures]
+
+    def _embed_batch(self, texts: list[str], input_type: EmbeddingInputType) -> TextEmbeddingResult:
+        tokens = sum(self._estimate_tokens(text) for text in texts)
+        retries = 0
+        while True:
+            self._budget.acquire(tokens)
+            try:
+                result = self._model_instance.invoke_text_embedding(texts=texts, user=self._user, input_type=input_type)
+            except InvokeRateLimitError:
+                self._budget.release(rate_limited=True)
+                if retries >= MAX_RATE_LIMIT_RETRIES:
+                    raise
+                retries += 1
+                wait = self._get_rate_limit_wait(retries)
+                logger.warning(f"Embedding rate limited, retry {retries} in {wait}s")
+                time.sleep(wait)
+                continue
+            except Exception:
+                self._budget.release(rate_limited=False)
+                raise
+
+            self._budget.release(rate_limited=False)
+            return result
+
+    def _get_rate_limit_wait(self, retries: int) -> int:
+        load_balancing_manager = self._model_instance.load_balancing_manager
+        if load_balancing_manager:
+            # rate limits escape load balancing only when every config is cooling down
+            cooldown_ttl = load_balancing_manager.get_cooldown_ttl()
+            if cooldown_ttl > 0:
+                return min(cooldown_ttl, MAX_RATE_LIMIT_WAIT)
+
+        return min(2**retries, MAX_RATE_LIMIT_WAIT)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # about four characters per token, counting with the tokenizer would cost more than embedding
+        return len(text) // 4 + 1
+
+    @classmethod
+    def _get_budget(cls, model_instance: ModelInstance) -> EmbeddingBudget:
+        credentials_hash = hashlib.sha256(
+            json.dumps(model_instance.credentials, sort_keys=True, default=repr).encode("utf-8")
+        ).hexdigest()
+        key = (model_instance.provider, model_instance.model, credentials_hash)
+        with cls._budgets_lock:
+            budget = cls._budgets.get(key)
+            if budget is None:
+                budget = EmbeddingBudget(
+                    dify_config.EMBEDDING_MAX_CONCURRENT_REQUESTS, dify_config.EMBEDDING_TOKENS_PER_MINUTE
+                )
+                cls._budgets.put(key, budget)
+            return budget
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._budgets_lock:
+            cls._budgets = LRUCache(EMBEDDING_BUDGET_CACHE_CAPACITY)
@@ -0,0 +1,87 @@
+import hashlib
+import json
+from datetime import datetime
+from json import JSONDecodeError
+from typing import Optional
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+API_TOKEN_LAST_USED_AT_KEY = "api_token_last_used_at"
+
+
+class ApiTokenCache:
+    def __init__(self, token: str, scope: Optional[str]):
+        # never keep the raw token in redis, the sha256 digest is enough to look it up
+        token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        self.cache_key = f"api_token:scope:{scope}:hash:{token_hash}"
+
+    def get(self) -> Optional[dict]:
+        """
+        Get cached api token info.
+
+        :return: dict with id, app_id, tenant_id and type of the token
+        """
+        cached_api_token = redis_client.get(self.cache_key)
+        if cached_api_token:
+            try:
+                cached_api_token = cached_api_token.decode("utf-8")
+                cached_api_token = json.loads(cached_api_token)
+            except JSONDecodeError:
+                return None
+
+            return cached_api_token
+        else:
+            return None
+
+    def set(self, api_token: dict) -> None:
+        """
+        Cache api token info.
+
+        :param api_token: dict with id, app_id, tenant_id and type of the token
+        :return:
+        """
+        redis_client.setex(self.cache_key, dify_config.API_TOKEN_CACHE_TTL, json.dumps(api_token))
+
+    def delete(self) -> None:
+        """
+        Delete cached api token info.
+
+        :return:
+        """
+        redis_client.delete(self.cache_key)
+
+
+class ApiTokenLastUsedRecorder:
+    """
+    Buffers api token last_used_at timestamps in redis so that service API requests
+    don't need a write transaction; the buffer is flushed by a periodic task.
+    """
+
+    @classmethod
+    def record(cls, api_token_id: str, used_at: datetime) -> None:
+        """
+        Record the last usage of an api token.
+
+        :param api_token_id: api token id
+        :param used_at: naive utc datetime of the usage
+        :return:
+        """
+        redis_client.hset(API_TOKEN_LAST_USED_AT_KEY, api_token_id, used_at.isoformat())
+
+    @classmethod
+    def pop_all(cls) -> dict[str, datetime]:
+        """
+        Atomically take every buffered usage out of redis.
+
+        :return: mapping of api token id to its latest usage
+        """
+        with redis_client.pipeline() as pipe:
+            pipe.hgetall(API_TOKEN_LAST_USED_AT_KEY)
+            pipe.delete(API_TOKEN_LAST_USED_AT_KEY)
+            buffered_usages, _ = pipe.execute()
+
+        return {
+            api_token_id.decode("utf-8"): datetime.fromisoformat(used_at.decode("utf-8"))
+            for api_token_id, used_at in buffered_usages.items()
+        }
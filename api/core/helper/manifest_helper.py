@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Manifest:
+    """
+    JSON snapshot of schemas that are otherwise read from YAML files spread over the source tree.
+
+    Manifests are generated at build time by `flask generate-manifests` and read in one go on first use.
+    Without the manifest file, callers fall back to reading the source tree.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data: Optional[dict[str, Any]] = None
+        self._loaded = False
+        self._lock = Lock()
+
+    def get(self) -> Optional[dict[str, Any]]:
+        """
+        Get the manifest content, None when the manifest was not generated
+        """
+        if self._loaded:
+            return self._data
+
+        with self._lock:
+            if not self._loaded:
+                self._data = self._read()
+                self._loaded = True
+
+        return self._data
+
+    def write(self, data: dict[str, Any]) -> None:
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            self._data = data
+            self._loaded = True
+
+    def remove(self) -> None:
+        """
+        Remove the manifest, so that the source tree is read until it is generated again
+        """
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._data = None
+            self._loaded = True
+
+    def _read(self) -> Optional[dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            logger.exception("Failed to read manifest %s, falling back to the source tree", self.path)
+            return None
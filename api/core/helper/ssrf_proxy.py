@@ -26,29 +26,76 @@ BACKOFF_FACTOR = 0.5
 STATUS_FORCELIST = [429, 500, 502, 503, 504]
 
 
+class _ClientClosingStream(httpx.SyncByteStream):
+    """
+    Body of a streamed response, closing it also closes the client the response was sent with.
+    """
+
+    def __init__(self, stream: httpx.SyncByteStream, client: httpx.Client):
+        self._stream = stream
+        self._client = client
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._client.close()
+
+
+def _create_client() -> httpx.Client:
+    if SSRF_PROXY_ALL_URL:
+        return httpx.Client(proxy=SSRF_PROXY_ALL_URL)
+    elif proxy_mounts:
+        return httpx.Client(mounts=proxy_mounts)
+    else:
+        return httpx.Client()
+
+
+def _stream_request(method, url, **kwargs) -> httpx.Response:
+    """
+    Send a request without reading the response body.
+    The caller reads the body with `iter_bytes` and must close the response.
+    """
+    send_kwargs = {}
+    if "follow_redirects" in kwargs:
+        send_kwargs["follow_redirects"] = kwargs.pop("follow_redirects")
+
+    client = _create_client()
+    try:
+        request = client.build_request(method=method, url=url, **kwargs)
+        response = client.send(request, stream=True, **send_kwargs)
+    except Exception:
+        client.close()
+        raise
+
+    response.stream = _ClientClosingStream(response.stream, client)
+    return response
+
+
 def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     if "allow_redirects" in kwargs:
         allow_redirects = kwargs.pop("allow_redirects")
         if "follow_redirects" not in kwargs:
             kwargs["follow_redirects"] = allow_redirects
+    stream = kwargs.pop("stream", False)
 
     retries = 0
     while retries <= max_retries:
         try:
-            if SSRF_PROXY_ALL_URL:
-                with httpx.Client(proxy=SSRF_PROXY_ALL_URL) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            elif proxy_mounts:
-                with httpx.Client(mounts=proxy_mounts) as client:
-                    response = client.request(method=method, url=url, **kwargs)
+            if stream:
+                response = _stream_request(method, url, **kwargs)
             else:
-                with httpx.Client() as client:
+                with _create_client() as client:
                     response = client.request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
                 return response
             else:
                 logging.warning(f"Received status code {response.status_code} for URL {url} which is in the force list")
+                response.close()
 
         except httpx.RequestError as e:
             logging.warning(f"Request to URL {url} failed on attempt {retries + 1}: {e}")
@@ -35,6 +35,7 @@ from libs import helper
 from models.dataset import Dataset, DatasetProcessRule, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from models.model import UploadFile
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
 from services.feature_service import FeatureService
 
 
@@ -675,6 +676,9 @@ class IndexingRunner:
 
                 for future in futures:
                     tokens += future.result()
+        else:
+            # the vector index the dataset switches to, if it is being rebuilt for high quality indexing
+            DatasetVectorRebuildService.index_documents(dataset, documents)
 
         create_keyword_thread.join()
         indexing_end_at = time.perf_counter()
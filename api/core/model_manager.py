@@ -201,6 +201,24 @@ class ModelInstance:
             texts=texts,
         )
 
+    def get_text_embedding_num_tokens_batch(self, texts: list[str]) -> list[int]:
+        """
+        Get number of tokens of each text for text embedding
+
+        :param texts: texts to embed
+        :return: token count of each text, in input order
+        """
+        if not isinstance(self.model_type_instance, TextEmbeddingModel):
+            raise Exception("Model type instance is not TextEmbeddingModel")
+
+        self.model_type_instance = cast(TextEmbeddingModel, self.model_type_instance)
+        return self._round_robin_invoke(
+            function=self.model_type_instance.get_num_tokens_batch,
+            model=self.model,
+            credentials=self.credentials,
+            texts=texts,
+        )
+
     def invoke_rerank(
         self,
         query: str,
@@ -534,3 +552,19 @@ class LBModelManager:
 
         ttl = cast(int, ttl)
         return True, ttl
+
+    def get_cooldown_ttl(self) -> int:
+        """
+        Get the seconds until a load balancing config leaves its cooldown, 0 if one is available
+        :return:
+        """
+        ttls = []
+        for load_balancing_config in self._load_balancing_configs:
+            in_cooldown, ttl = self.get_config_in_cooldown_and_ttl(
+                self._tenant_id, self._provider, self._model_type, self._model, load_balancing_config.id
+            )
+            if not in_cooldown:
+                return 0
+            ttls.append(ttl)
+
+        return min(ttls, default=0)
@@ -20,6 +20,7 @@ from core.model_runtime.entities.model_entities import (
 )
 from core.model_runtime.errors.invoke import InvokeAuthorizationError, InvokeError
 from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+from core.model_runtime.model_providers.model_provider_manifest import ModelProviderManifest
 from core.tools.utils.yaml_utils import load_yaml_file
 
 
@@ -145,6 +146,11 @@ class AIModel(ABC):
         # get provider name
         provider_name = self.__class__.__module__.split(".")[-3]
 
+        manifest_models = ModelProviderManifest.get_predefined_models(provider_name, self.model_type)
+        if manifest_models is not None:
+            self.model_schemas = manifest_models
+            return manifest_models
+
         # get the path of current classes
         current_path = os.path.abspath(__file__)
         # get parent path of the current path
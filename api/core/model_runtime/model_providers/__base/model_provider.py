@@ -6,6 +6,7 @@ from core.helper.module_import_helper import get_subclasses_from_module, import_
 from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
 from core.model_runtime.entities.provider_entities import ProviderEntity
 from core.model_runtime.model_providers.__base.ai_model import AIModel
+from core.model_runtime.model_providers.model_provider_manifest import ModelProviderManifest
 from core.tools.utils.yaml_utils import load_yaml_file
 
 
@@ -38,6 +39,11 @@ class ModelProvider(ABC):
         # get dirname of the current path
         provider_name = self.__class__.__module__.split(".")[-1]
 
+        provider_schema = ModelProviderManifest.get_provider_schema(provider_name)
+        if provider_schema:
+            self.provider_schema = provider_schema
+            return provider_schema
+
         # get the path of the model_provider classes
         base_path = os.path.abspath(__file__)
         current_path = os.path.join(os.path.dirname(os.path.dirname(base_path)), provider_name)
@@ -68,6 +74,12 @@ class ModelProvider(ABC):
         if model_type not in provider_schema.supported_model_types:
             return []
 
+        # served from the manifest without importing the model type module
+        provider_name = self.__class__.__module__.split(".")[-1]
+        models = ModelProviderManifest.get_predefined_models(provider_name, model_type)
+        if models is not None:
+            return models
+
         # get model instance of the model type
         model_instance = self.get_model_instance(model_type)
 
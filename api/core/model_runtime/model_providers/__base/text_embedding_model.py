@@ -78,6 +78,17 @@ class TextEmbeddingModel(AIModel):
         """
         raise NotImplementedError
 
+    def get_num_tokens_batch(self, model: str, credentials: dict, texts: list[str]) -> list[int]:
+        """
+        Get number of tokens for each of the given texts
+
+        :param model: model name
+        :param credentials: model credentials
+        :param texts: texts to embed
+        :return: token count of each text, in input order
+        """
+        return [self.get_num_tokens(model, credentials, [text]) for text in texts]
+
     def _get_context_size(self, model: str, credentials: dict) -> int:
         """
         Get context size for given embedding model
@@ -4,6 +4,8 @@ from typing import Any
 
 from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer
 
+from core.model_runtime.model_providers.__base.tokenizers.token_count_cache import token_count_cache
+
 _tokenizer = None
 _lock = Lock()
 
@@ -20,7 +22,7 @@ class GPT2Tokenizer:
 
     @staticmethod
     def get_num_tokens(text: str) -> int:
-        return GPT2Tokenizer._get_num_tokens_by_gpt2(text)
+        return token_count_cache.get_num_tokens("gpt2", text, GPT2Tokenizer._get_num_tokens_by_gpt2)
 
     @staticmethod
     def get_encoder() -> Any:
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+
+# texts shorter than this are tokenized faster than they are looked up
+MIN_CACHED_CHARACTERS = 64
+# characters of the cached texts, beyond which the least recently counted texts are evicted
+MAX_CACHED_CHARACTERS = 16 * 1024 * 1024
+
+
+class TokenCountCache:
+    """
+    Token counts of texts by tokenizer.
+
+    The system prompt, the histories and the context of a conversation are the same texts from message to message,
+    and within a message its token count is calculated several times to fit its context, so the texts a prompt is
+    assembled from are counted once each rather than every time the prompt is.
+    """
+
+    def __init__(
+        self, min_characters: int = MIN_CACHED_CHARACTERS, max_characters: int = MAX_CACHED_CHARACTERS
+    ) -> None:
+        self.min_characters = min_characters
+        self.max_characters = max_characters
+        self._counts: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._characters = 0
+        self._lock = Lock()
+
+    def get_num_tokens(self, tokenizer: str, text: str, count: Callable[[str], int]) -> int:
+        """
+        Get the number of tokens of a text, counted by `count` unless cached
+
+        :param tokenizer: name of the tokenizer `count` uses
+        :param text: text
+        :param count: counts the tokens of a text
+        :return: number of tokens
+        """
+        if len(text) < self.min_characters:
+            return count(text)
+
+        key = (tokenizer, text)
+        with self._lock:
+            num_tokens = self._counts.get(key)
+            if num_tokens is not None:
+                self._counts.move_to_end(key)
+                return num_tokens
+
+        num_tokens = count(text)
+        with self._lock:
+            if key not in self._counts:
+                self._counts[key] = num_tokens
+                self._characters += len(text)
+                while self._characters > self.max_characters:
+                    (_, evicted_text), _ = self._counts.popitem(last=False)
+                    self._characters -= len(evicted_text)
+        return num_tokens
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._characters = 0
+
+
+token_count_cache = TokenCountCache()
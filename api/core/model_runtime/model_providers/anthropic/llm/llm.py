@@ -43,6 +43,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.utils.client_pool import ModelClientPool, create_http_client
 
 ANTHROPIC_BLOCK_MODE_PROMPT = """You should always follow the instructions and output a valid {{block}} object.
 The structure of the {{block}} object you can found in the instructions, use {"answer": "$your_answer"} as the default structure
@@ -112,8 +113,13 @@ class AnthropicLargeLanguageModel(LargeLanguageModel):
         if "max_tokens_to_sample" in model_parameters:
             model_parameters["max_tokens"] = model_parameters.pop("max_tokens_to_sample")
 
-        # init model client
-        client = Anthropic(**credentials_kwargs)
+        # get the pooled model client, which reuses its connections across invocations
+        client = ModelClientPool.get_client(
+            "anthropic",
+            credentials_kwargs.get("base_url"),
+            credentials_kwargs,
+            lambda: Anthropic(**credentials_kwargs, http_client=create_http_client()),
+        )
 
         extra_model_kwargs = {}
         if stop:
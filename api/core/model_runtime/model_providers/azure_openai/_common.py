@@ -1,5 +1,6 @@
 import openai
 from httpx import Timeout
+from openai import AzureOpenAI
 
 from core.model_runtime.errors.invoke import (
     InvokeAuthorizationError,
@@ -10,6 +11,7 @@ from core.model_runtime.errors.invoke import (
     InvokeServerUnavailableError,
 )
 from core.model_runtime.model_providers.azure_openai._constant import AZURE_OPENAI_API_VERSION
+from core.model_runtime.utils.client_pool import ModelClientPool, create_http_client
 
 
 class _CommonAzureOpenAI:
@@ -26,6 +28,18 @@ class _CommonAzureOpenAI:
 
         return credentials_kwargs
 
+    @staticmethod
+    def _get_client(credentials_kwargs: dict) -> AzureOpenAI:
+        """
+        Get the pooled client of the credentials, which reuses its connections across invocations
+        """
+        return ModelClientPool.get_client(
+            "azure_openai",
+            credentials_kwargs["azure_endpoint"],
+            credentials_kwargs,
+            lambda: AzureOpenAI(**credentials_kwargs, http_client=create_http_client()),
+        )
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         return {
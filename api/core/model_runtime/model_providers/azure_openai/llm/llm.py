@@ -5,7 +5,7 @@ from collections.abc import Generator, Sequence
 from typing import Optional, Union, cast
 
 import tiktoken
-from openai import AzureOpenAI, Stream
+from openai import Stream
 from openai.types import Completion
 from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessageToolCall
 from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
@@ -26,6 +26,7 @@ from core.model_runtime.entities.message_entities import (
 from core.model_runtime.entities.model_entities import AIModelEntity, ModelPropertyKey
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.model_providers.__base.tokenizers.token_count_cache import token_count_cache
 from core.model_runtime.model_providers.azure_openai._common import _CommonAzureOpenAI
 from core.model_runtime.model_providers.azure_openai._constant import LLM_BASE_MODELS
 from core.model_runtime.utils import helper
@@ -117,7 +118,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
             raise CredentialsValidateFailedError(f'Base Model Name {credentials["base_model_name"]} is invalid')
 
         try:
-            client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+            client = self._get_client(self._to_credential_kwargs(credentials))
 
             if ai_model_entity.entity.model_properties.get(ModelPropertyKey.MODE) == LLMMode.CHAT.value:
                 # chat model
@@ -157,7 +158,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
         stream: bool = True,
         user: Optional[str] = None,
     ) -> Union[LLMResult, Generator]:
-        client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+        client = self._get_client(self._to_credential_kwargs(credentials))
 
         extra_model_kwargs = {}
 
@@ -279,7 +280,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
         stream: bool = True,
         user: Optional[str] = None,
     ) -> Union[LLMResult, Generator]:
-        client = AzureOpenAI(**self._to_credential_kwargs(credentials))
+        client = self._get_client(self._to_credential_kwargs(credentials))
 
         response_format = model_parameters.get("response_format")
         if response_format:
@@ -533,7 +534,7 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
         except KeyError:
             encoding = tiktoken.get_encoding("cl100k_base")
 
-        num_tokens = len(encoding.encode(text))
+        num_tokens = token_count_cache.get_num_tokens(encoding.name, text, lambda t: len(encoding.encode(t)))
 
         if tools:
             num_tokens += self._num_tokens_for_tools(encoding, tools)
@@ -601,7 +602,9 @@ class AzureOpenAILargeLanguageModel(_CommonAzureOpenAI, LargeLanguageModel):
                                 num_tokens += len(encoding.encode(t_key))
                                 num_tokens += len(encoding.encode(t_value))
                 else:
-                    num_tokens += len(encoding.encode(str(value)))
+                    num_tokens += token_count_cache.get_num_tokens(
+                        encoding.name, str(value), lambda t: len(encoding.encode(t))
+                    )
 
                 if key == "name":
                     num_tokens += tokens_per_name
@@ -1,15 +1,17 @@
 import logging
 import os
 from collections.abc import Sequence
+from threading import Lock
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from core.helper.module_import_helper import load_single_subclass_from_source
 from core.helper.position_helper import get_provider_position_map, sort_to_dict_by_position_map
-from core.model_runtime.entities.model_entities import ModelType
+from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
 from core.model_runtime.entities.provider_entities import ProviderConfig, ProviderEntity, SimpleProviderEntity
 from core.model_runtime.model_providers.__base.model_provider import ModelProvider
+from core.model_runtime.model_providers.model_provider_manifest import ModelProviderManifest
 from core.model_runtime.schema_validators.model_credential_schema_validator import ModelCredentialSchemaValidator
 from core.model_runtime.schema_validators.provider_credential_schema_validator import ProviderCredentialSchemaValidator
 
@@ -19,10 +21,42 @@ logger = logging.getLogger(__name__)
 class ModelProviderExtension(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    provider_instance: ModelProvider
     name: str
     position: Optional[int] = None
 
+    _provider_instance: Optional[ModelProvider] = PrivateAttr(default=None)
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+
+    @property
+    def provider_instance(self) -> ModelProvider:
+        """
+        The provider module is imported on first access
+        """
+        if self._provider_instance is None:
+            with self._lock:
+                if self._provider_instance is None:
+                    self._provider_instance = _load_model_provider_class(self.name)()
+
+        return self._provider_instance
+
+    def get_provider_schema(self) -> ProviderEntity:
+        return ModelProviderManifest.get_provider_schema(self.name) or self.provider_instance.get_provider_schema()
+
+    def get_predefined_models(self, model_type: ModelType) -> list[AIModelEntity]:
+        models = ModelProviderManifest.get_predefined_models(self.name, model_type)
+        if models is None:
+            models = self.provider_instance.models(model_type)
+        return models
+
+
+def _load_model_provider_class(model_provider_name: str) -> type[ModelProvider]:
+    model_providers_path = os.path.dirname(os.path.abspath(__file__))
+    return load_single_subclass_from_source(
+        module_name=f"core.model_runtime.model_providers.{model_provider_name}.{model_provider_name}",
+        script_path=os.path.join(model_providers_path, model_provider_name, f"{model_provider_name}.py"),
+        parent_type=ModelProvider,
+    )
+
 
 class ModelProviderFactory:
     model_provider_extensions: Optional[dict[str, ModelProviderExtension]] = None
@@ -42,15 +76,13 @@ class ModelProviderFactory:
         # traverse all model_provider_extensions
         providers = []
         for model_provider_extension in model_provider_extensions.values():
-            # get model_provider instance
-            model_provider_instance = model_provider_extension.provider_instance
-
-            # get provider schema
-            provider_schema = model_provider_instance.get_provider_schema()
+            # get provider schema, the cached schema is shared so the models are added to a copy
+            provider_schema = model_provider_extension.get_provider_schema()
+            provider_schema = provider_schema.model_copy(update={"models": list(provider_schema.models)})
 
             for model_type in provider_schema.supported_model_types:
                 # get predefined models for given model type
-                models = model_provider_instance.models(model_type)
+                models = model_provider_extension.get_predefined_models(model_type)
                 if models:
                     provider_schema.models.extend(models)
 
@@ -156,11 +188,8 @@ class ModelProviderFactory:
             if provider and name != provider:
                 continue
 
-            # get model_provider instance
-            model_provider_instance = model_provider_extension.provider_instance
-
             # get provider schema
-            provider_schema = model_provider_instance.get_provider_schema()
+            provider_schema = model_provider_extension.get_provider_schema()
 
             model_types = provider_schema.supported_model_types
             if model_type:
@@ -172,9 +201,7 @@ class ModelProviderFactory:
             all_model_type_models = []
             for model_type in model_types:
                 # get predefined models for given model type
-                models = model_provider_instance.models(
-                    model_type=model_type,
-                )
+                models = model_provider_extension.get_predefined_models(model_type)
 
                 all_model_type_models.extend(models)
 
@@ -221,6 +248,30 @@ class ModelProviderFactory:
         if self.model_provider_extensions:
             return self.model_provider_extensions
 
+        if ModelProviderManifest.is_available():
+            # provider modules are imported on first use
+            model_providers_path = os.path.dirname(os.path.abspath(__file__))
+            position_map = get_provider_position_map(model_providers_path)
+            model_providers = [
+                ModelProviderExtension(name=name, position=position_map.get(name))
+                for name in ModelProviderManifest.get_provider_names()
+            ]
+            sorted_extensions = sort_to_dict_by_position_map(position_map, model_providers, lambda x: x.name)
+        else:
+            sorted_extensions = self.scan_model_provider_map()
+
+        self.model_provider_extensions = sorted_extensions
+
+        return sorted_extensions
+
+    @staticmethod
+    def scan_model_provider_map() -> dict[str, ModelProviderExtension]:
+        """
+        Scans the model provider directories and imports every model provider module.
+
+        Returns:
+            A dictionary containing the model provider map.
+        """
         # get the path of current classes
         current_path = os.path.abspath(__file__)
         model_providers_path = os.path.dirname(current_path)
@@ -250,11 +301,7 @@ class ModelProviderFactory:
 
             # Dynamic loading {model_provider_name}.py file and find the subclass of ModelProvider
             py_path = os.path.join(model_provider_dir_path, model_provider_name + ".py")
-            model_provider_class = load_single_subclass_from_source(
-                module_name=f"core.model_runtime.model_providers.{model_provider_name}.{model_provider_name}",
-                script_path=py_path,
-                parent_type=ModelProvider,
-            )
+            model_provider_class = _load_model_provider_class(model_provider_name)
 
             if not model_provider_class:
                 logger.warning(f"Missing Model Provider Class that extends ModelProvider in {py_path}, Skip.")
@@ -264,16 +311,11 @@ class ModelProviderFactory:
                 logger.warning(f"Missing {model_provider_name}.yaml file in {model_provider_dir_path}, Skip.")
                 continue
 
-            model_providers.append(
-                ModelProviderExtension(
-                    name=model_provider_name,
-                    provider_instance=model_provider_class(),
-                    position=position_map.get(model_provider_name),
-                )
+            model_provider_extension = ModelProviderExtension(
+                name=model_provider_name,
+                position=position_map.get(model_provider_name),
             )
+            model_provider_extension._provider_instance = model_provider_class()
+            model_providers.append(model_provider_extension)
 
-        sorted_extensions = sort_to_dict_by_position_map(position_map, model_providers, lambda x: x.name)
-
-        self.model_provider_extensions = sorted_extensions
-
-        return sorted_extensions
+        return sort_to_dict_by_position_map(position_map, model_providers, lambda x: x.name)
@@ -0,0 +1,104 @@
+import os
+from threading import Lock
+from typing import Optional
+
+from core.helper.manifest_helper import Manifest
+from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
+from core.model_runtime.entities.provider_entities import ProviderEntity
+
+manifest = Manifest(os.path.join(os.path.dirname(os.path.abspath(__file__)), "_manifest.json"))
+
+
+class ModelProviderManifest:
+    """
+    Provider schemas and predefined models of all model providers, read from the manifest
+    so that listing providers neither parses their YAML files nor imports their modules.
+    """
+
+    _provider_schemas: dict[str, ProviderEntity] = {}
+    _predefined_models: dict[str, list[AIModelEntity]] = {}
+    _lock = Lock()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return manifest.get() is not None
+
+    @classmethod
+    def get_provider_names(cls) -> list[str]:
+        data = manifest.get()
+        if data is None:
+            return []
+        return list(data["providers"])
+
+    @classmethod
+    def get_provider_schema(cls, provider: str) -> Optional[ProviderEntity]:
+        """
+        Get the provider schema, None when the provider is not in the manifest
+        """
+        if provider in cls._provider_schemas:
+            return cls._provider_schemas[provider]
+
+        data = manifest.get()
+        if data is None or provider not in data["providers"]:
+            return None
+
+        with cls._lock:
+            if provider not in cls._provider_schemas:
+                cls._provider_schemas[provider] = ProviderEntity.model_validate(data["providers"][provider]["schema"])
+
+        return cls._provider_schemas[provider]
+
+    @classmethod
+    def get_predefined_models(cls, provider: str, model_type: ModelType) -> Optional[list[AIModelEntity]]:
+        """
+        Get the predefined models of a model type, None when the provider is not in the manifest
+        """
+        key = f"{provider}.{model_type.value}"
+        if key in cls._predefined_models:
+            return cls._predefined_models[key]
+
+        data = manifest.get()
+        if data is None or provider not in data["providers"]:
+            return None
+
+        with cls._lock:
+            if key not in cls._predefined_models:
+                models = data["providers"][provider]["models"].get(model_type.value, [])
+                cls._predefined_models[key] = [AIModelEntity.model_validate(model) for model in models]
+
+        return cls._predefined_models[key]
+
+    @classmethod
+    def generate(cls) -> str:
+        """
+        Generate the manifest from the provider modules and YAML files in the source tree
+
+        :return: manifest path
+        """
+        from core.model_runtime.model_providers.model_provider_factory import ModelProviderFactory
+
+        # read the source tree, not the previous manifest
+        manifest.remove()
+        cls.clear_cache()
+
+        providers = {}
+        for name, model_provider_extension in ModelProviderFactory.scan_model_provider_map().items():
+            provider_instance = model_provider_extension.provider_instance
+            provider_schema = provider_instance.get_provider_schema()
+            providers[name] = {
+                "schema": provider_schema.model_dump(mode="json"),
+                "models": {
+                    model_type.value: [model.model_dump(mode="json") for model in provider_instance.models(model_type)]
+                    for model_type in provider_schema.supported_model_types
+                },
+            }
+
+        manifest.write({"providers": providers})
+        cls.clear_cache()
+        return manifest.path
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._lock:
+            cls._provider_schemas = {}
+            cls._predefined_models = {}
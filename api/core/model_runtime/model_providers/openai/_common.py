@@ -2,6 +2,7 @@ from collections.abc import Mapping
 
 import openai
 from httpx import Timeout
+from openai import OpenAI
 
 from core.model_runtime.errors.invoke import (
     InvokeAuthorizationError,
@@ -11,6 +12,7 @@ from core.model_runtime.errors.invoke import (
     InvokeRateLimitError,
     InvokeServerUnavailableError,
 )
+from core.model_runtime.utils.client_pool import ModelClientPool, create_http_client
 
 
 class _CommonOpenAI:
@@ -36,6 +38,20 @@ class _CommonOpenAI:
 
         return credentials_kwargs
 
+    def _get_client(self, credentials_kwargs: dict) -> OpenAI:
+        """
+        Get the pooled client of the credentials, which reuses its connections across invocations
+
+        :param credentials_kwargs: kwargs from _to_credential_kwargs
+        :return:
+        """
+        return ModelClientPool.get_client(
+            "openai",
+            credentials_kwargs.get("base_url"),
+            credentials_kwargs,
+            lambda: OpenAI(**credentials_kwargs, http_client=create_http_client()),
+        )
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         """
@@ -4,7 +4,7 @@ from collections.abc import Generator
 from typing import Optional, Union, cast
 
 import tiktoken
-from openai import OpenAI, Stream
+from openai import Stream
 from openai.types import Completion
 from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessageToolCall
 from openai.types.chat.chat_completion_chunk import ChoiceDeltaFunctionCall, ChoiceDeltaToolCall
@@ -26,6 +26,7 @@ from core.model_runtime.entities.message_entities import (
 from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, I18nObject, ModelType, PriceConfig
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.model_providers.__base.tokenizers.token_count_cache import token_count_cache
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
 logger = logging.getLogger(__name__)
@@ -294,7 +295,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         try:
             # transform credentials to kwargs for model instance
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = self._get_client(credentials_kwargs)
 
             # handle fine tune remote models
             base_model = model
@@ -345,7 +346,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
 
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         # get all remote models
         remote_models = client.models.list()
@@ -405,7 +406,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
 
@@ -576,7 +577,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         response_format = model_parameters.get("response_format")
         if response_format:
@@ -1009,7 +1010,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         except KeyError:
             encoding = tiktoken.get_encoding("cl100k_base")
 
-        num_tokens = len(encoding.encode(text))
+        num_tokens = token_count_cache.get_num_tokens(encoding.name, text, lambda t: len(encoding.encode(t)))
 
         if tools:
             num_tokens += self._num_tokens_for_tools(encoding, tools)
@@ -1081,7 +1082,9 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
                                 num_tokens += len(encoding.encode(t_key))
                                 num_tokens += len(encoding.encode(t_value))
                 else:
-                    num_tokens += len(encoding.encode(str(value)))
+                    num_tokens += token_count_cache.get_num_tokens(
+                        encoding.name, str(value), lambda t: len(encoding.encode(t))
+                    )
 
                 if key == "name":
                     num_tokens += tokens_per_name
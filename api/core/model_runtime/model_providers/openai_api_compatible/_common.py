@@ -1,3 +1,5 @@
+from urllib.parse import urlparse
+
 import requests
 
 from core.model_runtime.errors.invoke import (
@@ -8,9 +10,24 @@ from core.model_runtime.errors.invoke import (
     InvokeRateLimitError,
     InvokeServerUnavailableError,
 )
+from core.model_runtime.utils.client_pool import ModelClientPool, create_requests_session
 
 
 class _CommonOaiApiCompat:
+    @staticmethod
+    def _get_session(endpoint_url: str) -> requests.Session:
+        """
+        Get the pooled session of the endpoint host, which reuses its connections across invocations.
+        Credentials are sent in the headers of each request and cookies are rejected, so hosts share a session.
+
+        :param endpoint_url: endpoint url
+        :return:
+        """
+        parsed_url = urlparse(endpoint_url)
+        return ModelClientPool.get_client(
+            "openai_api_compatible", f"{parsed_url.scheme}://{parsed_url.netloc}", {}, create_requests_session
+        )
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         """
@@ -138,7 +138,7 @@ class OAIAPICompatLargeLanguageModel(_CommonOaiApiCompat, LargeLanguageModel):
                 raise ValueError("Unsupported completion type for model configuration.")
 
             # send a post request to validate the credentials
-            response = requests.post(endpoint_url, headers=headers, json=data, timeout=(10, 300))
+            response = self._get_session(endpoint_url).post(endpoint_url, headers=headers, json=data, timeout=(10, 300))
 
             if response.status_code != 200:
                 raise CredentialsValidateFailedError(
@@ -368,7 +368,9 @@ class OAIAPICompatLargeLanguageModel(_CommonOaiApiCompat, LargeLanguageModel):
         if user:
             data["user"] = user
 
-        response = requests.post(endpoint_url, headers=headers, json=data, timeout=(10, 300), stream=stream)
+        response = self._get_session(endpoint_url).post(
+            endpoint_url, headers=headers, json=data, timeout=(10, 300), stream=stream
+        )
 
         if response.encoding is None or response.encoding == "ISO-8859-1":
             response.encoding = "utf-8"
@@ -5,7 +5,6 @@ from typing import Optional
 from urllib.parse import urljoin
 
 import numpy as np
-import requests
 
 from core.embedding.embedding_constant import EmbeddingInputType
 from core.model_runtime.entities.common_entities import I18nObject
@@ -95,7 +94,9 @@ class OAICompatEmbeddingModel(_CommonOaiApiCompat, TextEmbeddingModel):
             payload = {"input": inputs[i : i + max_chunks], "model": model, **extra_model_kwargs}
 
             # Make the request to the OpenAI API
-            response = requests.post(endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300))
+            response = self._get_session(endpoint_url).post(
+                endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300)
+            )
 
             response.raise_for_status()  # Raise an exception for HTTP errors
             response_data = response.json()
@@ -147,7 +148,9 @@ class OAICompatEmbeddingModel(_CommonOaiApiCompat, TextEmbeddingModel):
 
             payload = {"input": "ping", "model": model}
 
-            response = requests.post(url=endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300))
+            response = self._get_session(endpoint_url).post(
+                url=endpoint_url, headers=headers, data=json.dumps(payload), timeout=(10, 300)
+            )
 
             if response.status_code != 200:
                 raise CredentialsValidateFailedError(
@@ -0,0 +1,117 @@
+import hashlib
+import importlib.util
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+from typing import Any, NamedTuple, Optional, TypeVar
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from configs import dify_config
+
+ClientT = TypeVar("ClientT")
+
+# HTTP/2 is negotiated over TLS only when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ClientPoolEntry(NamedTuple):
+    client: Any
+    last_used_at: float
+
+
+class ModelClientPool:
+    """
+    Process-wide pool of model provider SDK clients, keyed by provider, endpoint and a hash of the credentials.
+
+    Reusing a client reuses its keep-alive connections, so sequential invocations skip the TCP and TLS
+    handshakes. The pool holds at most MODEL_CLIENT_POOL_MAX_SIZE clients and drops those unused for
+    MODEL_CLIENT_POOL_IDLE_TIMEOUT seconds. Dropped clients are not closed, a streamed response may still
+    be reading from them, their connections are closed once they are garbage collected.
+    """
+
+    _clients: OrderedDict[tuple[str, str, str], ClientPoolEntry] = OrderedDict()
+    _lock = Lock()
+
+    @classmethod
+    def get_client(
+        cls, provider: str, endpoint: Optional[str], credentials: Mapping[str, Any], factory: Callable[[], ClientT]
+    ) -> ClientT:
+        """
+        Get the pooled client of a provider endpoint and credentials, creating it on a miss
+
+        :param provider: provider name
+        :param endpoint: base url of the client, None for the default endpoint of the provider
+        :param credentials: everything the client is created with
+        :param factory: creates the client
+        """
+        max_size = dify_config.MODEL_CLIENT_POOL_MAX_SIZE
+        if max_size <= 0:
+            return factory()
+
+        key = (provider, endpoint or "", cls._hash_credentials(credentials))
+        now = time.monotonic()
+        with cls._lock:
+            cls._evict_idle_clients(now)
+            entry = cls._clients.pop(key, None)
+            client = entry.client if entry else factory()
+            cls._clients[key] = ClientPoolEntry(client=client, last_used_at=now)
+            while len(cls._clients) > max_size:
+                cls._clients.popitem(last=False)
+
+        return client
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._clients.clear()
+
+    @classmethod
+    def _evict_idle_clients(cls, now: float) -> None:
+        # entries are ordered by last use
+        idle_timeout = dify_config.MODEL_CLIENT_POOL_IDLE_TIMEOUT
+        while cls._clients:
+            key, entry = next(iter(cls._clients.items()))
+            if now - entry.last_used_at < idle_timeout:
+                break
+            del cls._clients[key]
+
+    @staticmethod
+    def _hash_credentials(credentials: Mapping[str, Any]) -> str:
+        # keep secrets out of the keys, timeouts and other objects are hashed by their repr
+        serialized = json.dumps(credentials, sort_keys=True, default=repr)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def create_http_client() -> httpx.Client:
+    """
+    Create an httpx client for SDK clients, which keeps idle connections alive between invocations
+    """
+    max_connections = dify_config.MODEL_CLIENT_POOL_MAX_CONNECTIONS
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=dify_config.MODEL_CLIENT_POOL_IDLE_TIMEOUT,
+        ),
+        follow_redirects=True,
+    )
+
+
+def create_requests_session() -> requests.Session:
+    """
+    Create a requests session for providers calling their API with requests, which keeps connections alive.
+    Cookies are rejected, since a session may be shared by the tenants of an endpoint.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_maxsize=dify_config.MODEL_CLIENT_POOL_MAX_CONNECTIONS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -1,8 +1,12 @@
+import logging
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 from core.ops.entities.config_entity import BaseTracingConfig
 from core.ops.entities.trace_entity import BaseTraceInfo
 
+logger = logging.getLogger(__name__)
+
 
 class BaseTraceInstance(ABC):
     """
@@ -24,3 +28,32 @@ class BaseTraceInstance(ABC):
         Subclasses must implement specific tracing logic for activities.
         """
         ...
+
+    def trace_batch(self, trace_infos: Sequence[BaseTraceInfo]) -> int:
+        """
+        Trace a batch of activities and flush them to the service.
+        A failing activity is logged and does not stop the rest of the batch.
+
+        :return: number of activities that failed
+        """
+        failure_count = 0
+        for trace_info in trace_infos:
+            try:
+                self.trace(trace_info)
+            except Exception:
+                logger.exception(f"Failed to trace {type(trace_info).__name__}")
+                failure_count += 1
+        self.flush()
+        return failure_count
+
+    def flush(self):
+        """
+        Send the activities buffered by the client of the service, for clients that batch requests.
+        """
+        return
+
+    def close(self):
+        """
+        Release the client of the service, called when the instance is dropped from the cache.
+        """
+        self.flush()
@@ -1,16 +1,20 @@
+import atexit
 import json
 import logging
 import os
 import queue
 import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import Any, Optional, Union
+from typing import Any, NamedTuple, Optional, Union
 from uuid import UUID
 
 from flask import current_app
 
 from core.helper.encrypter import decrypt_token, encrypt_token, obfuscated_token
+from core.ops.base_trace_instance import BaseTraceInstance
 from core.ops.entities.config_entity import (
     LangfuseConfig,
     LangSmithConfig,
@@ -50,7 +54,16 @@ provider_config_map = {
 }
 
 
+class TraceInstanceCacheEntry(NamedTuple):
+    fingerprint: Optional[tuple[str, str]]
+    trace_instance: Optional[BaseTraceInstance]
+    expires_at: float
+
+
 class OpsTraceManager:
+    _trace_instances: OrderedDict[str, TraceInstanceCacheEntry] = OrderedDict()
+    _trace_instances_lock = threading.Lock()
+
     @classmethod
     def encrypt_tracing_config(
         cls, tenant_id: str, tracing_provider: str, tracing_config: dict, current_trace_config=None
@@ -166,6 +179,10 @@ class OpsTraceManager:
     ):
         """
         Get ops trace through model config
+
+        Trace instances are cached per app, and revalidated against the tracing config of the app
+        every TRACE_INSTANCE_CACHE_TTL seconds. The config is only decrypted and the exporter client
+        only created again when the config changed.
         :param app_id: app_id
         :return:
         """
@@ -175,32 +192,81 @@ class OpsTraceManager:
         if app_id is None:
             return None
 
-        app: App = db.session.query(App).filter(App.id == app_id).first()
+        with cls._trace_instances_lock:
+            cached = cls._trace_instances.get(app_id)
+        if cached is not None and cached.expires_at > time.monotonic():
+            return cached.trace_instance
 
-        if app is None:
-            return None
-
-        app_ops_trace_config = json.loads(app.tracing) if app.tracing else None
-
-        if app_ops_trace_config is None:
-            return None
-
-        tracing_provider = app_ops_trace_config.get("tracing_provider")
+        fingerprint, tracing_instance = None, None
+        app: App = db.session.query(App).filter(App.id == app_id).first()
+        app_ops_trace_config = json.loads(app.tracing) if app and app.tracing else None
+        tracing_provider = app_ops_trace_config.get("tracing_provider") if app_ops_trace_config else None
+
+        if (
+            tracing_provider is not None
+            and tracing_provider in provider_config_map
+            and app_ops_trace_config.get("enabled")
+        ):
+            trace_config_data: TraceAppConfig = (
+                db.session.query(TraceAppConfig)
+                .filter(TraceAppConfig.app_id == app_id, TraceAppConfig.tracing_provider == tracing_provider)
+                .first()
+            )
+            if trace_config_data:
+                fingerprint = (app.tracing, json.dumps(trace_config_data.tracing_config, sort_keys=True))
+                if cached is not None and cached.fingerprint == fingerprint:
+                    tracing_instance = cached.trace_instance
+                else:
+                    # decrypt_token
+                    decrypt_trace_config = cls.decrypt_tracing_config(
+                        app.tenant_id, tracing_provider, trace_config_data.tracing_config
+                    )
+                    trace_instance, config_class = (
+                        provider_config_map[tracing_provider]["trace_instance"],
+                        provider_config_map[tracing_provider]["config_class"],
+                    )
+                    tracing_instance = trace_instance(config_class(**decrypt_trace_config))
+
+        cls._cache_trace_instance(
+            app_id,
+            TraceInstanceCacheEntry(
+                fingerprint=fingerprint,
+                trace_instance=tracing_instance,
+                expires_at=time.monotonic() + trace_instance_cache_ttl,
+            ),
+        )
+        return tracing_instance
 
-        if tracing_provider is None or tracing_provider not in provider_config_map:
-            return None
+    @classmethod
+    def _cache_trace_instance(cls, app_id: str, entry: "TraceInstanceCacheEntry"):
+        replaced = []
+        with cls._trace_instances_lock:
+            if app_id in cls._trace_instances:
+                replaced.append(cls._trace_instances.pop(app_id).trace_instance)
+            cls._trace_instances[app_id] = entry
+            while len(cls._trace_instances) > trace_instance_cache_size:
+                replaced.append(cls._trace_instances.popitem(last=False)[1].trace_instance)
+
+        for trace_instance in replaced:
+            if trace_instance is not None and trace_instance is not entry.trace_instance:
+                cls._close_trace_instance(trace_instance)
 
-        # decrypt_token
-        decrypt_trace_config = cls.get_decrypted_tracing_config(app_id, tracing_provider)
-        if app_ops_trace_config.get("enabled"):
-            trace_instance, config_class = (
-                provider_config_map[tracing_provider]["trace_instance"],
-                provider_config_map[tracing_provider]["config_class"],
-            )
-            tracing_instance = trace_instance(config_class(**decrypt_trace_config))
-            return tracing_instance
+    @staticmethod
+    def _close_trace_instance(trace_instance: BaseTraceInstance):
+        try:
+            trace_instance.close()
+        except Exception:
+            logging.exception("Failed to close trace instance")
 
-        return None
+    @classmethod
+    def clear_trace_instance_cache(cls, app_id: str):
+        """
+        Revalidate the cached trace instance of an app on next use, called after its tracing config changed
+        """
+        with cls._trace_instances_lock:
+            cached = cls._trace_instances.get(app_id)
+            if cached is not None:
+                cls._trace_instances[app_id] = cached._replace(expires_at=0)
 
     @classmethod
     def get_app_config_through_message_id(cls, message_id: str):
@@ -242,6 +308,8 @@ class OpsTraceManager:
         )
         db.session.commit()
 
+        cls.clear_trace_instance_cache(app_id)
+
     @classmethod
     def get_app_tracing_config(cls, app_id: str):
         """
@@ -684,66 +752,192 @@ class TraceTask:
         return generate_name_trace_info
 
 
-trace_manager_timer = None
-trace_manager_queue = queue.Queue()
+trace_manager_queue = queue.Queue(maxsize=int(os.getenv("TRACE_QUEUE_MANAGER_MAX_SIZE", 10000)))
 trace_manager_interval = int(os.getenv("TRACE_QUEUE_MANAGER_INTERVAL", 5))
 trace_manager_batch_size = int(os.getenv("TRACE_QUEUE_MANAGER_BATCH_SIZE", 100))
+trace_manager_workers = int(os.getenv("TRACE_QUEUE_MANAGER_WORKERS", 4))
+trace_instance_cache_ttl = int(os.getenv("TRACE_INSTANCE_CACHE_TTL", 60))
+trace_instance_cache_size = int(os.getenv("TRACE_INSTANCE_CACHE_SIZE", 1000))
+trace_export_slow_threshold = float(os.getenv("TRACE_EXPORT_SLOW_THRESHOLD", 10))
+trace_export_backoff = int(os.getenv("TRACE_EXPORT_BACKOFF", 60))
+trace_export_failure_ratio = float(os.getenv("TRACE_EXPORT_FAILURE_RATIO", 0.5))
 
 
 class TraceQueueManager:
     def __init__(self, app_id=None, user_id=None):
-        global trace_manager_timer
-
         self.app_id = app_id
         self.user_id = user_id
         self.trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
         self.flask_app = current_app._get_current_object()
-        if trace_manager_timer is None:
-            self.start_timer()
+        TraceFlusher.start(self.flask_app)
 
     def add_trace_task(self, trace_task: TraceTask):
-        global trace_manager_timer, trace_manager_queue
         try:
             if self.trace_instance:
                 trace_task.app_id = self.app_id
-                trace_manager_queue.put(trace_task)
+                trace_manager_queue.put_nowait(trace_task)
+        except queue.Full:
+            # drop new traces instead of blocking requests while trace processing falls behind
+            TraceFlusher.record_dropped()
         except Exception as e:
             logging.error(f"Error adding trace task: {e}")
-        finally:
-            self.start_timer()
 
-    def collect_tasks(self):
-        global trace_manager_queue
+
+class TraceFlusher:
+    """
+    Long-lived daemon thread of each process that drains the trace queue.
+
+    Trace tasks are collected into batches of up to TRACE_QUEUE_MANAGER_BATCH_SIZE, or whatever arrived
+    within TRACE_QUEUE_MANAGER_INTERVAL seconds, executed in parallel and sent to Celery as one task per batch.
+    """
+
+    _thread: Optional[threading.Thread] = None
+    _lock = threading.Lock()
+    _dropped = 0
+
+    @classmethod
+    def start(cls, flask_app):
+        if cls._thread is not None and cls._thread.is_alive():
+            return
+
+        with cls._lock:
+            # threads do not survive a fork, so workers start their own flusher
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(
+                    target=cls._run, args=(flask_app,), name="trace_manager_flusher", daemon=True
+                )
+                cls._thread.start()
+                atexit.register(cls.flush, flask_app)
+
+    @classmethod
+    def record_dropped(cls):
+        with cls._lock:
+            cls._dropped += 1
+            dropped = cls._dropped
+        # log the first drop and then every thousandth
+        if dropped % 1000 == 1:
+            logging.warning(f"Trace queue is full, {dropped} trace tasks dropped so far")
+
+    @classmethod
+    def get_dropped(cls) -> int:
+        return cls._dropped
+
+    @classmethod
+    def flush(cls, flask_app):
+        """
+        Send the queued trace tasks now, used at process exit
+        """
+        with ThreadPoolExecutor(max_workers=trace_manager_workers) as executor:
+            while tasks := cls._collect_tasks(block=False):
+                cls._send_to_celery(flask_app, executor, tasks)
+
+    @classmethod
+    def _run(cls, flask_app):
+        executor = ThreadPoolExecutor(max_workers=trace_manager_workers, thread_name_prefix="trace_task")
+        while True:
+            try:
+                tasks = cls._collect_tasks(block=True)
+                if tasks:
+                    cls._send_to_celery(flask_app, executor, tasks)
+            except Exception as e:
+                logging.error(f"Error processing trace tasks: {e}")
+
+    @staticmethod
+    def _collect_tasks(block: bool) -> list[TraceTask]:
         tasks = []
-        while len(tasks) < trace_manager_batch_size and not trace_manager_queue.empty():
-            task = trace_manager_queue.get_nowait()
+        deadline = time.monotonic() + trace_manager_interval
+        while len(tasks) < trace_manager_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    task = trace_manager_queue.get(timeout=timeout)
+                else:
+                    task = trace_manager_queue.get_nowait()
+            except queue.Empty:
+                # keep waiting while nothing arrived
+                if block and not tasks:
+                    deadline = time.monotonic() + trace_manager_interval
+                    continue
+                break
             tasks.append(task)
             trace_manager_queue.task_done()
         return tasks
 
-    def run(self):
+    @classmethod
+    def _send_to_celery(cls, flask_app, executor: ThreadPoolExecutor, tasks: list[TraceTask]):
+        # trace tasks query the database, so they run in parallel, each with its own session
+        tasks_data = [
+            task_data
+            for task_data in executor.map(lambda task: cls._execute_task(flask_app, task), tasks)
+            if task_data is not None
+        ]
+        if tasks_data:
+            process_trace_tasks.delay(tasks_data)
+
+    @staticmethod
+    def _execute_task(flask_app, task: TraceTask) -> Optional[dict]:
         try:
-            tasks = self.collect_tasks()
-            if tasks:
-                self.send_to_celery(tasks)
-        except Exception as e:
-            logging.error(f"Error processing trace tasks: {e}")
-
-    def start_timer(self):
-        global trace_manager_timer
-        if trace_manager_timer is None or not trace_manager_timer.is_alive():
-            trace_manager_timer = threading.Timer(trace_manager_interval, self.run)
-            trace_manager_timer.name = f"trace_manager_timer_{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}"
-            trace_manager_timer.daemon = False
-            trace_manager_timer.start()
-
-    def send_to_celery(self, tasks: list[TraceTask]):
-        with self.flask_app.app_context():
-            for task in tasks:
+            with flask_app.app_context():
                 trace_info = task.execute()
-                task_data = {
+                return {
                     "app_id": task.app_id,
                     "trace_info_type": type(trace_info).__name__,
                     "trace_info": trace_info.model_dump() if trace_info else {},
                 }
-                process_trace_tasks.delay(task_data)
+        except Exception as e:
+            logging.error(f"Error executing trace task: {e}")
+            return None
+
+
+class TraceExporterBackoff:
+    """
+    Drops the traces of an app for TRACE_EXPORT_BACKOFF seconds once exporting a batch of them failed,
+    at least TRACE_EXPORT_FAILURE_RATIO of its traces failed, or it took longer than
+    TRACE_EXPORT_SLOW_THRESHOLD seconds, so that a slow service does not hold up the trace queue of
+    every other app. A few failed traces, such as rejected payloads, do not stop the others.
+    """
+
+    _backoff_until: dict[str, float] = {}
+    _dropped: dict[str, int] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def is_backing_off(cls, app_id: str) -> bool:
+        backoff_until = cls._backoff_until.get(app_id)
+        if backoff_until is None:
+            return False
+        if backoff_until > time.monotonic():
+            return True
+
+        with cls._lock:
+            cls._backoff_until.pop(app_id, None)
+            dropped = cls._dropped.pop(app_id, 0)
+        if dropped:
+            logging.warning(f"Resuming trace export of app {app_id}, {dropped} traces were dropped")
+        return False
+
+    @classmethod
+    def record_export(cls, app_id: str, elapsed: float, failure_ratio: float = 0):
+        """
+        :param failure_ratio: ratio of the traces of the batch that failed
+        """
+        if failure_ratio and failure_ratio >= trace_export_failure_ratio:
+            logging.warning(f"Trace export of app {app_id} failed for {failure_ratio:.0%} of its traces, backing off")
+            cls._back_off(app_id)
+        elif elapsed > trace_export_slow_threshold:
+            logging.warning(f"Trace export of app {app_id} took {elapsed:.1f}s, backing off")
+            cls._back_off(app_id)
+
+    @classmethod
+    def record_failure(cls, app_id: str):
+        cls._back_off(app_id)
+
+    @classmethod
+    def record_dropped(cls, app_id: str, count: int):
+        with cls._lock:
+            cls._dropped[app_id] = cls._dropped.get(app_id, 0) + count
+
+    @classmethod
+    def _back_off(cls, app_id: str):
+        with cls._lock:
+            cls._backoff_until[app_id] = time.monotonic() + trace_export_backoff
@@ -1,9 +1,21 @@
 import re
+from functools import lru_cache
 
 REGEX = re.compile(r"\{\{([a-zA-Z_][a-zA-Z0-9_]{0,29}|#histories#|#query#|#context#)\}\}")
 WITH_VARIABLE_TMPL_REGEX = re.compile(
     r"\{\{([a-zA-Z_][a-zA-Z0-9_]{0,29}|#[a-zA-Z0-9_]{1,50}\.[a-zA-Z0-9_\.]{1,100}#|#histories#|#query#|#context#)\}\}"
 )
+SPECIAL_TOKEN_REGEX = re.compile(r"<\|.*?\|>")
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(template: str, with_variable_tmpl: bool) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Split a template into its literal parts and its variable keys, in order, the literal parts surrounding the keys.
+    Templates are compiled once per process, so that the same system prompts of an app are not parsed for every message.
+    """
+    parts = (WITH_VARIABLE_TMPL_REGEX if with_variable_tmpl else REGEX).split(template)
+    return tuple(parts[0::2]), tuple(parts[1::2])
 
 
 class PromptTemplateParser:
@@ -22,24 +34,29 @@ class PromptTemplateParser:
         self.template = template
         self.with_variable_tmpl = with_variable_tmpl
         self.regex = WITH_VARIABLE_TMPL_REGEX if with_variable_tmpl else REGEX
+        self._literals, self._keys = _compile_template(template, with_variable_tmpl)
         self.variable_keys = self.extract()
 
     def extract(self) -> list:
-        # Regular expression to match the template rules
-        return re.findall(self.regex, self.template)
+        return list(self._keys)
 
     def format(self, inputs: dict, remove_template_variables: bool = True) -> str:
-        def replacer(match):
-            key = match.group(1)
-            value = inputs.get(key, match.group(0))  # return original matched string if key not found
+        chunks = [self._literals[0]]
+        for key, literal in zip(self._keys, self._literals[1:]):
+            value = inputs.get(key, "{{" + key + "}}")  # keep the variable if key not found
 
             if remove_template_variables:
-                return PromptTemplateParser.remove_template_variables(value, self.with_variable_tmpl)
-            return value
+                value = PromptTemplateParser.remove_template_variables(value, self.with_variable_tmpl)
+            chunks.append(value)
+            chunks.append(literal)
 
-        prompt = re.sub(self.regex, replacer, self.template)
-        return re.sub(r"<\|.*?\|>", "", prompt)
+        prompt = "".join(chunks)
+        if "<|" not in prompt:
+            return prompt
+        return SPECIAL_TOKEN_REGEX.sub("", prompt)
 
     @classmethod
     def remove_template_variables(cls, text: str, with_variable_tmpl: bool = False):
+        if "{{" not in text:
+            return text
         return re.sub(WITH_VARIABLE_TMPL_REGEX if with_variable_tmpl else REGEX, r"{\1}", text)
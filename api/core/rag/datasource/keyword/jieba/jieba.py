@@ -28,13 +28,15 @@ class Jieba(BaseKeyword):
         with redis_client.lock(lock_name, timeout=600):
             keyword_table_handler = JiebaKeywordTableHandler()
             keyword_table = self._get_dataset_keyword_table()
-            for text in texts:
-                keywords = keyword_table_handler.extract_keywords(
-                    text.page_content, self._config.max_keywords_per_chunk
-                )
-                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+            keywords_list = keyword_table_handler.extract_keywords_batch(
+                [text.page_content for text in texts], self._config.max_keywords_per_chunk
+            )
+            segment_keywords = {}
+            for text, keywords in zip(texts, keywords_list):
+                segment_keywords[text.metadata["doc_id"]] = list(keywords)
                 keyword_table = self._add_text_to_keyword_table(keyword_table, text.metadata["doc_id"], list(keywords))
 
+            self._update_segments_keywords(self.dataset.id, segment_keywords)
             self._save_dataset_keyword_table(keyword_table)
 
             return self
@@ -45,22 +47,20 @@ class Jieba(BaseKeyword):
             keyword_table_handler = JiebaKeywordTableHandler()
 
             keyword_table = self._get_dataset_keyword_table()
-            keywords_list = kwargs.get("keywords_list")
-            for i in range(len(texts)):
-                text = texts[i]
-                if keywords_list:
-                    keywords = keywords_list[i]
-                    if not keywords:
-                        keywords = keyword_table_handler.extract_keywords(
-                            text.page_content, self._config.max_keywords_per_chunk
-                        )
-                else:
-                    keywords = keyword_table_handler.extract_keywords(
-                        text.page_content, self._config.max_keywords_per_chunk
-                    )
-                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+            keywords_list = list(kwargs.get("keywords_list") or [None] * len(texts))
+            missing_indexes = [i for i in range(len(texts)) if not keywords_list[i]]
+            extracted_keywords_list = keyword_table_handler.extract_keywords_batch(
+                [texts[i].page_content for i in missing_indexes], self._config.max_keywords_per_chunk
+            )
+            for i, keywords in zip(missing_indexes, extracted_keywords_list):
+                keywords_list[i] = keywords
+
+            segment_keywords = {}
+            for text, keywords in zip(texts, keywords_list):
+                segment_keywords[text.metadata["doc_id"]] = list(keywords)
                 keyword_table = self._add_text_to_keyword_table(keyword_table, text.metadata["doc_id"], list(keywords))
 
+            self._update_segments_keywords(self.dataset.id, segment_keywords)
             self._save_dataset_keyword_table(keyword_table)
 
     def text_exists(self, id: str) -> bool:
@@ -212,6 +212,23 @@ class Jieba(BaseKeyword):
             db.session.add(document_segment)
             db.session.commit()
 
+    def _update_segments_keywords(self, dataset_id: str, segment_keywords: dict[str, list[str]]):
+        """
+        Update the keywords of many segments, keyed by their index node id, with one commit
+        """
+        node_ids = list(segment_keywords.keys())
+        for i in range(0, len(node_ids), 1000):
+            document_segments = (
+                db.session.query(DocumentSegment)
+                .filter(
+                    DocumentSegment.dataset_id == dataset_id, DocumentSegment.index_node_id.in_(node_ids[i : i + 1000])
+                )
+                .all()
+            )
+            for document_segment in document_segments:
+                document_segment.keywords = segment_keywords[document_segment.index_node_id]
+        db.session.commit()
+
     def create_segment_keywords(self, node_id: str, keywords: list[str]):
         keyword_table = self._get_dataset_keyword_table()
         self._update_segment_keywords(self.dataset.id, node_id, keywords)
@@ -221,17 +238,18 @@ class Jieba(BaseKeyword):
     def multi_create_segment_keywords(self, pre_segment_data_list: list):
         keyword_table_handler = JiebaKeywordTableHandler()
         keyword_table = self._get_dataset_keyword_table()
-        for pre_segment_data in pre_segment_data_list:
+        keywords_list = [pre_segment_data["keywords"] for pre_segment_data in pre_segment_data_list]
+        missing_indexes = [i for i in range(len(keywords_list)) if not keywords_list[i]]
+        extracted_keywords_list = keyword_table_handler.extract_keywords_batch(
+            [pre_segment_data_list[i]["segment"].content for i in missing_indexes], self._config.max_keywords_per_chunk
+        )
+        for i, keywords in zip(missing_indexes, extracted_keywords_list):
+            keywords_list[i] = list(keywords)
+
+        for pre_segment_data, keywords in zip(pre_segment_data_list, keywords_list):
             segment = pre_segment_data["segment"]
-            if pre_segment_data["keywords"]:
-                segment.keywords = pre_segment_data["keywords"]
-                keyword_table = self._add_text_to_keyword_table(
-                    keyword_table, segment.index_node_id, pre_segment_data["keywords"]
-                )
-            else:
-                keywords = keyword_table_handler.extract_keywords(segment.content, self._config.max_keywords_per_chunk)
-                segment.keywords = list(keywords)
-                keyword_table = self._add_text_to_keyword_table(keyword_table, segment.index_node_id, list(keywords))
+            segment.keywords = keywords
+            keyword_table = self._add_text_to_keyword_table(keyword_table, segment.index_node_id, keywords)
         self._save_dataset_keyword_table(keyword_table)
 
     def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
@@ -1,13 +1,29 @@
+import logging
+import math
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
 from typing import Optional
 
 import jieba
 from jieba.analyse import default_tfidf
 
+from configs import dify_config
 from core.rag.datasource.keyword.jieba.stopwords import STOPWORDS
 
+logger = logging.getLogger(__name__)
+
+# texts per task sent to a worker, so that the IPC cost is shared by many texts
+MIN_CHUNK_SIZE = 50
+
 
 class JiebaKeywordTableHandler:
+    _pool: Optional[ProcessPoolExecutor] = None
+    _pool_lock = Lock()
+
     def __init__(self):
         default_tfidf.stop_words = STOPWORDS
 
@@ -20,6 +36,53 @@ class JiebaKeywordTableHandler:
 
         return set(self._expand_tokens_with_subtokens(keywords))
 
+    def extract_keywords_batch(self, texts: list[str], max_keywords_per_chunk: Optional[int] = 10) -> list[set[str]]:
+        """
+        Extract the keywords of many texts, in a pool of processes when there are enough texts to pay off
+        the IPC, since jieba holds the GIL.
+        """
+        # more workers than cores only adds IPC
+        workers = min(dify_config.KEYWORD_EXTRACTION_WORKERS, os.cpu_count() or 1)
+        if (
+            workers <= 1
+            or len(texts) < dify_config.KEYWORD_EXTRACTION_MIN_BATCH_SIZE
+            # daemonic processes such as prefork celery workers are not allowed to have children
+            or multiprocessing.current_process().daemon
+        ):
+            return [self.extract_keywords(text, max_keywords_per_chunk) for text in texts]
+
+        chunk_size = max(MIN_CHUNK_SIZE, math.ceil(len(texts) / (workers * 4)))
+        try:
+            pool = self._get_pool(workers)
+            futures = [
+                pool.submit(_extract_keywords_chunk, texts[i : i + chunk_size], max_keywords_per_chunk)
+                for i in range(0, len(texts), chunk_size)
+            ]
+            return [keywords for future in futures for keywords in future.result()]
+        except BrokenProcessPool:
+            logger.exception("Keyword extraction pool is broken, extracting keywords in the calling process")
+            self._shutdown_pool()
+            return [self.extract_keywords(text, max_keywords_per_chunk) for text in texts]
+
+    @classmethod
+    def _get_pool(cls, workers: int) -> ProcessPoolExecutor:
+        with cls._pool_lock:
+            if cls._pool is None:
+                # spawn rather than fork the gevent patched processes and their open connections
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return cls._pool
+
+    @classmethod
+    def _shutdown_pool(cls) -> None:
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.shutdown(wait=False, cancel_futures=True)
+                cls._pool = None
+
     def _expand_tokens_with_subtokens(self, tokens: set[str]) -> set[str]:
         """Get subtokens from a list of tokens., filtering for stopwords."""
         results = set()
@@ -27,6 +90,17 @@ class JiebaKeywordTableHandler:
             results.add(token)
             sub_tokens = re.findall(r"\w+", token)
             if len(sub_tokens) > 1:
-                results.update({w for w in sub_tokens if w not in list(STOPWORDS)})
+                results.update({w for w in sub_tokens if w not in STOPWORDS})
 
         return results
+
+
+def _init_worker() -> None:
+    # load the dictionary once per worker instead of on its first text
+    jieba.initialize()
+    default_tfidf.stop_words = STOPWORDS
+
+
+def _extract_keywords_chunk(texts: list[str], max_keywords_per_chunk: Optional[int]) -> list[set[str]]:
+    keyword_table_handler = JiebaKeywordTableHandler()
+    return [keyword_table_handler.extract_keywords(text, max_keywords_per_chunk) for text in texts]
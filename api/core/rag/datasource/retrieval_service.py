@@ -1,4 +1,7 @@
 import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
 from typing import Optional
 
 from flask import Flask, current_app
@@ -6,6 +9,7 @@ from flask import Flask, current_app
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor
 from core.rag.datasource.keyword.keyword_factory import Keyword
 from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
 from core.rag.rerank.constants.rerank_mode import RerankMode
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from extensions.ext_database import db
@@ -21,6 +25,27 @@ default_retrieval_model = {
 }
 
 
+class RetrievalStageTimer:
+    """
+    Seconds a retrieval spends in each of its stages: query_embedding, vector_search, full_text_search,
+    keyword_search and reranking, summed over the threads the stages run in
+    """
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage: str) -> Generator[None, None, None]:
+        start_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_at
+            with self._lock:
+                self.durations[stage] = self.durations.get(stage, 0.0) + elapsed
+
+
 class RetrievalService:
     @classmethod
     def retrieve(
@@ -33,6 +58,7 @@ class RetrievalService:
         reranking_model: Optional[dict] = None,
         reranking_mode: Optional[str] = "reranking_model",
         weights: Optional[dict] = None,
+        stage_timer: Optional[RetrievalStageTimer] = None,
     ):
         dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
         if not dataset:
@@ -40,6 +66,7 @@ class RetrievalService:
 
         if not dataset or dataset.available_document_count == 0 or dataset.available_segment_count == 0:
             return []
+        stage_timer = stage_timer or RetrievalStageTimer()
         all_documents = []
         threads = []
         exceptions = []
@@ -54,6 +81,7 @@ class RetrievalService:
                     "top_k": top_k,
                     "all_documents": all_documents,
                     "exceptions": exceptions,
+                    "stage_timer": stage_timer,
                 },
             )
             threads.append(keyword_thread)
@@ -72,6 +100,7 @@ class RetrievalService:
                     "all_documents": all_documents,
                     "retrieval_method": retrieval_method,
                     "exceptions": exceptions,
+                    "stage_timer": stage_timer,
                 },
             )
             threads.append(embedding_thread)
@@ -91,6 +120,7 @@ class RetrievalService:
                     "reranking_model": reranking_model,
                     "all_documents": all_documents,
                     "exceptions": exceptions,
+                    "stage_timer": stage_timer,
                 },
             )
             threads.append(full_text_index_thread)
@@ -107,9 +137,10 @@ class RetrievalService:
             data_post_processor = DataPostProcessor(
                 str(dataset.tenant_id), reranking_mode, reranking_model, weights, False
             )
-            all_documents = data_post_processor.invoke(
-                query=query, documents=all_documents, score_threshold=score_threshold, top_n=top_k
-            )
+            with stage_timer.measure("reranking"):
+                all_documents = data_post_processor.invoke(
+                    query=query, documents=all_documents, score_threshold=score_threshold, top_n=top_k
+                )
         return all_documents
 
     @classmethod
@@ -124,15 +155,24 @@ class RetrievalService:
 
     @classmethod
     def keyword_search(
-        cls, flask_app: Flask, dataset_id: str, query: str, top_k: int, all_documents: list, exceptions: list
+        cls,
+        flask_app: Flask,
+        dataset_id: str,
+        query: str,
+        top_k: int,
+        all_documents: list,
+        exceptions: list,
+        stage_timer: Optional[RetrievalStageTimer] = None,
     ):
+        stage_timer = stage_timer or RetrievalStageTimer()
         with flask_app.app_context():
             try:
                 dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
 
                 keyword = Keyword(dataset=dataset)
 
-                documents = keyword.search(cls.escape_query_for_search(query), top_k=top_k)
+                with stage_timer.measure("keyword_search"):
+                    documents = keyword.search(cls.escape_query_for_search(query), top_k=top_k)
                 all_documents.extend(documents)
             except Exception as e:
                 exceptions.append(str(e))
@@ -149,41 +189,110 @@ class RetrievalService:
         all_documents: list,
         retrieval_method: str,
         exceptions: list,
+        stage_timer: Optional[RetrievalStageTimer] = None,
     ):
+        stage_timer = stage_timer or RetrievalStageTimer()
         with flask_app.app_context():
             try:
                 dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
 
                 vector = Vector(dataset=dataset)
 
-                documents = vector.search_by_vector(
-                    cls.escape_query_for_search(query),
-                    search_type="similarity_score_threshold",
-                    top_k=top_k,
-                    score_threshold=score_threshold,
-                    filter={"group_id": [dataset.id]},
-                )
+                with stage_timer.measure("query_embedding"):
+                    query_vector = vector.embed_query(cls.escape_query_for_search(query))
+                with stage_timer.measure("vector_search"):
+                    documents = vector.search_by_query_vector(
+                        query_vector,
+                        search_type="similarity_score_threshold",
+                        top_k=top_k,
+                        score_threshold=score_threshold,
+                        filter={"group_id": [dataset.id]},
+                    )
 
-                if documents:
-                    if (
-                        reranking_model
-                        and reranking_model.get("reranking_model_name")
-                        and reranking_model.get("reranking_provider_name")
-                        and retrieval_method == RetrievalMethod.SEMANTIC_SEARCH.value
-                    ):
-                        data_post_processor = DataPostProcessor(
-                            str(dataset.tenant_id), RerankMode.RERANKING_MODEL.value, reranking_model, None, False
-                        )
-                        all_documents.extend(
-                            data_post_processor.invoke(
-                                query=query, documents=documents, score_threshold=score_threshold, top_n=len(documents)
-                            )
-                        )
-                    else:
-                        all_documents.extend(documents)
+                all_documents.extend(
+                    cls._rerank_embedding_documents(
+                        dataset, query, documents, score_threshold, reranking_model, retrieval_method, stage_timer
+                    )
+                )
             except Exception as e:
                 exceptions.append(str(e))
 
+    @classmethod
+    def embedding_search_multiple(cls, query: str, search_settings: list[dict]) -> list[Document]:
+        """
+        Semantic search of several datasets sharing a vector backend and an embedding model,
+        the query is embedded once and the backend batches the searches where it can.
+
+        :param query: query
+        :param search_settings: dataset_id, top_k, score_threshold and reranking_model of each dataset
+        :return: documents of all datasets
+        """
+        dataset_ids = [search_setting["dataset_id"] for search_setting in search_settings]
+        datasets = {dataset.id: dataset for dataset in db.session.query(Dataset).filter(Dataset.id.in_(dataset_ids))}
+
+        searches = []
+        for search_setting in search_settings:
+            dataset = datasets.get(search_setting["dataset_id"])
+            if not dataset or dataset.available_document_count == 0 or dataset.available_segment_count == 0:
+                continue
+            searches.append((dataset, search_setting))
+        if not searches:
+            return []
+
+        results = Vector.search_by_vector_multiple(
+            [Vector(dataset=dataset) for dataset, _ in searches],
+            cls.escape_query_for_search(query),
+            [
+                {
+                    "search_type": "similarity_score_threshold",
+                    "top_k": search_setting["top_k"],
+                    "score_threshold": search_setting["score_threshold"],
+                    "filter": {"group_id": [dataset.id]},
+                }
+                for dataset, search_setting in searches
+            ],
+        )
+
+        all_documents = []
+        for (dataset, search_setting), documents in zip(searches, results):
+            all_documents.extend(
+                cls._rerank_embedding_documents(
+                    dataset,
+                    query,
+                    documents,
+                    search_setting["score_threshold"],
+                    search_setting["reranking_model"],
+                    RetrievalMethod.SEMANTIC_SEARCH.value,
+                )
+            )
+        return all_documents
+
+    @staticmethod
+    def _rerank_embedding_documents(
+        dataset: Dataset,
+        query: str,
+        documents: list[Document],
+        score_threshold: Optional[float],
+        reranking_model: Optional[dict],
+        retrieval_method: str,
+        stage_timer: Optional[RetrievalStageTimer] = None,
+    ) -> list[Document]:
+        if (
+            documents
+            and reranking_model
+            and reranking_model.get("reranking_model_name")
+            and reranking_model.get("reranking_provider_name")
+            and retrieval_method == RetrievalMethod.SEMANTIC_SEARCH.value
+        ):
+            data_post_processor = DataPostProcessor(
+                str(dataset.tenant_id), RerankMode.RERANKING_MODEL.value, reranking_model, None, False
+            )
+            with (stage_timer or RetrievalStageTimer()).measure("reranking"):
+                return data_post_processor.invoke(
+                    query=query, documents=documents, score_threshold=score_threshold, top_n=len(documents)
+                )
+        return documents
+
     @classmethod
     def full_text_index_search(
         cls,
@@ -196,7 +305,9 @@ class RetrievalService:
         all_documents: list,
         retrieval_method: str,
         exceptions: list,
+        stage_timer: Optional[RetrievalStageTimer] = None,
     ):
+        stage_timer = stage_timer or RetrievalStageTimer()
         with flask_app.app_context():
             try:
                 dataset = db.session.query(Dataset).filter(Dataset.id == dataset_id).first()
@@ -205,7 +316,8 @@ class RetrievalService:
                     dataset=dataset,
                 )
 
-                documents = vector_processor.search_by_full_text(cls.escape_query_for_search(query), top_k=top_k)
+                with stage_timer.measure("full_text_search"):
+                    documents = vector_processor.search_by_full_text(cls.escape_query_for_search(query), top_k=top_k)
                 if documents:
                     if (
                         reranking_model
@@ -216,11 +328,15 @@ class RetrievalService:
                         data_post_processor = DataPostProcessor(
                             str(dataset.tenant_id), RerankMode.RERANKING_MODEL.value, reranking_model, None, False
                         )
-                        all_documents.extend(
-                            data_post_processor.invoke(
-                                query=query, documents=documents, score_threshold=score_threshold, top_n=len(documents)
+                        with stage_timer.measure("reranking"):
+                            all_documents.extend(
+                                data_post_processor.invoke(
+                                    query=query,
+                                    documents=documents,
+                                    score_threshold=score_threshold,
+                                    top_n=len(documents),
+                                )
                             )
-                        )
                     else:
                         all_documents.extend(documents)
             except Exception as e:
@@ -11,6 +11,7 @@ from pydantic import BaseModel, model_validator
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -43,12 +44,18 @@ class ElasticSearchConfig(BaseModel):
 class ElasticSearchVector(BaseVector):
     def __init__(self, index_name: str, config: ElasticSearchConfig, attributes: list):
         super().__init__(index_name.lower())
-        self._client = self._init_client(config)
-        self._version = self._get_version()
-        self._check_version()
+        # the version is checked once, when the shared client is created
+        self._client = VectorClientRegistry.get_client(
+            VectorType.ELASTICSEARCH,
+            config,
+            factory=lambda: self._check_version(self._init_client(config)),
+            health_check=self._check_client,
+            close=lambda client: client.close(),
+        )
         self._attributes = attributes
 
-    def _init_client(self, config: ElasticSearchConfig) -> Elasticsearch:
+    @staticmethod
+    def _init_client(config: ElasticSearchConfig) -> Elasticsearch:
         try:
             parsed_url = urlparse(config.host)
             if parsed_url.scheme in {"http", "https"}:
@@ -67,14 +74,23 @@ class ElasticSearchVector(BaseVector):
 
         return client
 
-    def _get_version(self) -> str:
-        info = self._client.info()
+    @staticmethod
+    def _get_version(client: Elasticsearch) -> str:
+        info = client.info()
         return info["version"]["number"]
 
-    def _check_version(self):
-        if self._version < "8.0.0":
+    @classmethod
+    def _check_version(cls, client: Elasticsearch) -> Elasticsearch:
+        if cls._get_version(client) < "8.0.0":
             raise ValueError("Elasticsearch vector database version must be greater than 8.0.0")
 
+        return client
+
+    @staticmethod
+    def _check_client(client: Elasticsearch):
+        if not client.ping():
+            raise ConnectionError("Elasticsearch is unreachable")
+
     def get_type(self) -> str:
         return "elasticsearch"
 
@@ -116,6 +132,33 @@ class ElasticSearchVector(BaseVector):
 
         results = self._client.search(index=self._collection_name, knn=knn, size=top_k)
 
+        return self._get_documents_by_vector_results(results, **kwargs)
+
+    def search_by_vector_multiple(
+        self, query_vector: list[float], searches: list[tuple[BaseVector, dict]]
+    ) -> list[list[Document]]:
+        if not all(
+            isinstance(vector, ElasticSearchVector) and vector._client is self._client for vector, _ in searches
+        ):
+            return super().search_by_vector_multiple(query_vector, searches)
+
+        # one multi search request for all indices
+        body = []
+        for vector, kwargs in searches:
+            top_k = kwargs.get("top_k", 10)
+            body.append({"index": vector._collection_name})
+            body.append({"knn": {"field": Field.VECTOR.value, "query_vector": query_vector, "k": top_k}, "size": top_k})
+        responses = self._client.msearch(searches=body)["responses"]
+
+        docs = []
+        for results, (_, kwargs) in zip(responses, searches):
+            if "error" in results:
+                raise ValueError(f"Elasticsearch search failed: {results['error']}")
+            docs.append(self._get_documents_by_vector_results(results, **kwargs))
+
+        return docs
+
+    def _get_documents_by_vector_results(self, results: Any, **kwargs: Any) -> list[Document]:
         docs_and_scores = []
         for hit in results["hits"]["hits"]:
             docs_and_scores.append(
@@ -192,6 +235,8 @@ class ElasticSearchVector(BaseVector):
 
 
 class ElasticSearchVectorFactory(AbstractVectorFactory):
+    supports_search_by_vector_multiple = True
+
     def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> ElasticSearchVector:
         if dataset.index_struct_dict:
             class_prefix: str = dataset.index_struct_dict["vector_store"]["class_prefix"]
@@ -12,6 +12,7 @@ from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -60,7 +61,18 @@ class OpenSearchVector(BaseVector):
     def __init__(self, collection_name: str, config: OpenSearchConfig):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = OpenSearch(**config.to_opensearch_params())
+        self._client = VectorClientRegistry.get_client(
+            VectorType.OPENSEARCH,
+            config,
+            factory=lambda: OpenSearch(**config.to_opensearch_params()),
+            health_check=self._check_client,
+            close=lambda client: client.close(),
+        )
+
+    @staticmethod
+    def _check_client(client: OpenSearch):
+        if not client.ping():
+            raise ConnectionError("OpenSearch is unreachable")
 
     def get_type(self) -> str:
         return VectorType.OPENSEARCH
@@ -150,17 +162,50 @@ class OpenSearchVector(BaseVector):
         if not all(isinstance(x, float) for x in query_vector):
             raise ValueError("All elements in query_vector should be floats")
 
-        query = {
-            "size": kwargs.get("top_k", 4),
-            "query": {"knn": {Field.VECTOR.value: {Field.VECTOR.value: query_vector, "k": kwargs.get("top_k", 4)}}},
-        }
-
         try:
-            response = self._client.search(index=self._collection_name.lower(), body=query)
+            response = self._client.search(
+                index=self._collection_name.lower(), body=self._get_vector_query(query_vector, **kwargs)
+            )
         except Exception as e:
             logger.error(f"Error executing search: {e}")
             raise
 
+        return self._get_documents_by_vector_response(response, **kwargs)
+
+    def search_by_vector_multiple(
+        self, query_vector: list[float], searches: list[tuple[BaseVector, dict]]
+    ) -> list[list[Document]]:
+        if not all(isinstance(vector, OpenSearchVector) and vector._client is self._client for vector, _ in searches):
+            return super().search_by_vector_multiple(query_vector, searches)
+
+        # one multi search request for all indices
+        body = []
+        for vector, kwargs in searches:
+            body.append({"index": vector._collection_name.lower()})
+            body.append(self._get_vector_query(query_vector, **kwargs))
+        try:
+            responses = self._client.msearch(body=body)["responses"]
+        except Exception as e:
+            logger.error(f"Error executing multi search: {e}")
+            raise
+
+        docs = []
+        for response, (_, kwargs) in zip(responses, searches):
+            if "error" in response:
+                raise ValueError(f"OpenSearch search failed: {response['error']}")
+            docs.append(self._get_documents_by_vector_response(response, **kwargs))
+
+        return docs
+
+    @staticmethod
+    def _get_vector_query(query_vector: list[float], **kwargs: Any) -> dict:
+        return {
+            "size": kwargs.get("top_k", 4),
+            "query": {"knn": {Field.VECTOR.value: {Field.VECTOR.value: query_vector, "k": kwargs.get("top_k", 4)}}},
+        }
+
+    @staticmethod
+    def _get_documents_by_vector_response(response: dict, **kwargs: Any) -> list[Document]:
         docs = []
         for hit in response["hits"]["hits"]:
             metadata = hit["_source"].get(Field.METADATA_KEY.value, {})
@@ -234,6 +279,8 @@ class OpenSearchVector(BaseVector):
 
 
 class OpenSearchVectorFactory(AbstractVectorFactory):
+    supports_search_by_vector_multiple = True
+
     def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> OpenSearchVector:
         if dataset.index_struct_dict:
             class_prefix: str = dataset.index_struct_dict["vector_store"]["class_prefix"]
@@ -1,7 +1,8 @@
 import json
+import threading
 import uuid
 from contextlib import contextmanager
-from typing import Any
+from typing import Any, Optional
 
 import psycopg2.extras
 import psycopg2.pool
@@ -10,6 +11,7 @@ from pydantic import BaseModel, model_validator
 from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -58,17 +60,70 @@ CREATE TABLE IF NOT EXISTS {table_name} (
 """
 
 
+class BoundedConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    Thread-safe pool that waits for a connection to be returned when all of them are in use,
+    instead of raising PoolError.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        self._semaphore = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None, timeout: Optional[float] = None):
+        """
+        Get a connection, waiting up to `timeout` seconds, or as long as it takes, for one to be returned
+        """
+        if not self._semaphore.acquire(timeout=timeout):
+            raise psycopg2.pool.PoolError("connection pool exhausted")
+        try:
+            conn = super().getconn(key)
+            if conn.closed:
+                # the server dropped the connection while it was idle in the pool
+                super().putconn(conn, key, close=True)
+                conn = super().getconn(key)
+            return conn
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._semaphore.release()
+
+    def retire(self):
+        """
+        Close the idle connections, and the connections in use once they are returned, so that the queries in
+        flight on a replaced pool finish, unlike with closeall.
+        """
+        with self._lock:
+            # connections are only kept in the pool up to minconn
+            self.minconn = 0
+            idle_connections, self._pool = self._pool, []
+        for conn in idle_connections:
+            conn.close()
+
+
 class PGVector(BaseVector):
     def __init__(self, collection_name: str, config: PGVectorConfig):
         super().__init__(collection_name)
-        self.pool = self._create_connection_pool(config)
+        self.pool = VectorClientRegistry.get_client(
+            VectorType.PGVECTOR,
+            config,
+            factory=lambda: self._create_connection_pool(config),
+            health_check=self._check_connection_pool,
+            close=lambda pool: pool.retire(),
+        )
         self.table_name = f"embedding_{collection_name}"
 
     def get_type(self) -> str:
         return VectorType.PGVECTOR
 
-    def _create_connection_pool(self, config: PGVectorConfig):
-        return psycopg2.pool.SimpleConnectionPool(
+    @staticmethod
+    def _create_connection_pool(config: PGVectorConfig):
+        return BoundedConnectionPool(
             config.min_connection,
             config.max_connection,
             host=config.host,
@@ -78,6 +133,20 @@ class PGVector(BaseVector):
             database=config.database,
         )
 
+    @staticmethod
+    def _check_connection_pool(pool: BoundedConnectionPool):
+        try:
+            conn = pool.getconn(timeout=0)
+        except psycopg2.pool.PoolError:
+            # every connection is in use, so the pool is serving queries
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        finally:
+            pool.putconn(conn)
+
     @contextmanager
     def _get_cursor(self):
         conn = self.pool.getconn()
@@ -127,6 +196,12 @@ class PGVector(BaseVector):
                 docs.append(Document(page_content=record[1], metadata=record[0]))
         return docs
 
+    def get_embeddings_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
+        with self._get_cursor() as cur:
+            # vectors are returned in their text format, which is a JSON array
+            cur.execute(f"SELECT id, embedding FROM {self.table_name} WHERE id IN %s", (tuple(ids),))
+            return {str(record[0]): json.loads(record[1]) for record in cur}
+
     def delete_by_ids(self, ids: list[str]) -> None:
         with self._get_cursor() as cur:
             cur.execute(f"DELETE FROM {self.table_name} WHERE id IN %s", (tuple(ids),))
@@ -161,6 +236,36 @@ class PGVector(BaseVector):
                     docs.append(Document(page_content=text, metadata=metadata))
         return docs
 
+    def search_by_vector_multiple(
+        self, query_vector: list[float], searches: list[tuple[BaseVector, dict]]
+    ) -> list[list[Document]]:
+        if not all(isinstance(vector, PGVector) and vector.pool is self.pool for vector, _ in searches):
+            return super().search_by_vector_multiple(query_vector, searches)
+
+        # one statement for all tables, each keeping its own limit
+        sub_queries = []
+        for index, (vector, kwargs) in enumerate(searches):
+            top_k = int(kwargs.get("top_k", 5))
+            sub_queries.append(
+                f"(SELECT {index} AS search_index, meta, text, embedding <=> %(query_vector)s AS distance"
+                f" FROM {vector.table_name} ORDER BY distance LIMIT {top_k})"
+            )
+
+        results = [[] for _ in searches]
+        with self._get_cursor() as cur:
+            cur.execute(" UNION ALL ".join(sub_queries), {"query_vector": json.dumps(query_vector)})
+            for record in cur:
+                search_index, metadata, text, distance = record
+                score = 1 - distance
+                metadata["score"] = score
+                score_threshold = float(searches[search_index][1].get("score_threshold") or 0.0)
+                if score > score_threshold:
+                    results[search_index].append(Document(page_content=text, metadata=metadata))
+
+        for docs in results:
+            docs.sort(key=lambda doc: doc.metadata["score"], reverse=True)
+        return results
+
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         top_k = kwargs.get("top_k", 5)
 
@@ -204,6 +309,8 @@ class PGVector(BaseVector):
 
 
 class PGVectorFactory(AbstractVectorFactory):
+    supports_search_by_vector_multiple = True
+
     def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> PGVector:
         if dataset.index_struct_dict:
             class_prefix: str = dataset.index_struct_dict["vector_store"]["class_prefix"]
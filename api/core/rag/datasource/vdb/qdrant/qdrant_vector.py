@@ -23,6 +23,7 @@ from configs import dify_config
 from core.rag.datasource.entity.embedding import Embeddings
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
@@ -69,7 +70,13 @@ class QdrantVector(BaseVector):
     def __init__(self, collection_name: str, group_id: str, config: QdrantConfig, distance_func: str = "Cosine"):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = qdrant_client.QdrantClient(**self._client_config.to_qdrant_params())
+        self._client = VectorClientRegistry.get_client(
+            VectorType.QDRANT,
+            config,
+            factory=lambda: qdrant_client.QdrantClient(**self._client_config.to_qdrant_params()),
+            health_check=lambda client: client.get_collections(),
+            close=lambda client: client.close(),
+        )
         self._distance_func = distance_func.upper()
         self._group_id = group_id
 
@@ -315,6 +322,20 @@ class QdrantVector(BaseVector):
 
         return len(response) > 0
 
+    def get_embeddings_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
+        from qdrant_client.http.exceptions import UnexpectedResponse
+
+        try:
+            points = self._client.retrieve(
+                collection_name=self._collection_name, ids=ids, with_payload=False, with_vectors=True
+            )
+        except UnexpectedResponse as e:
+            # Collection does not exist, so return
+            if e.status_code == 404:
+                return {}
+            raise e
+        return {str(point.id): point.vector for point in points if point.vector}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         from qdrant_client.http import models
 
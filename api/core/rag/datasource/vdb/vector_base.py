@@ -33,6 +33,16 @@ class BaseVector(ABC):
     def get_ids_by_metadata_field(self, key: str, value: str):
         raise NotImplementedError
 
+    def get_embeddings_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
+        """
+        Read the stored vectors of documents, to copy them to another store without embedding their texts again.
+        Backends that can return their vectors override this.
+
+        :param ids: doc ids of the documents
+        :return: vector of each document found, by doc id
+        """
+        return {}
+
     @abstractmethod
     def delete_by_metadata_field(self, key: str, value: str) -> None:
         raise NotImplementedError
@@ -41,6 +51,20 @@ class BaseVector(ABC):
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         raise NotImplementedError
 
+    def search_by_vector_multiple(
+        self, query_vector: list[float], searches: list[tuple[BaseVector, dict]]
+    ) -> list[list[Document]]:
+        """
+        Run the vector searches of several collections of this backend, one after another.
+        Backends that can serve them in a single round trip override this, and their factories set
+        supports_search_by_vector_multiple; the datasets of the other backends are searched concurrently instead.
+
+        :param query_vector: query vector
+        :param searches: vector of each collection and its search_by_vector kwargs
+        :return: documents of each search, in order
+        """
+        return [vector.search_by_vector(query_vector, **kwargs) for vector, kwargs in searches]
+
     @abstractmethod
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         raise NotImplementedError
@@ -0,0 +1,152 @@
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _RegisteredClient:
+    def __init__(
+        self,
+        client: Any,
+        health_check: Optional[Callable[[Any], None]],
+        close: Optional[Callable[[Any], None]],
+    ):
+        self.client = client
+        self.health_check = health_check
+        self.close = close
+        self.checked_at = time.monotonic()
+        self.checking = False
+
+
+class VectorClientRegistry:
+    """
+    Process-wide registry of vector store clients and connection pools.
+
+    Vector backends are constructed per dataset and per query, so their clients are kept here,
+    one per backend configuration, and shared by every collection of that backend.
+    Clients must be thread-safe.
+
+    Health checks and factories may block on their backend, so they run outside of the registry lock, under a lock
+    of their backend configuration: a slow backend only holds up the callers of that backend.
+    """
+
+    _clients: dict[str, _RegisteredClient] = {}
+    _key_locks: dict[str, threading.Lock] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(
+        cls,
+        backend: str,
+        config: BaseModel,
+        factory: Callable[[], T],
+        health_check: Optional[Callable[[T], None]] = None,
+        close: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """
+        Get the shared client of a backend configuration, creating it on first use.
+
+        :param backend: vector type
+        :param config: backend config, clients are shared between equal configs
+        :param factory: creates the client
+        :param health_check: raises when the client is no longer usable, the client is then recreated
+        :param close: releases the client resources on replacement and shutdown, while it may still be in use
+        :return: client
+        """
+        key = cls._get_key(backend, config)
+
+        with cls._lock:
+            registered_client = cls._clients.get(key)
+            # the other callers keep using the client while one of them checks it
+            if registered_client is not None and not cls._claim_health_check(registered_client):
+                return registered_client.client
+            key_lock = cls._key_locks.setdefault(key, threading.Lock())
+
+        if registered_client is not None and cls._is_healthy(registered_client):
+            return registered_client.client
+
+        with key_lock:
+            with cls._lock:
+                current_client = cls._clients.get(key)
+            if current_client is not None and current_client is not registered_client:
+                # created by another caller meanwhile
+                return current_client.client
+
+            new_client = _RegisteredClient(factory(), health_check, close)
+            with cls._lock:
+                cls._clients[key] = new_client
+
+        if registered_client is not None:
+            logger.warning("Vector store client of %s was unhealthy, recreated it", backend)
+            cls._close(registered_client)
+        return new_client.client
+
+    @classmethod
+    def close_all(cls) -> None:
+        """
+        Close every registered client, called on process shutdown.
+        """
+        with cls._lock:
+            registered_clients = list(cls._clients.values())
+            cls._clients.clear()
+            cls._key_locks.clear()
+
+        for registered_client in registered_clients:
+            cls._close(registered_client)
+
+    @staticmethod
+    def _get_key(backend: str, config: BaseModel) -> str:
+        # configs hold credentials, keep only a digest of them
+        config_hash = hashlib.sha256(config.model_dump_json().encode("utf-8")).hexdigest()
+        return f"{backend}:{config_hash}"
+
+    @staticmethod
+    def _claim_health_check(registered_client: _RegisteredClient) -> bool:
+        """
+        Claim the health check of a client if it is due and no other caller is running it, under the registry lock
+        """
+        if registered_client.health_check is None or registered_client.checking:
+            return False
+
+        if time.monotonic() - registered_client.checked_at < dify_config.VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL:
+            return False
+
+        registered_client.checking = True
+        return True
+
+    @staticmethod
+    def _is_healthy(registered_client: _RegisteredClient) -> bool:
+        try:
+            registered_client.health_check(registered_client.client)
+        except Exception:
+            logger.exception("Vector store client health check failed")
+            return False
+        finally:
+            registered_client.checked_at = time.monotonic()
+            registered_client.checking = False
+
+        return True
+
+    @staticmethod
+    def _close(registered_client: _RegisteredClient) -> None:
+        if registered_client.close is None:
+            return
+
+        try:
+            registered_client.close(registered_client.client)
+        except Exception:
+            logger.exception("Failed to close vector store client")
+
+
+atexit.register(VectorClientRegistry.close_all)
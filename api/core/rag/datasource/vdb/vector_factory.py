@@ -14,6 +14,10 @@ from models.dataset import Dataset
 
 
 class AbstractVectorFactory(ABC):
+    # whether the vectors batch the searches of several collections in search_by_vector_multiple,
+    # rather than running them one after another
+    supports_search_by_vector_multiple = False
+
     @abstractmethod
     def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> BaseVector:
         raise NotImplementedError
@@ -118,6 +122,16 @@ class Vector:
         embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
         self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
 
+    def create_with_embeddings(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
+        """
+        Create the documents with their vectors, such as vectors copied from another vector store
+        """
+        if texts:
+            self._vector_processor.create(texts=texts, embeddings=embeddings, **kwargs)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embeddings.embed_documents(texts)
+
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
 
@@ -128,9 +142,29 @@ class Vector:
         self._vector_processor.delete_by_metadata_field(key, value)
 
     def search_by_vector(self, query: str, **kwargs: Any) -> list[Document]:
-        query_vector = self._embeddings.embed_query(query)
+        return self.search_by_query_vector(self.embed_query(query), **kwargs)
+
+    def embed_query(self, query: str) -> list[float]:
+        return self._embeddings.embed_query(query)
+
+    def search_by_query_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         return self._vector_processor.search_by_vector(query_vector, **kwargs)
 
+    @staticmethod
+    def search_by_vector_multiple(vectors: list["Vector"], query: str, kwargs_list: list[dict]) -> list[list[Document]]:
+        """
+        Search several datasets sharing a vector backend and an embedding model,
+        embedding the query once and letting the backend batch the searches.
+
+        :param vectors: vector of each dataset
+        :param query: query
+        :param kwargs_list: search_by_vector kwargs of each dataset
+        :return: documents of each dataset, in order
+        """
+        query_vector = vectors[0]._embeddings.embed_query(query)
+        searches = [(vector._vector_processor, kwargs) for vector, kwargs in zip(vectors, kwargs_list)]
+        return vectors[0]._vector_processor.search_by_vector_multiple(query_vector, searches)
+
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         return self._vector_processor.search_by_full_text(query, **kwargs)
 
@@ -13,6 +13,7 @@ from core.rag.index_processor.index_processor_base import BaseIndexProcessor
 from core.rag.models.document import Document
 from libs import helper
 from models.dataset import Dataset
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
 
 
 class ParagraphIndexProcessor(BaseIndexProcessor):
@@ -58,6 +59,7 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
         if dataset.indexing_technique == "high_quality":
             vector = Vector(dataset)
             vector.create(documents)
+        DatasetVectorRebuildService.index_documents(dataset, documents)
         if with_keywords:
             keyword = Keyword(dataset)
             keyword.create(documents)
@@ -69,6 +71,8 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
                 vector.delete_by_ids(node_ids)
             else:
                 vector.delete()
+        if node_ids:
+            DatasetVectorRebuildService.delete_documents(dataset, node_ids)
         if with_keywords:
             keyword = Keyword(dataset)
             if node_ids:
@@ -20,6 +20,7 @@ from core.rag.index_processor.index_processor_base import BaseIndexProcessor
 from core.rag.models.document import Document
 from libs import helper
 from models.dataset import Dataset
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
 
 
 class QAIndexProcessor(BaseIndexProcessor):
@@ -103,11 +104,13 @@ class QAIndexProcessor(BaseIndexProcessor):
         if dataset.indexing_technique == "high_quality":
             vector = Vector(dataset)
             vector.create(documents)
+        DatasetVectorRebuildService.index_documents(dataset, documents)
 
     def clean(self, dataset: Dataset, node_ids: Optional[list[str]], with_keywords: bool = True):
         vector = Vector(dataset)
         if node_ids:
             vector.delete_by_ids(node_ids)
+            DatasetVectorRebuildService.delete_documents(dataset, node_ids)
         else:
             vector.delete()
 
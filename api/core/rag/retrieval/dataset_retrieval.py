@@ -1,10 +1,12 @@
+import logging
 import math
 import threading
-from collections import Counter
+from collections import Counter, defaultdict
 from typing import Optional, cast
 
 from flask import Flask, current_app
 
+from configs import dify_config
 from core.app.app_config.entities import DatasetEntity, DatasetRetrieveConfigEntity
 from core.app.entities.app_invoke_entities import InvokeFrom, ModelConfigWithCredentialsEntity
 from core.callback_handler.index_tool_callback_handler import DatasetIndexToolCallbackHandler
@@ -20,6 +22,7 @@ from core.ops.utils import measure_time
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
 from core.rag.datasource.retrieval_service import RetrievalService
+from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.entities.context_entities import DocumentContext
 from core.rag.models.document import Document
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
@@ -33,6 +36,8 @@ from models.dataset import Dataset, DatasetQuery, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from services.external_knowledge_service import ExternalDatasetService
 
+logger = logging.getLogger(__name__)
+
 default_retrieval_model = {
     "search_method": RetrievalMethod.SEMANTIC_SEARCH.value,
     "reranking_enable": False,
@@ -360,10 +365,29 @@ class DatasetRetrieval:
     ):
         threads = []
         all_documents = []
+        exceptions = []
         dataset_ids = [dataset.id for dataset in available_datasets]
         index_type = None
+        # datasets sharing a vector backend and an embedding model are searched together
+        vector_search_groups = self._get_vector_search_groups(available_datasets, top_k)
+        for datasets in vector_search_groups:
+            retrieval_thread = threading.Thread(
+                target=self._multiple_retriever,
+                kwargs={
+                    "flask_app": current_app._get_current_object(),
+                    "search_settings": [self._get_vector_search_setting(dataset) for dataset in datasets],
+                    "query": query,
+                    "all_documents": all_documents,
+                    "exceptions": exceptions,
+                },
+            )
+            threads.append(retrieval_thread)
+            retrieval_thread.start()
+        grouped_dataset_ids = {dataset.id for datasets in vector_search_groups for dataset in datasets}
         for dataset in available_datasets:
             index_type = dataset.indexing_technique
+            if dataset.id in grouped_dataset_ids:
+                continue
             retrieval_thread = threading.Thread(
                 target=self._retriever,
                 kwargs={
@@ -379,6 +403,9 @@ class DatasetRetrieval:
         for thread in threads:
             thread.join()
 
+        if exceptions:
+            raise Exception(";\n".join(exceptions))
+
         with measure_time() as timer:
             if reranking_enable:
                 # do rerank for searched documents
@@ -507,6 +534,57 @@ class DatasetRetrieval:
 
                         all_documents.extend(documents)
 
+    def _multiple_retriever(
+        self, flask_app: Flask, search_settings: list[dict], query: str, all_documents: list, exceptions: list
+    ):
+        with flask_app.app_context():
+            try:
+                documents = RetrievalService.embedding_search_multiple(query, search_settings)
+                all_documents.extend(documents)
+            except Exception as e:
+                logger.exception("Vector search of datasets failed")
+                exceptions.append(str(e))
+
+    @staticmethod
+    def _get_vector_search_groups(available_datasets: list, top_k: int) -> list[list[Dataset]]:
+        """
+        Group the semantic search datasets by vector backend and embedding model, for the backends which batch the
+        searches of several collections. Only groups of more than one dataset are returned, the other datasets are
+        retrieved concurrently, one thread each.
+        """
+        if top_k <= 0:
+            return []
+
+        groups = defaultdict(list)
+        for dataset in available_datasets:
+            if dataset.provider == "external" or dataset.indexing_technique != "high_quality":
+                continue
+            retrieval_model = dataset.retrieval_model or default_retrieval_model
+            if retrieval_model["search_method"] != RetrievalMethod.SEMANTIC_SEARCH.value:
+                continue
+            vector_type = dataset.index_struct_dict["type"] if dataset.index_struct_dict else dify_config.VECTOR_STORE
+            groups[(vector_type, dataset.embedding_model_provider, dataset.embedding_model)].append(dataset)
+
+        return [
+            datasets
+            for (vector_type, _, _), datasets in groups.items()
+            if len(datasets) > 1 and Vector.get_vector_factory(vector_type).supports_search_by_vector_multiple
+        ]
+
+    @staticmethod
+    def _get_vector_search_setting(dataset: Dataset) -> dict:
+        retrieval_model = dataset.retrieval_model or default_retrieval_model
+        return {
+            "dataset_id": dataset.id,
+            "top_k": retrieval_model.get("top_k") or 2,
+            "score_threshold": retrieval_model.get("score_threshold", 0.0)
+            if retrieval_model["score_threshold_enabled"]
+            else 0.0,
+            "reranking_model": retrieval_model.get("reranking_model", None)
+            if retrieval_model["reranking_enable"]
+            else None,
+        }
+
     def to_dataset_retriever_tool(
         self,
         tenant_id: str,
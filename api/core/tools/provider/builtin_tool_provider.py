@@ -10,6 +10,7 @@ from core.tools.errors import (
     ToolParameterValidationError,
     ToolProviderNotFoundError,
 )
+from core.tools.provider.builtin_tool_provider_manifest import BuiltinToolProviderManifest
 from core.tools.provider.tool_provider import ToolProviderController
 from core.tools.tool.builtin_tool import BuiltinTool
 from core.tools.tool.tool import Tool
@@ -24,11 +25,13 @@ class BuiltinToolProviderController(ToolProviderController):
 
         # load provider yaml
         provider = self.__class__.__module__.split(".")[-1]
-        yaml_path = path.join(path.dirname(path.realpath(__file__)), "builtin", provider, f"{provider}.yaml")
-        try:
-            provider_yaml = load_yaml_file(yaml_path, ignore_error=False)
-        except Exception as e:
-            raise ToolProviderNotFoundError(f"can not load provider yaml for {provider}: {e}")
+        provider_yaml = BuiltinToolProviderManifest.get_provider_yaml(provider)
+        if provider_yaml is None:
+            yaml_path = path.join(path.dirname(path.realpath(__file__)), "builtin", provider, f"{provider}.yaml")
+            try:
+                provider_yaml = load_yaml_file(yaml_path, ignore_error=False)
+            except Exception as e:
+                raise ToolProviderNotFoundError(f"can not load provider yaml for {provider}: {e}")
 
         if "credentials_for_provider" in provider_yaml and provider_yaml["credentials_for_provider"] is not None:
             # set credentials name
@@ -53,14 +56,17 @@ class BuiltinToolProviderController(ToolProviderController):
 
         provider = self.identity.name
         tool_path = path.join(path.dirname(path.realpath(__file__)), "builtin", provider, "tools")
-        # get all the yaml files in the tool path
-        tool_files = list(filter(lambda x: x.endswith(".yaml") and not x.startswith("__"), listdir(tool_path)))
-        tools = []
-        for tool_file in tool_files:
-            # get tool name
-            tool_name = tool_file.split(".")[0]
-            tool = load_yaml_file(path.join(tool_path, tool_file), ignore_error=False)
+        tool_yamls = BuiltinToolProviderManifest.get_tool_yamls(provider)
+        if tool_yamls is None:
+            # get all the yaml files in the tool path
+            tool_files = list(filter(lambda x: x.endswith(".yaml") and not x.startswith("__"), listdir(tool_path)))
+            tool_yamls = {
+                tool_file.split(".")[0]: load_yaml_file(path.join(tool_path, tool_file), ignore_error=False)
+                for tool_file in tool_files
+            }
 
+        tools = []
+        for tool_name, tool in tool_yamls.items():
             # get tool class, import the module
             assistant_tool_class = load_single_subclass_from_source(
                 module_name=f"core.tools.provider.builtin.{provider}.tools.{tool_name}",
@@ -0,0 +1,92 @@
+import copy
+from os import listdir, path
+from typing import Any, Optional
+
+from core.helper.manifest_helper import Manifest
+from core.tools.entities.common_entities import I18nObject
+from core.tools.utils.yaml_utils import load_yaml_file
+
+BUILTIN_PROVIDERS_PATH = path.join(path.dirname(path.realpath(__file__)), "builtin")
+
+manifest = Manifest(path.join(BUILTIN_PROVIDERS_PATH, "_manifest.json"))
+
+
+class BuiltinToolProviderManifest:
+    """
+    Provider and tool YAML of all builtin tool providers, read from the manifest so that
+    providers can be resolved by name and tools labeled without importing every provider module.
+    """
+
+    @classmethod
+    def get_provider_yaml(cls, provider: str) -> Optional[dict[str, Any]]:
+        """
+        Get the provider YAML of a provider directory, None when it is not in the manifest
+        """
+        data = manifest.get()
+        if data is None or provider not in data["providers"]:
+            return None
+        # callers complete the YAML in place
+        return copy.deepcopy(data["providers"][provider]["provider"])
+
+    @classmethod
+    def get_tool_yamls(cls, provider: str) -> Optional[dict[str, dict[str, Any]]]:
+        """
+        Get the tool YAML of a provider directory by tool file name, None when it is not in the manifest
+        """
+        data = manifest.get()
+        if data is None or provider not in data["providers"]:
+            return None
+        return copy.deepcopy(data["providers"][provider]["tools"])
+
+    @classmethod
+    def get_provider_dir(cls, provider_name: str) -> Optional[str]:
+        """
+        Get the directory of a provider by its identity name
+        """
+        data = manifest.get()
+        if data is None:
+            return None
+        return data["provider_dirs"].get(provider_name)
+
+    @classmethod
+    def get_tool_label(cls, tool_name: str) -> Optional[I18nObject]:
+        data = manifest.get()
+        if data is None or tool_name not in data["tool_labels"]:
+            return None
+        return I18nObject(**data["tool_labels"][tool_name])
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return manifest.get() is not None
+
+    @classmethod
+    def generate(cls) -> str:
+        """
+        Generate the manifest from the YAML files in the source tree
+
+        :return: manifest path
+        """
+        providers = {}
+        provider_dirs = {}
+        tool_labels = {}
+        for provider in sorted(listdir(BUILTIN_PROVIDERS_PATH)):
+            if provider.startswith("__") or not path.isdir(path.join(BUILTIN_PROVIDERS_PATH, provider)):
+                continue
+
+            provider_yaml = load_yaml_file(
+                path.join(BUILTIN_PROVIDERS_PATH, provider, f"{provider}.yaml"), ignore_error=False
+            )
+            tool_path = path.join(BUILTIN_PROVIDERS_PATH, provider, "tools")
+            tools = {}
+            for tool_file in sorted(listdir(tool_path)) if path.isdir(tool_path) else []:
+                if not tool_file.endswith(".yaml") or tool_file.startswith("__"):
+                    continue
+                tool = load_yaml_file(path.join(tool_path, tool_file), ignore_error=False)
+                tools[tool_file.split(".")[0]] = tool
+                tool_labels[tool["identity"]["name"]] = tool["identity"]["label"]
+
+            providers[provider] = {"provider": provider_yaml, "tools": tools}
+            provider_dirs[provider_yaml["identity"]["name"]] = provider
+
+        manifest.write({"providers": providers, "provider_dirs": provider_dirs, "tool_labels": tool_labels})
+        return manifest.path
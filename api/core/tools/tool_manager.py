@@ -3,7 +3,7 @@ import logging
 import mimetypes
 from collections.abc import Generator
 from os import listdir, path
-from threading import Lock
+from threading import RLock
 from typing import Any, Union
 
 from configs import dify_config
@@ -19,10 +19,13 @@ from core.tools.errors import ToolProviderNotFoundError
 from core.tools.provider.api_tool_provider import ApiToolProviderController
 from core.tools.provider.builtin._positions import BuiltinToolProviderSort
 from core.tools.provider.builtin_tool_provider import BuiltinToolProviderController
+from core.tools.provider.builtin_tool_provider_manifest import BuiltinToolProviderManifest
+from core.tools.provider.workflow_tool_provider import WorkflowToolProviderController
 from core.tools.tool.api_tool import ApiTool
 from core.tools.tool.builtin_tool import BuiltinTool
 from core.tools.tool.tool import Tool
 from core.tools.tool_label_manager import ToolLabelManager
+from core.tools.tool_runtime_cache import ToolRuntimeCache
 from core.tools.utils.configuration import ToolConfigurationManager, ToolParameterConfigurationManager
 from extensions.ext_database import db
 from models.tools import ApiToolProvider, BuiltinToolProvider, WorkflowToolProvider
@@ -32,8 +35,10 @@ logger = logging.getLogger(__name__)
 
 
 class ToolManager:
-    _builtin_provider_lock = Lock()
+    # reentrant, the providers may be looked up while they are being listed
+    _builtin_provider_lock = RLock()
     _builtin_providers = {}
+    _builtin_provider_dirs = {}
     _builtin_providers_loaded = False
     _builtin_tools_labels = {}
 
@@ -45,9 +50,15 @@ class ToolManager:
         :param provider: the name of the provider
         :return: the provider
         """
-        if len(cls._builtin_providers) == 0:
-            # init the builtin providers
-            cls.load_builtin_providers_cache()
+        if provider not in cls._builtin_providers and not cls._builtin_providers_loaded:
+            provider_dir = BuiltinToolProviderManifest.get_provider_dir(provider)
+            if provider_dir:
+                # import only the requested provider
+                with cls._builtin_provider_lock:
+                    cls._load_builtin_provider(provider_dir)
+            else:
+                # init the builtin providers
+                cls.load_builtin_providers_cache()
 
         if provider not in cls._builtin_providers:
             raise ToolProviderNotFoundError(f"builtin provider {provider} not found")
@@ -128,25 +139,29 @@ class ToolManager:
                     }
                 )
 
-            # get credentials
-            builtin_provider: BuiltinToolProvider = (
-                db.session.query(BuiltinToolProvider)
-                .filter(
-                    BuiltinToolProvider.tenant_id == tenant_id,
-                    BuiltinToolProvider.provider == provider_id,
+            def load_builtin_provider() -> tuple[BuiltinToolProviderController, dict[str, Any]]:
+                # get credentials
+                builtin_provider: BuiltinToolProvider = (
+                    db.session.query(BuiltinToolProvider)
+                    .filter(
+                        BuiltinToolProvider.tenant_id == tenant_id,
+                        BuiltinToolProvider.provider == provider_id,
+                    )
+                    .first()
                 )
-                .first()
-            )
 
-            if builtin_provider is None:
-                raise ToolProviderNotFoundError(f"builtin provider {provider_id} not found")
+                if builtin_provider is None:
+                    raise ToolProviderNotFoundError(f"builtin provider {provider_id} not found")
 
-            # decrypt the credentials
-            credentials = builtin_provider.credentials
-            controller = cls.get_builtin_provider(provider_id)
-            tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=controller)
+                # decrypt the credentials
+                tool_configuration = ToolConfigurationManager(
+                    tenant_id=tenant_id, provider_controller=provider_controller
+                )
+                return provider_controller, tool_configuration.decrypt_tool_credentials(builtin_provider.credentials)
 
-            decrypted_credentials = tool_configuration.decrypt_tool_credentials(credentials)
+            _, decrypted_credentials = ToolRuntimeCache.get_or_load(
+                tenant_id, provider_type, provider_id, load_builtin_provider
+            )
 
             return builtin_tool.fork_tool_runtime(
                 runtime={
@@ -162,11 +177,16 @@ class ToolManager:
             if tenant_id is None:
                 raise ValueError("tenant id is required for api provider")
 
-            api_provider, credentials = cls.get_api_provider_controller(tenant_id, provider_id)
+            def load_api_provider() -> tuple[ApiToolProviderController, dict[str, Any]]:
+                api_provider, credentials = cls.get_api_provider_controller(tenant_id, provider_id)
 
-            # decrypt the credentials
-            tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=api_provider)
-            decrypted_credentials = tool_configuration.decrypt_tool_credentials(credentials)
+                # decrypt the credentials
+                tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=api_provider)
+                return api_provider, tool_configuration.decrypt_tool_credentials(credentials)
+
+            api_provider, decrypted_credentials = ToolRuntimeCache.get_or_load(
+                tenant_id, provider_type, provider_id, load_api_provider
+            )
 
             return api_provider.get_tool(tool_name).fork_tool_runtime(
                 runtime={
@@ -177,18 +197,25 @@ class ToolManager:
                 }
             )
         elif provider_type == "workflow":
-            workflow_provider = (
-                db.session.query(WorkflowToolProvider)
-                .filter(WorkflowToolProvider.tenant_id == tenant_id, WorkflowToolProvider.id == provider_id)
-                .first()
-            )
 
-            if workflow_provider is None:
-                raise ToolProviderNotFoundError(f"workflow provider {provider_id} not found")
+            def load_workflow_provider() -> tuple[WorkflowToolProviderController, dict[str, Any]]:
+                workflow_provider = (
+                    db.session.query(WorkflowToolProvider)
+                    .filter(WorkflowToolProvider.tenant_id == tenant_id, WorkflowToolProvider.id == provider_id)
+                    .first()
+                )
+
+                if workflow_provider is None:
+                    raise ToolProviderNotFoundError(f"workflow provider {provider_id} not found")
+
+                controller = ToolTransformService.workflow_provider_to_controller(db_provider=workflow_provider)
+                # load the tools, so they are cached with the controller
+                controller.get_tools(user_id=None, tenant_id=workflow_provider.tenant_id)
+                return controller, {}
 
-            controller = ToolTransformService.workflow_provider_to_controller(db_provider=workflow_provider)
+            controller, _ = ToolRuntimeCache.get_or_load(tenant_id, provider_type, provider_id, load_workflow_provider)
 
-            return controller.get_tools(user_id=None, tenant_id=workflow_provider.tenant_id)[0].fork_tool_runtime(
+            return controller.get_tools(user_id=None, tenant_id=tenant_id)[0].fork_tool_runtime(
                 runtime={
                     "tenant_id": tenant_id,
                     "credentials": {},
@@ -370,25 +397,35 @@ class ToolManager:
 
                 # init provider
                 try:
-                    provider_class = load_single_subclass_from_source(
-                        module_name=f"core.tools.provider.builtin.{provider}.{provider}",
-                        script_path=path.join(
-                            path.dirname(path.realpath(__file__)), "provider", "builtin", provider, f"{provider}.py"
-                        ),
-                        parent_type=BuiltinToolProviderController,
-                    )
-                    provider: BuiltinToolProviderController = provider_class()
-                    cls._builtin_providers[provider.identity.name] = provider
-                    for tool in provider.get_tools():
-                        cls._builtin_tools_labels[tool.identity.name] = tool.identity.label
-                    yield provider
-
+                    yield cls._load_builtin_provider(provider)
                 except Exception as e:
                     logger.error(f"load builtin provider {provider} error: {e}")
                     continue
         # set builtin providers loaded
         cls._builtin_providers_loaded = True
 
+    @classmethod
+    def _load_builtin_provider(cls, provider_dir: str) -> BuiltinToolProviderController:
+        """
+        import a builtin provider and its tools, once per provider directory
+        """
+        if provider_dir in cls._builtin_provider_dirs:
+            return cls._builtin_provider_dirs[provider_dir]
+
+        provider_class = load_single_subclass_from_source(
+            module_name=f"core.tools.provider.builtin.{provider_dir}.{provider_dir}",
+            script_path=path.join(
+                path.dirname(path.realpath(__file__)), "provider", "builtin", provider_dir, f"{provider_dir}.py"
+            ),
+            parent_type=BuiltinToolProviderController,
+        )
+        provider: BuiltinToolProviderController = provider_class()
+        for tool in provider.get_tools():
+            cls._builtin_tools_labels[tool.identity.name] = tool.identity.label
+        cls._builtin_providers[provider.identity.name] = provider
+        cls._builtin_provider_dirs[provider_dir] = provider
+        return provider
+
     @classmethod
     def load_builtin_providers_cache(cls):
         for _ in cls.list_builtin_providers():
@@ -397,6 +434,7 @@ class ToolManager:
     @classmethod
     def clear_builtin_providers_cache(cls):
         cls._builtin_providers = {}
+        cls._builtin_provider_dirs = {}
         cls._builtin_providers_loaded = False
 
     @classmethod
@@ -408,7 +446,14 @@ class ToolManager:
 
         :return: the label of the tool
         """
-        if len(cls._builtin_tools_labels) == 0:
+        if tool_name in cls._builtin_tools_labels:
+            return cls._builtin_tools_labels[tool_name]
+
+        label = BuiltinToolProviderManifest.get_tool_label(tool_name)
+        if label:
+            return label
+
+        if not cls._builtin_providers_loaded:
             # init the builtin providers
             cls.load_builtin_providers_cache()
 
@@ -641,6 +686,3 @@ class ToolManager:
             return json.loads(provider.icon)
         else:
             raise ValueError(f"provider type {provider_type} not found")
-
-
-ToolManager.load_builtin_providers_cache()
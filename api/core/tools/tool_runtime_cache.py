@@ -0,0 +1,72 @@
+from collections.abc import Callable
+from threading import Lock
+from typing import Any, NamedTuple
+
+from core.helper.lru_cache import LRUCache
+from core.tools.provider.tool_provider import ToolProviderController
+from extensions.ext_redis import redis_client
+
+TOOL_RUNTIME_CACHE_CAPACITY = 1024
+
+
+class ToolRuntimeCacheEntry(NamedTuple):
+    generation: bytes
+    controller: ToolProviderController
+    credentials: dict[str, Any]
+
+
+class ToolRuntimeCache:
+    """
+    Process-local cache of tool provider controllers with their decrypted credentials, per tenant.
+
+    Every provider has a generation counter in Redis that provider edits increment, an entry is only
+    served while the generation it was loaded at is current. Setting up a tool then costs one Redis
+    read instead of database queries, schema parsing and credential decryption.
+    """
+
+    _entries = LRUCache(TOOL_RUNTIME_CACHE_CAPACITY)
+    _lock = Lock()
+
+    @classmethod
+    def get_or_load(
+        cls,
+        tenant_id: str,
+        provider_type: str,
+        provider_id: str,
+        loader: Callable[[], tuple[ToolProviderController, dict[str, Any]]],
+    ) -> tuple[ToolProviderController, dict[str, Any]]:
+        """
+        Get the controller and decrypted credentials of a provider, loading them on a miss
+
+        :param loader: loads the controller, with its tools, and the decrypted credentials from the database
+        :return: the controller, a copy of the credentials
+        """
+        cache_key = (tenant_id, provider_type, provider_id)
+        # read before loading, an edit committed while loading makes the entry stale
+        generation = redis_client.get(cls._get_generation_key(tenant_id, provider_type, provider_id)) or b"0"
+
+        with cls._lock:
+            entry: ToolRuntimeCacheEntry = cls._entries.get(cache_key)
+        if entry is None or entry.generation != generation:
+            controller, credentials = loader()
+            entry = ToolRuntimeCacheEntry(generation=generation, controller=controller, credentials=credentials)
+            with cls._lock:
+                cls._entries.put(cache_key, entry)
+
+        return entry.controller, dict(entry.credentials)
+
+    @classmethod
+    def invalidate(cls, tenant_id: str, provider_type: str, provider_id: str) -> None:
+        """
+        Invalidate the entries of a provider in every process, called after the provider is edited or deleted
+        """
+        redis_client.incr(cls._get_generation_key(tenant_id, provider_type, provider_id))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries = LRUCache(TOOL_RUNTIME_CACHE_CAPACITY)
+
+    @staticmethod
+    def _get_generation_key(tenant_id: str, provider_type: str, provider_id: str) -> str:
+        return f"tool_runtime_generation:tenant_id:{tenant_id}:{provider_type}:{provider_id}"
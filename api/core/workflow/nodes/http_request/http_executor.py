@@ -1,8 +1,11 @@
 import json
+import time
 from collections.abc import Mapping, Sequence
+from contextlib import closing
 from copy import deepcopy
 from random import randint
-from typing import Any, Literal
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Literal
 from urllib.parse import urlencode
 
 import httpx
@@ -30,15 +33,53 @@ NON_FILE_CONTENT_TYPES = (
     "text/plain",
     "application/x-www-form-urlencoded",
 )
+# response bodies larger than this are spooled to a temporary file instead of memory
+RESPONSE_SPOOL_MAX_MEMORY_SIZE = 1024 * 1024
 
 
 class HttpExecutorResponse:
     headers: dict[str, str]
     response: httpx.Response
+    body: IO[bytes]
+    size: int
+    time_to_headers: float
+    elapsed: float
 
     def __init__(self, response: httpx.Response):
         self.response = response
         self.headers = dict(response.headers)
+        self.body = SpooledTemporaryFile(max_size=RESPONSE_SPOOL_MAX_MEMORY_SIZE)  # noqa: SIM115, closed by close()
+        self.size = 0
+        self.time_to_headers = 0.0
+        self.elapsed = 0.0
+
+    def read(self, max_size: int) -> None:
+        """
+        Read the response body, aborting as soon as it is larger than max_size
+        """
+        with closing(self.response):
+            if "content-encoding" not in self.response.headers:
+                content_length = int(self.response.headers.get("content-length") or 0)
+                if content_length > max_size:
+                    self._raise_too_large(max_size, content_length)
+
+            for chunk in self.response.iter_bytes():
+                self.size += len(chunk)
+                if self.size > max_size:
+                    self._raise_too_large(max_size, self.size)
+                self.body.write(chunk)
+
+        self.body.seek(0)
+
+    def close(self) -> None:
+        self.body.close()
+
+    def _raise_too_large(self, max_size: int, size: int):
+        raise ValueError(
+            f'{"File" if self.is_file else "Text"} size is too large,'
+            f" max size is {max_size / 1024 / 1024:.2f} MB,"
+            f" but current size is {_readable_size(size)}."
+        )
 
     @property
     def is_file(self):
@@ -52,32 +93,35 @@ class HttpExecutorResponse:
 
     @property
     def content_type(self) -> str:
-        return self.headers.get("Content-Type", "")
+        return self.response.headers.get("Content-Type", "")
 
     @property
     def text(self) -> str:
-        return self.response.text
+        return self.content.decode(self.response.encoding or "utf-8", errors="replace")
 
     @property
     def content(self) -> bytes:
-        return self.response.content
+        self.body.seek(0)
+        content = self.body.read()
+        self.body.seek(0)
+        return content
 
     @property
     def status_code(self) -> int:
         return self.response.status_code
 
     @property
-    def size(self) -> int:
-        return len(self.content)
+    def readable_size(self) -> str:
+        return _readable_size(self.size)
 
     @property
-    def readable_size(self) -> str:
-        if self.size < 1024:
-            return f"{self.size} bytes"
-        elif self.size < 1024 * 1024:
-            return f"{(self.size / 1024):.2f} KB"
-        else:
-            return f"{(self.size / 1024 / 1024):.2f} MB"
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "size": self.size,
+            "time_to_headers": round(self.time_to_headers, 3),
+            "download_time": round(self.elapsed - self.time_to_headers, 3),
+            "elapsed": round(self.elapsed, 3),
+        }
 
 
 class HttpExecutor:
@@ -235,12 +279,11 @@ class HttpExecutor:
             if executor_response.is_file
             else dify_config.HTTP_REQUEST_NODE_MAX_TEXT_SIZE
         )
-        if executor_response.size > threshold_size:
-            raise ValueError(
-                f'{"File" if executor_response.is_file else "Text"} size is too large,'
-                f' max size is {threshold_size / 1024 / 1024:.2f} MB,'
-                f' but current size is {executor_response.readable_size}.'
-            )
+        try:
+            executor_response.read(threshold_size)
+        except Exception:
+            executor_response.close()
+            raise
 
         return executor_response
 
@@ -261,6 +304,7 @@ class HttpExecutor:
             "params": self.params,
             "timeout": (self.timeout.connect, self.timeout.read, self.timeout.write),
             "follow_redirects": True,
+            "stream": True,
         }
 
         response = getattr(ssrf_proxy, self.method)(**request_args)
@@ -269,10 +313,15 @@ class HttpExecutor:
     def invoke(self) -> HttpExecutorResponse:
         # assemble headers
         headers = self._assembling_headers()
+        start_at = time.perf_counter()
         # do http request
         response = self._do_http_request(headers)
+        time_to_headers = time.perf_counter() - start_at
         # validate response
-        return self._validate_and_parse_response(response)
+        executor_response = self._validate_and_parse_response(response)
+        executor_response.time_to_headers = time_to_headers
+        executor_response.elapsed = time.perf_counter() - start_at
+        return executor_response
 
     def to_log(self):
         url = self.url
@@ -363,6 +412,15 @@ def _plain_text_to_dict(text: str, /) -> dict[str, str]:
     }
 
 
+def _readable_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} bytes"
+    elif size < 1024 * 1024:
+        return f"{(size / 1024):.2f} KB"
+    else:
+        return f"{(size / 1024 / 1024):.2f} MB"
+
+
 def _generate_random_string(n: int) -> str:
     """
     Generate a random string of lowercase ASCII letters.
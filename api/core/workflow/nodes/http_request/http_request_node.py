@@ -64,17 +64,22 @@ class HttpRequestNode(BaseNode):
             process_data["request"] = http_executor.to_log()
 
             response = http_executor.invoke()
-            files = self.extract_files(url=http_executor.url, response=response)
+            try:
+                files = self.extract_files(url=http_executor.url, response=response)
+                body = response.text if not files else ""
+            finally:
+                response.close()
             return NodeRunResult(
                 status=WorkflowNodeExecutionStatus.SUCCEEDED,
                 outputs={
                     "status_code": response.status_code,
-                    "body": response.text if not files else "",
+                    "body": body,
                     "headers": response.headers,
                     "files": files,
                 },
                 process_data={
                     "request": http_executor.to_log(),
+                    "response_metrics": response.metrics,
                 },
             )
         except Exception as e:
@@ -142,19 +147,19 @@ class HttpRequestNode(BaseNode):
         """
         files = []
         content_type = response.content_type
-        content = response.content
 
-        if content_type:
+        if response.is_file and content_type:
             # extract filename from url
             filename = path.basename(url)
             # extract extension if possible
             extension = guess_extension(content_type) or ".bin"
 
-            tool_file = ToolFileManager.create_file_by_raw(
+            # the body may be spooled on disk, upload it without loading it into memory
+            tool_file = ToolFileManager.create_file_by_stream(
                 user_id=self.user_id,
                 tenant_id=self.tenant_id,
                 conversation_id=None,
-                file_binary=content,
+                file_stream=response.body,
                 mimetype=content_type,
             )
 
@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import json
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any, Optional
+
+from configs import dify_config
+from extensions.ext_storage import storage
+
+if TYPE_CHECKING:
+    from models.workflow import WorkflowNodeExecution
+
+NODE_PAYLOAD_FIELDS = ("inputs", "process_data", "outputs")
+
+# size counted for the numbers, booleans and nulls of a preview
+SCALAR_PREVIEW_LENGTH = 8
+
+
+def set_node_payloads(
+    workflow_node_execution: "WorkflowNodeExecution",
+    inputs: Optional[Mapping[str, Any]],
+    process_data: Optional[Mapping[str, Any]],
+    outputs: Optional[Mapping[str, Any]],
+) -> None:
+    """
+    Set the inputs, process data and outputs of a node execution.
+
+    The payloads larger than WORKFLOW_NODE_PAYLOAD_OFFLOAD_THRESHOLD are saved gzipped to the storage, keyed by
+    their hash within their app, and their columns hold a preview with the strings truncated, which is what is
+    streamed to clients.
+    """
+    threshold = dify_config.WORKFLOW_NODE_PAYLOAD_OFFLOAD_THRESHOLD
+    offloaded_payloads = {}
+    for field, value in zip(NODE_PAYLOAD_FIELDS, (inputs, process_data, outputs)):
+        serialized = json.dumps(value) if value else None
+        if serialized and threshold and len(serialized) > threshold:
+            offloaded_payloads[field] = save_node_payload(
+                workflow_node_execution.tenant_id, workflow_node_execution.app_id, serialized
+            )
+            serialized = json.dumps(truncate_payload(value, dify_config.WORKFLOW_NODE_PAYLOAD_PREVIEW_LENGTH))
+        setattr(workflow_node_execution, field, serialized)
+
+    workflow_node_execution.offloaded_payloads = json.dumps(offloaded_payloads) if offloaded_payloads else None
+
+
+def save_node_payload(tenant_id: str, app_id: str, serialized: str) -> str:
+    """
+    Save a serialized payload to the storage, unless a payload with the same content was saved before for the app,
+    so that the payloads of an app are deleted with it
+
+    :return: storage key of the payload
+    """
+    data = serialized.encode("utf-8")
+    storage_key = f"workflow_node_payloads/{tenant_id}/{app_id}/{hashlib.sha256(data).hexdigest()}.json.gz"
+    if not storage.exists(storage_key):
+        storage.save(storage_key, gzip.compress(data))
+    return storage_key
+
+
+def load_node_payload(storage_key: str) -> Any:
+    return json.loads(gzip.decompress(storage.load_once(storage_key)))
+
+
+def delete_node_payloads(offloaded_payloads: Iterable[Optional[str]]) -> int:
+    """
+    Delete the payloads of node executions from the storage, skipping the ones already deleted
+
+    :param offloaded_payloads: offloaded_payloads columns of the executions
+    :return: number of payloads deleted
+    """
+    storage_keys = {storage_key for value in offloaded_payloads if value for storage_key in json.loads(value).values()}
+    deleted_count = 0
+    for storage_key in storage_keys:
+        if storage.exists(storage_key):
+            storage.delete(storage_key)
+            deleted_count += 1
+    return deleted_count
+
+
+def truncate_payload(value: Any, max_length: int) -> Any:
+    """
+    Truncate a payload to about `max_length` characters, keeping its structure and its first items
+    """
+    return _truncate(value, [max_length])
+
+
+def _truncate(value: Any, budget: list[int]) -> Any:
+    if isinstance(value, str):
+        if len(value) <= budget[0]:
+            budget[0] -= len(value)
+            return value
+        truncated = value[: max(budget[0], 0)] + "..."
+        budget[0] = 0
+        return truncated
+
+    if isinstance(value, Mapping):
+        truncated_mapping = {}
+        for key, item in value.items():
+            if budget[0] <= 0:
+                break
+            budget[0] -= len(str(key))
+            truncated_mapping[key] = _truncate(item, budget)
+        return truncated_mapping
+
+    if isinstance(value, list | tuple):
+        truncated_list = []
+        for item in value:
+            if budget[0] <= 0:
+                break
+            truncated_list.append(_truncate(item, budget))
+        return truncated_list
+
+    budget[0] -= SCALAR_PREVIEW_LENGTH
+    return value
@@ -0,0 +1,17 @@
+from core.app.entities.app_invoke_entities import AdvancedChatAppGenerateEntity, EasyUIBasedAppGenerateEntity
+from core.app.features.rate_limiting import RateLimit
+from events.message_event import message_was_created
+
+
+@message_was_created.connect
+def handle(sender, **kwargs):
+    message = sender
+    application_generate_entity = kwargs.get("application_generate_entity")
+
+    if not isinstance(application_generate_entity, EasyUIBasedAppGenerateEntity | AdvancedChatAppGenerateEntity):
+        return
+
+    tokens = (message.message_tokens or 0) + (message.answer_tokens or 0)
+    # the concurrency limit is not used
+    rate_limit = RateLimit.for_app(message.app_id, 0, end_user_id=message.from_end_user_id)
+    rate_limit.consume_llm_tokens(tokens)
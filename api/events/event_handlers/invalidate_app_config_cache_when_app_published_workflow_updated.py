@@ -0,0 +1,8 @@
+from core.app.app_config.app_config_cache import AppConfigCache
+from events.app_event import app_published_workflow_was_updated
+
+
+@app_published_workflow_was_updated.connect
+def handle(sender, **kwargs):
+    app = sender
+    AppConfigCache.invalidate(app.id)
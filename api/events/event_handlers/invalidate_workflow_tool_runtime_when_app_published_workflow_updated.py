@@ -0,0 +1,17 @@
+from core.tools.tool_runtime_cache import ToolRuntimeCache
+from events.app_event import app_published_workflow_was_updated
+from extensions.ext_database import db
+from models.tools import WorkflowToolProvider
+
+
+@app_published_workflow_was_updated.connect
+def handle(sender, **kwargs):
+    app = sender
+    # workflow tool parameters are read from the published workflow
+    workflow_tool_provider = (
+        db.session.query(WorkflowToolProvider)
+        .filter(WorkflowToolProvider.tenant_id == app.tenant_id, WorkflowToolProvider.app_id == app.id)
+        .first()
+    )
+    if workflow_tool_provider is not None:
+        ToolRuntimeCache.invalidate(app.tenant_id, "workflow", workflow_tool_provider.id)
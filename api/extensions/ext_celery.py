@@ -51,11 +51,20 @@ def init_app(app: Flask) -> Celery:
     app.extensions["celery"] = celery_app
 
     imports = [
+        "schedule.archive_app_data_task",
         "schedule.clean_embedding_cache_task",
         "schedule.clean_unused_datasets_task",
+        "schedule.generate_app_statistic_rollups_task",
+        "schedule.reconcile_billing_entitlements_task",
+        "schedule.resume_dataset_vector_rebuild_task",
+        "schedule.update_api_token_last_used_task",
     ]
     day = app.config.get("CELERY_BEAT_SCHEDULER_TIME")
     beat_schedule = {
+        "archive_app_data_task": {
+            "task": "schedule.archive_app_data_task.archive_app_data_task",
+            "schedule": timedelta(days=day),
+        },
         "clean_embedding_cache_task": {
             "task": "schedule.clean_embedding_cache_task.clean_embedding_cache_task",
             "schedule": timedelta(days=day),
@@ -64,6 +73,22 @@ def init_app(app: Flask) -> Celery:
             "task": "schedule.clean_unused_datasets_task.clean_unused_datasets_task",
             "schedule": timedelta(days=day),
         },
+        "generate_app_statistic_rollups_task": {
+            "task": "schedule.generate_app_statistic_rollups_task.generate_app_statistic_rollups_task",
+            "schedule": timedelta(hours=1),
+        },
+        "reconcile_billing_entitlements_task": {
+            "task": "schedule.reconcile_billing_entitlements_task.reconcile_billing_entitlements_task",
+            "schedule": timedelta(minutes=app.config.get("BILLING_ENTITLEMENT_RECONCILE_INTERVAL")),
+        },
+        "resume_dataset_vector_rebuild_task": {
+            "task": "schedule.resume_dataset_vector_rebuild_task.resume_dataset_vector_rebuild_task",
+            "schedule": timedelta(minutes=app.config.get("DATASET_VECTOR_REBUILD_STALE_MINUTES")),
+        },
+        "update_api_token_last_used_task": {
+            "task": "schedule.update_api_token_last_used_task.update_api_token_last_used_task",
+            "schedule": timedelta(seconds=app.config.get("API_TOKEN_LAST_USED_UPDATE_INTERVAL")),
+        },
     }
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
 
@@ -1,6 +1,6 @@
 import logging
 from collections.abc import Generator
-from typing import Union
+from typing import IO, Union
 
 from flask import Flask
 
@@ -47,6 +47,13 @@ class Storage:
             logging.exception("Failed to save file: %s", e)
             raise e
 
+    def save_stream(self, filename: str, stream: IO[bytes]):
+        try:
+            self.storage_runner.save_stream(filename, stream)
+        except Exception as e:
+            logging.exception("Failed to save file: %s", e)
+            raise e
+
     def load(self, filename: str, /, *, stream: bool = False) -> Union[bytes, Generator]:
         try:
             if stream:
@@ -2,6 +2,7 @@
 
 from abc import ABC, abstractmethod
 from collections.abc import Generator
+from typing import IO
 
 from flask import Flask
 
@@ -18,6 +19,13 @@ class BaseStorage(ABC):
     def save(self, filename, data):
         raise NotImplementedError
 
+    def save_stream(self, filename: str, stream: IO[bytes]):
+        """
+        Save a file object, read from its current position.
+        Storages that can upload from a stream override this to avoid reading it into memory.
+        """
+        self.save(filename, stream.read())
+
     @abstractmethod
     def load_once(self, filename: str) -> bytes:
         raise NotImplementedError
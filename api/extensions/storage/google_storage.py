@@ -3,6 +3,7 @@ import io
 import json
 from collections.abc import Generator
 from contextlib import closing
+from typing import IO
 
 from flask import Flask
 from google.cloud import storage as google_cloud_storage
@@ -33,6 +34,11 @@ class GoogleStorage(BaseStorage):
         with io.BytesIO(data) as stream:
             blob.upload_from_file(stream)
 
+    def save_stream(self, filename: str, stream: IO[bytes]):
+        bucket = self.client.get_bucket(self.bucket_name)
+        blob = bucket.blob(filename)
+        blob.upload_from_file(stream)
+
     def load_once(self, filename: str) -> bytes:
         bucket = self.client.get_bucket(self.bucket_name)
         blob = bucket.get_blob(filename)
@@ -2,6 +2,7 @@ import os
 import shutil
 from collections.abc import Generator
 from pathlib import Path
+from typing import IO
 
 from flask import Flask
 
@@ -29,6 +30,18 @@ class LocalStorage(BaseStorage):
 
         Path(os.path.join(os.getcwd(), filename)).write_bytes(data)
 
+    def save_stream(self, filename: str, stream: IO[bytes]):
+        if not self.folder or self.folder.endswith("/"):
+            filename = self.folder + filename
+        else:
+            filename = self.folder + "/" + filename
+
+        folder = os.path.dirname(filename)
+        os.makedirs(folder, exist_ok=True)
+
+        with open(os.path.join(os.getcwd(), filename), "wb") as f:
+            shutil.copyfileobj(stream, f)
+
     def load_once(self, filename: str) -> bytes:
         if not self.folder or self.folder.endswith("/"):
             filename = self.folder + filename
@@ -1,5 +1,6 @@
 from collections.abc import Generator
 from contextlib import closing
+from typing import IO
 
 import boto3
 from botocore.client import Config
@@ -45,6 +46,9 @@ class S3Storage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(Bucket=self.bucket_name, Key=filename, Body=data)
 
+    def save_stream(self, filename: str, stream: IO[bytes]):
+        self.client.upload_fileobj(stream, self.bucket_name, filename)
+
     def load_once(self, filename: str) -> bytes:
         try:
             with closing(self.client) as client:
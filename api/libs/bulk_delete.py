@@ -0,0 +1,141 @@
+import json
+import logging
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import ColumnElement, Engine, delete, literal, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from configs import dify_config
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+BULK_DELETE_CHECKPOINT_TTL = 7 * 24 * 60 * 60
+
+
+class BulkDeleteTarget(NamedTuple):
+    """
+    Rows of a table to delete in batches.
+
+    :param name: name of the target in logs and checkpoints, unique within a job
+    :param model: model of the table, with an id primary key
+    :param where: filter of the rows to delete
+    :param keyset: columns ending with a unique one, which an index on the filter columns is ordered by, to page
+        through the rows from a checkpoint. Without them every batch takes the first rows left.
+    :param children: foreign key columns of the rows of other tables deleted with every batch of rows, by their ids
+    """
+
+    name: str
+    model: type[Any]
+    where: ColumnElement[bool]
+    keyset: Optional[Sequence[InstrumentedAttribute]] = None
+    children: Sequence[InstrumentedAttribute] = ()
+
+
+class BulkDeleter:
+    """
+    Delete rows with one `DELETE ... WHERE id IN (...)` per batch of ids and table, instead of one statement and
+    commit per row.
+
+    Every batch is committed on its own, so that the transactions and the WAL they write stay small, and the
+    progress of a target is checkpointed in Redis after every batch, so that a retried job resumes where it stopped
+    rather than scanning the rows it already deleted. Independent targets are deleted in parallel, up to
+    BULK_DELETE_MAX_WORKERS, and every worker sleeps BULK_DELETE_BATCH_INTERVAL_MS between batches to leave room
+    for the online traffic.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        batch_interval_ms: Optional[int] = None,
+    ):
+        self.job_id = job_id
+        self.batch_size = batch_size or dify_config.BULK_DELETE_BATCH_SIZE
+        self.max_workers = max_workers or dify_config.BULK_DELETE_MAX_WORKERS
+        if batch_interval_ms is None:
+            batch_interval_ms = dify_config.BULK_DELETE_BATCH_INTERVAL_MS
+        self.batch_interval = batch_interval_ms / 1000
+        # the engine rather than the scoped session, which is bound to the app context of the calling thread
+        self._engine: Engine = db.engine
+
+    def delete(self, targets: Sequence[BulkDeleteTarget]) -> dict[str, int]:
+        """
+        Delete the rows of the targets, which must not depend on each other
+
+        :return: number of rows deleted per target, without their children
+        """
+        if self.max_workers <= 1 or len(targets) <= 1:
+            return {target.name: self.delete_target(target) for target in targets}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets))) as executor:
+            futures = {target.name: executor.submit(self.delete_target, target) for target in targets}
+            return {name: future.result() for name, future in futures.items()}
+
+    def delete_target(self, target: BulkDeleteTarget) -> int:
+        """
+        Delete the rows of a target, resuming from its checkpoint
+
+        :return: number of rows deleted, including those deleted before the checkpoint
+        """
+        checkpoint_key = self._get_checkpoint_key(target.name)
+        checkpoint = self._load_checkpoint(checkpoint_key)
+        deleted = checkpoint.get("deleted", 0)
+        last_values = checkpoint.get("last_values") if target.keyset else None
+        start_at = time.perf_counter()
+
+        while True:
+            with self._engine.begin() as conn:
+                rows = conn.execute(self._select_batch(target, last_values)).all()
+                if not rows:
+                    break
+
+                ids = [row.id for row in rows]
+                for child_column in target.children:
+                    conn.execute(delete(child_column.class_).where(child_column.in_(ids)))
+                conn.execute(delete(target.model).where(target.model.id.in_(ids)))
+
+            deleted += len(ids)
+            if target.keyset:
+                last_values = [str(value) for value in rows[-1][1:]]
+            self._save_checkpoint(checkpoint_key, {"deleted": deleted, "last_values": last_values})
+            logger.info(f"Bulk delete {self.job_id}: deleted {deleted} {target.name}")
+
+            if len(rows) < self.batch_size:
+                break
+            if self.batch_interval:
+                time.sleep(self.batch_interval)
+
+        redis_client.delete(checkpoint_key)
+        logger.info(
+            f"Bulk delete {self.job_id}: deleted {deleted} {target.name} in {time.perf_counter() - start_at:.2f}s"
+        )
+        return deleted
+
+    def _select_batch(self, target: BulkDeleteTarget, last_values: Optional[Sequence[str]]):
+        if not target.keyset:
+            return select(target.model.id).where(target.where).limit(self.batch_size)
+
+        stmt = select(target.model.id, *target.keyset).where(target.where)
+        if last_values:
+            # checkpointed values are strings, bound as the types of their columns
+            values = [literal(value, type_=column.type) for column, value in zip(target.keyset, last_values)]
+            stmt = stmt.where(tuple_(*target.keyset) > tuple_(*values))
+        return stmt.order_by(*target.keyset).limit(self.batch_size)
+
+    def _get_checkpoint_key(self, name: str) -> str:
+        return f"bulk_delete_checkpoint:{self.job_id}:{name}"
+
+    @staticmethod
+    def _load_checkpoint(key: str) -> dict[str, Any]:
+        checkpoint = redis_client.get(key)
+        return json.loads(checkpoint) if checkpoint else {}
+
+    @staticmethod
+    def _save_checkpoint(key: str, checkpoint: Mapping[str, Any]) -> None:
+        redis_client.setex(key, BULK_DELETE_CHECKPOINT_TTL, json.dumps(checkpoint))
@@ -259,3 +259,26 @@ class InvitationCode(db.Model):
     used_by_account_id = db.Column(StringUUID)
     deprecated_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+
+
+class TenantBillingEntitlement(db.Model):
+    __tablename__ = "tenant_billing_entitlements"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="tenant_billing_entitlement_pkey"),
+        db.UniqueConstraint("tenant_id", name="unique_tenant_billing_entitlement_tenant"),
+    )
+
+    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    tenant_id = db.Column(StringUUID, nullable=False)
+    entitlements = db.Column(db.Text, nullable=False)
+    synced_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+
+    @property
+    def entitlements_dict(self) -> dict:
+        return json.loads(self.entitlements) if self.entitlements else {}
+
+    @entitlements_dict.setter
+    def entitlements_dict(self, value: dict):
+        self.entitlements = json.dumps(value)
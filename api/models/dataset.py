@@ -704,6 +704,62 @@ class DatasetCollectionBinding(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
 
 
+class DatasetVectorMigration(db.Model):
+    """
+    Progress of the migration of the vectors of a dataset to a vector store, by the vdb-migrate command
+    """
+
+    __tablename__ = "dataset_vector_migrations"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="dataset_vector_migration_pkey"),
+        db.UniqueConstraint("dataset_id", "vector_type", name="unique_dataset_vector_migration"),
+    )
+
+    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    # vector store migrated to
+    vector_type = db.Column(db.String(40), nullable=False)
+    # migrating, completed
+    status = db.Column(db.String(40), nullable=False, server_default=db.text("'migrating'::character varying"))
+    # id of the last segment migrated, segments are migrated in the order of their ids
+    last_segment_id = db.Column(StringUUID, nullable=True)
+    segment_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+
+
+class DatasetVectorRebuild(db.Model):
+    """
+    Rebuild of the vector index of a dataset for a new embedding model, into a shadow collection which replaces
+    the index of the dataset once it is complete
+    """
+
+    __tablename__ = "dataset_vector_rebuilds"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="dataset_vector_rebuild_pkey"),
+        db.UniqueConstraint("dataset_id", name="unique_dataset_vector_rebuild"),
+    )
+
+    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    # embedding model of the dataset once rebuilt
+    embedding_model_provider = db.Column(db.String(255), nullable=False)
+    embedding_model = db.Column(db.String(255), nullable=False)
+    collection_binding_id = db.Column(StringUUID, nullable=True)
+    # index struct of the shadow collection
+    index_struct = db.Column(db.Text, nullable=False)
+    # rebuilding, completed, failed, cancelled
+    status = db.Column(db.String(40), nullable=False, server_default=db.text("'rebuilding'::character varying"))
+    # id of the last segment rebuilt, segments are rebuilt in the order of their ids
+    last_segment_id = db.Column(StringUUID, nullable=True)
+    segment_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    # times the rebuild was resumed after its worker died
+    attempt_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+
+
 class DatasetPermission(db.Model):
     __tablename__ = "dataset_permissions"
     __table_args__ = (
@@ -1,7 +1,9 @@
+import functools
+import hashlib
 import json
 import re
 import uuid
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
@@ -10,7 +12,7 @@ from flask import request
 from flask_login import UserMixin
 from pydantic import BaseModel, Field
 from sqlalchemy import Float, func, text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, validates
 
 from configs import dify_config
 from core.file import FILE_MODEL_IDENTITY, File
@@ -18,6 +20,7 @@ from core.file import helpers as file_helpers
 from core.file.tool_file_parser import ToolFileParser
 from enums import FileTransferMethod, FileType
 from extensions.ext_database import db
+
 # from libs.helper import generate_string
 from libs.utils import generate_string
 
@@ -33,6 +36,31 @@ class FileUploadConfig(BaseModel):
     number_limits: int = Field(default=0, gt=0, le=6)
 
 
+def prefetchable_property(func: Callable[[Any], Any]) -> property:
+    """
+    Property whose value can be attached in advance by a data loader, so list views can
+    resolve it for a whole page in one query instead of one query per row.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        prefetched = self.__dict__.get("_prefetched_properties")
+        if prefetched is not None and name in prefetched:
+            return prefetched[name]
+
+        return func(self)
+
+    return property(wrapper)
+
+
+def set_prefetched_property(instance: Any, name: str, value: Any) -> None:
+    """
+    Attach a prefetched value for a property declared with `prefetchable_property`.
+    """
+    instance.__dict__.setdefault("_prefetched_properties", {})[name] = value
+
+
 class DifySetup(db.Model):
     __tablename__ = "dify_setups"
     __table_args__ = (db.PrimaryKeyConstraint("version", name="dify_setup_pkey"),)
@@ -109,19 +137,19 @@ class App(db.Model):
             else:
                 return ""
 
-    @property
+    @prefetchable_property
     def site(self):
         site = db.session.query(Site).filter(Site.app_id == self.id).first()
         return site
 
-    @property
+    @prefetchable_property
     def app_model_config(self) -> Optional["AppModelConfig"]:
         if self.app_model_config_id:
             return db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
 
         return None
 
-    @property
+    @prefetchable_property
     def workflow(self) -> Optional["Workflow"]:
         if self.workflow_id:
             from .workflow import Workflow
@@ -134,7 +162,7 @@ class App(db.Model):
     def api_base_url(self):
         return (dify_config.SERVICE_API_URL or request.host_url.rstrip("/")) + "/v1"
 
-    @property
+    @prefetchable_property
     def tenant(self):
         tenant = db.session.query(Tenant).filter(Tenant.id == self.tenant_id).first()
         return tenant
@@ -207,7 +235,7 @@ class App(db.Model):
 
         return deleted_tools
 
-    @property
+    @prefetchable_property
     def tags(self):
         tags = (
             db.session.query(Tag)
@@ -290,7 +318,7 @@ class AppModelConfig(db.Model):
     def retriever_resource_dict(self) -> dict:
         return json.loads(self.retriever_resource) if self.retriever_resource else {"enabled": True}
 
-    @property
+    @prefetchable_property
     def annotation_reply_dict(self) -> dict:
         annotation_setting = (
             db.session.query(AppAnnotationSetting).filter(AppAnnotationSetting.app_id == self.app_id).first()
@@ -606,17 +634,20 @@ class Conversation(db.Model):
                 else:
                     model_config["configs"] = override_model_configs
             else:
-                app_model_config = (
-                    db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
-                )
-
-                model_config = app_model_config.to_dict()
+                model_config = self.app_model_config.to_dict()
 
         model_config["model_id"] = self.model_id
         model_config["provider"] = self.model_provider
 
         return model_config
 
+    @prefetchable_property
+    def app_model_config(self) -> Optional["AppModelConfig"]:
+        if self.app_model_config_id:
+            return db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
+
+        return None
+
     @property
     def summary_or_query(self):
         if self.summary:
@@ -628,19 +659,19 @@ class Conversation(db.Model):
             else:
                 return ""
 
-    @property
+    @prefetchable_property
     def annotated(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).count() > 0
 
-    @property
+    @prefetchable_property
     def annotation(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).first()
 
-    @property
+    @prefetchable_property
     def message_count(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).count()
 
-    @property
+    @prefetchable_property
     def user_feedback_stats(self):
         like = (
             db.session.query(MessageFeedback)
@@ -664,7 +695,7 @@ class Conversation(db.Model):
 
         return {"like": like, "dislike": dislike}
 
-    @property
+    @prefetchable_property
     def admin_feedback_stats(self):
         like = (
             db.session.query(MessageFeedback)
@@ -688,7 +719,7 @@ class Conversation(db.Model):
 
         return {"like": like, "dislike": dislike}
 
-    @property
+    @prefetchable_property
     def first_message(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).first()
 
@@ -696,7 +727,7 @@ class Conversation(db.Model):
     def app(self):
         return db.session.query(App).filter(App.id == self.app_id).first()
 
-    @property
+    @prefetchable_property
     def from_end_user_session_id(self):
         if self.from_end_user_id:
             end_user = db.session.query(EndUser).filter(EndUser.id == self.from_end_user_id).first()
@@ -705,7 +736,7 @@ class Conversation(db.Model):
 
         return None
 
-    @property
+    @prefetchable_property
     def from_account_name(self):
         if self.from_account_id:
             account = db.session.query(Account).filter(Account.id == self.from_account_id).first()
@@ -910,6 +941,11 @@ class Message(db.Model):
 
     @property
     def agent_thoughts(self):
+        # archived messages are read back with their agent thoughts, which are no longer in the database
+        archived_agent_thoughts = getattr(self, "archived_agent_thoughts", None)
+        if archived_agent_thoughts is not None:
+            return archived_agent_thoughts
+
         return (
             db.session.query(MessageAgentThought)
             .filter(MessageAgentThought.message_id == self.id)
@@ -1076,6 +1112,7 @@ class MessageAnnotation(db.Model):
         db.Index("message_annotation_app_idx", "app_id"),
         db.Index("message_annotation_conversation_idx", "conversation_id"),
         db.Index("message_annotation_message_idx", "message_id"),
+        db.Index("message_annotation_question_hash_idx", "app_id", "question_hash"),
     )
 
     id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
@@ -1083,13 +1120,15 @@ class MessageAnnotation(db.Model):
     conversation_id = db.Column(StringUUID, db.ForeignKey("conversations.id"), nullable=True)
     message_id = db.Column(StringUUID, nullable=True)
     question = db.Column(db.Text, nullable=True)
+    # hash of the normalized question, for exact matches of queries
+    question_hash = db.Column(db.String(64), nullable=True)
     content = db.Column(db.Text, nullable=False)
     hit_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
     account_id = db.Column(StringUUID, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
     updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
 
-    @property
+    @prefetchable_property
     def account(self):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
@@ -1099,6 +1138,27 @@ class MessageAnnotation(db.Model):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
 
+    @validates("question")
+    def _set_question_hash(self, key, question):
+        self.question_hash = self.generate_question_hash(question)
+        return question
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """
+        Normalize a question for exact matches: collapse whitespace, drop trailing punctuation and lowercase.
+        Keep in sync with the backfill of the add_annotation_question_hash migration.
+        """
+        question = re.sub(r"\s+", " ", question.strip())
+        return re.sub(r"[\s?!.。？！]+$", "", question).lower()
+
+    @classmethod
+    def generate_question_hash(cls, question: Optional[str]) -> Optional[str]:
+        normalized_question = cls.normalize_question(question or "")
+        if not normalized_question:
+            return None
+        return hashlib.sha256(normalized_question.encode("utf-8")).hexdigest()
+
 
 class AppAnnotationHitHistory(db.Model):
     __tablename__ = "app_annotation_hit_histories"
@@ -1596,3 +1656,46 @@ class TraceAppConfig(db.Model):
             "created_at": str(self.created_at) if self.created_at else None,
             "updated_at": str(self.updated_at) if self.updated_at else None,
         }
+
+
+class AppStatisticRollup(db.Model):
+    __tablename__ = "app_statistic_rollups"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="app_statistic_rollup_pkey"),
+        db.UniqueConstraint("app_id", "statistic", "timezone", "date", name="unique_app_statistic_rollup"),
+    )
+
+    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    app_id = db.Column(StringUUID, nullable=False)
+    statistic = db.Column(db.String(255), nullable=False)
+    timezone = db.Column(db.String(255), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    # the day's statistic row as returned by the statistic endpoint, null when the day has no data
+    data = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
+
+    @property
+    def data_dict(self) -> Optional[dict]:
+        return json.loads(self.data) if self.data else None
+
+
+class AppDataArchive(db.Model):
+    """
+    A month of the rows of a table of an app, moved out of the database to a Parquet file in the storage
+    """
+
+    __tablename__ = "app_data_archives"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="app_data_archive_pkey"),
+        db.UniqueConstraint("app_id", "table_name", "period", name="unique_app_data_archive"),
+    )
+
+    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    app_id = db.Column(StringUUID, nullable=False)
+    table_name = db.Column(db.String(255), nullable=False)
+    # first day of the month of the created_at of the archived rows
+    period = db.Column(db.Date, nullable=False)
+    storage_key = db.Column(db.String(255), nullable=False)
+    row_count = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
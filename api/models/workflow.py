@@ -1,4 +1,5 @@
 import json
+import logging
 from collections.abc import Mapping, Sequence
 from datetime import datetime
 from enum import Enum
@@ -399,6 +400,7 @@ class WorkflowRun(db.Model):
         db.PrimaryKeyConstraint("id", name="workflow_run_pkey"),
         db.Index("workflow_run_triggerd_from_idx", "tenant_id", "app_id", "triggered_from"),
         db.Index("workflow_run_tenant_app_sequence_idx", "tenant_id", "app_id", "sequence_number"),
+        db.Index("workflow_run_app_created_at_idx", "app_id", "created_at"),
     )
 
     id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
@@ -623,6 +625,7 @@ class WorkflowNodeExecution(db.Model):
             "triggered_from",
             "node_execution_id",
         ),
+        db.Index("workflow_node_execution_workflow_run_id_idx", "workflow_run_id"),
     )
 
     id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
@@ -648,6 +651,8 @@ class WorkflowNodeExecution(db.Model):
     created_by_role = db.Column(db.String(255), nullable=False)
     created_by = db.Column(StringUUID, nullable=False)
     finished_at = db.Column(db.DateTime)
+    # storage keys of the payloads too large to be stored inline, by column, the columns hold their previews
+    offloaded_payloads = db.Column(db.Text, nullable=True)
 
     @property
     def created_by_account(self):
@@ -663,15 +668,39 @@ class WorkflowNodeExecution(db.Model):
 
     @property
     def inputs_dict(self):
-        return json.loads(self.inputs) if self.inputs else None
+        return self._load_payload("inputs")
 
     @property
     def outputs_dict(self):
-        return json.loads(self.outputs) if self.outputs else None
+        return self._load_payload("outputs")
 
     @property
     def process_data_dict(self):
-        return json.loads(self.process_data) if self.process_data else None
+        return self._load_payload("process_data")
+
+    @property
+    def offloaded_payloads_dict(self) -> dict[str, str]:
+        return json.loads(self.offloaded_payloads) if self.offloaded_payloads else {}
+
+    def get_payload_preview(self, field: str) -> Optional[dict]:
+        """
+        Get the inputs, process data or outputs as stored in the row, truncated when they were offloaded
+        """
+        value = getattr(self, field)
+        return json.loads(value) if value else None
+
+    def _load_payload(self, field: str) -> Optional[dict]:
+        storage_key = self.offloaded_payloads_dict.get(field)
+        if not storage_key:
+            return self.get_payload_preview(field)
+
+        from core.workflow.utils.node_payload_storage import load_node_payload
+
+        try:
+            return load_node_payload(storage_key)
+        except Exception:
+            logging.exception(f"Failed to load the {field} of workflow node execution {self.id}")
+            return self.get_payload_preview(field)
 
     @property
     def execution_metadata_dict(self):
@@ -0,0 +1,43 @@
+import datetime
+import logging
+import time
+
+import click
+
+import app
+from configs import dify_config
+from extensions.ext_database import db
+from models.model import App
+from services.app_data_archive_service import AppDataArchiveService
+
+
+@app.celery.task(queue="dataset")
+def archive_app_data_task():
+    """
+    Archive the messages and workflow runs of the months past APP_DATA_ARCHIVE_RETENTION_DAYS to the storage.
+    Only whole months are archived, a month is kept until all of its days are past the retention.
+    """
+    retention_days = dify_config.APP_DATA_ARCHIVE_RETENTION_DAYS
+    if not retention_days:
+        return
+
+    click.echo(click.style("Start archive app data.", fg="green"))
+    start_at = time.perf_counter()
+    retained_since = datetime.datetime.now(datetime.UTC).replace(tzinfo=None) - datetime.timedelta(days=retention_days)
+    before = retained_since.date().replace(day=1)
+
+    row_count = 0
+    app_ids = [app_id for (app_id,) in db.session.query(App.id).all()]
+    for app_id in app_ids:
+        try:
+            row_count += AppDataArchiveService.archive_app(app_id, before)
+        except Exception:
+            db.session.rollback()
+            logging.exception("Archive data of app %s failed", app_id)
+
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(
+            "Archived {} messages and workflow runs latency: {}".format(row_count, end_at - start_at), fg="green"
+        )
+    )
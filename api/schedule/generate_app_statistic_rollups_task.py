@@ -0,0 +1,59 @@
+import datetime
+import logging
+import time
+
+import click
+import pytz
+
+import app
+from extensions.ext_database import db
+from models.account import Account, TenantAccountJoin
+from models.model import App
+from services.app_statistic_service import AppStatisticService
+
+
+@app.celery.task(queue="dataset")
+def generate_app_statistic_rollups_task():
+    """
+    Roll up the statistics of the day that just ended, for every timezone used by the members of a workspace.
+    Runs hourly so each timezone is handled in the hour after its local midnight, and rebuilds the days before
+    it within APP_STATISTIC_ROLLUP_REBUILD_DAYS, so that late feedback and messages are counted.
+    """
+    click.echo(click.style("Start generate app statistic rollups.", fg="green"))
+    start_at = time.perf_counter()
+    now = datetime.datetime.now(pytz.utc)
+
+    tenant_timezones = (
+        db.session.query(TenantAccountJoin.tenant_id, Account.timezone)
+        .join(Account, Account.id == TenantAccountJoin.account_id)
+        .filter(Account.timezone.isnot(None))
+        .distinct()
+        .all()
+    )
+
+    rollup_count = 0
+    for tenant_id, timezone in tenant_timezones:
+        try:
+            local_now = now.astimezone(pytz.timezone(timezone))
+        except pytz.UnknownTimeZoneError:
+            continue
+        if local_now.hour != 0:
+            continue
+
+        day = local_now.date() - datetime.timedelta(days=1)
+        apps = db.session.query(App).filter(App.tenant_id == tenant_id, App.status == "normal").all()
+        for app_model in apps:
+            try:
+                AppStatisticService.rebuild_rollups(app_model, timezone, day)
+                rollup_count += 1
+            except Exception:
+                db.session.rollback()
+                logging.exception("Generate statistic rollups of app %s failed", app_model.id)
+
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(
+            "Generated statistic rollups of {} apps latency: {}".format(rollup_count, end_at - start_at),
+            fg="green",
+        )
+    )
@@ -0,0 +1,45 @@
+import datetime
+import time
+
+import click
+
+import app
+from configs import dify_config
+from extensions.ext_database import db
+from models.account import Tenant, TenantBillingEntitlement
+from tasks.refresh_billing_entitlement_task import refresh_billing_entitlement_task
+
+
+@app.celery.task(queue="billing")
+def reconcile_billing_entitlements_task():
+    """
+    Re-sync billing entitlement snapshots that are missing or older than the reconcile interval,
+    so that entitlements converge with Stripe even when a webhook is lost.
+    """
+    if not dify_config.BILLING_ENABLED:
+        return
+
+    click.echo(click.style("Start reconcile billing entitlements.", fg="green"))
+    start_at = time.perf_counter()
+    stale_before = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(
+        minutes=dify_config.BILLING_ENTITLEMENT_RECONCILE_INTERVAL
+    )
+    tenant_ids = (
+        db.session.query(Tenant.id)
+        .outerjoin(TenantBillingEntitlement, TenantBillingEntitlement.tenant_id == Tenant.id)
+        .filter(
+            Tenant.status == "normal",
+            db.or_(TenantBillingEntitlement.id.is_(None), TenantBillingEntitlement.synced_at < stale_before),
+        )
+        .all()
+    )
+    for (tenant_id,) in tenant_ids:
+        refresh_billing_entitlement_task.delay(tenant_id)
+
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(
+            "Scheduled {} billing entitlement refreshes latency: {}".format(len(tenant_ids), end_at - start_at),
+            fg="green",
+        )
+    )
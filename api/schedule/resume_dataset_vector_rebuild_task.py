@@ -0,0 +1,19 @@
+import click
+
+import app
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
+from tasks.deal_dataset_vector_index_task import deal_dataset_vector_index_task
+
+
+@app.celery.task(queue="dataset")
+def resume_dataset_vector_rebuild_task():
+    """
+    Resume the vector index rebuilds whose worker died, from their last checkpoint, up to
+    DATASET_VECTOR_REBUILD_MAX_ATTEMPTS times
+    """
+    dataset_ids = DatasetVectorRebuildService.claim_stale_dataset_ids()
+    for dataset_id in dataset_ids:
+        deal_dataset_vector_index_task.delay(dataset_id, "update")
+
+    if dataset_ids:
+        click.echo(click.style("Resumed {} dataset vector index rebuilds.".format(len(dataset_ids)), fg="green"))
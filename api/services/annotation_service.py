@@ -7,6 +7,7 @@ from sqlalchemy import or_
 from werkzeug.datastructures import FileStorage
 from werkzeug.exceptions import NotFound
 
+from core.app.app_config.app_config_cache import AppConfigCache
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from models.model import App, AppAnnotationHitHistory, AppAnnotationSetting, Message, MessageAnnotation
@@ -345,6 +346,27 @@ class AppAnnotationService:
             return None
         return annotation
 
+    @classmethod
+    def get_annotation_by_question(cls, app_id: str, question: str) -> MessageAnnotation | None:
+        """
+        Get the annotation of an app whose question matches the given one after normalization
+        """
+        question_hash = MessageAnnotation.generate_question_hash(question)
+        if not question_hash:
+            return None
+
+        annotation = (
+            db.session.query(MessageAnnotation)
+            .filter(MessageAnnotation.app_id == app_id, MessageAnnotation.question_hash == question_hash)
+            .first()
+        )
+        # guard against the hashes of questions that were normalized by the database
+        if not annotation or MessageAnnotation.normalize_question(
+            annotation.question
+        ) != MessageAnnotation.normalize_question(question):
+            return None
+        return annotation
+
     @classmethod
     def add_annotation_history(
         cls,
@@ -432,6 +454,8 @@ class AppAnnotationService:
         annotation_setting.updated_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
         db.session.add(annotation_setting)
         db.session.commit()
+        # the annotation reply setting is part of the app model config dict
+        AppConfigCache.invalidate(app_id)
 
         collection_binding_detail = annotation_setting.collection_binding_detail
 
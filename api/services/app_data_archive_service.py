@@ -0,0 +1,432 @@
+import io
+import json
+import logging
+import tempfile
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from threading import Lock
+from typing import IO, Any, NamedTuple, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Integer, Numeric, func, inspect, select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from core.helper.lru_cache import LRUCache
+from core.workflow.utils.node_payload_storage import delete_node_payloads
+from extensions.ext_database import db
+from extensions.ext_storage import storage
+from libs.bulk_delete import BulkDeleter, BulkDeleteTarget
+from models.model import AppDataArchive, Conversation, Message, MessageAgentThought
+from models.workflow import WorkflowNodeExecution, WorkflowRun
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_TABLE_CACHE_CAPACITY = 8
+
+
+class ArchivedTable(NamedTuple):
+    model: type[Any]
+    child_model: type[Any]
+    child_foreign_key: InstrumentedAttribute
+
+
+# the rows of a child table are archived with their parents, in the file of the month of their parent
+ARCHIVED_TABLES = {
+    "workflow_runs": ArchivedTable(WorkflowRun, WorkflowNodeExecution, WorkflowNodeExecution.workflow_run_id),
+    "messages": ArchivedTable(Message, MessageAgentThought, MessageAgentThought.message_id),
+}
+
+ARCHIVED_MODELS = {
+    model.__tablename__: model
+    for archived_table in ARCHIVED_TABLES.values()
+    for model in (archived_table.model, archived_table.child_model)
+}
+
+
+class AppDataArchiveService:
+    """
+    Move the messages and workflow runs of the months past the retention of an app to Parquet files in the
+    storage, and read them back when they are requested by id or paged through.
+
+    A month is archived once its rows are written, then deleted from the database. Archived rows are read
+    back as transient models, which are not attached to the session, so archived messages are read back with
+    their archived agent thoughts.
+    """
+
+    _tables = LRUCache(ARCHIVE_TABLE_CACHE_CAPACITY)
+    _tables_lock = Lock()
+
+    @classmethod
+    def archive_app(cls, app_id: str, before: date) -> int:
+        """
+        Archive the months of an app before a month
+
+        :param before: first day of the first month that is kept
+        :return: number of rows archived, without the rows of the child tables
+        """
+        row_count = 0
+        for table_name, archived_table in ARCHIVED_TABLES.items():
+            model = archived_table.model
+            oldest_created_at = db.session.query(func.min(model.created_at)).filter(model.app_id == app_id).scalar()
+            # end the read transaction, which would keep vacuum from reclaiming the archived rows
+            db.session.commit()
+            if not oldest_created_at:
+                continue
+
+            period = oldest_created_at.date().replace(day=1)
+            while period < before:
+                row_count += cls.archive_month(app_id, table_name, period)
+                period = _get_next_month(period)
+
+        return row_count
+
+    @classmethod
+    def archive_month(cls, app_id: str, table_name: str, period: date) -> int:
+        """
+        Archive the rows of a month of an app, and the rows of the child table that belong to them
+
+        :param table_name: name of a table of ARCHIVED_TABLES
+        :param period: first day of the month
+        :return: number of rows archived, without the rows of the child table
+        """
+        archived_table = ARCHIVED_TABLES[table_name]
+        model = archived_table.model
+        where = (model.app_id == app_id) & (model.created_at >= period) & (model.created_at < _get_next_month(period))
+
+        archive = (
+            db.session.query(AppDataArchive)
+            .filter(
+                AppDataArchive.app_id == app_id,
+                AppDataArchive.table_name == table_name,
+                AppDataArchive.period == period,
+            )
+            .first()
+        )
+        if archive:
+            # a previous run archived the month but failed to delete its rows
+            row_count = archive.row_count
+        else:
+            row_count = cls._write_archive(app_id, archived_table, period, where)
+            if not row_count:
+                return 0
+
+        # delete after the archive is recorded, so that a failed deletion is resumed rather than archived again
+        BulkDeleter(job_id=f"archive:{app_id}:{table_name}:{period.isoformat()}").delete_target(
+            BulkDeleteTarget(
+                table_name,
+                model,
+                where,
+                keyset=(model.created_at, model.id),
+                children=(archived_table.child_foreign_key,),
+            )
+        )
+        logger.info(f"Archived {row_count} {table_name} of app {app_id} in {period:%Y-%m}")
+        return row_count
+
+    @classmethod
+    def delete_app_archives(cls, app_id: str) -> int:
+        """
+        Delete the archived months of a deleted app, with the payloads of their node executions, files first, so
+        that a failed deletion is resumed
+
+        :return: number of archives deleted
+        """
+        archives = db.session.query(AppDataArchive).filter(AppDataArchive.app_id == app_id).all()
+        for archive in archives:
+            if storage.exists(archive.storage_key):
+                if archive.table_name == WorkflowNodeExecution.__tablename__:
+                    table = pq.read_table(io.BytesIO(storage.load_once(archive.storage_key)))
+                    if "offloaded_payloads" in table.column_names:
+                        delete_node_payloads(table["offloaded_payloads"].to_pylist())
+                storage.delete(archive.storage_key)
+            db.session.delete(archive)
+            db.session.commit()
+
+        if archives:
+            logger.info(f"Deleted {len(archives)} archives of app {app_id}")
+        return len(archives)
+
+    @classmethod
+    def get_workflow_run(cls, app_id: str, run_id: str) -> Optional[WorkflowRun]:
+        workflow_runs = cls._search(app_id, "workflow_runs", {"id": run_id}, limit=1)
+        return workflow_runs[0] if workflow_runs else None
+
+    @classmethod
+    def get_workflow_runs(
+        cls, app_id: str, triggered_from: str, before: Optional[datetime], limit: int
+    ) -> list[WorkflowRun]:
+        """
+        Get the archived workflow runs of an app created before a time, newest first
+        """
+        return cls._search(app_id, "workflow_runs", {"triggered_from": triggered_from}, before=before, limit=limit)
+
+    @classmethod
+    def get_workflow_node_executions(cls, app_id: str, workflow_run: WorkflowRun) -> list[WorkflowNodeExecution]:
+        return cls._search(
+            app_id,
+            "workflow_node_executions",
+            {"workflow_run_id": workflow_run.id},
+            period=workflow_run.created_at.date().replace(day=1),
+            sort_keys=[("index", "descending")],
+        )
+
+    @classmethod
+    def get_message(cls, app_id: str, conversation: Conversation, message_id: str) -> Optional[Message]:
+        messages = cls._search(
+            app_id,
+            "messages",
+            {"conversation_id": conversation.id, "id": message_id},
+            after=conversation.created_at,
+            limit=1,
+        )
+        cls._attach_agent_thoughts(app_id, messages)
+        return messages[0] if messages else None
+
+    @classmethod
+    def get_messages(
+        cls, app_id: str, conversation: Conversation, before: Optional[datetime], limit: int
+    ) -> list[Message]:
+        """
+        Get the archived messages of a conversation created before a time, newest first
+        """
+        messages = cls._search(
+            app_id,
+            "messages",
+            {"conversation_id": conversation.id},
+            before=before,
+            after=conversation.created_at,
+            limit=limit,
+        )
+        cls._attach_agent_thoughts(app_id, messages)
+        return messages
+
+    @classmethod
+    def _attach_agent_thoughts(cls, app_id: str, messages: Sequence[Message]) -> None:
+        """
+        Attach the agent thoughts of archived messages, archived in the month of their message
+        """
+        messages_by_period: dict[date, list[Message]] = defaultdict(list)
+        for message in messages:
+            messages_by_period[message.created_at.date().replace(day=1)].append(message)
+
+        for period, period_messages in messages_by_period.items():
+            agent_thoughts_by_message_id: dict[str, list[MessageAgentThought]] = defaultdict(list)
+            for agent_thought in cls._search(
+                app_id,
+                "message_agent_thoughts",
+                {"message_id": [message.id for message in period_messages]},
+                period=period,
+                sort_keys=[("position", "ascending")],
+            ):
+                agent_thoughts_by_message_id[agent_thought.message_id].append(agent_thought)
+
+            for message in period_messages:
+                message.archived_agent_thoughts = agent_thoughts_by_message_id.get(message.id, [])
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._tables_lock:
+            cls._tables = LRUCache(ARCHIVE_TABLE_CACHE_CAPACITY)
+
+    @classmethod
+    def _write_archive(cls, app_id: str, archived_table: ArchivedTable, period: date, where) -> int:
+        model, child_model = archived_table.model, archived_table.child_model
+        storage_key = cls._get_storage_key(app_id, model.__tablename__, period)
+        child_storage_key = cls._get_storage_key(app_id, child_model.__tablename__, period)
+
+        row_count = child_row_count = 0
+        with (
+            tempfile.TemporaryFile() as file,
+            tempfile.TemporaryFile() as child_file,
+            db.engine.connect() as conn,
+            db.engine.connect() as child_conn,
+        ):
+            writer = pq.ParquetWriter(file, _get_arrow_schema(model), compression="zstd")
+            child_writer = pq.ParquetWriter(child_file, _get_arrow_schema(child_model), compression="zstd")
+            # stream the rows of the month rather than loading them
+            result = conn.execution_options(yield_per=ARCHIVE_BATCH_SIZE).execute(
+                select(model.__table__).where(where).order_by(model.created_at, model.id)
+            )
+            for rows in result.mappings().partitions():
+                _write_rows(writer, model, rows)
+                child_rows = (
+                    child_conn.execute(
+                        select(child_model.__table__).where(
+                            archived_table.child_foreign_key.in_([row["id"] for row in rows])
+                        )
+                    )
+                    .mappings()
+                    .all()
+                )
+                _write_rows(child_writer, child_model, child_rows)
+                row_count += len(rows)
+                child_row_count += len(child_rows)
+            writer.close()
+            child_writer.close()
+
+            if not row_count:
+                return 0
+            _save(storage_key, file)
+            _save(child_storage_key, child_file)
+
+        db.session.add_all(
+            [
+                AppDataArchive(
+                    app_id=app_id,
+                    table_name=model.__tablename__,
+                    period=period,
+                    storage_key=storage_key,
+                    row_count=row_count,
+                ),
+                AppDataArchive(
+                    app_id=app_id,
+                    table_name=child_model.__tablename__,
+                    period=period,
+                    storage_key=child_storage_key,
+                    row_count=child_row_count,
+                ),
+            ]
+        )
+        db.session.commit()
+        return row_count
+
+    @classmethod
+    def _search(
+        cls,
+        app_id: str,
+        table_name: str,
+        filters: Mapping[str, Any],
+        before: Optional[datetime] = None,
+        after: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        period: Optional[date] = None,
+        sort_keys: Sequence[tuple[str, str]] = (("created_at", "descending"),),
+    ) -> list[Any]:
+        """
+        Search the archived rows of an app equal to the filters, or in them for lists, month by month from the newest
+
+        :param after: time no row is created before, such as the creation of their conversation, to skip the months
+            before it, and every month when it is more recent than the last archived one
+        """
+        query = db.session.query(AppDataArchive).filter(
+            AppDataArchive.app_id == app_id, AppDataArchive.table_name == table_name
+        )
+        if period:
+            query = query.filter(AppDataArchive.period == period)
+        if before:
+            query = query.filter(AppDataArchive.period <= before.date())
+        if after:
+            query = query.filter(AppDataArchive.period >= after.date().replace(day=1))
+
+        results: list[Any] = []
+        for archive in query.order_by(AppDataArchive.period.desc()).all():
+            table = cls._load_table(archive.storage_key)
+            conditions = [
+                pc.is_in(table[name], value_set=pa.array(value))
+                if isinstance(value, list)
+                else pc.equal(table[name], value)
+                for name, value in filters.items()
+            ]
+            if before:
+                conditions.append(pc.less(table["created_at"], pa.scalar(before, type=pa.timestamp("us"))))
+            mask = conditions[0]
+            for condition in conditions[1:]:
+                mask = pc.and_(mask, condition)
+
+            matched = table.filter(mask).sort_by(list(sort_keys))
+            if limit is not None:
+                matched = matched.slice(0, limit - len(results))
+            results.extend(_to_models(ARCHIVED_MODELS[table_name], matched.to_pylist()))
+            if limit is not None and len(results) >= limit:
+                break
+
+        return results
+
+    @classmethod
+    def _load_table(cls, storage_key: str) -> pa.Table:
+        # pages of a listing read the same months
+        with cls._tables_lock:
+            table = cls._tables.get(storage_key)
+        if table is None:
+            table = pq.read_table(io.BytesIO(storage.load_once(storage_key)))
+            with cls._tables_lock:
+                cls._tables.put(storage_key, table)
+        return table
+
+    @staticmethod
+    def _get_storage_key(app_id: str, table_name: str, period: date) -> str:
+        return f"archives/{app_id}/{table_name}/{period:%Y-%m}.parquet"
+
+
+def _get_next_month(period: date) -> date:
+    return date(period.year + period.month // 12, period.month % 12 + 1, 1)
+
+
+def _get_columns(model: type[Any]) -> list[tuple[str, Column]]:
+    # attribute keys differ from column names for some models, such as Message._inputs
+    return [(column_attr.key, column_attr.columns[0]) for column_attr in inspect(model).column_attrs]
+
+
+def _get_arrow_schema(model: type[Any]) -> pa.Schema:
+    return pa.schema([pa.field(column.name, _get_arrow_type(column)) for _, column in _get_columns(model)])
+
+
+def _get_arrow_type(column: Column) -> pa.DataType:
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    # decimals are kept exact and JSON as its text
+    return pa.string()
+
+
+def _to_arrow_value(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, JSON):
+        return json.dumps(value)
+    if isinstance(column.type, Numeric) and not isinstance(column.type, Float):
+        return str(value)
+    return value
+
+
+def _from_arrow_value(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, JSON):
+        return json.loads(value)
+    if isinstance(column.type, Numeric) and not isinstance(column.type, Float):
+        return Decimal(value)
+    return value
+
+
+def _write_rows(writer: pq.ParquetWriter, model: type[Any], rows: Sequence[Mapping[str, Any]]) -> None:
+    if not rows:
+        return
+    columns = [column for _, column in _get_columns(model)]
+    writer.write_table(
+        pa.Table.from_pylist(
+            [{column.name: _to_arrow_value(column, row[column.name]) for column in columns} for row in rows],
+            schema=writer.schema,
+        )
+    )
+
+
+def _to_models(model: type[Any], rows: Iterable[Mapping[str, Any]]) -> list[Any]:
+    columns = _get_columns(model)
+    # files archived before a column was added lack it
+    return [model(**{key: _from_arrow_value(column, row.get(column.name)) for key, column in columns}) for row in rows]
+
+
+def _save(storage_key: str, file: IO[bytes]) -> None:
+    file.seek(0)
+    storage.save_stream(storage_key, file)
@@ -37,7 +37,9 @@ class AppGenerateService:
         :return:
         """
         max_active_request = AppGenerateService._get_max_active_requests(app_model)
-        rate_limit = RateLimit(app_model.id, max_active_request)
+        rate_limit = RateLimit.for_app(
+            app_model.id, max_active_request, end_user_id=user.id if isinstance(user, EndUser) else None
+        )
         request_id = RateLimit.gen_request_key()
         try:
             request_id = rate_limit.enter(request_id)
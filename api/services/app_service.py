@@ -9,8 +9,8 @@ from flask_sqlalchemy.pagination import Pagination
 from configs import dify_config
 from constants.model_template import default_app_templates
 from core.agent.entities import AgentToolEntity
-from core.app.features.rate_limiting import RateLimit
 from core.errors.error import LLMBadRequestError, ProviderTokenNotInitError
+from core.helper.api_token_cache import ApiTokenCache
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelPropertyKey, ModelType
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
@@ -19,8 +19,9 @@ from core.tools.utils.configuration import ToolParameterConfigurationManager
 from events.app_event import app_was_created
 from extensions.ext_database import db
 from models.account import Account
-from models.model import App, AppMode, AppModelConfig
+from models.model import ApiToken, App, AppMode, AppModelConfig
 from models.tools import ApiToolProvider
+from services.data_loader_service import AppDataLoader
 from services.tag_service import TagService
 from tasks.remove_app_and_related_data_task import remove_app_and_related_data_task
 
@@ -60,6 +61,7 @@ class AppService:
             per_page=args["limit"],
             error_out=False,
         )
+        AppDataLoader.load(app_models.items)
 
         return app_models
 
@@ -226,9 +228,6 @@ class AppService:
         app.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
         db.session.commit()
 
-        if app.max_active_requests is not None:
-            rate_limit = RateLimit(app.id, app.max_active_requests)
-            rate_limit.flush_cache(use_local_value=True)
         return app
 
     def update_app_name(self, app: App, name: str) -> App:
@@ -293,6 +292,9 @@ class AppService:
         app.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
         db.session.commit()
 
+        if not enable_api:
+            self._delete_api_token_cache(app)
+
         return app
 
     def delete_app(self, app: App) -> None:
@@ -300,12 +302,23 @@ class AppService:
         Delete app
         :param app: App instance
         """
+        self._delete_api_token_cache(app)
         db.session.delete(app)
         db.session.commit()
 
         # Trigger asynchronous deletion of app and related data
         remove_app_and_related_data_task.delay(tenant_id=app.tenant_id, app_id=app.id)
 
+    @staticmethod
+    def _delete_api_token_cache(app: App) -> None:
+        """
+        Drop cached service API tokens of the app
+        :param app: App instance
+        """
+        api_tokens = db.session.query(ApiToken.token, ApiToken.type).filter(ApiToken.app_id == app.id).all()
+        for token, token_type in api_tokens:
+            ApiTokenCache(token, token_type).delete()
+
     def get_app_meta(self, app_model: App) -> dict:
         """
         Get app meta info
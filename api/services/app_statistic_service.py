@@ -0,0 +1,435 @@
+import json
+from collections.abc import Callable
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, NamedTuple, Optional
+
+import pytz
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.postgresql import insert
+
+from configs import dify_config
+from enums import WorkflowRunTriggeredFrom
+from extensions.ext_database import db
+from models.model import App, AppMode, AppStatisticRollup
+
+# days of an app backfilled at most by its first rebuild, older ranges keep being scanned on read
+MAX_BACKFILL_DAYS = 366
+
+
+class DailyStatistic(NamedTuple):
+    # must filter rows on `:start <= created_at < :end` and group them by the local `date`
+    sql: str
+    format_row: Callable[[Any], dict]
+    # app modes the statistic is rolled up for by the scheduled task
+    app_modes: set[AppMode]
+
+
+MESSAGE_APP_MODES = {AppMode.COMPLETION, AppMode.CHAT, AppMode.AGENT_CHAT, AppMode.ADVANCED_CHAT, AppMode.CHANNEL}
+WORKFLOW_APP_MODES = {AppMode.WORKFLOW, AppMode.ADVANCED_CHAT}
+
+DAILY_STATISTICS: dict[str, DailyStatistic] = {
+    "daily_messages": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    COUNT(*) AS message_count
+FROM
+    messages
+WHERE
+    app_id = :app_id
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "message_count": i.message_count},
+        app_modes=MESSAGE_APP_MODES,
+    ),
+    "daily_conversations": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    COUNT(DISTINCT messages.conversation_id) AS conversation_count
+FROM
+    messages
+WHERE
+    app_id = :app_id
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "conversation_count": i.conversation_count},
+        app_modes=MESSAGE_APP_MODES,
+    ),
+    "daily_end_users": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    COUNT(DISTINCT messages.from_end_user_id) AS terminal_count
+FROM
+    messages
+WHERE
+    app_id = :app_id
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "terminal_count": i.terminal_count},
+        app_modes=MESSAGE_APP_MODES,
+    ),
+    "token_costs": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    (SUM(messages.message_tokens) + SUM(messages.answer_tokens)) AS token_count,
+    SUM(total_price) AS total_price
+FROM
+    messages
+WHERE
+    app_id = :app_id
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {
+            "date": str(i.date),
+            "token_count": i.token_count,
+            "total_price": i.total_price,
+            "currency": "USD",
+        },
+        app_modes=MESSAGE_APP_MODES,
+    ),
+    "average_session_interactions": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', c.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    AVG(subquery.message_count) AS interactions
+FROM
+    (
+        SELECT
+            m.conversation_id,
+            COUNT(m.id) AS message_count
+        FROM
+            conversations c
+        JOIN
+            messages m
+            ON c.id = m.conversation_id
+        WHERE
+            c.override_model_configs IS NULL
+            AND c.app_id = :app_id
+            AND c.created_at >= :start
+            AND c.created_at < :end
+        GROUP BY m.conversation_id
+    ) subquery
+LEFT JOIN
+    conversations c
+    ON c.id = subquery.conversation_id
+GROUP BY
+    date
+ORDER BY
+    date""",
+        format_row=lambda i: {"date": str(i.date), "interactions": float(i.interactions.quantize(Decimal("0.01")))},
+        app_modes={AppMode.CHAT, AppMode.AGENT_CHAT, AppMode.ADVANCED_CHAT},
+    ),
+    "user_satisfaction_rate": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', m.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    COUNT(m.id) AS message_count,
+    COUNT(mf.id) AS feedback_count
+FROM
+    messages m
+LEFT JOIN
+    message_feedbacks mf
+    ON mf.message_id=m.id AND mf.rating='like'
+WHERE
+    m.app_id = :app_id
+    AND m.created_at >= :start
+    AND m.created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {
+            "date": str(i.date),
+            "rate": round((i.feedback_count * 1000 / i.message_count) if i.message_count > 0 else 0, 2),
+        },
+        app_modes=MESSAGE_APP_MODES,
+    ),
+    "average_response_time": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    AVG(provider_response_latency) AS latency
+FROM
+    messages
+WHERE
+    app_id = :app_id
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "latency": round(i.latency * 1000, 4)},
+        app_modes={AppMode.COMPLETION},
+    ),
+    "tokens_per_second": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    CASE
+        WHEN SUM(provider_response_latency) = 0 THEN 0
+        ELSE (SUM(answer_tokens) / SUM(provider_response_latency))
+    END as tokens_per_second
+FROM
+    messages
+WHERE
+    app_id = :app_id
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "tps": round(i.tokens_per_second, 4)},
+        app_modes=MESSAGE_APP_MODES,
+    ),
+    "workflow_daily_runs": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    COUNT(id) AS runs
+FROM
+    workflow_runs
+WHERE
+    app_id = :app_id
+    AND triggered_from = :triggered_from
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "runs": i.runs},
+        app_modes=WORKFLOW_APP_MODES,
+    ),
+    "workflow_daily_terminals": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    COUNT(DISTINCT workflow_runs.created_by) AS terminal_count
+FROM
+    workflow_runs
+WHERE
+    app_id = :app_id
+    AND triggered_from = :triggered_from
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "terminal_count": i.terminal_count},
+        app_modes=WORKFLOW_APP_MODES,
+    ),
+    "workflow_token_costs": DailyStatistic(
+        sql="""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    SUM(workflow_runs.total_tokens) AS token_count
+FROM
+    workflow_runs
+WHERE
+    app_id = :app_id
+    AND triggered_from = :triggered_from
+    AND created_at >= :start
+    AND created_at < :end
+GROUP BY date ORDER BY date""",
+        format_row=lambda i: {"date": str(i.date), "token_count": i.token_count},
+        app_modes=WORKFLOW_APP_MODES,
+    ),
+    "workflow_average_app_interactions": DailyStatistic(
+        sql="""SELECT
+    AVG(sub.interactions) AS interactions,
+    sub.date
+FROM
+    (
+        SELECT
+            DATE(DATE_TRUNC('day', c.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+            c.created_by,
+            COUNT(c.id) AS interactions
+        FROM
+            workflow_runs c
+        WHERE
+            c.app_id = :app_id
+            AND c.triggered_from = :triggered_from
+            AND c.created_at >= :start
+            AND c.created_at < :end
+        GROUP BY
+            date, c.created_by
+    ) sub
+GROUP BY
+    sub.date
+ORDER BY
+    sub.date""",
+        format_row=lambda i: {"date": str(i.date), "interactions": float(i.interactions.quantize(Decimal("0.01")))},
+        app_modes={AppMode.WORKFLOW},
+    ),
+}
+
+
+class AppStatisticService:
+    """
+    Serves the console statistic endpoints. Complete past days are read from per app, per day
+    rollups, so only the partial days at the edges of the range (including today) scan raw rows.
+    The rollups are only written by the scheduled task, which rebuilds the last days every night.
+    """
+
+    @classmethod
+    def get_daily_statistics(
+        cls, app_model: App, statistic: str, timezone: str, start: Optional[str], end: Optional[str]
+    ) -> list[dict]:
+        """
+        Get a daily statistic of an app.
+
+        :param app_model: app
+        :param statistic: key of DAILY_STATISTICS
+        :param timezone: timezone the days are counted in
+        :param start: optional local start time, format %Y-%m-%d %H:%M
+        :param end: optional local end time (exclusive), format %Y-%m-%d %H:%M
+        :return: one row per day that has data
+        """
+        tz = pytz.timezone(timezone)
+        now = datetime.now(pytz.utc)
+
+        # nothing of an app can be older than the app itself
+        start_at = cls._local_to_utc(tz, start) if start else pytz.utc.localize(app_model.created_at)
+        end_at = cls._local_to_utc(tz, end) if end else now
+
+        first_day = start_at.astimezone(tz).date()
+        if cls._day_start(tz, first_day) < start_at:
+            first_day += timedelta(days=1)
+        # today is never complete, and neither is the day the range ends in
+        last_day = min(end_at.astimezone(tz).date(), now.astimezone(tz).date()) - timedelta(days=1)
+
+        if first_day > last_day:
+            return cls._query_daily_statistics(app_model, statistic, timezone, start_at, end_at)
+
+        response_data = []
+        if start_at < cls._day_start(tz, first_day):
+            response_data.extend(
+                cls._query_daily_statistics(app_model, statistic, timezone, start_at, cls._day_start(tz, first_day))
+            )
+
+        response_data.extend(cls._get_rollups(app_model, statistic, timezone, first_day, last_day))
+
+        tail_start_at = cls._day_start(tz, last_day + timedelta(days=1))
+        if tail_start_at < end_at:
+            response_data.extend(cls._query_daily_statistics(app_model, statistic, timezone, tail_start_at, end_at))
+
+        return response_data
+
+    @classmethod
+    def rebuild_rollups(cls, app_model: App, timezone: str, day: date) -> None:
+        """
+        Rebuild the rollups of an app for the APP_STATISTIC_ROLLUP_REBUILD_DAYS days ending on a local day, so
+        that the feedback and messages that arrive after a day ended are counted, and backfill the days of the
+        app before them the first time.
+
+        :param app_model: app
+        :param timezone: timezone the days are counted in
+        :param day: last local day, must be complete
+        """
+        first_day = day - timedelta(days=dify_config.APP_STATISTIC_ROLLUP_REBUILD_DAYS - 1)
+        # the day before the window was rebuilt by the previous runs, unless the app has no rollups yet
+        has_rollups = db.session.scalar(
+            select(
+                exists().where(
+                    AppStatisticRollup.app_id == app_model.id,
+                    AppStatisticRollup.timezone == timezone,
+                    AppStatisticRollup.date == first_day - timedelta(days=1),
+                )
+            )
+        )
+        if not has_rollups:
+            created_day = pytz.utc.localize(app_model.created_at).astimezone(pytz.timezone(timezone)).date()
+            first_day = max(min(first_day, created_day), first_day - timedelta(days=MAX_BACKFILL_DAYS))
+
+        cls.generate_rollups(app_model, timezone, first_day, day)
+
+    @classmethod
+    def generate_rollups(cls, app_model: App, timezone: str, first_day: date, last_day: date) -> None:
+        """
+        (Re)build the rollups of every statistic that applies to an app for a range of local days.
+
+        :param app_model: app
+        :param timezone: timezone the days are counted in
+        :param first_day: first local day
+        :param last_day: last local day (inclusive), must be complete
+        """
+        tz = pytz.timezone(timezone)
+        start_at = cls._day_start(tz, first_day)
+        end_at = cls._day_start(tz, last_day + timedelta(days=1))
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
+        for statistic, daily_statistic in DAILY_STATISTICS.items():
+            if AppMode.value_of(app_model.mode) not in daily_statistic.app_modes:
+                continue
+
+            rows = cls._query_daily_statistics(app_model, statistic, timezone, start_at, end_at)
+            cls._save_rollups(app_model, statistic, timezone, days, rows)
+
+        db.session.commit()
+
+    @classmethod
+    def _get_rollups(cls, app_model: App, statistic: str, timezone: str, first_day: date, last_day: date) -> list[dict]:
+        rollups = db.session.scalars(
+            select(AppStatisticRollup).where(
+                AppStatisticRollup.app_id == app_model.id,
+                AppStatisticRollup.statistic == statistic,
+                AppStatisticRollup.timezone == timezone,
+                AppStatisticRollup.date >= first_day,
+                AppStatisticRollup.date <= last_day,
+            )
+        ).all()
+        rows_by_day: dict[date, Optional[dict]] = {rollup.date: rollup.data_dict for rollup in rollups}
+
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+        missing_days = [day for day in days if day not in rows_by_day]
+        if missing_days:
+            # the days the scheduled task has not rolled up yet are scanned with one query
+            tz = pytz.timezone(timezone)
+            rows = cls._query_daily_statistics(
+                app_model,
+                statistic,
+                timezone,
+                cls._day_start(tz, missing_days[0]),
+                cls._day_start(tz, missing_days[-1] + timedelta(days=1)),
+            )
+            queried_rows = {date.fromisoformat(row["date"]): row for row in rows}
+            rows_by_day.update({day: queried_rows.get(day) for day in missing_days})
+
+        return [rows_by_day[day] for day in days if rows_by_day[day] is not None]
+
+    @classmethod
+    def _save_rollups(cls, app_model: App, statistic: str, timezone: str, days: list[date], rows: list[dict]) -> None:
+        rows_by_day = {date.fromisoformat(row["date"]): row for row in rows}
+
+        values = [
+            {
+                "app_id": app_model.id,
+                "statistic": statistic,
+                "timezone": timezone,
+                "date": day,
+                # decimals are kept as strings, the same way the endpoint serializes them
+                "data": json.dumps(rows_by_day[day], default=str) if day in rows_by_day else None,
+            }
+            for day in days
+        ]
+        stmt = insert(AppStatisticRollup).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["app_id", "statistic", "timezone", "date"],
+            set_={"data": stmt.excluded.data, "updated_at": datetime.now(pytz.utc).replace(tzinfo=None)},
+        )
+        db.session.execute(stmt)
+
+    @classmethod
+    def _query_daily_statistics(
+        cls, app_model: App, statistic: str, timezone: str, start_at: datetime, end_at: datetime
+    ) -> list[dict]:
+        daily_statistic = DAILY_STATISTICS[statistic]
+        arg_dict = {
+            "tz": timezone,
+            "app_id": app_model.id,
+            "triggered_from": WorkflowRunTriggeredFrom.APP_RUN.value,
+            "start": start_at,
+            "end": end_at,
+        }
+
+        response_data = []
+        with db.engine.begin() as conn:
+            rs = conn.execute(db.text(daily_statistic.sql), arg_dict)
+            for i in rs:
+                response_data.append(daily_statistic.format_row(i))
+
+        return response_data
+
+    @staticmethod
+    def _local_to_utc(tz: pytz.BaseTzInfo, value: str) -> datetime:
+        local_datetime = datetime.strptime(value, "%Y-%m-%d %H:%M").replace(second=0)
+        return tz.localize(local_datetime).astimezone(pytz.utc)
+
+    @staticmethod
+    def _day_start(tz: pytz.BaseTzInfo, day: date) -> datetime:
+        return tz.localize(datetime.combine(day, time.min)).astimezone(pytz.utc)
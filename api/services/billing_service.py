@@ -73,9 +73,55 @@ STRIPE_PLANS = {
 }
 
 
+# Eventos do Stripe que alteram o snapshot de billing do tenant
+STRIPE_ENTITLEMENT_EVENTS = {
+    "checkout.session.completed",
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+    "customer.subscription.paused",
+    "customer.subscription.resumed",
+    "invoice.paid",
+    "invoice.payment_failed",
+}
+
+
 class BillingService:
     # Lê as variáveis de ambiente para a chave da API do Stripe
     stripe.api_key = os.environ.get("STRIPE_API_SECRET_KEY")
+    # Segredo usado para validar a assinatura dos webhooks do Stripe
+    webhook_secret = os.environ.get("STRIPE_WEBHOOK_SECRET")
+
+    @classmethod
+    def get_tenant_id_from_webhook(cls, payload: bytes, sig_header: str):
+        """
+        Valida a assinatura de um webhook do Stripe e retorna o tenant_id afetado pelo evento,
+        ou None quando o evento não altera o billing de nenhum tenant.
+        """
+        if not cls.webhook_secret:
+            raise ValueError("STRIPE_WEBHOOK_SECRET não configurado.")
+
+        # Lança stripe.error.SignatureVerificationError quando a assinatura é inválida
+        event = stripe.Webhook.construct_event(payload, sig_header, cls.webhook_secret)
+        if event["type"] not in STRIPE_ENTITLEMENT_EVENTS:
+            logger.debug(f"Evento do Stripe ignorado: {event['type']}")
+            return None
+
+        data_object = event["data"]["object"]
+        metadata = data_object.get("metadata") or {}
+        tenant_id = metadata.get("tenant_id")
+        if not tenant_id:
+            # Faturas carregam os metadados da assinatura em subscription_details
+            subscription_details = data_object.get("subscription_details") or {}
+            tenant_id = (subscription_details.get("metadata") or {}).get("tenant_id")
+
+        log_checklist(
+            check_name="Tenant ID no Webhook",
+            success=bool(tenant_id),
+            error=f"Evento {event['type']} sem tenant_id nos metadados",
+            solution="Verifique se as assinaturas e sessões de checkout são criadas com o metadado tenant_id."
+        )
+        return tenant_id
 
     @classmethod
     def create_checkout_session(cls, email, tenant_id, plan, interval="month", success_url=None, cancel_url=None):
@@ -0,0 +1,203 @@
+from collections import defaultdict
+from collections.abc import Sequence
+
+from sqlalchemy import func, select
+
+from extensions.ext_database import db
+from models.account import Account, Tenant
+from models.model import (
+    App,
+    AppModelConfig,
+    Conversation,
+    EndUser,
+    Message,
+    MessageAnnotation,
+    MessageFeedback,
+    Site,
+    Tag,
+    TagBinding,
+    set_prefetched_property,
+)
+from models.workflow import Workflow
+
+
+class ConversationDataLoader:
+    """
+    Prefetch the properties marshaled by the console conversation lists for a whole page,
+    so the page costs a fixed number of queries instead of several queries per row.
+    """
+
+    @classmethod
+    def load(cls, conversations: Sequence[Conversation]) -> None:
+        if not conversations:
+            return
+
+        conversation_ids = [conversation.id for conversation in conversations]
+
+        message_counts = dict(
+            db.session.execute(
+                select(Message.conversation_id, func.count(Message.id))
+                .where(Message.conversation_id.in_(conversation_ids))
+                .group_by(Message.conversation_id)
+            ).all()
+        )
+
+        first_messages = {
+            message.conversation_id: message
+            for message in db.session.scalars(
+                select(Message)
+                .where(Message.conversation_id.in_(conversation_ids))
+                .order_by(Message.conversation_id, Message.created_at.asc())
+                .distinct(Message.conversation_id)
+            ).all()
+        }
+
+        annotations: dict[str, MessageAnnotation] = {}
+        for annotation in db.session.scalars(
+            select(MessageAnnotation)
+            .where(MessageAnnotation.conversation_id.in_(conversation_ids))
+            .order_by(MessageAnnotation.created_at.asc())
+        ).all():
+            annotations.setdefault(annotation.conversation_id, annotation)
+        cls._load_annotation_accounts(list(annotations.values()))
+
+        feedback_stats: dict[tuple[str, str], dict[str, int]] = defaultdict(lambda: {"like": 0, "dislike": 0})
+        for conversation_id, from_source, rating, count in db.session.execute(
+            select(
+                MessageFeedback.conversation_id,
+                MessageFeedback.from_source,
+                MessageFeedback.rating,
+                func.count(MessageFeedback.id),
+            )
+            .where(MessageFeedback.conversation_id.in_(conversation_ids))
+            .group_by(MessageFeedback.conversation_id, MessageFeedback.from_source, MessageFeedback.rating)
+        ).all():
+            if rating in {"like", "dislike"}:
+                feedback_stats[(conversation_id, from_source)][rating] = count
+
+        end_user_ids = {
+            conversation.from_end_user_id for conversation in conversations if conversation.from_end_user_id
+        }
+        end_user_session_ids = {}
+        if end_user_ids:
+            end_user_session_ids = dict(
+                db.session.execute(select(EndUser.id, EndUser.session_id).where(EndUser.id.in_(end_user_ids))).all()
+            )
+
+        account_ids = {conversation.from_account_id for conversation in conversations if conversation.from_account_id}
+        account_names = {}
+        if account_ids:
+            account_names = dict(
+                db.session.execute(select(Account.id, Account.name).where(Account.id.in_(account_ids))).all()
+            )
+
+        app_model_config_ids = {
+            conversation.app_model_config_id for conversation in conversations if conversation.app_model_config_id
+        }
+        app_model_configs = {}
+        if app_model_config_ids:
+            app_model_configs = {
+                app_model_config.id: app_model_config
+                for app_model_config in db.session.scalars(
+                    select(AppModelConfig).where(AppModelConfig.id.in_(app_model_config_ids))
+                ).all()
+            }
+            # the annotation reply setting is per app, so resolve it once for the configs of each app
+            annotation_reply_dicts: dict[str, dict] = {}
+            for app_model_config in app_model_configs.values():
+                if app_model_config.app_id not in annotation_reply_dicts:
+                    annotation_reply_dicts[app_model_config.app_id] = app_model_config.annotation_reply_dict
+                set_prefetched_property(
+                    app_model_config, "annotation_reply_dict", annotation_reply_dicts[app_model_config.app_id]
+                )
+
+        for conversation in conversations:
+            annotation = annotations.get(conversation.id)
+            set_prefetched_property(conversation, "message_count", message_counts.get(conversation.id, 0))
+            set_prefetched_property(conversation, "first_message", first_messages.get(conversation.id))
+            set_prefetched_property(conversation, "annotation", annotation)
+            set_prefetched_property(conversation, "annotated", annotation is not None)
+            set_prefetched_property(
+                conversation, "user_feedback_stats", dict(feedback_stats[(conversation.id, "user")])
+            )
+            set_prefetched_property(
+                conversation, "admin_feedback_stats", dict(feedback_stats[(conversation.id, "admin")])
+            )
+            set_prefetched_property(
+                conversation, "from_end_user_session_id", end_user_session_ids.get(conversation.from_end_user_id)
+            )
+            set_prefetched_property(conversation, "from_account_name", account_names.get(conversation.from_account_id))
+            set_prefetched_property(
+                conversation, "app_model_config", app_model_configs.get(conversation.app_model_config_id)
+            )
+
+    @classmethod
+    def _load_annotation_accounts(cls, annotations: Sequence[MessageAnnotation]) -> None:
+        account_ids = {annotation.account_id for annotation in annotations if annotation.account_id}
+        if not account_ids:
+            return
+
+        accounts = {
+            account.id: account
+            for account in db.session.scalars(select(Account).where(Account.id.in_(account_ids))).all()
+        }
+        for annotation in annotations:
+            set_prefetched_property(annotation, "account", accounts.get(annotation.account_id))
+
+
+class AppDataLoader:
+    """
+    Prefetch the properties marshaled by the console app list for a whole page.
+    """
+
+    @classmethod
+    def load(cls, apps: Sequence[App]) -> None:
+        if not apps:
+            return
+
+        app_ids = [app.id for app in apps]
+        tenant_ids = {app.tenant_id for app in apps}
+
+        sites = {site.app_id: site for site in db.session.scalars(select(Site).where(Site.app_id.in_(app_ids))).all()}
+
+        tenants = {
+            tenant.id: tenant for tenant in db.session.scalars(select(Tenant).where(Tenant.id.in_(tenant_ids))).all()
+        }
+
+        tags: dict[str, list[Tag]] = defaultdict(list)
+        for target_id, tag in db.session.execute(
+            select(TagBinding.target_id, Tag)
+            .join(Tag, Tag.id == TagBinding.tag_id)
+            .where(
+                TagBinding.target_id.in_(app_ids),
+                TagBinding.tenant_id.in_(tenant_ids),
+                Tag.tenant_id == TagBinding.tenant_id,
+                Tag.type == "app",
+            )
+        ).all():
+            tags[target_id].append(tag)
+
+        app_model_config_ids = {app.app_model_config_id for app in apps if app.app_model_config_id}
+        app_model_configs = {}
+        if app_model_config_ids:
+            app_model_configs = {
+                app_model_config.id: app_model_config
+                for app_model_config in db.session.scalars(
+                    select(AppModelConfig).where(AppModelConfig.id.in_(app_model_config_ids))
+                ).all()
+            }
+
+        workflow_ids = {app.workflow_id for app in apps if app.workflow_id}
+        workflows = {}
+        if workflow_ids:
+            workflows = {
+                workflow.id: workflow
+                for workflow in db.session.scalars(select(Workflow).where(Workflow.id.in_(workflow_ids))).all()
+            }
+
+        for app in apps:
+            set_prefetched_property(app, "site", sites.get(app.id))
+            set_prefetched_property(app, "tenant", tenants.get(app.tenant_id))
+            set_prefetched_property(app, "tags", tags.get(app.id, []))
+            set_prefetched_property(app, "app_model_config", app_model_configs.get(app.app_model_config_id))
+            set_prefetched_property(app, "workflow", workflows.get(app.workflow_id))
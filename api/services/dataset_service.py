@@ -36,6 +36,7 @@ from models.dataset import (
 )
 from models.model import UploadFile
 from models.source import DataSourceOauthBinding
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
 from services.errors.account import NoPermissionError
 from services.errors.dataset import DatasetNameDuplicateError
 from services.errors.document import DocumentIndexingError
@@ -320,9 +321,23 @@ class DatasetService:
             # update Retrieval model
             filtered_data["retrieval_model"] = data["retrieval_model"]
 
+            if action in {"add", "update"}:
+                # the dataset keeps its embedding model until its vector index is rebuilt for the new one
+                filtered_data.pop("indexing_technique", None)
+                embedding_model_provider = filtered_data.pop("embedding_model_provider")
+                embedding_model = filtered_data.pop("embedding_model")
+                collection_binding_id = filtered_data.pop("collection_binding_id")
+
             dataset.query.filter_by(id=dataset_id).update(filtered_data)
 
             db.session.commit()
+            if action in {None, "remove"}:
+                # the dataset is set back to its embedding model, or to economy, before a rebuild switched it
+                DatasetVectorRebuildService.cancel(dataset)
+            if action in {"add", "update"}:
+                DatasetVectorRebuildService.start(
+                    dataset, embedding_model_provider, embedding_model, collection_binding_id
+                )
             if action:
                 deal_dataset_vector_index_task.delay(dataset_id, action)
         return dataset
@@ -0,0 +1,428 @@
+import json
+import logging
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import or_
+
+from configs import dify_config
+from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory, Vector
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.dataset import Dataset, DatasetVectorRebuild, DocumentSegment
+from models.dataset import Document as DatasetDocument
+
+logger = logging.getLogger(__name__)
+
+REBUILD_LOCK_TIMEOUT = 600
+
+
+class DatasetVectorRebuildService:
+    """
+    Rebuild the vector index of a dataset for a new embedding model, or for a dataset switched to high quality
+    indexing, without taking the dataset offline.
+
+    The dataset keeps its embedding model and index, and is queried as before, while its segments are embedded
+    with the new model into a shadow collection, batch by batch. Every batch is checkpointed, so that a rebuild
+    whose worker died resumes from its last batch. Once all segments are in the shadow collection, the segments
+    created or updated during the rebuild are embedded again, then the embedding model and the index struct of
+    the dataset are switched in one update and the old index is deleted.
+
+    Meanwhile, the documents indexed into the dataset are indexed into the shadow collection too, see
+    `index_documents`, so that the documents indexed while the dataset is switched are not left in its old index.
+    A rebuild is cancelled when the dataset is set back to its embedding model or to economy indexing before it
+    is switched, see `cancel`.
+    """
+
+    @classmethod
+    def start(
+        cls,
+        dataset: Dataset,
+        embedding_model_provider: str,
+        embedding_model: str,
+        collection_binding_id: Optional[str],
+    ) -> DatasetVectorRebuild:
+        """
+        Record the rebuild of the vector index of a dataset for an embedding model, to run with `rebuild`.
+        A rebuild in progress for another model is replaced, and one for the same model is resumed.
+        A dataset without segments to rebuild is switched to the embedding model at once.
+        """
+        rebuild = db.session.query(DatasetVectorRebuild).filter(DatasetVectorRebuild.dataset_id == dataset.id).first()
+        if (
+            rebuild
+            and rebuild.status != "completed"
+            and rebuild.embedding_model_provider == embedding_model_provider
+            and rebuild.embedding_model == embedding_model
+        ):
+            rebuild.status = "rebuilding"
+            rebuild.attempt_count = 0
+            rebuild.error = None
+            db.session.commit()
+            return rebuild
+
+        if rebuild and rebuild.status != "completed":
+            try:
+                cls._get_shadow_vector(dataset, rebuild).delete()
+            except Exception:
+                logger.exception(f"Failed to delete the shadow vector index of dataset {dataset.id}")
+        if not rebuild:
+            rebuild = DatasetVectorRebuild(dataset_id=dataset.id)
+            db.session.add(rebuild)
+
+        # a collection of its own, which the collection of the dataset is not overwritten by
+        vector_type = dataset.index_struct_dict["type"] if dataset.index_struct_dict else dify_config.VECTOR_STORE
+        index_struct = AbstractVectorFactory.gen_index_struct_dict(
+            vector_type, Dataset.gen_collection_name_by_id(str(uuid.uuid4()))
+        )
+        rebuild.embedding_model_provider = embedding_model_provider
+        rebuild.embedding_model = embedding_model
+        rebuild.collection_binding_id = collection_binding_id
+        rebuild.index_struct = json.dumps(index_struct)
+        rebuild.status = "rebuilding"
+        rebuild.last_segment_id = None
+        rebuild.segment_count = 0
+        rebuild.attempt_count = 0
+        rebuild.error = None
+        rebuild.created_at = rebuild.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.session.commit()
+
+        if not cls._get_segments_query(dataset.id).first():
+            cls._switch(dataset, rebuild)
+        return rebuild
+
+    @classmethod
+    def rebuild(cls, dataset_id: str) -> None:
+        """
+        Run or resume the rebuild of the vector index of a dataset, unless another worker is running it
+        """
+        lock = redis_client.lock(f"dataset_vector_rebuild_{dataset_id}", timeout=REBUILD_LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            logger.info(f"Vector index of dataset {dataset_id} is being rebuilt by another worker")
+            return
+
+        try:
+            rebuild = (
+                db.session.query(DatasetVectorRebuild)
+                .filter(DatasetVectorRebuild.dataset_id == dataset_id, DatasetVectorRebuild.status == "rebuilding")
+                .first()
+            )
+            dataset = db.session.get(Dataset, dataset_id)
+            if not rebuild or not dataset:
+                return
+
+            rebuild_id, index_struct = rebuild.id, rebuild.index_struct
+            try:
+                cls._rebuild(dataset, rebuild, lock)
+            except Exception as e:
+                db.session.rollback()
+                if cls._is_cancelled(rebuild_id, index_struct):
+                    # such as deleted with its dataset while a batch was rebuilt
+                    logger.info(f"Stopped the cancelled vector index rebuild of dataset {dataset_id}")
+                    return
+                rebuild.status = "failed"
+                rebuild.error = str(e)
+                db.session.commit()
+                raise
+        finally:
+            lock.release()
+
+    @classmethod
+    def cancel(cls, dataset: Dataset) -> None:
+        """
+        Cancel the rebuild in progress of a dataset, if any, and delete its shadow collection.
+        A rebuild switched meanwhile is not cancelled, its collection being the index of the dataset.
+        """
+        rebuild = (
+            db.session.query(DatasetVectorRebuild)
+            .filter(DatasetVectorRebuild.dataset_id == dataset.id, DatasetVectorRebuild.status == "rebuilding")
+            .first()
+        )
+        if not rebuild:
+            return
+
+        # conditional, as the worker switches the dataset by the same update
+        cancelled = (
+            db.session.query(DatasetVectorRebuild)
+            .filter(DatasetVectorRebuild.id == rebuild.id, DatasetVectorRebuild.status == "rebuilding")
+            .update(
+                {"status": "cancelled", "updated_at": datetime.now(timezone.utc).replace(tzinfo=None)},
+                synchronize_session=False,
+            )
+        )
+        db.session.commit()
+        if not cancelled:
+            return
+
+        logger.info(f"Cancelled the vector index rebuild of dataset {dataset.id}")
+        try:
+            cls._get_shadow_vector(dataset, rebuild).delete()
+        except Exception:
+            logger.exception(f"Failed to delete the shadow vector index of dataset {dataset.id}")
+
+    @classmethod
+    def delete(cls, dataset: Dataset) -> None:
+        """
+        Delete the rebuild of a deleted dataset, and its shadow collection unless the dataset was switched to it
+        """
+        rebuild = db.session.query(DatasetVectorRebuild).filter(DatasetVectorRebuild.dataset_id == dataset.id).first()
+        if not rebuild:
+            return
+
+        if rebuild.status != "completed":
+            try:
+                cls._get_shadow_vector(dataset, rebuild).delete()
+            except Exception:
+                logger.exception(f"Failed to delete the shadow vector index of dataset {dataset.id}")
+        # a worker still rebuilding it stops at its next batch
+        db.session.delete(rebuild)
+        db.session.commit()
+
+    @classmethod
+    def index_documents(cls, dataset: Dataset, documents: Sequence[Document]) -> None:
+        """
+        Index the documents just indexed into a dataset into the indexes replacing the one they were indexed into:
+        the shadow collection of a rebuild in progress, and the index the dataset was switched to after it was
+        loaded by the indexer. Called after the documents are indexed, it covers both sides of a switch.
+        """
+        for vector in cls._get_replacing_vectors(dataset):
+            cls._load_documents(vector, documents, replace=True)
+
+    @classmethod
+    def delete_documents(cls, dataset: Dataset, node_ids: list[str]) -> None:
+        """
+        Delete the documents just deleted from a dataset from the indexes replacing the one they were deleted from
+        """
+        for vector in cls._get_replacing_vectors(dataset):
+            vector.delete_by_ids(node_ids)
+
+    @classmethod
+    def claim_stale_dataset_ids(cls) -> list[str]:
+        """
+        Get the datasets whose rebuild made no progress for DATASET_VECTOR_REBUILD_STALE_MINUTES, as its worker
+        died, to resume. Each resume counts as an attempt and restarts the stale period, and a rebuild which
+        made no progress after DATASET_VECTOR_REBUILD_MAX_ATTEMPTS resumes is marked failed instead.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        stale_before = now - timedelta(minutes=dify_config.DATASET_VECTOR_REBUILD_STALE_MINUTES)
+        rebuilds = (
+            db.session.query(DatasetVectorRebuild)
+            .filter(DatasetVectorRebuild.status == "rebuilding", DatasetVectorRebuild.updated_at < stale_before)
+            .all()
+        )
+
+        dataset_ids = []
+        for rebuild in rebuilds:
+            if rebuild.attempt_count >= dify_config.DATASET_VECTOR_REBUILD_MAX_ATTEMPTS:
+                rebuild.status = "failed"
+                rebuild.error = f"Rebuild made no progress after {rebuild.attempt_count} resumes"
+                logger.warning(f"Gave up the vector index rebuild of dataset {rebuild.dataset_id}")
+            else:
+                rebuild.attempt_count += 1
+                dataset_ids.append(rebuild.dataset_id)
+            rebuild.updated_at = now
+        db.session.commit()
+        return dataset_ids
+
+    @classmethod
+    def _rebuild(cls, dataset: Dataset, rebuild: DatasetVectorRebuild, lock) -> None:
+        shadow_vector = cls._get_shadow_vector(dataset, rebuild)
+        total = cls._get_segments_query(dataset.id).count()
+        logger.info(
+            f"Rebuilding the vector index of dataset {dataset.id} for {rebuild.embedding_model}: "
+            f"{rebuild.segment_count}/{total} segments done"
+        )
+
+        # the batch after the checkpoint may have been written before the worker died
+        resumed = rebuild.last_segment_id is not None
+        while True:
+            query = cls._get_segments_query(dataset.id)
+            if rebuild.last_segment_id:
+                query = query.filter(DocumentSegment.id > rebuild.last_segment_id)
+            segments = query.order_by(DocumentSegment.id).limit(dify_config.DATASET_VECTOR_REBUILD_BATCH_SIZE).all()
+            if not segments:
+                break
+
+            cls._load_segments(shadow_vector, segments, replace=resumed)
+            resumed = False
+            rebuild.last_segment_id = segments[-1].id
+            rebuild.segment_count += len(segments)
+            rebuild.attempt_count = 0
+            rebuild.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            db.session.commit()
+            lock.reacquire()
+            logger.info(f"Rebuilt {rebuild.segment_count}/{total} segments of the vector index of dataset {dataset.id}")
+            if cls._is_cancelled(rebuild.id, rebuild.index_struct):
+                logger.info(f"Stopped the cancelled or replaced vector index rebuild of dataset {dataset.id}")
+                return
+
+        # segments indexed into the old index while the shadow collection was built, which the batches may have
+        # passed already
+        changed_segments = (
+            cls._get_segments_query(dataset.id)
+            .filter(
+                or_(DocumentSegment.created_at >= rebuild.created_at, DocumentSegment.updated_at >= rebuild.created_at)
+            )
+            .all()
+        )
+        batch_size = dify_config.DATASET_VECTOR_REBUILD_BATCH_SIZE
+        for i in range(0, len(changed_segments), batch_size):
+            cls._load_segments(shadow_vector, changed_segments[i : i + batch_size], replace=True)
+
+        cls._switch(dataset, rebuild)
+
+    @classmethod
+    def _switch(cls, dataset: Dataset, rebuild: DatasetVectorRebuild) -> None:
+        """
+        Switch a dataset to its rebuilt vector index in one update, then delete its old index
+        """
+        old_dataset = cls._copy_dataset(dataset)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        # in the transaction of the switch, unless the rebuild was cancelled or replaced meanwhile
+        claimed = (
+            db.session.query(DatasetVectorRebuild)
+            .filter(
+                DatasetVectorRebuild.id == rebuild.id,
+                DatasetVectorRebuild.status == "rebuilding",
+                DatasetVectorRebuild.index_struct == rebuild.index_struct,
+            )
+            .update({"status": "completed", "updated_at": now}, synchronize_session=False)
+        )
+        if not claimed:
+            db.session.rollback()
+            logger.info(f"Vector index rebuild of dataset {dataset.id} was cancelled or replaced, not switching")
+            return
+
+        db.session.query(Dataset).filter(Dataset.id == dataset.id).update(
+            {
+                "indexing_technique": "high_quality",
+                "embedding_model_provider": rebuild.embedding_model_provider,
+                "embedding_model": rebuild.embedding_model,
+                "collection_binding_id": rebuild.collection_binding_id,
+                "index_struct": rebuild.index_struct,
+            },
+            synchronize_session=False,
+        )
+        rebuild.status = "completed"
+        rebuild.updated_at = now
+        db.session.commit()
+        logger.info(f"Switched dataset {dataset.id} to its rebuilt vector index")
+
+        if old_dataset.indexing_technique == "high_quality":
+            try:
+                Vector(old_dataset).delete()
+            except Exception:
+                logger.exception(f"Failed to delete the old vector index of dataset {dataset.id}")
+
+    @staticmethod
+    def _is_cancelled(rebuild_id: str, index_struct: str) -> bool:
+        """
+        Whether a rebuild was cancelled, deleted, or replaced by a rebuild for another model, since it was loaded
+        """
+        status = (
+            db.session.query(DatasetVectorRebuild.status)
+            .filter(DatasetVectorRebuild.id == rebuild_id, DatasetVectorRebuild.index_struct == index_struct)
+            .scalar()
+        )
+        return status != "rebuilding"
+
+    @classmethod
+    def _get_replacing_vectors(cls, dataset: Dataset) -> list[Vector]:
+        vectors = []
+        # the rebuild and the dataset as committed, which the objects of the session of the indexer may predate
+        rebuild = (
+            db.session.query(DatasetVectorRebuild)
+            .filter(DatasetVectorRebuild.dataset_id == dataset.id, DatasetVectorRebuild.status == "rebuilding")
+            .populate_existing()
+            .first()
+        )
+        if rebuild:
+            vectors.append(cls._get_shadow_vector(dataset, rebuild))
+
+        current = (
+            db.session.query(
+                Dataset.indexing_technique,
+                Dataset.embedding_model_provider,
+                Dataset.embedding_model,
+                Dataset.collection_binding_id,
+                Dataset.index_struct,
+            )
+            .filter(Dataset.id == dataset.id)
+            .first()
+        )
+        if (
+            current
+            and current.indexing_technique == "high_quality"
+            and current.index_struct
+            and (dataset.indexing_technique != "high_quality" or dataset.index_struct != current.index_struct)
+        ):
+            current_dataset = cls._copy_dataset(dataset)
+            current_dataset.indexing_technique = current.indexing_technique
+            current_dataset.embedding_model_provider = current.embedding_model_provider
+            current_dataset.embedding_model = current.embedding_model
+            current_dataset.collection_binding_id = current.collection_binding_id
+            current_dataset.index_struct = current.index_struct
+            vectors.append(Vector(current_dataset))
+        return vectors
+
+    @classmethod
+    def _load_segments(cls, vector: Vector, segments: Sequence[DocumentSegment], replace: bool = False) -> None:
+        documents = [
+            Document(
+                page_content=segment.content,
+                metadata={
+                    "doc_id": segment.index_node_id,
+                    "doc_hash": segment.index_node_hash,
+                    "document_id": segment.document_id,
+                    "dataset_id": segment.dataset_id,
+                },
+            )
+            for segment in segments
+        ]
+        cls._load_documents(vector, documents, replace)
+
+    @staticmethod
+    def _load_documents(vector: Vector, documents: Sequence[Document], replace: bool = False) -> None:
+        if replace:
+            vector.delete_by_ids([document.metadata["doc_id"] for document in documents])
+        # embedded in concurrent requests by the embedding dispatcher, within the budget of the provider
+        vector.create(documents)
+
+    @staticmethod
+    def _get_segments_query(dataset_id: str):
+        return (
+            db.session.query(DocumentSegment)
+            .join(DatasetDocument, DatasetDocument.id == DocumentSegment.document_id)
+            .filter(
+                DocumentSegment.dataset_id == dataset_id,
+                DocumentSegment.enabled == True,
+                DatasetDocument.indexing_status == "completed",
+                DatasetDocument.enabled == True,
+                DatasetDocument.archived == False,
+            )
+        )
+
+    @classmethod
+    def _get_shadow_vector(cls, dataset: Dataset, rebuild: DatasetVectorRebuild) -> Vector:
+        shadow_dataset = cls._copy_dataset(dataset)
+        shadow_dataset.indexing_technique = "high_quality"
+        shadow_dataset.embedding_model_provider = rebuild.embedding_model_provider
+        shadow_dataset.embedding_model = rebuild.embedding_model
+        shadow_dataset.collection_binding_id = rebuild.collection_binding_id
+        shadow_dataset.index_struct = rebuild.index_struct
+        return Vector(shadow_dataset)
+
+    @staticmethod
+    def _copy_dataset(dataset: Dataset) -> Dataset:
+        # a transient copy, which the vector factories may set the index struct of
+        return Dataset(
+            id=dataset.id,
+            tenant_id=dataset.tenant_id,
+            indexing_technique=dataset.indexing_technique,
+            embedding_model_provider=dataset.embedding_model_provider,
+            embedding_model=dataset.embedding_model,
+            collection_binding_id=dataset.collection_binding_id,
+            index_struct=dataset.index_struct,
+        )
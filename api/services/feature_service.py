@@ -1,7 +1,13 @@
+from datetime import datetime, timezone
+from typing import Optional
+
 from pydantic import BaseModel, ConfigDict
 import logging
 import json  # Adicionar json para formatar os logs
 from configs import dify_config
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.account import TenantBillingEntitlement
 from services.billing_service import BillingService
 from services.enterprise.enterprise_service import EnterpriseService
 
@@ -98,6 +104,10 @@ STRIPE_PLANS = {
     },
 }
 
+# Chaves do Redis para o snapshot de billing por tenant
+BILLING_ENTITLEMENT_CACHE_KEY = "billing_entitlement:{}"
+BILLING_ENTITLEMENT_REFRESH_LOCK_KEY = "billing_entitlement_refresh_lock:{}"
+
 
 class FeatureService:
 
@@ -109,17 +119,78 @@ class FeatureService:
         cls._fulfill_params_from_env(features)
         logger.debug(f"Parâmetros de ambiente preenchidos: {features}")
 
-        # Preencher com informações de billing, se habilitado
+        # Preencher com o snapshot local de billing, se habilitado. O Stripe nunca é chamado aqui:
+        # o snapshot é atualizado pelos webhooks e pela tarefa periódica de reconciliação.
         if dify_config.BILLING_ENABLED:
-            try:
-                cls._fulfill_params_from_billing_api(features, tenant_id)
-                logger.debug(f"Informações de billing preenchidas: {features}")
-            except Exception as e:
-                logger.error(f"Erro ao preencher informações de billing para tenant_id '{tenant_id}': {e}")
-                raise ValueError(f"Falha ao recuperar as informações de billing para tenant_id '{tenant_id}'. Verifique o sistema.")
+            entitlement = cls.get_billing_entitlement(tenant_id)
+            if entitlement:
+                features = entitlement
+                logger.debug(f"Informações de billing preenchidas a partir do snapshot: {features}")
+            else:
+                logger.warning(f"Snapshot de billing ausente para tenant_id '{tenant_id}', usando limites padrão.")
+                cls._schedule_billing_entitlement_refresh(tenant_id)
 
         return features
 
+    @classmethod
+    def get_billing_entitlement(cls, tenant_id: str) -> Optional[FeatureModel]:
+        """Obtém o snapshot de billing do tenant, primeiro no Redis e depois no banco de dados"""
+        cache_key = BILLING_ENTITLEMENT_CACHE_KEY.format(tenant_id)
+        cached_entitlement = redis_client.get(cache_key)
+        if cached_entitlement:
+            return FeatureModel.model_validate_json(cached_entitlement)
+
+        tenant_billing_entitlement = (
+            db.session.query(TenantBillingEntitlement).filter(TenantBillingEntitlement.tenant_id == tenant_id).first()
+        )
+        if not tenant_billing_entitlement:
+            return None
+
+        redis_client.setex(cache_key, dify_config.BILLING_ENTITLEMENT_CACHE_TTL, tenant_billing_entitlement.entitlements)
+        return FeatureModel.model_validate(tenant_billing_entitlement.entitlements_dict)
+
+    @classmethod
+    def refresh_billing_entitlement(cls, tenant_id: str) -> FeatureModel:
+        """Consulta o Stripe e persiste o snapshot de billing do tenant (banco de dados + Redis)"""
+        features = FeatureModel()
+        cls._fulfill_params_from_env(features)
+
+        # Tenants sem cliente no Stripe (ex.: sandbox) recebem o snapshot padrão, para não voltarem a ser
+        # atualizados a cada acesso e a cada reconciliação
+        customer = BillingService.find_customer_by_email_and_tenant(email=None, tenant_id=tenant_id)
+        if customer and customer.email:
+            cls._fulfill_params_from_billing_api(features, tenant_id, email=customer.email)
+        else:
+            logger.info(f"Cliente não encontrado no Stripe para tenant_id {tenant_id}, usando o snapshot padrão.")
+
+        entitlements = features.model_dump_json()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        tenant_billing_entitlement = (
+            db.session.query(TenantBillingEntitlement).filter(TenantBillingEntitlement.tenant_id == tenant_id).first()
+        )
+        if not tenant_billing_entitlement:
+            tenant_billing_entitlement = TenantBillingEntitlement(tenant_id=tenant_id)
+            db.session.add(tenant_billing_entitlement)
+        tenant_billing_entitlement.entitlements = entitlements
+        tenant_billing_entitlement.synced_at = now
+        tenant_billing_entitlement.updated_at = now
+        db.session.commit()
+
+        redis_client.setex(
+            BILLING_ENTITLEMENT_CACHE_KEY.format(tenant_id), dify_config.BILLING_ENTITLEMENT_CACHE_TTL, entitlements
+        )
+        logger.info(f"Snapshot de billing atualizado para tenant_id {tenant_id}")
+        return features
+
+    @classmethod
+    def _schedule_billing_entitlement_refresh(cls, tenant_id: str):
+        """Agenda a atualização assíncrona do snapshot, no máximo uma vez por janela de bloqueio"""
+        from tasks.refresh_billing_entitlement_task import refresh_billing_entitlement_task
+
+        lock_key = BILLING_ENTITLEMENT_REFRESH_LOCK_KEY.format(tenant_id)
+        if redis_client.set(lock_key, 1, ex=60, nx=True):
+            refresh_billing_entitlement_task.delay(tenant_id)
+
     @classmethod
     def get_system_features(cls) -> SystemFeatureModel:
         system_features = SystemFeatureModel()
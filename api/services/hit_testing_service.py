@@ -1,7 +1,14 @@
+import bisect
 import logging
+import math
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-from core.rag.datasource.retrieval_service import RetrievalService
+from flask import Flask, current_app
+
+from configs import dify_config
+from core.rag.datasource.retrieval_service import RetrievalService, RetrievalStageTimer
 from core.rag.models.document import Document
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from extensions.ext_database import db
@@ -16,6 +23,12 @@ default_retrieval_model = {
     "score_threshold_enabled": False,
 }
 
+# maximum number of retrieval settings compared by a batch hit testing
+BATCH_HIT_TESTING_MAX_RETRIEVAL_MODELS = 5
+
+# upper bounds of the buckets of the stage latency histograms, in milliseconds
+TIMING_HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
 
 class HitTestingService:
     @classmethod
@@ -43,20 +56,7 @@ class HitTestingService:
         if not retrieval_model:
             retrieval_model = dataset.retrieval_model or default_retrieval_model
 
-        all_documents = RetrievalService.retrieve(
-            retrieval_method=retrieval_model.get("search_method", "semantic_search"),
-            dataset_id=dataset.id,
-            query=cls.escape_query_for_search(query),
-            top_k=retrieval_model.get("top_k", 2),
-            score_threshold=retrieval_model.get("score_threshold", 0.0)
-            if retrieval_model["score_threshold_enabled"]
-            else 0.0,
-            reranking_model=retrieval_model.get("reranking_model", None)
-            if retrieval_model["reranking_enable"]
-            else None,
-            reranking_mode=retrieval_model.get("reranking_mode") or "reranking_model",
-            weights=retrieval_model.get("weights", None),
-        )
+        all_documents = cls._retrieve_documents(dataset.id, query, retrieval_model)
 
         end = time.perf_counter()
         logging.debug(f"Hit testing retrieve in {end - start:0.4f} seconds")
@@ -70,6 +70,159 @@ class HitTestingService:
 
         return cls.compact_retrieve_response(dataset, query, all_documents)
 
+    @classmethod
+    def batch_retrieve(cls, dataset: Dataset, queries: list[dict], retrieval_models: Optional[list[dict]]) -> dict:
+        """
+        Run a set of queries against a dataset with each of several retrieval settings, and compare the settings
+        by the recall@k and the MRR of the queries with expected segments, and by the latency of each stage of
+        the retrievals. The queries run concurrently, in HIT_TESTING_BATCH_MAX_WORKERS threads.
+
+        :param dataset: dataset
+        :param queries: content and optional expected_segment_ids of each query
+        :param retrieval_models: retrieval settings to compare, the retrieval model of the dataset by default
+        :return: metrics, stage latency histograms and queries of each retrieval setting
+        """
+        retrieval_models = retrieval_models or [dataset.retrieval_model or default_retrieval_model]
+        flask_app = current_app._get_current_object()  # type: ignore
+
+        with ThreadPoolExecutor(max_workers=dify_config.HIT_TESTING_BATCH_MAX_WORKERS) as executor:
+            futures = [
+                [
+                    executor.submit(cls._run_batch_query, flask_app, dataset.id, query, retrieval_model)
+                    for query in queries
+                ]
+                for retrieval_model in retrieval_models
+            ]
+            results = []
+            for retrieval_model, query_futures in zip(retrieval_models, futures):
+                query_results = [future.result() for future in query_futures]
+                results.append(
+                    {
+                        "retrieval_model": retrieval_model,
+                        "metrics": cls._compute_metrics(retrieval_model.get("top_k", 2), query_results),
+                        "timings": cls._compute_timing_histograms(query_results),
+                        "queries": query_results,
+                    }
+                )
+
+        return {"results": results}
+
+    @classmethod
+    def _run_batch_query(cls, flask_app: Flask, dataset_id: str, query: dict, retrieval_model: dict) -> dict:
+        with flask_app.app_context():
+            stage_timer = RetrievalStageTimer()
+            start_at = time.perf_counter()
+            documents = cls._retrieve_documents(dataset_id, query["content"], retrieval_model, stage_timer)
+            with stage_timer.measure("segment_hydration"):
+                segments = cls._get_segments(dataset_id, documents)
+            elapsed = time.perf_counter() - start_at
+
+        segment_ids = [segment.id for segment, _ in segments]
+        expected_segment_ids = query.get("expected_segment_ids") or []
+        result = {
+            "content": query["content"],
+            "segment_ids": segment_ids,
+            "scores": [score for _, score in segments],
+            "expected_segment_ids": expected_segment_ids,
+            "recall": None,
+            "reciprocal_rank": None,
+            "timings": {
+                **{stage: duration * 1000 for stage, duration in stage_timer.durations.items()},
+                "total": elapsed * 1000,
+            },
+        }
+        if expected_segment_ids:
+            expected = set(expected_segment_ids)
+            result["recall"] = len(expected.intersection(segment_ids)) / len(expected)
+            result["reciprocal_rank"] = next(
+                (1 / rank for rank, segment_id in enumerate(segment_ids, start=1) if segment_id in expected), 0.0
+            )
+        return result
+
+    @staticmethod
+    def _compute_metrics(top_k: int, query_results: list[dict]) -> dict:
+        # queries without expected segments only count towards the timings
+        evaluated = [result for result in query_results if result["recall"] is not None]
+        return {
+            "k": top_k,
+            "evaluated_query_count": len(evaluated),
+            "recall_at_k": sum(result["recall"] for result in evaluated) / len(evaluated) if evaluated else None,
+            "mrr": sum(result["reciprocal_rank"] for result in evaluated) / len(evaluated) if evaluated else None,
+        }
+
+    @staticmethod
+    def _compute_timing_histograms(query_results: list[dict]) -> dict:
+        durations_by_stage: dict[str, list[float]] = {}
+        for result in query_results:
+            for stage, duration in result["timings"].items():
+                durations_by_stage.setdefault(stage, []).append(duration)
+
+        histograms = {}
+        for stage, durations in durations_by_stage.items():
+            durations.sort()
+            bucket_counts = [0] * (len(TIMING_HISTOGRAM_BUCKETS_MS) + 1)
+            for duration in durations:
+                bucket_counts[bisect.bisect_left(TIMING_HISTOGRAM_BUCKETS_MS, duration)] += 1
+            histograms[stage] = {
+                "count": len(durations),
+                "mean": sum(durations) / len(durations),
+                # nearest-rank percentiles
+                "p50": durations[math.ceil(len(durations) * 0.5) - 1],
+                "p95": durations[math.ceil(len(durations) * 0.95) - 1],
+                "max": durations[-1],
+                "buckets": [
+                    {"le": upper_bound, "count": count}
+                    for upper_bound, count in zip((*TIMING_HISTOGRAM_BUCKETS_MS, None), bucket_counts)
+                ],
+            }
+        return histograms
+
+    @classmethod
+    def _retrieve_documents(
+        cls,
+        dataset_id: str,
+        query: str,
+        retrieval_model: dict,
+        stage_timer: Optional[RetrievalStageTimer] = None,
+    ) -> list[Document]:
+        return RetrievalService.retrieve(
+            retrieval_method=retrieval_model.get("search_method", "semantic_search"),
+            dataset_id=dataset_id,
+            query=cls.escape_query_for_search(query),
+            top_k=retrieval_model.get("top_k", 2),
+            score_threshold=retrieval_model.get("score_threshold", 0.0)
+            if retrieval_model.get("score_threshold_enabled")
+            else 0.0,
+            reranking_model=retrieval_model.get("reranking_model") if retrieval_model.get("reranking_enable") else None,
+            reranking_mode=retrieval_model.get("reranking_mode") or "reranking_model",
+            weights=retrieval_model.get("weights"),
+            stage_timer=stage_timer,
+        )
+
+    @staticmethod
+    def _get_segments(dataset_id: str, documents: list[Document]) -> list[tuple[DocumentSegment, Optional[float]]]:
+        """
+        Get the segments of retrieved documents in one query, in the order of the documents, with their scores
+        """
+        index_node_ids = [document.metadata["doc_id"] for document in documents]
+        if not index_node_ids:
+            return []
+
+        segments = {
+            segment.index_node_id: segment
+            for segment in db.session.query(DocumentSegment).filter(
+                DocumentSegment.dataset_id == dataset_id,
+                DocumentSegment.enabled == True,
+                DocumentSegment.status == "completed",
+                DocumentSegment.index_node_id.in_(index_node_ids),
+            )
+        }
+        return [
+            (segments[document.metadata["doc_id"]], document.metadata.get("score", None))
+            for document in documents
+            if document.metadata["doc_id"] in segments
+        ]
+
     @classmethod
     def external_retrieve(
         cls,
@@ -106,31 +259,7 @@ class HitTestingService:
 
     @classmethod
     def compact_retrieve_response(cls, dataset: Dataset, query: str, documents: list[Document]):
-        records = []
-
-        for document in documents:
-            index_node_id = document.metadata["doc_id"]
-
-            segment = (
-                db.session.query(DocumentSegment)
-                .filter(
-                    DocumentSegment.dataset_id == dataset.id,
-                    DocumentSegment.enabled == True,
-                    DocumentSegment.status == "completed",
-                    DocumentSegment.index_node_id == index_node_id,
-                )
-                .first()
-            )
-
-            if not segment:
-                continue
-
-            record = {
-                "segment": segment,
-                "score": document.metadata.get("score", None),
-            }
-
-            records.append(record)
+        records = [{"segment": segment, "score": score} for segment, score in cls._get_segments(dataset.id, documents)]
 
         return {
             "query": {
@@ -165,6 +294,30 @@ class HitTestingService:
         if not query or len(query) > 250:
             raise ValueError("Query is required and cannot exceed 250 characters")
 
+    @classmethod
+    def batch_hit_testing_args_check(cls, args):
+        queries = args["queries"]
+        if not isinstance(queries, list) or not queries:
+            raise ValueError("Queries are required")
+        if len(queries) > dify_config.HIT_TESTING_BATCH_MAX_QUERIES:
+            raise ValueError(f"Queries cannot exceed {dify_config.HIT_TESTING_BATCH_MAX_QUERIES}")
+        for query in queries:
+            if not isinstance(query, dict):
+                raise ValueError("Each query must be an object with a content")
+            cls.hit_testing_args_check({"query": query.get("content")})
+            expected_segment_ids = query.get("expected_segment_ids")
+            if expected_segment_ids is not None and not (
+                isinstance(expected_segment_ids, list) and all(isinstance(i, str) for i in expected_segment_ids)
+            ):
+                raise ValueError("Expected segment ids must be a list of segment ids")
+
+        retrieval_models = args["retrieval_models"]
+        if retrieval_models is not None:
+            if not isinstance(retrieval_models, list) or not all(isinstance(m, dict) for m in retrieval_models):
+                raise ValueError("Retrieval models must be a list of retrieval settings")
+            if len(retrieval_models) > BATCH_HIT_TESTING_MAX_RETRIEVAL_MODELS:
+                raise ValueError(f"Retrieval models cannot exceed {BATCH_HIT_TESTING_MAX_RETRIEVAL_MODELS}")
+
     @staticmethod
     def escape_query_for_search(query: str) -> str:
         return query.replace('"', '\\"')
@@ -14,6 +14,7 @@ from extensions.ext_database import db
 from libs.infinite_scroll_pagination import InfiniteScrollPagination
 from models.account import Account
 from models.model import App, AppMode, AppModelConfig, EndUser, Message, MessageFeedback
+from services.app_data_archive_service import AppDataArchiveService
 from services.conversation_service import ConversationService
 from services.errors.conversation import ConversationCompletedError, ConversationNotExistsError
 from services.errors.message import (
@@ -46,12 +47,13 @@ class MessageService:
             app_model=app_model, user=user, conversation_id=conversation_id
         )
 
+        first_message = None
         if first_id:
             first_message = (
                 db.session.query(Message)
                 .filter(Message.conversation_id == conversation.id, Message.id == first_id)
                 .first()
-            )
+            ) or AppDataArchiveService.get_message(app_model.id, conversation, first_id)
 
             if not first_message:
                 raise FirstMessageNotExistsError()
@@ -76,6 +78,13 @@ class MessageService:
                 .all()
             )
 
+        # continue with the archived months once the messages left in the database run out
+        if len(history_messages) < limit:
+            before = history_messages[-1].created_at if history_messages else getattr(first_message, "created_at", None)
+            history_messages += AppDataArchiveService.get_messages(
+                app_model.id, conversation, before, limit - len(history_messages)
+            )
+
         has_more = False
         if len(history_messages) == limit:
             current_page_first_message = history_messages[-1]
@@ -89,7 +98,9 @@ class MessageService:
                 .count()
             )
 
-            if rest_count > 0:
+            if rest_count > 0 or AppDataArchiveService.get_messages(
+                app_model.id, conversation, current_page_first_message.created_at, 1
+            ):
                 has_more = True
 
         if order == "asc":
@@ -113,6 +113,7 @@ class OpsService:
         )
         db.session.add(trace_config_data)
         db.session.commit()
+        OpsTraceManager.clear_trace_instance_cache(app_id)
 
         return {"result": "success"}
 
@@ -152,6 +153,7 @@ class OpsService:
 
         current_trace_config.tracing_config = tracing_config
         db.session.commit()
+        OpsTraceManager.clear_trace_instance_cache(app_id)
 
         return current_trace_config.to_dict()
 
@@ -174,5 +176,6 @@ class OpsService:
 
         db.session.delete(trace_config)
         db.session.commit()
+        OpsTraceManager.clear_trace_instance_cache(app_id)
 
         return True
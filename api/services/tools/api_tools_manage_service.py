@@ -16,6 +16,7 @@ from core.tools.entities.tool_entities import (
 from core.tools.provider.api_tool_provider import ApiToolProviderController
 from core.tools.tool_label_manager import ToolLabelManager
 from core.tools.tool_manager import ToolManager
+from core.tools.tool_runtime_cache import ToolRuntimeCache
 from core.tools.utils.configuration import ToolConfigurationManager
 from core.tools.utils.parser import ApiBasedToolSchemaParser
 from extensions.ext_database import db
@@ -300,6 +301,7 @@ class ApiToolManageService:
 
         # delete cache
         tool_configuration.delete_tool_credentials_cache()
+        ToolRuntimeCache.invalidate(tenant_id, "api", provider.id)
 
         # update labels
         ToolLabelManager.update_tool_labels(provider_controller, labels)
@@ -326,6 +328,8 @@ class ApiToolManageService:
         db.session.delete(provider)
         db.session.commit()
 
+        ToolRuntimeCache.invalidate(tenant_id, "api", provider.id)
+
         return {"result": "success"}
 
     @staticmethod
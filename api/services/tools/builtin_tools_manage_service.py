@@ -11,6 +11,7 @@ from core.tools.provider.builtin._positions import BuiltinToolProviderSort
 from core.tools.provider.tool_provider import ToolProviderController
 from core.tools.tool_label_manager import ToolLabelManager
 from core.tools.tool_manager import ToolManager
+from core.tools.tool_runtime_cache import ToolRuntimeCache
 from core.tools.utils.configuration import ToolConfigurationManager
 from extensions.ext_database import db
 from models.tools import BuiltinToolProvider
@@ -125,6 +126,7 @@ class BuiltinToolManageService:
 
             # delete cache
             tool_configuration.delete_tool_credentials_cache()
+            ToolRuntimeCache.invalidate(tenant_id, "builtin", provider_name)
 
         return {"result": "success"}
 
@@ -175,6 +177,7 @@ class BuiltinToolManageService:
         provider_controller = ToolManager.get_builtin_provider(provider_name)
         tool_configuration = ToolConfigurationManager(tenant_id=tenant_id, provider_controller=provider_controller)
         tool_configuration.delete_tool_credentials_cache()
+        ToolRuntimeCache.invalidate(tenant_id, "builtin", provider_name)
 
         return {"result": "success"}
 
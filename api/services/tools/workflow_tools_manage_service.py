@@ -9,6 +9,7 @@ from core.model_runtime.utils.encoders import jsonable_encoder
 from core.tools.entities.api_entities import UserToolProvider
 from core.tools.provider.workflow_tool_provider import WorkflowToolProviderController
 from core.tools.tool_label_manager import ToolLabelManager
+from core.tools.tool_runtime_cache import ToolRuntimeCache
 from core.tools.utils.workflow_configuration_sync import WorkflowToolConfigurationUtils
 from extensions.ext_database import db
 from models.model import App
@@ -163,6 +164,8 @@ class WorkflowToolManageService:
         db.session.add(workflow_tool_provider)
         db.session.commit()
 
+        ToolRuntimeCache.invalidate(tenant_id, "workflow", workflow_tool_provider.id)
+
         if labels is not None:
             ToolLabelManager.update_tool_labels(
                 ToolTransformService.workflow_provider_to_controller(workflow_tool_provider), labels
@@ -220,6 +223,8 @@ class WorkflowToolManageService:
 
         db.session.commit()
 
+        ToolRuntimeCache.invalidate(tenant_id, "workflow", workflow_tool_id)
+
         return {"result": "success"}
 
     @classmethod
@@ -0,0 +1,325 @@
+import json
+import logging
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Optional
+
+from flask import Flask, current_app
+from sqlalchemy import func, select
+
+from configs import dify_config
+from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory, Vector
+from core.rag.datasource.vdb.vector_type import VectorType
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from models.dataset import Dataset, DatasetCollectionBinding, DatasetVectorMigration, DocumentSegment
+from models.dataset import Document as DatasetDocument
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_TARGET_VECTOR_TYPES = {
+    VectorType.WEAVIATE,
+    VectorType.QDRANT,
+    VectorType.MILVUS,
+    VectorType.RELYT,
+    VectorType.TENCENT,
+    VectorType.PGVECTOR,
+    VectorType.OPENSEARCH,
+    VectorType.ANALYTICDB,
+    VectorType.ELASTICSEARCH,
+}
+
+
+class VectorMigrationProgress:
+    """
+    Counters of a migration, shared by its workers
+    """
+
+    def __init__(self, total_segments: int):
+        self.total_segments = total_segments
+        self.migrated_segments = 0
+        self.copied_vectors = 0
+        self.embedded_vectors = 0
+        self.migrated_datasets = 0
+        self.failed_datasets = 0
+        self.skipped_datasets = 0
+        self.started_at = time.perf_counter()
+        self._lock = Lock()
+
+    def add_batch(self, segment_count: int, copied_count: int) -> None:
+        with self._lock:
+            self.migrated_segments += segment_count
+            self.copied_vectors += copied_count
+            self.embedded_vectors += segment_count - copied_count
+
+    def add_dataset(self, migrated: bool) -> None:
+        with self._lock:
+            if migrated:
+                self.migrated_datasets += 1
+            else:
+                self.failed_datasets += 1
+
+    @property
+    def segments_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        return self.migrated_segments / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        segments_per_second = self.segments_per_second
+        if not segments_per_second:
+            return None
+        return max(self.total_segments - self.migrated_segments, 0) / segments_per_second
+
+    def __str__(self) -> str:
+        eta_seconds = self.eta_seconds
+        eta = f"{eta_seconds:.0f}s" if eta_seconds is not None else "unknown"
+        return (
+            f"{self.migrated_datasets} datasets migrated, {self.failed_datasets} failed,"
+            f" {self.skipped_datasets} skipped. {self.migrated_segments}/{self.total_segments} segments"
+            f" ({self.copied_vectors} vectors copied, {self.embedded_vectors} embedded),"
+            f" {self.segments_per_second:.1f} segments/s, ETA {eta}."
+        )
+
+
+class VectorMigrationService:
+    """
+    Migrate the vectors of the high quality datasets to the vector store of VECTOR_STORE.
+
+    The vectors of the segments are copied from the store a dataset is indexed in when it can return them, and the
+    others are taken from the embeddings cache or embedded again. Datasets are migrated in parallel by a pool of
+    workers, and the progress of every dataset is checkpointed after each batch of segments in
+    dataset_vector_migrations, so that a migration that was stopped resumes from its last batch. A dataset is only
+    switched to the new store once all its segments are migrated.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        batch_size: int = 500,
+        on_progress: Optional[Callable[[VectorMigrationProgress], None]] = None,
+        progress_interval: float = 10,
+    ):
+        self.vector_type = dify_config.VECTOR_STORE
+        if self.vector_type not in MIGRATION_TARGET_VECTOR_TYPES:
+            raise ValueError(f"Vector store {self.vector_type} is not supported.")
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self._reported_at = time.perf_counter()
+        self._report_lock = Lock()
+
+    def migrate(self) -> VectorMigrationProgress:
+        """
+        Migrate the datasets which are not indexed in the vector store yet
+        """
+        dataset_ids = []
+        skipped_count = 0
+        for dataset_id, index_struct in db.session.execute(
+            select(Dataset.id, Dataset.index_struct)
+            .where(Dataset.indexing_technique == "high_quality")
+            .order_by(Dataset.created_at.desc())
+        ):
+            if index_struct and json.loads(index_struct)["type"] == self.vector_type:
+                skipped_count += 1
+            else:
+                dataset_ids.append(dataset_id)
+
+        progress = VectorMigrationProgress(self._count_segments(dataset_ids))
+        progress.skipped_datasets = skipped_count
+        db.session.commit()
+
+        flask_app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._migrate_dataset_in_app, flask_app, dataset_id, progress)
+                for dataset_id in dataset_ids
+            ]
+            for future in as_completed(futures):
+                progress.add_dataset(future.result())
+                self._report(progress, force=True)
+
+        return progress
+
+    def migrate_dataset(self, dataset_id: str, progress: VectorMigrationProgress) -> None:
+        dataset = db.session.get(Dataset, dataset_id)
+        migration = (
+            db.session.query(DatasetVectorMigration)
+            .filter(
+                DatasetVectorMigration.dataset_id == dataset_id, DatasetVectorMigration.vector_type == self.vector_type
+            )
+            .first()
+        )
+        if not migration:
+            migration = DatasetVectorMigration(dataset_id=dataset_id, vector_type=self.vector_type, segment_count=0)
+            db.session.add(migration)
+        elif migration.status == "completed":
+            # the dataset was moved to another store after it was migrated to this one
+            migration.status = "migrating"
+            migration.last_segment_id = None
+            migration.segment_count = 0
+        resumed = migration.last_segment_id is not None
+
+        source_vector = self._get_source_vector(dataset)
+        target_index_struct = self._get_target_index_struct(dataset)
+        target_vector = Vector(
+            Dataset(
+                id=dataset.id,
+                tenant_id=dataset.tenant_id,
+                indexing_technique=dataset.indexing_technique,
+                embedding_model_provider=dataset.embedding_model_provider,
+                embedding_model=dataset.embedding_model,
+                collection_binding_id=dataset.collection_binding_id,
+                index_struct=json.dumps(target_index_struct),
+            )
+        )
+        if not resumed:
+            # clear what a migration of the dataset to the store left before its checkpoint was recorded
+            target_vector.delete()
+        db.session.commit()
+
+        while True:
+            query = (
+                db.session.query(DocumentSegment)
+                .join(DatasetDocument, DatasetDocument.id == DocumentSegment.document_id)
+                .filter(DocumentSegment.dataset_id == dataset_id, *self._get_segment_filters())
+            )
+            if migration.last_segment_id:
+                query = query.filter(DocumentSegment.id > migration.last_segment_id)
+            segments = query.order_by(DocumentSegment.id).limit(self.batch_size).all()
+            if not segments:
+                break
+
+            documents = [
+                Document(
+                    page_content=segment.content,
+                    metadata={
+                        "doc_id": segment.index_node_id,
+                        "doc_hash": segment.index_node_hash,
+                        "document_id": segment.document_id,
+                        "dataset_id": segment.dataset_id,
+                    },
+                )
+                for segment in segments
+            ]
+            embeddings, copied_count = self._get_embeddings(source_vector, target_vector, documents)
+            if resumed:
+                # the batch after the checkpoint may have been written before the migration stopped
+                target_vector.delete_by_ids([document.metadata["doc_id"] for document in documents])
+                resumed = False
+            target_vector.create_with_embeddings(documents, embeddings)
+
+            migration.last_segment_id = segments[-1].id
+            migration.segment_count += len(segments)
+            migration.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            db.session.commit()
+            progress.add_batch(len(segments), copied_count)
+            self._report(progress)
+
+        dataset.index_struct = json.dumps(target_index_struct)
+        migration.status = "completed"
+        migration.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.session.commit()
+
+    def _migrate_dataset_in_app(self, flask_app: Flask, dataset_id: str, progress: VectorMigrationProgress) -> bool:
+        with flask_app.app_context():
+            try:
+                self.migrate_dataset(dataset_id, progress)
+                logger.info(f"Migrated dataset {dataset_id} to {self.vector_type}.")
+                return True
+            except Exception:
+                db.session.rollback()
+                logger.exception(f"Failed to migrate dataset {dataset_id} to {self.vector_type}.")
+                return False
+
+    def _get_source_vector(self, dataset: Dataset) -> Optional[Vector]:
+        if not dataset.index_struct_dict:
+            return None
+        try:
+            return Vector(dataset)
+        except Exception:
+            # the store the dataset was indexed in may not be configured anymore
+            logger.warning(f"Vector store of dataset {dataset.id} is unavailable, its vectors are not copied.")
+            return None
+
+    def _get_target_index_struct(self, dataset: Dataset) -> dict:
+        collection_name = Dataset.gen_collection_name_by_id(dataset.id)
+        if self.vector_type == VectorType.QDRANT and dataset.collection_binding_id:
+            dataset_collection_binding = (
+                db.session.query(DatasetCollectionBinding)
+                .filter(DatasetCollectionBinding.id == dataset.collection_binding_id)
+                .one_or_none()
+            )
+            if not dataset_collection_binding:
+                raise ValueError("Dataset Collection Binding not found")
+            collection_name = dataset_collection_binding.collection_name
+        return AbstractVectorFactory.gen_index_struct_dict(VectorType(self.vector_type), collection_name)
+
+    @staticmethod
+    def _get_embeddings(
+        source_vector: Optional[Vector], target_vector: Vector, documents: Sequence[Document]
+    ) -> tuple[list[list[float]], int]:
+        """
+        Get the vectors of documents, copied from the source store when it has them
+
+        :return: vector of each document, and number of vectors copied
+        """
+        copied_embeddings = {}
+        if source_vector:
+            try:
+                copied_embeddings = source_vector.get_embeddings_by_ids(
+                    [document.metadata["doc_id"] for document in documents]
+                )
+            except Exception:
+                logger.warning("Failed to read vectors from the source store, they are embedded again.", exc_info=True)
+
+        missing_documents = [document for document in documents if document.metadata["doc_id"] not in copied_embeddings]
+        # texts embedded before are read from the embeddings cache
+        embedded = iter(target_vector.embed_documents([document.page_content for document in missing_documents]))
+        embeddings = [
+            copied_embeddings[document.metadata["doc_id"]]
+            if document.metadata["doc_id"] in copied_embeddings
+            else next(embedded)
+            for document in documents
+        ]
+        return embeddings, len(documents) - len(missing_documents)
+
+    def _count_segments(self, dataset_ids: Sequence[str]) -> int:
+        migrating_dataset_ids = set(dataset_ids)
+        segment_counts = db.session.execute(
+            select(DocumentSegment.dataset_id, func.count())
+            .join(DatasetDocument, DatasetDocument.id == DocumentSegment.document_id)
+            .where(*self._get_segment_filters())
+            .group_by(DocumentSegment.dataset_id)
+        )
+        total = sum(count for dataset_id, count in segment_counts if dataset_id in migrating_dataset_ids)
+        migrated = db.session.execute(
+            select(DatasetVectorMigration.dataset_id, DatasetVectorMigration.segment_count).where(
+                DatasetVectorMigration.vector_type == self.vector_type, DatasetVectorMigration.status == "migrating"
+            )
+        )
+        return total - sum(count for dataset_id, count in migrated if dataset_id in migrating_dataset_ids)
+
+    @staticmethod
+    def _get_segment_filters() -> list:
+        return [
+            DatasetDocument.indexing_status == "completed",
+            DatasetDocument.enabled == True,
+            DatasetDocument.archived == False,
+            DocumentSegment.status == "completed",
+            DocumentSegment.enabled == True,
+        ]
+
+    def _report(self, progress: VectorMigrationProgress, force: bool = False) -> None:
+        if not self.on_progress:
+            return
+        with self._report_lock:
+            now = time.perf_counter()
+            if not force and now - self._reported_at < self.progress_interval:
+                return
+            self._reported_at = now
+            self.on_progress(progress)
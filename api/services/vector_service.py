@@ -4,6 +4,7 @@ from core.rag.datasource.keyword.keyword_factory import Keyword
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from models.dataset import Dataset, DocumentSegment
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
 
 
 class VectorService:
@@ -27,6 +28,7 @@ class VectorService:
             # save vector index
             vector = Vector(dataset=dataset)
             vector.add_texts(documents, duplicate_check=True)
+        DatasetVectorRebuildService.index_documents(dataset, documents)
 
         # save keyword index
         keyword = Keyword(dataset)
@@ -55,6 +57,7 @@ class VectorService:
             vector = Vector(dataset=dataset)
             vector.delete_by_ids([segment.index_node_id])
             vector.add_texts([document], duplicate_check=True)
+        DatasetVectorRebuildService.index_documents(dataset, [document])
 
         # update keyword index
         keyword = Keyword(dataset)
@@ -7,6 +7,7 @@ from models.workflow import (
     WorkflowNodeExecutionTriggeredFrom,
     WorkflowRun,
 )
+from services.app_data_archive_service import AppDataArchiveService
 
 
 class WorkflowRunService:
@@ -60,10 +61,11 @@ class WorkflowRunService:
             WorkflowRun.triggered_from == WorkflowRunTriggeredFrom.DEBUGGING.value,
         )
 
+        last_workflow_run = None
         if args.get("last_id"):
             last_workflow_run = base_query.filter(
                 WorkflowRun.id == args.get("last_id"),
-            ).first()
+            ).first() or AppDataArchiveService.get_workflow_run(app_model.id, args.get("last_id"))
 
             if not last_workflow_run:
                 raise ValueError("Last workflow run not exists")
@@ -79,6 +81,13 @@ class WorkflowRunService:
         else:
             workflow_runs = base_query.order_by(WorkflowRun.created_at.desc()).limit(limit).all()
 
+        # continue with the archived months once the workflow runs left in the database run out
+        if len(workflow_runs) < limit:
+            before = workflow_runs[-1].created_at if workflow_runs else getattr(last_workflow_run, "created_at", None)
+            workflow_runs += AppDataArchiveService.get_workflow_runs(
+                app_model.id, WorkflowRunTriggeredFrom.DEBUGGING.value, before, limit - len(workflow_runs)
+            )
+
         has_more = False
         if len(workflow_runs) == limit:
             current_page_first_workflow_run = workflow_runs[-1]
@@ -87,7 +96,9 @@ class WorkflowRunService:
                 WorkflowRun.id != current_page_first_workflow_run.id,
             ).count()
 
-            if rest_count > 0:
+            if rest_count > 0 or AppDataArchiveService.get_workflow_runs(
+                app_model.id, WorkflowRunTriggeredFrom.DEBUGGING.value, current_page_first_workflow_run.created_at, 1
+            ):
                 has_more = True
 
         return InfiniteScrollPagination(data=workflow_runs, limit=limit, has_more=has_more)
@@ -109,6 +120,9 @@ class WorkflowRunService:
             .first()
         )
 
+        if not workflow_run:
+            workflow_run = AppDataArchiveService.get_workflow_run(app_model.id, run_id)
+
         return workflow_run
 
     def get_workflow_run_node_executions(self, app_model: App, run_id: str) -> list[WorkflowNodeExecution]:
@@ -133,4 +147,7 @@ class WorkflowRunService:
             .all()
         )
 
+        if not node_executions:
+            node_executions = AppDataArchiveService.get_workflow_node_executions(app_model.id, workflow_run)
+
         return node_executions
@@ -12,6 +12,7 @@ from core.workflow.entities.node_entities import NodeRunResult
 from core.workflow.errors import WorkflowNodeRunFailedError
 from core.workflow.nodes.event import RunCompletedEvent
 from core.workflow.nodes.node_mapping import node_classes
+from core.workflow.utils.node_payload_storage import set_node_payloads
 from core.workflow.workflow_entry import WorkflowEntry
 from enums import NodeType
 from events.app_event import app_draft_workflow_was_synced, app_published_workflow_was_updated
@@ -262,12 +263,11 @@ class WorkflowService:
 
         if run_succeeded and node_run_result:
             # create workflow node execution
-            workflow_node_execution.inputs = json.dumps(node_run_result.inputs) if node_run_result.inputs else None
-            workflow_node_execution.process_data = (
-                json.dumps(node_run_result.process_data) if node_run_result.process_data else None
-            )
-            workflow_node_execution.outputs = (
-                json.dumps(jsonable_encoder(node_run_result.outputs)) if node_run_result.outputs else None
+            set_node_payloads(
+                workflow_node_execution,
+                node_run_result.inputs,
+                node_run_result.process_data,
+                jsonable_encoder(node_run_result.outputs),
             )
             workflow_node_execution.execution_metadata = (
                 json.dumps(jsonable_encoder(node_run_result.metadata)) if node_run_result.metadata else None
@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task
 
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from models.dataset import Dataset
@@ -46,6 +47,7 @@ def add_annotation_to_index_task(
         vector = Vector(dataset, attributes=["doc_id", "annotation_id", "app_id"])
         vector.create([document], duplicate_check=True)
 
+        AnnotationIndex.invalidate(app_id)
         end_at = time.perf_counter()
         logging.info(
             click.style(
@@ -5,6 +5,7 @@ import click
 from celery import shared_task
 from werkzeug.exceptions import NotFound
 
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from extensions.ext_database import db
@@ -73,6 +74,7 @@ def batch_import_annotations_task(job_id: str, content_list: list[dict], app_id:
 
             db.session.commit()
             redis_client.setex(indexing_cache_key, 600, "completed")
+            AnnotationIndex.invalidate(app_id)
             end_at = time.perf_counter()
             logging.info(
                 click.style(
@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task
 
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from models.dataset import Dataset
 from services.dataset_service import DatasetCollectionBindingService
@@ -33,6 +34,7 @@ def delete_annotation_index_task(annotation_id: str, app_id: str, tenant_id: str
             vector.delete_by_metadata_field("annotation_id", annotation_id)
         except Exception:
             logging.exception("Delete annotation index failed when annotation deleted.")
+        AnnotationIndex.invalidate(app_id)
         end_at = time.perf_counter()
         logging.info(
             click.style("App annotations index deleted : {} latency: {}".format(app_id, end_at - start_at), fg="green")
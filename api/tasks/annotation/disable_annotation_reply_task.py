@@ -5,6 +5,8 @@ import click
 from celery import shared_task
 from werkzeug.exceptions import NotFound
 
+from core.app.app_config.app_config_cache import AppConfigCache
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
@@ -55,6 +57,9 @@ def disable_annotation_reply_task(job_id: str, app_id: str, tenant_id: str):
         db.session.delete(app_annotation_setting)
         db.session.commit()
 
+        AnnotationIndex.invalidate(app_id)
+        # the annotation reply setting is part of the app model config dict
+        AppConfigCache.invalidate(app_id)
         end_at = time.perf_counter()
         logging.info(
             click.style("App annotations index deleted : {} latency: {}".format(app_id, end_at - start_at), fg="green")
@@ -6,6 +6,8 @@ import click
 from celery import shared_task
 from werkzeug.exceptions import NotFound
 
+from core.app.app_config.app_config_cache import AppConfigCache
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from extensions.ext_database import db
@@ -88,6 +90,9 @@ def enable_annotation_reply_task(
             vector.create(documents)
         db.session.commit()
         redis_client.setex(enable_app_annotation_job_key, 600, "completed")
+        AnnotationIndex.invalidate(app_id)
+        # the annotation reply setting is part of the app model config dict
+        AppConfigCache.invalidate(app_id)
         end_at = time.perf_counter()
         logging.info(
             click.style("App annotations added to index: {} latency: {}".format(app_id, end_at - start_at), fg="green")
@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task
 
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from models.dataset import Dataset
@@ -47,6 +48,7 @@ def update_annotation_to_index_task(
         vector = Vector(dataset, attributes=["doc_id", "annotation_id", "app_id"])
         vector.delete_by_metadata_field("annotation_id", annotation_id)
         vector.add_texts([document])
+        AnnotationIndex.invalidate(app_id)
         end_at = time.perf_counter()
         logging.info(
             click.style(
@@ -7,6 +7,7 @@ import click
 from celery import shared_task
 from sqlalchemy import func
 
+from configs import dify_config
 from core.indexing_runner import IndexingRunner
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
@@ -47,7 +48,6 @@ def batch_create_segment_to_index_task(
 
         if not dataset_document.enabled or dataset_document.archived or dataset_document.indexing_status != "completed":
             raise ValueError("Document is not available.")
-        document_segments = []
         embedding_model = None
         if dataset.indexing_technique == "high_quality":
             model_manager = ModelManager()
@@ -58,44 +58,61 @@ def batch_create_segment_to_index_task(
                 model=dataset.embedding_model,
             )
 
-        for segment in content:
-            content = segment["content"]
-            doc_id = str(uuid.uuid4())
-            segment_hash = helper.generate_text_hash(content)
+        # positions are assigned from a single lookup instead of one max() query per row
+        max_position = (
+            db.session.query(func.max(DocumentSegment.position))
+            .filter(DocumentSegment.document_id == dataset_document.id)
+            .scalar()
+        ) or 0
+
+        indexing_runner = IndexingRunner()
+        chunk_size = dify_config.SEGMENT_BATCH_IMPORT_CHUNK_SIZE
+        for i in range(0, len(content), chunk_size):
+            rows = content[i : i + chunk_size]
+            texts = [row["content"] for row in rows]
             # calc embedding use tokens
-            tokens = embedding_model.get_text_embedding_num_tokens(texts=[content]) if embedding_model else 0
-            max_position = (
-                db.session.query(func.max(DocumentSegment.position))
-                .filter(DocumentSegment.document_id == dataset_document.id)
-                .scalar()
-            )
-            segment_document = DocumentSegment(
-                tenant_id=tenant_id,
-                dataset_id=dataset_id,
-                document_id=document_id,
-                index_node_id=doc_id,
-                index_node_hash=segment_hash,
-                position=max_position + 1 if max_position else 1,
-                content=content,
-                word_count=len(content),
-                tokens=tokens,
-                created_by=user_id,
-                indexing_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
-                status="completed",
-                completed_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+            if embedding_model:
+                tokens_list = embedding_model.get_text_embedding_num_tokens_batch(texts=texts)
+            else:
+                tokens_list = [0] * len(texts)
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            segment_mappings = []
+            for row, text, tokens in zip(rows, texts, tokens_list):
+                max_position += 1
+                segment_mapping = {
+                    "id": str(uuid.uuid4()),
+                    "tenant_id": tenant_id,
+                    "dataset_id": dataset_id,
+                    "document_id": document_id,
+                    "index_node_id": str(uuid.uuid4()),
+                    "index_node_hash": helper.generate_text_hash(text),
+                    "position": max_position,
+                    "content": text,
+                    "word_count": len(text),
+                    "tokens": tokens,
+                    "created_by": user_id,
+                    "indexing_at": now,
+                    "status": "completed",
+                    "completed_at": now,
+                }
+                if dataset_document.doc_form == "qa_model":
+                    segment_mapping["answer"] = row["answer"]
+                segment_mappings.append(segment_mapping)
+            db.session.bulk_insert_mappings(DocumentSegment, segment_mappings)
+            # add index to db, the vector store embeds the chunk in max_chunks sized batches
+            indexing_runner.batch_add_segments(
+                [DocumentSegment(**segment_mapping) for segment_mapping in segment_mappings], dataset
             )
-            if dataset_document.doc_form == "qa_model":
-                segment_document.answer = segment["answer"]
-            db.session.add(segment_document)
-            document_segments.append(segment_document)
-        # add index to db
-        indexing_runner = IndexingRunner()
-        indexing_runner.batch_add_segments(document_segments, dataset)
         db.session.commit()
         redis_client.setex(indexing_cache_key, 600, "completed")
         end_at = time.perf_counter()
         logging.info(
-            click.style("Segment batch created job: {} latency: {}".format(job_id, end_at - start_at), fg="green")
+            click.style(
+                "Segment batch created job: {} segments: {} latency: {}".format(
+                    job_id, len(content), end_at - start_at
+                ),
+                fg="green",
+            )
         )
     except Exception as e:
         logging.exception("Segments batch created index failed:{}".format(str(e)))
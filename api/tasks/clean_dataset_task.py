@@ -1,12 +1,15 @@
+import json
 import logging
 import time
 
 import click
 from celery import shared_task
+from sqlalchemy import select
 
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from extensions.ext_database import db
 from extensions.ext_storage import storage
+from libs.bulk_delete import BulkDeleter, BulkDeleteTarget
 from models.dataset import (
     AppDatasetJoin,
     Dataset,
@@ -16,6 +19,7 @@ from models.dataset import (
     DocumentSegment,
 )
 from models.model import UploadFile
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
 
 
 # Add import statement for ValueError
@@ -50,10 +54,17 @@ def clean_dataset_task(
             index_struct=index_struct,
             collection_binding_id=collection_binding_id,
         )
-        documents = db.session.query(Document).filter(Document.dataset_id == dataset_id).all()
-        segments = db.session.query(DocumentSegment).filter(DocumentSegment.dataset_id == dataset_id).all()
+        # read the columns needed to delete the upload files, rather than loading the documents
+        upload_file_documents = db.session.execute(
+            select(Document.tenant_id, Document.data_source_info).where(
+                Document.dataset_id == dataset_id, Document.data_source_type == "upload_file"
+            )
+        ).all()
+        has_documents = db.session.query(Document.id).filter(Document.dataset_id == dataset_id).first() is not None
+        # the shadow collection of a rebuild in progress is not an index of the dataset yet
+        DatasetVectorRebuildService.delete(dataset)
 
-        if documents is None or len(documents) == 0:
+        if not has_documents:
             logging.info(click.style("No documents found for dataset: {}".format(dataset_id), fg="green"))
         else:
             logging.info(click.style("Cleaning documents for dataset: {}".format(dataset_id), fg="green"))
@@ -63,36 +74,36 @@ def clean_dataset_task(
             index_processor = IndexProcessorFactory(doc_form).init_index_processor()
             index_processor.clean(dataset, None)
 
-            for document in documents:
-                db.session.delete(document)
-
-            for segment in segments:
-                db.session.delete(segment)
+        # end the read transaction, which would keep vacuum from reclaiming the rows deleted below
+        db.session.commit()
+        BulkDeleter(job_id=f"clean_dataset:{dataset_id}").delete(
+            [
+                BulkDeleteTarget("document", Document, Document.dataset_id == dataset_id),
+                BulkDeleteTarget("segment", DocumentSegment, DocumentSegment.dataset_id == dataset_id),
+            ]
+        )
 
         db.session.query(DatasetProcessRule).filter(DatasetProcessRule.dataset_id == dataset_id).delete()
         db.session.query(DatasetQuery).filter(DatasetQuery.dataset_id == dataset_id).delete()
         db.session.query(AppDatasetJoin).filter(AppDatasetJoin.dataset_id == dataset_id).delete()
 
         # delete files
-        if documents:
-            for document in documents:
-                try:
-                    if document.data_source_type == "upload_file":
-                        if document.data_source_info:
-                            data_source_info = document.data_source_info_dict
-                            if data_source_info and "upload_file_id" in data_source_info:
-                                file_id = data_source_info["upload_file_id"]
-                                file = (
-                                    db.session.query(UploadFile)
-                                    .filter(UploadFile.tenant_id == document.tenant_id, UploadFile.id == file_id)
-                                    .first()
-                                )
-                                if not file:
-                                    continue
-                                storage.delete(file.key)
-                                db.session.delete(file)
-                except Exception:
-                    continue
+        for document_tenant_id, data_source_info in upload_file_documents:
+            try:
+                data_source_info = json.loads(data_source_info) if data_source_info else None
+                if data_source_info and "upload_file_id" in data_source_info:
+                    file_id = data_source_info["upload_file_id"]
+                    file = (
+                        db.session.query(UploadFile)
+                        .filter(UploadFile.tenant_id == document_tenant_id, UploadFile.id == file_id)
+                        .first()
+                    )
+                    if not file:
+                        continue
+                    storage.delete(file.key)
+                    db.session.delete(file)
+            except Exception:
+                continue
 
         db.session.commit()
         end_at = time.perf_counter()
@@ -4,10 +4,12 @@ from typing import Optional
 
 import click
 from celery import shared_task
+from sqlalchemy import select
 
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from extensions.ext_database import db
 from extensions.ext_storage import storage
+from libs.bulk_delete import BulkDeleter, BulkDeleteTarget
 from models.dataset import Dataset, DocumentSegment
 from models.model import UploadFile
 
@@ -32,17 +34,18 @@ def clean_document_task(document_id: str, dataset_id: str, doc_form: str, file_i
         if not dataset:
             raise Exception("Document has no dataset")
 
-        segments = db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).all()
+        index_node_ids = db.session.scalars(
+            select(DocumentSegment.index_node_id).where(DocumentSegment.document_id == document_id)
+        ).all()
         # check segment is exist
-        if segments:
-            index_node_ids = [segment.index_node_id for segment in segments]
+        if index_node_ids:
             index_processor = IndexProcessorFactory(doc_form).init_index_processor()
-            index_processor.clean(dataset, index_node_ids)
-
-            for segment in segments:
-                db.session.delete(segment)
+            index_processor.clean(dataset, list(index_node_ids))
 
             db.session.commit()
+            BulkDeleter(job_id=f"clean_document:{document_id}").delete_target(
+                BulkDeleteTarget("segment", DocumentSegment, DocumentSegment.document_id == document_id)
+            )
         if file_id:
             file = db.session.query(UploadFile).filter(UploadFile.id == file_id).first()
             if file:
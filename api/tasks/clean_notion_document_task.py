@@ -3,9 +3,11 @@ import time
 
 import click
 from celery import shared_task
+from sqlalchemy import select
 
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from extensions.ext_database import db
+from libs.bulk_delete import BulkDeleter, BulkDeleteTarget
 from models.dataset import Dataset, Document, DocumentSegment
 
 
@@ -30,18 +32,20 @@ def clean_notion_document_task(document_ids: list[str], dataset_id: str):
             raise Exception("Document has no dataset")
         index_type = dataset.doc_form
         index_processor = IndexProcessorFactory(index_type).init_index_processor()
-        for document_id in document_ids:
-            document = db.session.query(Document).filter(Document.id == document_id).first()
-            db.session.delete(document)
+        index_node_ids = db.session.scalars(
+            select(DocumentSegment.index_node_id).where(DocumentSegment.document_id.in_(document_ids))
+        ).all()
+        # an empty list of node ids would clean the whole index of the dataset
+        if index_node_ids:
+            index_processor.clean(dataset, list(index_node_ids))
 
-            segments = db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).all()
-            index_node_ids = [segment.index_node_id for segment in segments]
-
-            index_processor.clean(dataset, index_node_ids)
-
-            for segment in segments:
-                db.session.delete(segment)
         db.session.commit()
+        BulkDeleter(job_id=f"clean_notion_document:{dataset_id}").delete(
+            [
+                BulkDeleteTarget("document", Document, Document.id.in_(document_ids)),
+                BulkDeleteTarget("segment", DocumentSegment, DocumentSegment.document_id.in_(document_ids)),
+            ]
+        )
         end_at = time.perf_counter()
         logging.info(
             click.style(
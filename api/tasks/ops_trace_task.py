@@ -1,5 +1,6 @@
 import logging
 import time
+from collections import defaultdict
 
 from celery import shared_task
 from flask import current_app
@@ -14,16 +15,47 @@ from models.workflow import WorkflowRun
 def process_trace_tasks(tasks_data):
     """
     Async process trace tasks
-    :param tasks_data: List of dictionaries containing task data
+    :param tasks_data: List of dictionaries containing task data, or a single one from older producers
 
     Usage: process_trace_tasks.delay(tasks_data)
     """
-    from core.ops.ops_trace_manager import OpsTraceManager
+    from core.ops.ops_trace_manager import OpsTraceManager, TraceExporterBackoff
 
-    trace_info = tasks_data.get("trace_info")
-    app_id = tasks_data.get("app_id")
-    trace_info_type = tasks_data.get("trace_info_type")
-    trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
+    if isinstance(tasks_data, dict):
+        tasks_data = [tasks_data]
+
+    tasks_data_by_app = defaultdict(list)
+    for task_data in tasks_data:
+        tasks_data_by_app[task_data.get("app_id")].append(task_data)
+
+    for app_id, app_tasks_data in tasks_data_by_app.items():
+        if TraceExporterBackoff.is_backing_off(app_id):
+            TraceExporterBackoff.record_dropped(app_id, len(app_tasks_data))
+            continue
+
+        try:
+            # cached per app, the config is not decrypted and the client not created for every trace
+            trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
+            if not trace_instance:
+                continue
+
+            with current_app.app_context():
+                trace_infos = [_load_trace_info(task_data) for task_data in app_tasks_data]
+                start_at = time.perf_counter()
+                failure_count = trace_instance.trace_batch(trace_infos)
+                if failure_count:
+                    logging.warning(f"Failed to trace {failure_count} of {len(trace_infos)} traces of app {app_id}")
+                TraceExporterBackoff.record_export(
+                    app_id, time.perf_counter() - start_at, failure_ratio=failure_count / len(trace_infos)
+                )
+        except Exception:
+            logging.exception("Processing trace tasks failed")
+            TraceExporterBackoff.record_failure(app_id)
+
+
+def _load_trace_info(task_data: dict):
+    trace_info = task_data.get("trace_info")
+    trace_info_type = task_data.get("trace_info_type")
 
     if trace_info.get("message_data"):
         trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
@@ -32,13 +64,7 @@ def process_trace_tasks(tasks_data):
     if trace_info.get("documents"):
         trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
 
-    try:
-        if trace_instance:
-            with current_app.app_context():
-                trace_type = trace_info_info_map.get(trace_info_type)
-                if trace_type:
-                    trace_info = trace_type(**trace_info)
-                trace_instance.trace(trace_info)
-            end_at = time.perf_counter()
-    except Exception:
-        logging.exception("Processing trace tasks failed")
+    trace_type = trace_info_info_map.get(trace_info_type)
+    if trace_type:
+        trace_info = trace_type(**trace_info)
+    return trace_info
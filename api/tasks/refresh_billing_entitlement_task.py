@@ -0,0 +1,32 @@
+import logging
+import time
+
+import click
+from celery import shared_task
+
+from services.feature_service import FeatureService
+
+
+@shared_task(queue="billing")
+def refresh_billing_entitlement_task(tenant_id: str):
+    """
+    Async refresh the billing entitlement snapshot of a tenant from Stripe
+    :param tenant_id:
+
+    Usage: refresh_billing_entitlement_task.delay(tenant_id)
+    """
+    logging.info(click.style("Start refresh billing entitlement for tenant: {}".format(tenant_id), fg="green"))
+    start_at = time.perf_counter()
+
+    try:
+        FeatureService.refresh_billing_entitlement(tenant_id)
+        end_at = time.perf_counter()
+        logging.info(
+            click.style(
+                "Billing entitlement refreshed for tenant: {} latency: {}".format(tenant_id, end_at - start_at),
+                fg="green",
+            )
+        )
+    except Exception:
+        # keep serving the previous snapshot, the next webhook or reconciliation run will retry
+        logging.exception("Refresh billing entitlement for tenant {} failed".format(tenant_id))
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.app.app_config.app_config_cache import AppConfigCache
+from core.app.app_config.entities import AppAdditionalFeatures
+from core.app.apps.workflow.app_config_manager import WorkflowAppConfig, WorkflowAppConfigManager
+from models.model import AppMode
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    AppConfigCache.clear()
+    yield
+    AppConfigCache.clear()
+
+
+def _build_app_config() -> WorkflowAppConfig:
+    return WorkflowAppConfig(
+        tenant_id="tenant",
+        app_id="app",
+        app_mode=AppMode.WORKFLOW,
+        workflow_id="workflow",
+        additional_features=AppAdditionalFeatures(),
+    )
+
+
+def test_app_config_is_built_once_and_copied():
+    builder = MagicMock(side_effect=_build_app_config)
+
+    with patch("redis.Redis.get", return_value=b"1"):
+        first = AppConfigCache.get_or_build("app", ("workflow",), builder)
+        first.additional_features.show_retrieve_source = True
+        second = AppConfigCache.get_or_build("app", ("workflow",), builder)
+
+    assert builder.call_count == 1
+    assert second.additional_features.show_retrieve_source is False
+
+
+def test_app_config_is_rebuilt_after_invalidation():
+    builder = MagicMock(side_effect=_build_app_config)
+
+    with patch("redis.Redis.get", return_value=None):
+        AppConfigCache.get_or_build("app", ("workflow",), builder)
+    with patch("redis.Redis.incr") as mock_incr:
+        AppConfigCache.invalidate("app")
+    with patch("redis.Redis.get", return_value=b"1"):
+        AppConfigCache.get_or_build("app", ("workflow",), builder)
+
+    mock_incr.assert_called_once_with("app_config_generation:app_id:app")
+    assert builder.call_count == 2
+
+
+def test_draft_workflow_app_config_is_not_cached():
+    app_model = MagicMock(id="app", tenant_id="tenant", mode=AppMode.WORKFLOW.value)
+    workflow = MagicMock(id="workflow", version="draft")
+
+    with (
+        patch.object(WorkflowAppConfigManager, "_build_app_config", return_value=_build_app_config()) as mock_build,
+        patch.object(AppConfigCache, "get_or_build") as mock_get_or_build,
+    ):
+        WorkflowAppConfigManager.get_app_config(app_model, workflow)
+        WorkflowAppConfigManager.get_app_config(app_model, workflow)
+
+    assert mock_build.call_count == 2
+    mock_get_or_build.assert_not_called()
@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from core.app.features.annotation_reply import annotation_index
+from core.app.features.annotation_reply.annotation_index import AnnotationIndex
+from models.dataset import Dataset
+from models.model import MessageAnnotation
+
+
+@pytest.fixture(autouse=True)
+def clean_indexes():
+    AnnotationIndex.clear()
+    yield
+    AnnotationIndex.clear()
+
+
+@pytest.fixture
+def config():
+    with patch.object(annotation_index, "dify_config", MagicMock(ANNOTATION_IN_MEMORY_INDEX_MAX_SIZE=1000)) as config:
+        yield config
+
+
+def _dataset() -> Dataset:
+    return Dataset(id="app", tenant_id="tenant", embedding_model_provider="openai", embedding_model="ada")
+
+
+def test_question_hash_ignores_case_whitespace_and_trailing_punctuation():
+    assert MessageAnnotation.normalize_question("  How do I   reset my password?? ") == "how do i reset my password"
+    assert MessageAnnotation.generate_question_hash("How do I reset my password") == (
+        MessageAnnotation.generate_question_hash("how do i  reset my password？")
+    )
+    assert MessageAnnotation.generate_question_hash(" ?! ") is None
+
+
+def test_search_returns_closest_question_above_threshold():
+    embedding = MagicMock()
+    embeddings = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    index = AnnotationIndex(["first", "second"], embeddings, embedding)
+
+    embedding.embed_query.return_value = [0.1, 2.0]
+    annotation_id, score = index.search("query", score_threshold=0.9)
+    assert annotation_id == "second"
+    assert score == pytest.approx(2.0 / np.sqrt(4.01))
+
+    embedding.embed_query.return_value = [1.0, 1.0]
+    assert index.search("query", score_threshold=0.9) is None
+
+
+def test_index_is_rebuilt_after_invalidation(config):
+    with patch.object(AnnotationIndex, "_build", side_effect=lambda dataset: MagicMock()) as mock_build:
+        with patch("redis.Redis.get", return_value=None):
+            first = AnnotationIndex.get(_dataset())
+            assert AnnotationIndex.get(_dataset()) is first
+        with patch("redis.Redis.incr") as mock_incr:
+            AnnotationIndex.invalidate("app")
+        with patch("redis.Redis.get", return_value=b"1"):
+            second = AnnotationIndex.get(_dataset())
+
+    mock_incr.assert_called_once_with("annotation_index_generation:app_id:app")
+    assert mock_build.call_count == 2
+    assert second is not first
+
+
+def test_index_is_disabled_when_max_size_is_zero(config):
+    config.ANNOTATION_IN_MEMORY_INDEX_MAX_SIZE = 0
+    with patch.object(AnnotationIndex, "_build") as mock_build:
+        assert AnnotationIndex.get(_dataset()) is None
+    mock_build.assert_not_called()
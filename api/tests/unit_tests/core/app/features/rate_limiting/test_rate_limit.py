@@ -0,0 +1,101 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from core.app.features.rate_limiting.rate_limit import RateLimit, RateLimitRule, RateLimitScope
+from core.app.features.rate_limiting.rate_limit_metrics import RateLimitMetrics
+from core.errors.error import AppInvokeQuotaExceededError
+
+
+@pytest.fixture(autouse=True)
+def clean_local_state():
+    RateLimit.clear_local_state()
+    RateLimitMetrics.reset()
+    yield
+    RateLimit.clear_local_state()
+    RateLimitMetrics.reset()
+
+
+def test_unlimited_request_skips_redis():
+    rate_limit = RateLimit([RateLimitRule(scope=RateLimitScope.APP, scope_id="app")])
+
+    with patch("redis.Redis.evalsha") as mock_evalsha:
+        request_id = rate_limit.enter()
+
+    assert request_id == RateLimit._UNLIMITED_REQUEST_ID
+    mock_evalsha.assert_not_called()
+
+
+def test_all_scopes_are_checked_in_one_script_call():
+    rate_limit = RateLimit(
+        [
+            RateLimitRule(scope=RateLimitScope.APP, scope_id="app", max_active_requests=2, requests_per_minute=60),
+            RateLimitRule(scope=RateLimitScope.END_USER, scope_id="user", llm_tokens_per_minute=1000),
+        ]
+    )
+
+    with patch("redis.Redis.evalsha", return_value=[0, 0]) as mock_evalsha:
+        rate_limit.enter("request")
+
+    mock_evalsha.assert_called_once()
+    keys = mock_evalsha.call_args.args[2:6]
+    assert keys == (
+        "dify:rate_limit:rejections",
+        "dify:rate_limit:app:app:active_requests",
+        "dify:rate_limit:app:app:requests_per_minute",
+        "dify:rate_limit:end_user:user:llm_tokens_per_minute",
+    )
+
+
+def test_local_active_requests_reject_without_redis():
+    rate_limit = RateLimit([RateLimitRule(scope=RateLimitScope.APP, scope_id="app", max_active_requests=1)])
+
+    with patch("redis.Redis.evalsha", return_value=[0, 0]) as mock_evalsha:
+        rate_limit.enter("first")
+        with pytest.raises(AppInvokeQuotaExceededError):
+            rate_limit.enter("second")
+
+    assert mock_evalsha.call_count == 1
+    assert RateLimitMetrics.get_local_rejections() == {"app:active_requests": 1}
+
+    with patch("redis.Redis.pipeline") as mock_pipeline:
+        rate_limit.exit("first")
+    mock_pipeline.return_value.__enter__.return_value.zrem.assert_called_once_with(
+        "dify:rate_limit:app:app:active_requests", "first"
+    )
+
+    with patch("redis.Redis.evalsha", return_value=[0, 0]) as mock_evalsha:
+        rate_limit.enter("second")
+    assert mock_evalsha.call_count == 1
+
+
+def test_empty_bucket_rejects_locally_until_refilled():
+    rate_limit = RateLimit([RateLimitRule(scope=RateLimitScope.API_KEY, scope_id="key", requests_per_minute=10)])
+
+    with patch("redis.Redis.evalsha", return_value=[1, 6000]) as mock_evalsha:
+        with pytest.raises(AppInvokeQuotaExceededError, match="requests per minute"):
+            rate_limit.enter()
+        with pytest.raises(AppInvokeQuotaExceededError):
+            rate_limit.enter()
+
+    assert mock_evalsha.call_count == 1
+    assert RateLimitMetrics.get_local_rejections() == {"api_key:requests_per_minute": 1}
+
+    # a minute later the bucket is checked in Redis again
+    with patch("core.app.features.rate_limiting.rate_limit.time.time", return_value=time.time() + 60):
+        with patch("redis.Redis.evalsha", return_value=[0, 0]) as mock_evalsha:
+            rate_limit.enter()
+    mock_evalsha.assert_called_once()
+
+
+def test_llm_tokens_in_debt_block_requests():
+    rate_limit = RateLimit([RateLimitRule(scope=RateLimitScope.APP, scope_id="app", llm_tokens_per_minute=100)])
+
+    with patch("redis.Redis.evalsha", return_value=[30000]):
+        rate_limit.consume_llm_tokens(150)
+
+    with patch("redis.Redis.evalsha") as mock_evalsha:
+        with pytest.raises(AppInvokeQuotaExceededError, match="LLM tokens per minute"):
+            rate_limit.enter()
+    mock_evalsha.assert_not_called()
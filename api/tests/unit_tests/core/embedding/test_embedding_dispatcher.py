@@ -0,0 +1,69 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.embedding import embedding_dispatcher
+from core.embedding.embedding_dispatcher import EmbeddingDispatcher
+from core.model_runtime.errors.invoke import InvokeRateLimitError
+
+
+@pytest.fixture(autouse=True)
+def config():
+    EmbeddingDispatcher.clear()
+    config = MagicMock(EMBEDDING_MAX_CONCURRENT_REQUESTS=3, EMBEDDING_TOKENS_PER_MINUTE=0)
+    with patch.object(embedding_dispatcher, "dify_config", config):
+        yield config
+    EmbeddingDispatcher.clear()
+
+
+def _model_instance(invoke) -> MagicMock:
+    model_instance = MagicMock(provider="openai", model="text-embedding-3-small", credentials={"api_key": "a"})
+    model_instance.load_balancing_manager = None
+    model_instance.invoke_text_embedding.side_effect = invoke
+    return model_instance
+
+
+def test_batches_run_concurrently_within_budget_and_keep_their_order():
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def invoke(texts, user, input_type):
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return MagicMock(embeddings=[[float(text)] for text in texts])
+
+    batches = [[str(i), str(i + 0.5)] for i in range(10)]
+    results = EmbeddingDispatcher(_model_instance(invoke)).embed_batches(batches)
+
+    assert [result.embeddings for result in results] == [[[i], [i + 0.5]] for i in range(10)]
+    assert max_active == 3
+
+
+def test_rate_limited_batch_is_retried_with_lower_concurrency():
+    model_instance = _model_instance([InvokeRateLimitError("429"), MagicMock(embeddings=[[1.0]])])
+    dispatcher = EmbeddingDispatcher(model_instance)
+
+    with patch("time.sleep") as mock_sleep:
+        results = dispatcher.embed_batches([["text"]])
+
+    assert results[0].embeddings == [[1.0]]
+
+    mock_sleep.assert_called_once_with(2)
+    # halved on the rate limit, then grown back by the success
+    assert dispatcher._budget.concurrency == 2
+
+
+def test_rate_limit_wait_follows_load_balancing_cooldown():
+    model_instance = _model_instance(None)
+    model_instance.load_balancing_manager = MagicMock()
+    model_instance.load_balancing_manager.get_cooldown_ttl.return_value = 42
+
+    assert EmbeddingDispatcher(model_instance)._get_rate_limit_wait(1) == 42
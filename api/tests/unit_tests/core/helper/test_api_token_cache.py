@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from core.helper.api_token_cache import API_TOKEN_LAST_USED_AT_KEY, ApiTokenCache, ApiTokenLastUsedRecorder
+
+
+def test_cache_key_does_not_contain_raw_token():
+    cache = ApiTokenCache("app-secrettoken", "app")
+
+    assert "app-secrettoken" not in cache.cache_key
+    assert cache.cache_key == ApiTokenCache("app-secrettoken", "app").cache_key
+    assert cache.cache_key != ApiTokenCache("app-secrettoken", "dataset").cache_key
+    assert cache.cache_key != ApiTokenCache("app-othertoken", "app").cache_key
+
+
+@patch("redis.Redis.get")
+def test_get_cached_api_token(mock_get):
+    api_token = {"id": "token-id", "app_id": "app-id", "tenant_id": "tenant-id", "type": "app"}
+    mock_get.return_value = json.dumps(api_token).encode("utf-8")
+
+    assert ApiTokenCache("app-secrettoken", "app").get() == api_token
+
+
+@patch("redis.Redis.get")
+def test_get_invalid_cached_api_token(mock_get):
+    mock_get.return_value = b"not json"
+
+    assert ApiTokenCache("app-secrettoken", "app").get() is None
+
+
+@patch("redis.Redis.hset")
+def test_record_last_used(mock_hset):
+    used_at = datetime(2024, 10, 1, 12, 30, 15)
+
+    ApiTokenLastUsedRecorder.record("token-id", used_at)
+
+    mock_hset.assert_called_once_with(API_TOKEN_LAST_USED_AT_KEY, "token-id", used_at.isoformat())
+
+
+@patch("redis.Redis.pipeline")
+def test_pop_all_last_used(mock_pipeline):
+    pipe = MagicMock()
+    pipe.execute.return_value = [
+        {b"token-1": b"2024-10-01T12:30:15", b"token-2": b"2024-10-01T12:31:00.123456"},
+        1,
+    ]
+    mock_pipeline.return_value.__enter__.return_value = pipe
+
+    last_used_at_map = ApiTokenLastUsedRecorder.pop_all()
+
+    pipe.hgetall.assert_called_once_with(API_TOKEN_LAST_USED_AT_KEY)
+    pipe.delete.assert_called_once_with(API_TOKEN_LAST_USED_AT_KEY)
+    assert last_used_at_map == {
+        "token-1": datetime(2024, 10, 1, 12, 30, 15),
+        "token-2": datetime(2024, 10, 1, 12, 31, 0, 123456),
+    }
@@ -1,6 +1,7 @@
 import random
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 
 from core.helper.ssrf_proxy import SSRF_DEFAULT_MAX_RETRIES, STATUS_FORCELIST, make_request
@@ -50,3 +51,18 @@ def test_retry_logic_success(mock_request):
     assert response.status_code == 200
     assert mock_request.call_count == SSRF_DEFAULT_MAX_RETRIES + 1
     assert mock_request.call_args_list[0][1].get("method") == "GET"
+
+
+@patch("httpx.Client.close")
+@patch("httpx.Client.send")
+def test_stream_request_closes_client_with_response(mock_send, mock_close):
+    mock_send.return_value = httpx.Response(200, content=iter([b"chunk"]))
+
+    response = make_request("GET", "http://example.com", stream=True)
+    assert mock_send.call_args.kwargs["stream"] is True
+    mock_close.assert_not_called()
+
+    # reading the body to the end closes the response and its client
+    assert list(response.iter_bytes()) == [b"chunk"]
+    response.close()
+    mock_close.assert_called_once()
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+import pytest
+
+from core.helper.manifest_helper import Manifest
+from core.model_runtime.model_providers import model_provider_manifest
+from core.model_runtime.model_providers.model_provider_factory import ModelProviderFactory
+from core.model_runtime.model_providers.model_provider_manifest import ModelProviderManifest
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    manifest = Manifest(str(tmp_path / "_manifest.json"))
+    monkeypatch.setattr(model_provider_manifest, "manifest", manifest)
+    ModelProviderManifest.clear_cache()
+    yield manifest
+    ModelProviderManifest.clear_cache()
+
+
+def test_manifest_matches_source_tree(manifest):
+    assert not ModelProviderManifest.is_available()
+    scanned_providers = [provider.model_dump() for provider in ModelProviderFactory().get_providers()]
+
+    ModelProviderManifest.generate()
+    manifest_providers = [provider.model_dump() for provider in ModelProviderFactory().get_providers()]
+
+    assert ModelProviderManifest.is_available()
+    assert manifest_providers == scanned_providers
+
+
+def test_manifest_providers_are_imported_on_first_use(manifest):
+    ModelProviderManifest.generate()
+
+    with patch(
+        "core.model_runtime.model_providers.model_provider_factory.load_single_subclass_from_source"
+    ) as mock_load:
+        factory = ModelProviderFactory()
+        factory.get_models(provider="openai")
+        mock_load.assert_not_called()
+
+        factory.get_provider_instance("openai")
+        mock_load.assert_called_once()
@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock
+
+from core.model_runtime.model_providers.__base.tokenizers.token_count_cache import TokenCountCache
+
+
+def test_texts_are_counted_once_per_tokenizer():
+    cache = TokenCountCache(min_characters=4)
+    count = MagicMock(side_effect=len)
+
+    assert cache.get_num_tokens("gpt2", "system prompt", count) == 13
+    assert cache.get_num_tokens("gpt2", "system prompt", count) == 13
+    assert cache.get_num_tokens("cl100k_base", "system prompt", count) == 13
+    # short texts are not cached
+    assert cache.get_num_tokens("gpt2", "hi", count) == 2
+    assert cache.get_num_tokens("gpt2", "hi", count) == 2
+
+    assert count.call_count == 4
+
+
+def test_least_recently_counted_texts_are_evicted():
+    cache = TokenCountCache(min_characters=1, max_characters=10)
+    count = MagicMock(side_effect=len)
+
+    cache.get_num_tokens("gpt2", "aaaa", count)
+    cache.get_num_tokens("gpt2", "bbbb", count)
+    cache.get_num_tokens("gpt2", "aaaa", count)
+    cache.get_num_tokens("gpt2", "cccc", count)
+    count.reset_mock()
+
+    cache.get_num_tokens("gpt2", "aaaa", count)
+    cache.get_num_tokens("gpt2", "cccc", count)
+    assert count.call_count == 0
+    cache.get_num_tokens("gpt2", "bbbb", count)
+    assert count.call_count == 1
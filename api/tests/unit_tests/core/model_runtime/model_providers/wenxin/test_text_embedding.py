@@ -73,3 +73,18 @@ def test_context_size():
     texts = [text]
     result: TextEmbeddingResult = embedding_model.invoke(model, credentials, texts, "test")
     assert result.usage.tokens == context_size
+
+
+def test_get_num_tokens_batch():
+    model = "embedding-v1"
+    credentials = {
+        "api_key": "xxxx",
+        "secret_key": "yyyy",
+    }
+    embedding_model = WenxinTextEmbeddingModel()
+    texts = ["hello world", "", "0123456789" * 10]
+
+    num_tokens_list = embedding_model.get_num_tokens_batch(model, credentials, texts)
+    assert num_tokens_list == [embedding_model.get_num_tokens(model, credentials, [text]) for text in texts]
+    assert sum(num_tokens_list) == embedding_model.get_num_tokens(model, credentials, texts)
+    assert embedding_model.get_num_tokens_batch(model, credentials, []) == []
@@ -0,0 +1,67 @@
+from http.client import HTTPMessage
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from requests.cookies import MockRequest, MockResponse
+
+from core.model_runtime.utils import client_pool
+from core.model_runtime.utils.client_pool import ModelClientPool
+
+
+@pytest.fixture(autouse=True)
+def config():
+    ModelClientPool.clear()
+    config = MagicMock(MODEL_CLIENT_POOL_MAX_SIZE=2, MODEL_CLIENT_POOL_IDLE_TIMEOUT=300)
+    with patch.object(client_pool, "dify_config", config):
+        yield config
+    ModelClientPool.clear()
+
+
+def test_client_is_reused_per_provider_endpoint_and_credentials():
+    factory = MagicMock(side_effect=lambda: object())
+
+    first = ModelClientPool.get_client("openai", None, {"api_key": "a"}, factory)
+    assert ModelClientPool.get_client("openai", None, {"api_key": "a"}, factory) is first
+    assert ModelClientPool.get_client("openai", None, {"api_key": "b"}, factory) is not first
+    assert ModelClientPool.get_client("openai", "http://localhost/v1", {"api_key": "a"}, factory) is not first
+
+    assert factory.call_count == 3
+
+
+def test_least_recently_used_and_idle_clients_are_dropped():
+    factory = MagicMock(side_effect=lambda: object())
+
+    with patch("time.monotonic", return_value=0):
+        first = ModelClientPool.get_client("openai", None, {"api_key": "a"}, factory)
+        second = ModelClientPool.get_client("openai", None, {"api_key": "b"}, factory)
+        ModelClientPool.get_client("openai", None, {"api_key": "a"}, factory)
+        # over the max size, the client of b is the least recently used
+        ModelClientPool.get_client("openai", None, {"api_key": "c"}, factory)
+        assert ModelClientPool.get_client("openai", None, {"api_key": "b"}, factory) is not second
+
+    with patch("time.monotonic", return_value=301):
+        assert ModelClientPool.get_client("openai", None, {"api_key": "a"}, factory) is not first
+
+
+def test_pool_is_disabled_when_max_size_is_zero(config):
+    config.MODEL_CLIENT_POOL_MAX_SIZE = 0
+    factory = MagicMock(side_effect=lambda: object())
+
+    first = ModelClientPool.get_client("openai", None, {"api_key": "a"}, factory)
+
+    assert ModelClientPool.get_client("openai", None, {"api_key": "a"}, factory) is not first
+
+
+def test_requests_session_rejects_cookies(config):
+    config.MODEL_CLIENT_POOL_MAX_CONNECTIONS = 10
+    session = client_pool.create_requests_session()
+    headers = HTTPMessage()
+    headers["Set-Cookie"] = "session=tenant; Path=/"
+
+    # a session is shared by the tenants of an endpoint
+    session.cookies.extract_cookies(
+        MockResponse(headers), MockRequest(requests.Request("GET", "https://localhost/v1/chat/completions").prepare())
+    )
+
+    assert not session.cookies
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.ops.entities.trace_entity import GenerateNameTraceInfo
+from core.ops.ops_trace_manager import TraceExporterBackoff, TraceFlusher
+from tasks.ops_trace_task import process_trace_tasks
+
+
+@pytest.fixture(autouse=True)
+def clean_backoff():
+    yield
+    TraceExporterBackoff._backoff_until.clear()
+    TraceExporterBackoff._dropped.clear()
+
+
+def _generate_name_trace_info(conversation_id: str) -> GenerateNameTraceInfo:
+    return GenerateNameTraceInfo(
+        conversation_id=conversation_id, inputs="hello", outputs="greeting", metadata={}, tenant_id="tenant"
+    )
+
+
+def test_batch_is_sent_as_one_celery_task(app):
+    tasks = []
+    for i in range(3):
+        task = MagicMock(app_id="app")
+        task.execute.return_value = _generate_name_trace_info(f"conversation-{i}")
+        tasks.append(task)
+    # a failing task does not drop the batch
+    failing_task = MagicMock(app_id="app")
+    failing_task.execute.side_effect = ValueError("message not found")
+
+    with (
+        patch("core.ops.ops_trace_manager.process_trace_tasks") as mock_process_trace_tasks,
+        ThreadPoolExecutor(max_workers=2) as executor,
+    ):
+        TraceFlusher._send_to_celery(app, executor, [*tasks, failing_task])
+
+    mock_process_trace_tasks.delay.assert_called_once()
+    tasks_data = mock_process_trace_tasks.delay.call_args.args[0]
+    assert [task_data["trace_info"]["conversation_id"] for task_data in tasks_data] == [
+        "conversation-0",
+        "conversation-1",
+        "conversation-2",
+    ]
+    assert {task_data["trace_info_type"] for task_data in tasks_data} == {"GenerateNameTraceInfo"}
+
+
+def test_worker_exports_batch_per_app_and_backs_off_slow_exporters():
+    trace_instance = MagicMock()
+    trace_instance.trace_batch.return_value = 0
+    tasks_data = [
+        {
+            "app_id": app_id,
+            "trace_info_type": "GenerateNameTraceInfo",
+            "trace_info": _generate_name_trace_info(app_id).model_dump(),
+        }
+        for app_id in ["slow-app", "slow-app", "other-app"]
+    ]
+
+    with (
+        patch("core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", return_value=trace_instance),
+        patch("core.ops.ops_trace_manager.trace_export_slow_threshold", -1),
+    ):
+        process_trace_tasks(tasks_data)
+
+        assert trace_instance.trace_batch.call_count == 2
+        trace_infos = trace_instance.trace_batch.call_args_list[0].args[0]
+        assert [type(trace_info) for trace_info in trace_infos] == [GenerateNameTraceInfo, GenerateNameTraceInfo]
+
+        # both apps were slow, their next traces are dropped
+        process_trace_tasks(tasks_data[0])
+        assert trace_instance.trace_batch.call_count == 2
+        assert TraceExporterBackoff.is_backing_off("slow-app")
+
+
+def _tasks_data(app_id: str, count: int) -> list[dict]:
+    return [
+        {
+            "app_id": app_id,
+            "trace_info_type": "GenerateNameTraceInfo",
+            "trace_info": _generate_name_trace_info(f"{app_id}-{i}").model_dump(),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("failure_count", "backs_off"),
+    [
+        # the whole batch failed
+        (4, True),
+        # the failure ratio reached TRACE_EXPORT_FAILURE_RATIO
+        (2, True),
+        # a few traces were rejected, the exporter is still up
+        (1, False),
+    ],
+)
+def test_worker_backs_off_exporters_failing_traces(failure_count, backs_off):
+    trace_instance = MagicMock()
+    # traces fail one by one within a batch, which does not raise
+    trace_instance.trace_batch.return_value = failure_count
+    tasks_data = _tasks_data("failing-app", 4)
+
+    with (
+        patch("core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", return_value=trace_instance),
+        patch("core.ops.ops_trace_manager.trace_export_failure_ratio", 0.5),
+    ):
+        process_trace_tasks(tasks_data)
+        process_trace_tasks(tasks_data)
+
+    assert trace_instance.trace_batch.call_count == (1 if backs_off else 2)
+    assert TraceExporterBackoff.is_backing_off("failing-app") == backs_off
@@ -0,0 +1,18 @@
+from core.prompt.utils.prompt_template_parser import PromptTemplateParser
+
+
+def test_format_fills_the_variables_of_the_compiled_template():
+    parser = PromptTemplateParser(template="{{name}} asks: {{#query#}}<|endoftext|> ({{missing}})")
+
+    assert parser.variable_keys == ["name", "#query#", "missing"]
+    assert parser.format({"name": "Ann", "#query#": "what is {{x}}?"}) == "Ann asks: what is {x}? ({missing})"
+    assert parser.format({"name": "Ann", "#query#": "{{x}}"}, remove_template_variables=False) == (
+        "Ann asks: {{x}} ({{missing}})"
+    )
+
+
+def test_format_with_variable_templates():
+    parser = PromptTemplateParser(template="{{#start.topic#}} and {{#context#}}", with_variable_tmpl=True)
+
+    assert parser.variable_keys == ["#start.topic#", "#context#"]
+    assert parser.format({"#start.topic#": "cats", "#context#": "dogs"}) == "cats and dogs"
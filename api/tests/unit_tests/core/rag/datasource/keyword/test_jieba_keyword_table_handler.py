@@ -0,0 +1,44 @@
+from unittest.mock import MagicMock, patch
+
+from core.rag.datasource.keyword.jieba import jieba_keyword_table_handler
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+
+TEXTS = [
+    "Dify is an open-source LLM app development platform.",
+    "自然语言处理是人工智能领域中的一个重要方向。",
+    "The workflow engine runs nodes in parallel branches.",
+] * 20
+
+
+def test_subtokens_are_filtered_by_stopwords():
+    keywords = JiebaKeywordTableHandler()._expand_tokens_with_subtokens({"the-workflow"})
+
+    assert keywords == {"the-workflow", "workflow"}
+
+
+def test_batch_extracts_in_calling_process_below_min_batch_size():
+    config = MagicMock(KEYWORD_EXTRACTION_WORKERS=4, KEYWORD_EXTRACTION_MIN_BATCH_SIZE=len(TEXTS) + 1)
+    keyword_table_handler = JiebaKeywordTableHandler()
+
+    with (
+        patch.object(jieba_keyword_table_handler, "dify_config", config),
+        patch.object(JiebaKeywordTableHandler, "_get_pool") as mock_get_pool,
+    ):
+        keywords_list = keyword_table_handler.extract_keywords_batch(TEXTS)
+
+    mock_get_pool.assert_not_called()
+    assert keywords_list == [keyword_table_handler.extract_keywords(text) for text in TEXTS]
+
+
+@patch("os.cpu_count", return_value=2)
+def test_batch_extracts_in_process_pool(mock_cpu_count):
+    config = MagicMock(KEYWORD_EXTRACTION_WORKERS=2, KEYWORD_EXTRACTION_MIN_BATCH_SIZE=1)
+    keyword_table_handler = JiebaKeywordTableHandler()
+
+    try:
+        with patch.object(jieba_keyword_table_handler, "dify_config", config):
+            keywords_list = keyword_table_handler.extract_keywords_batch(TEXTS, max_keywords_per_chunk=5)
+    finally:
+        JiebaKeywordTableHandler._shutdown_pool()
+
+    assert keywords_list == [keyword_table_handler.extract_keywords(text, 5) for text in TEXTS]
@@ -0,0 +1,85 @@
+from unittest.mock import MagicMock, patch
+
+import psycopg2.extensions
+import psycopg2.pool
+import pytest
+
+from core.rag.datasource.vdb.pgvector.pgvector import BoundedConnectionPool, PGVector, PGVectorConfig
+
+
+def _connection():
+    conn = MagicMock(closed=0)
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+@pytest.fixture
+def pool():
+    with patch.object(psycopg2.pool.psycopg2, "connect", side_effect=lambda *args, **kwargs: _connection()):
+        yield BoundedConnectionPool(1, 2, host="localhost")
+
+
+def test_exhausted_pool_raises_after_timeout(pool):
+    pool.getconn()
+    pool.getconn()
+
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.getconn(timeout=0)
+
+
+def test_health_check_skips_a_busy_pool(pool):
+    busy_connections = [pool.getconn(), pool.getconn()]
+
+    PGVector._check_connection_pool(pool)
+
+    for conn in busy_connections:
+        conn.cursor.assert_not_called()
+
+
+def test_retired_pool_closes_connections_once_returned(pool):
+    in_use = pool.getconn()
+    idle = pool.getconn()
+    pool.putconn(idle)
+
+    pool.retire()
+
+    idle.close.assert_called_once()
+    in_use.close.assert_not_called()
+    pool.putconn(in_use)
+    in_use.close.assert_called_once()
+
+
+def test_searches_of_several_tables_are_one_union_all_statement():
+    config = PGVectorConfig(
+        host="localhost",
+        port=5432,
+        user="postgres",
+        password="secret",
+        database="dify",
+        min_connection=1,
+        max_connection=2,
+    )
+    cursor = MagicMock()
+    # rows of both tables, in no particular order
+    cursor.__iter__.return_value = [
+        (1, {"doc_id": "b1"}, "b1", 0.1),
+        (0, {"doc_id": "a1"}, "a1", 0.4),
+        (0, {"doc_id": "a2"}, "a2", 0.2),
+        (1, {"doc_id": "b2"}, "b2", 0.8),
+    ]
+    pool = MagicMock()
+    pool.getconn.return_value.cursor.return_value = cursor
+    with patch("core.rag.datasource.vdb.pgvector.pgvector.VectorClientRegistry.get_client", return_value=pool):
+        first, second = PGVector("a", config), PGVector("b", config)
+
+    results = first.search_by_vector_multiple(
+        [0.1, 0.2], [(first, {"top_k": 2}), (second, {"top_k": 3, "score_threshold": 0.5})]
+    )
+
+    cursor.execute.assert_called_once()
+    statement = cursor.execute.call_args.args[0]
+    assert statement.count(" UNION ALL ") == 1
+    assert "FROM embedding_a ORDER BY distance LIMIT 2" in statement
+    assert "FROM embedding_b ORDER BY distance LIMIT 3" in statement
+    # sorted by score, each within its own threshold
+    assert [[doc.page_content for doc in docs] for docs in results] == [["a2", "a1"], ["b1"]]
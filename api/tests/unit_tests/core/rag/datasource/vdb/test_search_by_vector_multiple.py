@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.rag.datasource.vdb.elasticsearch.elasticsearch_vector import ElasticSearchConfig, ElasticSearchVector
+from core.rag.datasource.vdb.opensearch.opensearch_vector import OpenSearchConfig, OpenSearchVector
+
+
+def _response(*hits: tuple[str, float]) -> dict:
+    return {
+        "hits": {
+            "hits": [
+                {
+                    "_score": score,
+                    "_source": {"page_content": content, "vector": [0.1, 0.2], "metadata": {"doc_id": content}},
+                }
+                for content, score in hits
+            ]
+        }
+    }
+
+
+@pytest.fixture
+def elasticsearch_vectors():
+    config = ElasticSearchConfig(host="localhost", port=9200, username="elastic", password="secret")
+    client = MagicMock()
+    with patch(
+        "core.rag.datasource.vdb.elasticsearch.elasticsearch_vector.VectorClientRegistry.get_client",
+        return_value=client,
+    ):
+        yield client, ElasticSearchVector("A", config, []), ElasticSearchVector("B", config, [])
+
+
+@pytest.fixture
+def opensearch_vectors():
+    config = OpenSearchConfig(host="localhost", port=9200)
+    client = MagicMock()
+    with patch(
+        "core.rag.datasource.vdb.opensearch.opensearch_vector.VectorClientRegistry.get_client", return_value=client
+    ):
+        yield client, OpenSearchVector("A", config), OpenSearchVector("B", config)
+
+
+def test_elasticsearch_searches_of_several_indices_are_one_multi_search(elasticsearch_vectors):
+    client, first, second = elasticsearch_vectors
+    client.msearch.return_value = {"responses": [_response(("a1", 0.9)), _response(("b1", 0.7), ("b2", 0.6))]}
+
+    results = first.search_by_vector_multiple([0.1, 0.2], [(first, {"top_k": 1}), (second, {"top_k": 2})])
+
+    client.msearch.assert_called_once()
+    body = client.msearch.call_args.kwargs["searches"]
+    assert [header["index"] for header in body[::2]] == ["a", "b"]
+    assert [search["knn"]["k"] for search in body[1::2]] == [1, 2]
+    client.search.assert_not_called()
+    assert [[doc.page_content for doc in docs] for docs in results] == [["a1"], ["b1", "b2"]]
+
+
+def test_elasticsearch_failed_search_of_a_multi_search_raises(elasticsearch_vectors):
+    client, first, second = elasticsearch_vectors
+    client.msearch.return_value = {"responses": [_response(), {"error": "no such index"}]}
+
+    with pytest.raises(ValueError, match="no such index"):
+        first.search_by_vector_multiple([0.1, 0.2], [(first, {}), (second, {})])
+
+
+def test_opensearch_searches_of_several_indices_are_one_multi_search(opensearch_vectors):
+    client, first, second = opensearch_vectors
+    client.msearch.return_value = {"responses": [_response(("a1", 0.9), ("a2", 0.2)), _response(("b1", 0.7))]}
+
+    results = first.search_by_vector_multiple(
+        [0.1, 0.2], [(first, {"top_k": 2, "score_threshold": 0.5}), (second, {"top_k": 1})]
+    )
+
+    client.msearch.assert_called_once()
+    body = client.msearch.call_args.kwargs["body"]
+    assert [header["index"] for header in body[::2]] == ["a", "b"]
+    assert [search["size"] for search in body[1::2]] == [2, 1]
+    client.search.assert_not_called()
+    assert [[doc.page_content for doc in docs] for docs in results] == [["a1"], ["b1"]]
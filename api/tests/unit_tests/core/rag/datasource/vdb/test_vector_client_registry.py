@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from core.rag.datasource.vdb.vector_client_registry import VectorClientRegistry
+
+
+class FakeConfig(BaseModel):
+    host: str
+    password: str
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    VectorClientRegistry.close_all()
+    yield
+    VectorClientRegistry.close_all()
+
+
+def test_client_is_shared_by_equal_configs():
+    factory = MagicMock(side_effect=lambda: object())
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(
+            executor.map(
+                lambda _: VectorClientRegistry.get_client(
+                    "fake", FakeConfig(host="localhost", password="secret"), factory
+                ),
+                range(32),
+            )
+        )
+
+    assert factory.call_count == 1
+    assert all(client is clients[0] for client in clients)
+
+
+def test_client_per_config():
+    first = VectorClientRegistry.get_client("fake", FakeConfig(host="a", password="secret"), object)
+    second = VectorClientRegistry.get_client("fake", FakeConfig(host="b", password="secret"), object)
+
+    assert first is not second
+
+
+def test_unhealthy_client_is_recreated():
+    close = MagicMock()
+    health_check = MagicMock(side_effect=ConnectionError("unreachable"))
+    config = FakeConfig(host="localhost", password="secret")
+
+    with patch("core.rag.datasource.vdb.vector_client_registry.dify_config") as mock_config:
+        mock_config.VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL = 0
+        first = VectorClientRegistry.get_client("fake", config, object, health_check, close)
+        second = VectorClientRegistry.get_client("fake", config, object, health_check, close)
+
+    health_check.assert_called_once_with(first)
+    close.assert_called_once_with(first)
+    assert first is not second
+
+
+def test_close_all_closes_clients():
+    close = MagicMock()
+    client = VectorClientRegistry.get_client(
+        "fake", FakeConfig(host="localhost", password="secret"), object, None, close
+    )
+
+    VectorClientRegistry.close_all()
+
+    close.assert_called_once_with(client)
+
+
+def test_slow_health_check_does_not_block_other_clients():
+    checking, release = threading.Event(), threading.Event()
+
+    def slow_health_check(client):
+        checking.set()
+        release.wait(timeout=5)
+
+    with patch("core.rag.datasource.vdb.vector_client_registry.dify_config") as mock_config:
+        mock_config.VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL = 0
+        slow_config = FakeConfig(host="slow", password="secret")
+        slow_client = VectorClientRegistry.get_client("fake", slow_config, object, slow_health_check)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            checked_client = executor.submit(
+                VectorClientRegistry.get_client, "fake", slow_config, object, slow_health_check
+            )
+            assert checking.wait(timeout=5)
+
+            # served while the health check of the slow client is running
+            VectorClientRegistry.get_client("fake", FakeConfig(host="other", password="secret"), object)
+            assert VectorClientRegistry.get_client("fake", slow_config, object, slow_health_check) is slow_client
+
+            release.set()
+            assert checked_client.result() is slow_client
@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from core.rag.retrieval.dataset_retrieval import DatasetRetrieval
+
+
+def _dataset(
+    dataset_id: str,
+    vector_type: str = "pgvector",
+    embedding_model: str = "text-embedding-3-small",
+    indexing_technique: str = "high_quality",
+    search_method: str = "semantic_search",
+    provider: str = "vendor",
+) -> MagicMock:
+    return MagicMock(
+        id=dataset_id,
+        provider=provider,
+        indexing_technique=indexing_technique,
+        index_struct_dict={"type": vector_type},
+        embedding_model_provider="openai",
+        embedding_model=embedding_model,
+        retrieval_model={
+            "search_method": search_method,
+            "reranking_enable": False,
+            "top_k": 4,
+            "score_threshold_enabled": True,
+            "score_threshold": 0.5,
+        },
+    )
+
+
+def test_datasets_are_grouped_by_vector_backend_and_embedding_model():
+    datasets = [
+        _dataset("a"),
+        _dataset("b"),
+        _dataset("c", vector_type="qdrant"),
+        _dataset("d", embedding_model="text-embedding-3-large"),
+        _dataset("e", search_method="hybrid_search"),
+        _dataset("f", indexing_technique="economy"),
+        _dataset("g", provider="external"),
+        _dataset("h"),
+        # searched one after another by the backend, so searched by a thread each instead
+        _dataset("i", vector_type="milvus"),
+        _dataset("j", vector_type="milvus"),
+    ]
+
+    groups = DatasetRetrieval._get_vector_search_groups(datasets, top_k=4)
+
+    assert [[dataset.id for dataset in group] for group in groups] == [["a", "b", "h"]]
+    assert DatasetRetrieval._get_vector_search_groups(datasets, top_k=0) == []
+
+
+def test_vector_search_setting_matches_single_dataset_retrieval():
+    setting = DatasetRetrieval._get_vector_search_setting(_dataset("a"))
+
+    assert setting == {"dataset_id": "a", "top_k": 4, "score_threshold": 0.5, "reranking_model": None}
+
+
+def test_failed_vector_search_of_datasets_is_recorded():
+    exceptions = []
+    all_documents = []
+
+    with patch(
+        "core.rag.retrieval.dataset_retrieval.RetrievalService.embedding_search_multiple",
+        side_effect=ConnectionError("vector store unreachable"),
+    ):
+        DatasetRetrieval()._multiple_retriever(
+            Flask(__name__), [{"dataset_id": "a"}], "query", all_documents, exceptions
+        )
+
+    assert all_documents == []
+    assert exceptions == ["vector store unreachable"]
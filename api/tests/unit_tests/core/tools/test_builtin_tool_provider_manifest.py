@@ -0,0 +1,32 @@
+import pytest
+
+from core.helper.manifest_helper import Manifest
+from core.tools.provider import builtin_tool_provider_manifest
+from core.tools.provider.builtin_tool_provider_manifest import BuiltinToolProviderManifest
+from core.tools.tool_manager import ToolManager
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    manifest = Manifest(str(tmp_path / "_manifest.json"))
+    monkeypatch.setattr(builtin_tool_provider_manifest, "manifest", manifest)
+    BuiltinToolProviderManifest.generate()
+    ToolManager.clear_builtin_providers_cache()
+    yield manifest
+    ToolManager.clear_builtin_providers_cache()
+
+
+def test_tool_label_is_read_from_manifest(manifest):
+    label = ToolManager.get_tool_label("current_time")
+
+    assert label.en_US == "Current Time"
+    assert ToolManager._builtin_providers == {}
+
+
+def test_builtin_provider_is_imported_alone(manifest):
+    provider = ToolManager.get_builtin_provider("time")
+
+    assert provider.identity.name == "time"
+    assert {tool.identity.name for tool in provider.get_tools()} >= {"current_time"}
+    assert list(ToolManager._builtin_providers) == ["time"]
+    assert not ToolManager._builtin_providers_loaded
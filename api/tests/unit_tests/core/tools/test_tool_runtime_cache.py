@@ -0,0 +1,42 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.tools.tool_runtime_cache import ToolRuntimeCache
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    ToolRuntimeCache.clear()
+    yield
+    ToolRuntimeCache.clear()
+
+
+def test_entry_is_reused_while_generation_is_current():
+    controller = object()
+    loader = MagicMock(return_value=(controller, {"api_key": "secret"}))
+
+    with patch("redis.Redis.get", return_value=b"1"):
+        first = ToolRuntimeCache.get_or_load("tenant", "api", "provider", loader)
+        second = ToolRuntimeCache.get_or_load("tenant", "api", "provider", loader)
+
+    assert loader.call_count == 1
+    assert first[0] is second[0] is controller
+    # callers get their own copy of the credentials
+    first[1]["api_key"] = "changed"
+    assert second[1] == {"api_key": "secret"}
+
+
+def test_entry_is_reloaded_after_invalidation():
+    loader = MagicMock(side_effect=lambda: (object(), {}))
+
+    with patch("redis.Redis.get", return_value=None):
+        first, _ = ToolRuntimeCache.get_or_load("tenant", "builtin", "provider", loader)
+    with patch("redis.Redis.incr") as mock_incr:
+        ToolRuntimeCache.invalidate("tenant", "builtin", "provider")
+    with patch("redis.Redis.get", return_value=b"1"):
+        second, _ = ToolRuntimeCache.get_or_load("tenant", "builtin", "provider", loader)
+
+    mock_incr.assert_called_once_with("tool_runtime_generation:tenant_id:tenant:builtin:provider")
+    assert loader.call_count == 2
+    assert first is not second
@@ -1,4 +1,7 @@
+from unittest.mock import MagicMock
+
 import httpx
+import pytest
 
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.file import File, FileTransferMethod, FileType
@@ -14,7 +17,8 @@ from core.workflow.nodes.http_request import (
     HttpRequestNodeBody,
     HttpRequestNodeData,
 )
-from core.workflow.nodes.http_request.http_executor import _plain_text_to_dict
+from core.workflow.nodes.http_request.entities import HttpRequestNodeTimeout
+from core.workflow.nodes.http_request.http_executor import HttpExecutor, _plain_text_to_dict
 from enums import UserFrom
 from models.workflow import WorkflowNodeExecutionStatus, WorkflowType
 
@@ -200,3 +204,80 @@ def test_http_request_node_form_with_file(monkeypatch):
     assert result.status == WorkflowNodeExecutionStatus.SUCCEEDED
     assert result.outputs is not None
     assert result.outputs["body"] == ""
+
+
+def _get_executor() -> HttpExecutor:
+    data = HttpRequestNodeData(
+        title="test",
+        method="get",
+        url="http://example.org/get",
+        authorization=HttpRequestNodeAuthorization(type="no-auth"),
+        headers="",
+        params="",
+    )
+    return HttpExecutor(
+        node_data=data,
+        timeout=HttpRequestNodeTimeout(connect=10, read=60, write=20),
+        variable_pool=VariablePool(system_variables={}, user_inputs={}),
+    )
+
+
+def test_http_executor_aborts_oversized_response_while_streaming(monkeypatch):
+    monkeypatch.setattr(
+        "core.workflow.nodes.http_request.http_executor.dify_config",
+        MagicMock(HTTP_REQUEST_NODE_MAX_TEXT_SIZE=1024),
+    )
+    read_chunks = []
+
+    def body():
+        for _ in range(100):
+            read_chunks.append(1)
+            yield b"x" * 512
+
+    monkeypatch.setattr(
+        "core.helper.ssrf_proxy.get",
+        lambda *args, **kwargs: httpx.Response(200, headers={"Content-Type": "text/plain"}, content=body()),
+    )
+    with pytest.raises(ValueError, match="Text size is too large"):
+        _get_executor().invoke()
+    assert len(read_chunks) == 3
+
+
+def test_http_executor_rejects_oversized_content_length(monkeypatch):
+    monkeypatch.setattr(
+        "core.workflow.nodes.http_request.http_executor.dify_config",
+        MagicMock(HTTP_REQUEST_NODE_MAX_BINARY_SIZE=1024),
+    )
+    response = httpx.Response(
+        200,
+        headers={"Content-Type": "application/octet-stream", "Content-Length": "4096"},
+        content=iter([b"never read"]),
+    )
+    monkeypatch.setattr("core.helper.ssrf_proxy.get", lambda *args, **kwargs: response)
+
+    with pytest.raises(ValueError, match="File size is too large"):
+        _get_executor().invoke()
+    assert response.is_closed
+
+
+def test_http_executor_spools_binary_response(monkeypatch):
+    monkeypatch.setattr(
+        "core.workflow.nodes.http_request.http_executor.RESPONSE_SPOOL_MAX_MEMORY_SIZE",
+        1024,
+    )
+    monkeypatch.setattr(
+        "core.helper.ssrf_proxy.get",
+        lambda *args, **kwargs: httpx.Response(
+            200, headers={"Content-Type": "application/pdf"}, content=iter([b"x" * 1024, b"y" * 1024])
+        ),
+    )
+
+    response = _get_executor().invoke()
+
+    assert response.is_file
+    assert response.size == 2048
+    assert response.body._rolled
+    assert response.content == b"x" * 1024 + b"y" * 1024
+    assert response.metrics["size"] == 2048
+    assert response.metrics["elapsed"] >= response.metrics["time_to_headers"]
+    response.close()
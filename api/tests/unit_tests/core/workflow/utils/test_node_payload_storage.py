@@ -0,0 +1,61 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.workflow.utils import node_payload_storage
+from core.workflow.utils.node_payload_storage import set_node_payloads, truncate_payload
+from models.workflow import WorkflowNodeExecution
+
+
+@pytest.fixture
+def storage():
+    files = {}
+    mock_storage = MagicMock()
+    mock_storage.exists.side_effect = lambda key: key in files
+    mock_storage.save.side_effect = files.__setitem__
+    mock_storage.load_once.side_effect = files.__getitem__
+    with (
+        patch.object(node_payload_storage, "storage", mock_storage),
+        patch.object(
+            node_payload_storage,
+            "dify_config",
+            MagicMock(WORKFLOW_NODE_PAYLOAD_OFFLOAD_THRESHOLD=100, WORKFLOW_NODE_PAYLOAD_PREVIEW_LENGTH=20),
+        ),
+    ):
+        yield mock_storage
+
+
+def test_truncate_payload_keeps_structure_within_budget():
+    payload = {"text": "a" * 50, "items": ["b" * 10, "c" * 10, "d" * 10], "count": 3}
+
+    assert truncate_payload(payload, 100) == payload
+    assert truncate_payload(payload, 20) == {"text": "a" * 16 + "..."}
+    # keys count towards the budget too
+    assert truncate_payload(payload, 70) == {"text": "a" * 50, "items": ["b" * 10, "c..."]}
+
+
+def test_large_payloads_are_offloaded_with_a_preview(storage):
+    workflow_node_execution = WorkflowNodeExecution(id="execution", tenant_id="tenant", app_id="app")
+    outputs = {"text": "x" * 500}
+
+    set_node_payloads(workflow_node_execution, {"query": "hello"}, None, outputs)
+
+    assert workflow_node_execution.inputs == json.dumps({"query": "hello"})
+    assert workflow_node_execution.process_data is None
+    assert workflow_node_execution.get_payload_preview("outputs") == {"text": "x" * 16 + "..."}
+    assert list(workflow_node_execution.offloaded_payloads_dict) == ["outputs"]
+    assert workflow_node_execution.offloaded_payloads_dict["outputs"].startswith("workflow_node_payloads/tenant/app/")
+    # the full payload is loaded from the storage when read
+    assert workflow_node_execution.outputs_dict == outputs
+    assert workflow_node_execution.inputs_dict == {"query": "hello"}
+
+
+def test_identical_payloads_are_saved_once_per_app(storage):
+    for execution_id, app_id in (("first", "app"), ("second", "app"), ("third", "other app")):
+        set_node_payloads(
+            WorkflowNodeExecution(id=execution_id, tenant_id="tenant", app_id=app_id), None, None, {"text": "x" * 500}
+        )
+
+    # so that the payloads of an app are deleted with it
+    assert storage.save.call_count == 2
@@ -0,0 +1,103 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import Integer, String, create_engine, func, insert, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from libs import bulk_delete
+from libs.bulk_delete import BulkDeleter, BulkDeleteTarget
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    owner_id: Mapped[str] = mapped_column(String)
+    sequence_number: Mapped[int] = mapped_column(Integer)
+
+
+class ItemChild(Base):
+    __tablename__ = "item_children"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    item_id: Mapped[str] = mapped_column(String)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # a file rather than in memory, for the connections of the parallel workers to share it
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk_delete.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Item),
+            [{"id": f"item-{i:02}", "owner_id": "owner", "sequence_number": i} for i in range(25)]
+            + [{"id": "other", "owner_id": "other-owner", "sequence_number": 0}],
+        )
+        conn.execute(insert(ItemChild), [{"item_id": f"item-{i:02}"} for i in range(25)] + [{"item_id": "other"}])
+    with (
+        patch.object(bulk_delete, "db", MagicMock(engine=engine)),
+        patch.object(
+            bulk_delete,
+            "dify_config",
+            MagicMock(BULK_DELETE_BATCH_SIZE=10, BULK_DELETE_MAX_WORKERS=2, BULK_DELETE_BATCH_INTERVAL_MS=0),
+        ),
+    ):
+        yield engine
+
+
+def _count(engine, model) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(model))
+
+
+def test_delete_removes_matching_rows_and_children_in_batches(engine):
+    target = BulkDeleteTarget(
+        "item",
+        Item,
+        Item.owner_id == "owner",
+        keyset=(Item.sequence_number, Item.id),
+        children=(ItemChild.item_id,),
+    )
+    with (
+        patch("redis.Redis.get", return_value=None),
+        patch("redis.Redis.setex") as mock_setex,
+        patch("redis.Redis.delete") as mock_delete,
+    ):
+        assert BulkDeleter(job_id="job").delete([target]) == {"item": 25}
+
+    assert _count(engine, Item) == 1
+    assert _count(engine, ItemChild) == 1
+    assert [json.loads(c.args[2]) for c in mock_setex.call_args_list] == [
+        {"deleted": 10, "last_values": ["9", "item-09"]},
+        {"deleted": 20, "last_values": ["19", "item-19"]},
+        {"deleted": 25, "last_values": ["24", "item-24"]},
+    ]
+    mock_delete.assert_called_once_with("bulk_delete_checkpoint:job:item")
+
+
+def test_delete_resumes_from_checkpoint(engine):
+    target = BulkDeleteTarget("item", Item, Item.owner_id == "owner", keyset=(Item.sequence_number, Item.id))
+    checkpoint = json.dumps({"deleted": 20, "last_values": ["19", "item-19"]})
+    with patch("redis.Redis.get", return_value=checkpoint), patch("redis.Redis.setex"), patch("redis.Redis.delete"):
+        assert BulkDeleter(job_id="job").delete_target(target) == 25
+
+    # the rows before the checkpoint were deleted by the previous run
+    assert _count(engine, Item) == 21
+
+
+def test_delete_targets_in_parallel_without_keyset(engine):
+    targets = [
+        BulkDeleteTarget("item", Item, Item.owner_id == "owner"),
+        BulkDeleteTarget("child", ItemChild, ItemChild.item_id == "other"),
+    ]
+    with patch("redis.Redis.get", return_value=None), patch("redis.Redis.setex"), patch("redis.Redis.delete"):
+        assert BulkDeleter(job_id="job").delete(targets) == {"item": 25, "child": 1}
+
+    assert _count(engine, Item) == 1
+    assert _count(engine, ItemChild) == 25
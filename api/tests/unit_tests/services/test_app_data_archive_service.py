@@ -0,0 +1,235 @@
+# test for api/services/app_data_archive_service.py
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pyarrow.parquet as pq
+import pytest
+
+from core.workflow.utils import node_payload_storage
+from models.model import AppDataArchive, Conversation, Message, MessageAgentThought
+from models.workflow import WorkflowNodeExecution
+from services import app_data_archive_service
+from services.app_data_archive_service import AppDataArchiveService
+
+MESSAGE_COLUMNS = [column.name for column in Message.__table__.columns]
+
+
+class FakeArchiveQuery:
+    """
+    Archives filtered by the comparisons of their columns
+    """
+
+    def __init__(self, archives: list[AppDataArchive]):
+        self.archives = archives
+
+    def filter(self, *conditions):
+        return FakeArchiveQuery(
+            [
+                archive
+                for archive in self.archives
+                if all(
+                    condition.operator(getattr(archive, condition.left.key), condition.right.value)
+                    for condition in conditions
+                )
+            ]
+        )
+
+    def order_by(self, *args):
+        return self
+
+    def all(self):
+        return self.archives
+
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    AppDataArchiveService.clear()
+    yield
+    AppDataArchiveService.clear()
+
+
+def _message_row(message_id: str, conversation_id: str, created_at: datetime) -> dict:
+    values = dict.fromkeys(MESSAGE_COLUMNS)
+    values.update(
+        id=message_id,
+        app_id="app",
+        conversation_id=conversation_id,
+        inputs={"name": "value"},
+        query="query",
+        message=[{"role": "user", "text": "query"}],
+        message_unit_price=Decimal("0.0010"),
+        answer="answer",
+        agent_based=False,
+        created_at=created_at,
+    )
+    return values
+
+
+def _agent_thought_row(agent_thought_id: str, message_id: str, position: int) -> dict:
+    values = dict.fromkeys(column.name for column in MessageAgentThought.__table__.columns)
+    values.update(id=agent_thought_id, message_id=message_id, position=position, thought=f"thought {position}")
+    return values
+
+
+def _write_file(rows: list[dict], model=Message) -> bytes:
+    file = io.BytesIO()
+    writer = pq.ParquetWriter(file, app_data_archive_service._get_arrow_schema(model), compression="zstd")
+    app_data_archive_service._write_rows(writer, model, rows)
+    writer.close()
+    return file.getvalue()
+
+
+@pytest.fixture
+def archives():
+    files = {
+        "2024-02": _write_file(
+            [
+                _message_row("m3", "c1", datetime(2024, 2, 3)),
+                _message_row("m4", "c2", datetime(2024, 2, 4)),
+                _message_row("m5", "c1", datetime(2024, 2, 5)),
+            ]
+        ),
+        "2024-01": _write_file([_message_row("m1", "c1", datetime(2024, 1, 1))]),
+        "2024-02-agent-thoughts": _write_file(
+            [_agent_thought_row("t2", "m3", 2), _agent_thought_row("t1", "m3", 1), _agent_thought_row("t3", "m4", 1)],
+            MessageAgentThought,
+        ),
+    }
+    query = FakeArchiveQuery(
+        [
+            AppDataArchive(app_id="app", table_name="messages", period=date(2024, 2, 1), storage_key="2024-02"),
+            AppDataArchive(app_id="app", table_name="messages", period=date(2024, 1, 1), storage_key="2024-01"),
+            AppDataArchive(
+                app_id="app",
+                table_name="message_agent_thoughts",
+                period=date(2024, 2, 1),
+                storage_key="2024-02-agent-thoughts",
+            ),
+        ]
+    )
+    mock_storage = MagicMock()
+    mock_storage.load_once.side_effect = lambda key: files[key]
+    with (
+        patch.object(app_data_archive_service, "db", MagicMock()) as mock_db,
+        patch.object(app_data_archive_service, "storage", mock_storage),
+    ):
+        mock_db.session.query.return_value = query
+        yield mock_storage
+
+
+def _conversation(conversation_id: str, created_at: datetime = datetime(2024, 1, 1)) -> Conversation:
+    return Conversation(id=conversation_id, created_at=created_at)
+
+
+def test_archived_rows_are_read_back_as_models(archives):
+    message = AppDataArchiveService.get_message("app", _conversation("c1"), "m3")
+
+    assert isinstance(message, Message)
+    assert message.inputs == {"name": "value"}
+    assert message.message == [{"role": "user", "text": "query"}]
+    assert message.message_unit_price == Decimal("0.0010")
+    assert message.agent_based is False
+    assert message.created_at == datetime(2024, 2, 3)
+    assert AppDataArchiveService.get_message("app", _conversation("c2"), "m3") is None
+
+
+def test_archived_messages_are_paged_newest_first_across_months(archives):
+    first_page = AppDataArchiveService.get_messages("app", _conversation("c1"), None, 2)
+    second_page = AppDataArchiveService.get_messages("app", _conversation("c1"), first_page[-1].created_at, 2)
+
+    assert [message.id for message in first_page] == ["m5", "m3"]
+    assert [message.id for message in second_page] == ["m1"]
+    # files are loaded once for every page
+    assert archives.load_once.call_count == 3
+
+
+def test_archived_messages_are_read_back_with_their_agent_thoughts(archives):
+    m5, m3 = AppDataArchiveService.get_messages("app", _conversation("c1"), None, 2)
+
+    assert [agent_thought.id for agent_thought in m3.agent_thoughts] == ["t1", "t2"]
+    assert m3.agent_thoughts[0].thought == "thought 1"
+    assert m5.agent_thoughts == []
+
+
+def test_archived_messages_are_only_searched_from_the_month_of_their_conversation(archives):
+    messages = AppDataArchiveService.get_messages("app", _conversation("c1", datetime(2024, 2, 2)), None, 10)
+
+    assert [message.id for message in messages] == ["m5", "m3"]
+    assert [c.args[0] for c in archives.load_once.call_args_list] == ["2024-02", "2024-02-agent-thoughts"]
+
+
+def test_conversations_newer_than_the_archives_are_not_searched(archives):
+    assert AppDataArchiveService.get_messages("app", _conversation("c3", datetime(2024, 3, 1)), None, 10) == []
+    archives.load_once.assert_not_called()
+
+
+def test_next_month_rolls_over_the_year():
+    assert app_data_archive_service._get_next_month(date(2024, 12, 1)) == date(2025, 1, 1)
+    assert app_data_archive_service._get_next_month(date(2024, 1, 1)) == date(2024, 2, 1)
+
+
+def test_archives_of_a_deleted_app_are_deleted_with_their_files():
+    archives = [
+        AppDataArchive(app_id="app", table_name="messages", period=date(2024, 1, 1), storage_key="2024-01"),
+        AppDataArchive(app_id="app", table_name="messages", period=date(2024, 2, 1), storage_key="2024-02"),
+    ]
+    mock_storage = MagicMock()
+    # deleted by a previous attempt
+    mock_storage.exists.side_effect = lambda key: key != "2024-01"
+    with (
+        patch.object(app_data_archive_service, "db", MagicMock()) as mock_db,
+        patch.object(app_data_archive_service, "storage", mock_storage),
+    ):
+        mock_db.session.query.return_value = FakeArchiveQuery(archives)
+
+        assert AppDataArchiveService.delete_app_archives("app") == 2
+
+    mock_storage.delete.assert_called_once_with("2024-02")
+    assert [c.args[0] for c in mock_db.session.delete.call_args_list] == archives
+
+
+def test_archived_node_executions_are_deleted_with_their_payloads():
+    rows = []
+    for execution_id, offloaded_payloads in (
+        ("e1", {"outputs": "payload-1"}),
+        ("e2", {"inputs": "payload-2", "outputs": "payload-1"}),
+        ("e3", None),
+    ):
+        values = dict.fromkeys(column.name for column in WorkflowNodeExecution.__table__.columns)
+        values.update(
+            id=execution_id,
+            app_id="app",
+            offloaded_payloads=json.dumps(offloaded_payloads) if offloaded_payloads else None,
+        )
+        rows.append(values)
+    files = {"executions": _write_file(rows, WorkflowNodeExecution), "payload-1": b"", "payload-2": b""}
+    archive = AppDataArchive(
+        app_id="app", table_name="workflow_node_executions", period=date(2024, 1, 1), storage_key="executions"
+    )
+    mock_storage = MagicMock()
+    mock_storage.exists.side_effect = lambda key: key in files
+    mock_storage.load_once.side_effect = files.__getitem__
+    mock_storage.delete.side_effect = files.pop
+    with (
+        patch.object(app_data_archive_service, "db", MagicMock()) as mock_db,
+        patch.object(app_data_archive_service, "storage", mock_storage),
+        patch.object(node_payload_storage, "storage", mock_storage),
+    ):
+        mock_db.session.query.return_value = FakeArchiveQuery([archive])
+
+        assert AppDataArchiveService.delete_app_archives("app") == 1
+
+    # the payloads shared by several executions are deleted once
+    assert sorted(c.args[0] for c in mock_storage.delete.call_args_list) == ["executions", "payload-1", "payload-2"]
+
+
+def test_archives_written_before_a_column_was_added_are_read_back():
+    table = pq.read_table(io.BytesIO(_write_file([_message_row("m1", "c1", datetime(2024, 1, 1))])))
+
+    (message,) = app_data_archive_service._to_models(Message, table.drop_columns(["invoke_from"]).to_pylist())
+
+    assert message.id == "m1"
+    assert message.invoke_from is None
@@ -0,0 +1,142 @@
+# test for api/services/app_statistic_service.py
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytz
+from sqlalchemy.dialects import postgresql
+
+from models.model import AppStatisticRollup
+from services.app_statistic_service import AppStatisticService
+
+TIMEZONE = "Asia/Shanghai"
+
+
+def _utc(value: str) -> datetime:
+    return pytz.timezone(TIMEZONE).localize(datetime.strptime(value, "%Y-%m-%d %H:%M")).astimezone(pytz.utc)
+
+
+def _row(day: str, count: int) -> dict:
+    return {"date": day, "message_count": count}
+
+
+def test_complete_days_are_read_from_rollups():
+    app_model = MagicMock(id="app-id")
+    with (
+        patch.object(AppStatisticService, "_query_daily_statistics") as mock_query,
+        patch.object(AppStatisticService, "_get_rollups") as mock_get_rollups,
+    ):
+        mock_query.return_value = [_row("2024-01-01", 1)]
+        mock_get_rollups.return_value = [_row("2024-01-02", 2), _row("2024-01-04", 4)]
+        response_data = AppStatisticService.get_daily_statistics(
+            app_model, "daily_messages", TIMEZONE, "2024-01-01 10:00", "2024-01-05 00:00"
+        )
+
+    # only the partial first day scans raw rows, the range ends on a midnight so there is no tail
+    mock_query.assert_called_once_with(
+        app_model, "daily_messages", TIMEZONE, _utc("2024-01-01 10:00"), _utc("2024-01-02 00:00")
+    )
+    mock_get_rollups.assert_called_once_with(app_model, "daily_messages", TIMEZONE, date(2024, 1, 2), date(2024, 1, 4))
+    assert response_data == [_row("2024-01-01", 1), _row("2024-01-02", 2), _row("2024-01-04", 4)]
+
+
+def test_partial_last_day_is_queried_raw():
+    app_model = MagicMock(id="app-id")
+    with (
+        patch.object(AppStatisticService, "_query_daily_statistics") as mock_query,
+        patch.object(AppStatisticService, "_get_rollups", return_value=[]) as mock_get_rollups,
+    ):
+        AppStatisticService.get_daily_statistics(
+            app_model, "daily_messages", TIMEZONE, "2024-01-01 00:00", "2024-01-03 12:00"
+        )
+
+    mock_get_rollups.assert_called_once_with(app_model, "daily_messages", TIMEZONE, date(2024, 1, 1), date(2024, 1, 2))
+    mock_query.assert_called_once_with(
+        app_model, "daily_messages", TIMEZONE, _utc("2024-01-03 00:00"), _utc("2024-01-03 12:00")
+    )
+
+
+def test_range_without_complete_day_is_queried_raw():
+    app_model = MagicMock(id="app-id")
+    with (
+        patch.object(AppStatisticService, "_query_daily_statistics", return_value=[]) as mock_query,
+        patch.object(AppStatisticService, "_get_rollups") as mock_get_rollups,
+    ):
+        AppStatisticService.get_daily_statistics(
+            app_model, "daily_messages", TIMEZONE, "2024-01-01 08:00", "2024-01-01 20:00"
+        )
+
+    mock_query.assert_called_once_with(
+        app_model, "daily_messages", TIMEZONE, _utc("2024-01-01 08:00"), _utc("2024-01-01 20:00")
+    )
+    mock_get_rollups.assert_not_called()
+
+
+def test_missing_rollups_are_scanned_without_writing():
+    app_model = MagicMock(id="app-id")
+    existing = [
+        AppStatisticRollup(date=date(2024, 1, 1), data='{"date": "2024-01-01", "message_count": 1}'),
+        AppStatisticRollup(date=date(2024, 1, 4), data=None),
+    ]
+    with (
+        patch("services.app_statistic_service.db") as mock_db,
+        patch.object(AppStatisticService, "_query_daily_statistics") as mock_query,
+    ):
+        mock_db.session.scalars.return_value.all.return_value = existing
+        mock_query.return_value = [_row("2024-01-02", 2), _row("2024-01-04", 4)]
+        response_data = AppStatisticService._get_rollups(
+            app_model, "daily_messages", TIMEZONE, date(2024, 1, 1), date(2024, 1, 5)
+        )
+
+    mock_query.assert_called_once_with(
+        app_model, "daily_messages", TIMEZONE, _utc("2024-01-02 00:00"), _utc("2024-01-06 00:00")
+    )
+    # the rollups are only written by the scheduled task
+    mock_db.session.execute.assert_not_called()
+    mock_db.session.commit.assert_not_called()
+    # the rolled up days are read from their rollups even when the scan covers them
+    assert response_data == [_row("2024-01-01", 1), _row("2024-01-02", 2)]
+
+
+@pytest.mark.parametrize(
+    ("has_rollups", "first_day"),
+    [
+        # the days before the window were rolled up by the previous runs
+        (True, date(2024, 3, 4)),
+        # the first run backfills the days since the app was created
+        (False, date(2024, 1, 1)),
+    ],
+)
+def test_rebuild_rollups_rebuilds_the_last_days(has_rollups, first_day):
+    app_model = MagicMock(id="app-id", created_at=datetime(2023, 12, 31, 20, 0))
+    with (
+        patch("services.app_statistic_service.db") as mock_db,
+        patch("services.app_statistic_service.dify_config", MagicMock(APP_STATISTIC_ROLLUP_REBUILD_DAYS=7)),
+        patch.object(AppStatisticService, "generate_rollups") as mock_generate_rollups,
+    ):
+        mock_db.session.scalar.return_value = has_rollups
+        AppStatisticService.rebuild_rollups(app_model, TIMEZONE, date(2024, 3, 10))
+
+    mock_generate_rollups.assert_called_once_with(app_model, TIMEZONE, first_day, date(2024, 3, 10))
+
+
+def test_generate_rollups_overwrites_every_day_of_the_range():
+    app_model = MagicMock(id="app-id", mode="completion")
+    with (
+        patch("services.app_statistic_service.db") as mock_db,
+        patch.object(AppStatisticService, "_query_daily_statistics") as mock_query,
+    ):
+        mock_query.return_value = [_row("2024-01-02", 2)]
+        AppStatisticService.generate_rollups(app_model, TIMEZONE, date(2024, 1, 1), date(2024, 1, 3))
+
+    assert all(c.args[3:] == (_utc("2024-01-01 00:00"), _utc("2024-01-04 00:00")) for c in mock_query.call_args_list)
+    stmt = mock_db.session.execute.call_args[0][0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT" in sql
+    assert "DO UPDATE" in sql
+    assert {value for key, value in stmt.compile().params.items() if key.startswith("date")} == {
+        date(2024, 1, 1),
+        date(2024, 1, 2),
+        date(2024, 1, 3),
+    }
+    mock_db.session.commit.assert_called_once()
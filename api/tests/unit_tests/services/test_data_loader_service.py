@@ -0,0 +1,182 @@
+# test for api/services/data_loader_service.py
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask_restful import marshal
+
+from fields.app_fields import app_pagination_fields
+from fields.conversation_fields import conversation_pagination_fields, conversation_with_summary_pagination_fields
+from models.account import Account, Tenant
+from models.model import (
+    App,
+    AppModelConfig,
+    Conversation,
+    Message,
+    MessageAnnotation,
+    Site,
+    Tag,
+)
+from services.data_loader_service import AppDataLoader, ConversationDataLoader
+
+
+class FakeSession:
+    """
+    Answers the loader queries from in-memory rows and counts the round trips.
+    """
+
+    def __init__(self, rows: dict[str, list]):
+        self.rows = rows
+        self.query_count = 0
+
+    def _result(self, statement):
+        self.query_count += 1
+        sql = str(statement.compile(compile_kwargs={"literal_binds": False}))
+        for marker, rows in self.rows.items():
+            if marker in sql:
+                return MagicMock(all=MagicMock(return_value=rows))
+
+        return MagicMock(all=MagicMock(return_value=[]))
+
+    def execute(self, statement):
+        return self._result(statement)
+
+    def scalars(self, statement):
+        return self._result(statement)
+
+
+@pytest.fixture
+def model_db():
+    # queries issued by the model properties themselves, i.e. the per-row queries
+    with patch("models.model.db") as mock_db:
+        yield mock_db
+
+
+def _conversations(count: int) -> list[Conversation]:
+    return [
+        Conversation(
+            id=f"conversation-{i}",
+            app_id="app-id",
+            app_model_config_id="app-model-config-id",
+            mode="chat",
+            name=f"conversation {i}",
+            status="normal",
+            from_source="api",
+            from_end_user_id=f"end-user-{i}",
+            from_account_id="account-id",
+        )
+        for i in range(count)
+    ]
+
+
+def _apps(count: int) -> list[App]:
+    return [
+        App(
+            id=f"app-{i}",
+            tenant_id="tenant-id",
+            name=f"app {i}",
+            description="",
+            mode="chat",
+            app_model_config_id=f"app-model-config-{i}",
+            enable_site=True,
+            enable_api=True,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("page_size", [1, 100])
+def test_conversation_loader_query_count_is_independent_of_page_size(page_size):
+    session = FakeSession({})
+    with patch("services.data_loader_service.db", MagicMock(session=session)):
+        ConversationDataLoader.load(_conversations(page_size))
+
+    # message counts, first messages, annotations, feedback stats, end users, accounts, app model configs
+    assert session.query_count == 7
+
+
+def test_conversation_list_marshals_from_prefetched_page(model_db):
+    conversations = _conversations(2)
+    first_message = Message(
+        id="message-id", conversation_id="conversation-0", query="hello", answer="hi", _inputs={}, message=[]
+    )
+    annotation = MessageAnnotation(
+        id="annotation-id", conversation_id="conversation-0", content="answer", account_id="account-id"
+    )
+    account = Account(id="account-id", name="Owner", email="owner@example.com")
+    session = FakeSession(
+        {
+            "count(messages.id)": [("conversation-0", 3)],
+            "ORDER BY messages.conversation_id": [first_message],
+            "FROM message_annotations": [annotation],
+            "count(message_feedbacks.id)": [
+                ("conversation-0", "user", "like", 2),
+                ("conversation-0", "admin", "dislike", 1),
+            ],
+            "FROM end_users": [("end-user-0", "session-0")],
+            "accounts.email": [account],
+            "FROM accounts": [("account-id", "Owner")],
+            "FROM app_model_configs": [AppModelConfig(id="app-model-config-id", app_id="app-id")],
+        }
+    )
+    with patch("services.data_loader_service.db", MagicMock(session=session)):
+        ConversationDataLoader.load(conversations)
+    # the annotation reply setting of the app is resolved once while loading
+    assert model_db.session.query.call_count == 1
+    model_db.session.query.reset_mock()
+
+    pagination = MagicMock(page=1, per_page=20, total=2, has_next=False, items=conversations)
+    summaries = marshal(pagination, conversation_with_summary_pagination_fields)["data"]
+    details = marshal(pagination, conversation_pagination_fields)["data"]
+
+    assert summaries[0]["message_count"] == 3
+    assert summaries[0]["summary"] == "hello"
+    assert summaries[0]["annotated"] is True
+    assert summaries[0]["user_feedback_stats"] == {"like": 2, "dislike": 0}
+    assert summaries[0]["admin_feedback_stats"] == {"like": 0, "dislike": 1}
+    assert summaries[0]["from_end_user_session_id"] == "session-0"
+    assert summaries[0]["from_account_name"] == "Owner"
+    assert summaries[1]["message_count"] == 0
+    assert summaries[1]["summary"] == ""
+    assert summaries[1]["annotated"] is False
+    assert details[0]["annotation"]["account"]["name"] == "Owner"
+    assert details[0]["message"]["query"] == "hello"
+    assert details[1]["annotation"] is None
+    model_db.session.query.assert_not_called()
+
+
+@pytest.mark.parametrize("page_size", [1, 100])
+def test_app_loader_query_count_is_independent_of_page_size(page_size):
+    session = FakeSession({})
+    with patch("services.data_loader_service.db", MagicMock(session=session)):
+        AppDataLoader.load(_apps(page_size))
+
+    # sites, tenants, tags, app model configs
+    assert session.query_count == 4
+
+
+def test_app_list_marshals_from_prefetched_page(model_db):
+    apps = _apps(2)
+    session = FakeSession(
+        {
+            "FROM sites": [Site(app_id="app-0", code="code-0")],
+            "FROM tenants": [Tenant(id="tenant-id", name="Workspace")],
+            "FROM tag_bindings": [("app-0", Tag(id="tag-id", name="prod", type="app"))],
+            "FROM app_model_configs": [AppModelConfig(id="app-model-config-0", pre_prompt="prompt")],
+        }
+    )
+    with patch("services.data_loader_service.db", MagicMock(session=session)):
+        AppDataLoader.load(apps)
+    model_db.session.query.reset_mock()
+
+    pagination = MagicMock(page=1, per_page=20, total=2, has_next=False, items=apps)
+    data = marshal(pagination, app_pagination_fields)["data"]
+
+    assert data[0]["description"] == "prompt"
+    assert data[0]["tags"] == [{"id": "tag-id", "name": "prod", "type": "app"}]
+    assert data[0]["model_config"] is not None
+    assert data[1]["description"] == ""
+    assert data[1]["tags"] == []
+    assert data[1]["model_config"] is None
+    assert apps[0].site.code == "code-0"
+    assert apps[1].tenant.name == "Workspace"
+    model_db.session.query.assert_not_called()
@@ -0,0 +1,298 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.sql.elements import BinaryExpression
+
+from core.rag.models.document import Document
+from models.dataset import Dataset, DatasetVectorRebuild
+from services import dataset_vector_rebuild_service
+from services.dataset_vector_rebuild_service import DatasetVectorRebuildService
+
+
+class FakeSegmentsQuery:
+    """
+    Segments of a dataset, filtered by the id keyset of the batches or by the changes since the rebuild started
+    """
+
+    def __init__(self, segments, changed_segments):
+        self.segments = segments
+        self.changed_segments = changed_segments
+        self.after = None
+        self.changed = False
+        self.size = None
+
+    def filter(self, *conditions):
+        for condition in conditions:
+            if isinstance(condition, BinaryExpression) and condition.left.key == "id":
+                self.after = condition.right.value
+            else:
+                self.changed = True
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def limit(self, size):
+        self.size = size
+        return self
+
+    def count(self):
+        return len(self.segments)
+
+    def all(self):
+        if self.changed:
+            return self.changed_segments
+        return [segment for segment in self.segments if self.after is None or segment.id > self.after][: self.size]
+
+
+def _segment(segment_id: str):
+    return SimpleNamespace(
+        id=segment_id,
+        content=f"content {segment_id}",
+        index_node_id=f"node-{segment_id}",
+        index_node_hash="hash",
+        document_id="document",
+        dataset_id="dataset",
+    )
+
+
+@pytest.fixture
+def vectors():
+    shadow_vector, old_vector = MagicMock(), MagicMock()
+    segments = [_segment(f"s{i}") for i in range(1, 6)]
+    with (
+        patch.object(dataset_vector_rebuild_service, "db", MagicMock()) as mock_db,
+        patch.object(dataset_vector_rebuild_service, "Vector", side_effect=[shadow_vector, old_vector]),
+        patch.object(dataset_vector_rebuild_service, "dify_config", MagicMock(DATASET_VECTOR_REBUILD_BATCH_SIZE=2)),
+        patch.object(
+            DatasetVectorRebuildService,
+            "_get_segments_query",
+            side_effect=lambda dataset_id: FakeSegmentsQuery(segments, changed_segments=[segments[0]]),
+        ),
+    ):
+        mock_db.session.query.return_value.filter.return_value.scalar.return_value = "rebuilding"
+        yield shadow_vector, old_vector, mock_db
+
+
+def _rebuild(**kwargs) -> DatasetVectorRebuild:
+    return DatasetVectorRebuild(
+        dataset_id="dataset",
+        embedding_model_provider="new-provider",
+        embedding_model="new-model",
+        index_struct='{"type": "pgvector", "vector_store": {"class_prefix": "Vector_index_shadow_Node"}}',
+        status="rebuilding",
+        created_at=datetime(2024, 1, 1),
+        **kwargs,
+    )
+
+
+def _dataset() -> Dataset:
+    return Dataset(
+        id="dataset",
+        tenant_id="tenant",
+        indexing_technique="high_quality",
+        embedding_model_provider="old-provider",
+        embedding_model="old-model",
+        index_struct='{"type": "pgvector", "vector_store": {"class_prefix": "Vector_index_dataset_Node"}}',
+    )
+
+
+def _created_node_ids(vector) -> list[list[str]]:
+    return [[document.metadata["doc_id"] for document in c.args[0]] for c in vector.create.call_args_list]
+
+
+def test_rebuild_fills_the_shadow_collection_in_batches_then_switches_the_dataset(vectors):
+    shadow_vector, old_vector, mock_db = vectors
+    rebuild = _rebuild(segment_count=0)
+
+    DatasetVectorRebuildService._rebuild(_dataset(), rebuild, MagicMock())
+
+    assert _created_node_ids(shadow_vector) == [
+        ["node-s1", "node-s2"],
+        ["node-s3", "node-s4"],
+        ["node-s5"],
+        # changed while the collection was built
+        ["node-s1"],
+    ]
+    shadow_vector.delete_by_ids.assert_called_once_with(["node-s1"])
+    assert (rebuild.last_segment_id, rebuild.segment_count, rebuild.status) == ("s5", 5, "completed")
+    mock_db.session.query.return_value.filter.return_value.update.assert_called_with(
+        {
+            "indexing_technique": "high_quality",
+            "embedding_model_provider": "new-provider",
+            "embedding_model": "new-model",
+            "collection_binding_id": None,
+            "index_struct": rebuild.index_struct,
+        },
+        synchronize_session=False,
+    )
+    old_vector.delete.assert_called_once()
+
+
+def test_rebuild_resumes_after_its_checkpoint(vectors):
+    shadow_vector, _, _ = vectors
+    rebuild = _rebuild(last_segment_id="s2", segment_count=2)
+
+    DatasetVectorRebuildService._rebuild(_dataset(), rebuild, MagicMock())
+
+    assert _created_node_ids(shadow_vector)[:2] == [["node-s3", "node-s4"], ["node-s5"]]
+    # the batch after the checkpoint may have been written before the worker died
+    assert shadow_vector.delete_by_ids.call_args_list[0].args == (["node-s3", "node-s4"],)
+    assert rebuild.segment_count == 5
+
+
+def test_stale_rebuilds_are_resumed_up_to_the_maximum_attempts():
+    resumable = _rebuild(attempt_count=1)
+    exhausted = _rebuild(attempt_count=3)
+    exhausted.dataset_id = "exhausted"
+    mock_db = MagicMock()
+    mock_db.session.query.return_value.filter.return_value.all.return_value = [resumable, exhausted]
+
+    with (
+        patch.object(dataset_vector_rebuild_service, "db", mock_db),
+        patch.object(
+            dataset_vector_rebuild_service,
+            "dify_config",
+            MagicMock(DATASET_VECTOR_REBUILD_STALE_MINUTES=30, DATASET_VECTOR_REBUILD_MAX_ATTEMPTS=3),
+        ),
+    ):
+        assert DatasetVectorRebuildService.claim_stale_dataset_ids() == ["dataset"]
+
+    assert (resumable.status, resumable.attempt_count) == ("rebuilding", 2)
+    assert exhausted.status == "failed"
+    mock_db.session.commit.assert_called_once()
+
+
+def test_start_switches_a_dataset_without_segments_at_once():
+    dataset = _dataset()
+    mock_db = MagicMock()
+    mock_db.session.query.return_value.filter.return_value.first.return_value = None
+    empty_query = MagicMock()
+    empty_query.first.return_value = None
+
+    with (
+        patch.object(dataset_vector_rebuild_service, "db", mock_db),
+        patch.object(dataset_vector_rebuild_service, "Vector") as mock_vector,
+        patch.object(DatasetVectorRebuildService, "_get_segments_query", return_value=empty_query),
+    ):
+        rebuild = DatasetVectorRebuildService.start(dataset, "new-provider", "new-model", None)
+
+    assert rebuild.status == "completed"
+    update = mock_db.session.query.return_value.filter.return_value.update
+    assert update.call_args.args[0]["embedding_model"] == "new-model"
+    mock_vector.return_value.delete.assert_called_once()
+
+
+def _replacing_vectors_db(rebuild, current_dataset):
+    mock_db = MagicMock()
+    query = mock_db.session.query.return_value.filter.return_value
+    query.populate_existing.return_value.first.return_value = rebuild
+    query.first.return_value = SimpleNamespace(
+        indexing_technique=current_dataset.indexing_technique,
+        embedding_model_provider=current_dataset.embedding_model_provider,
+        embedding_model=current_dataset.embedding_model,
+        collection_binding_id=current_dataset.collection_binding_id,
+        index_struct=current_dataset.index_struct,
+    )
+    return mock_db
+
+
+def test_documents_indexed_during_a_rebuild_are_indexed_into_the_shadow_collection():
+    dataset = _dataset()
+    rebuild = _rebuild()
+    documents = [Document(page_content="content", metadata={"doc_id": "node-s1"})]
+
+    with (
+        patch.object(dataset_vector_rebuild_service, "db", _replacing_vectors_db(rebuild, dataset)),
+        patch.object(dataset_vector_rebuild_service, "Vector") as mock_vector,
+    ):
+        DatasetVectorRebuildService.index_documents(dataset, documents)
+
+    mock_vector.assert_called_once()
+    assert mock_vector.call_args.args[0].index_struct == rebuild.index_struct
+    mock_vector.return_value.delete_by_ids.assert_called_once_with(["node-s1"])
+    mock_vector.return_value.create.assert_called_once_with(documents)
+
+
+def test_documents_indexed_into_a_switched_dataset_are_indexed_into_its_new_index():
+    # loaded by the indexer before the dataset was switched to its rebuilt index
+    dataset = _dataset()
+    switched_dataset = _dataset()
+    switched_dataset.index_struct = _rebuild().index_struct
+    documents = [Document(page_content="content", metadata={"doc_id": "node-s1"})]
+
+    with (
+        patch.object(dataset_vector_rebuild_service, "db", _replacing_vectors_db(None, switched_dataset)),
+        patch.object(dataset_vector_rebuild_service, "Vector") as mock_vector,
+    ):
+        DatasetVectorRebuildService.index_documents(dataset, documents)
+        DatasetVectorRebuildService.index_documents(switched_dataset, documents)
+
+    mock_vector.assert_called_once()
+    assert mock_vector.call_args.args[0].index_struct == switched_dataset.index_struct
+    mock_vector.return_value.create.assert_called_once_with(documents)
+
+
+def test_rebuild_stops_once_cancelled(vectors):
+    shadow_vector, old_vector, mock_db = vectors
+    mock_db.session.query.return_value.filter.return_value.scalar.return_value = "cancelled"
+
+    DatasetVectorRebuildService._rebuild(_dataset(), _rebuild(segment_count=0), MagicMock())
+
+    assert _created_node_ids(shadow_vector) == [["node-s1", "node-s2"]]
+    mock_db.session.query.return_value.filter.return_value.update.assert_not_called()
+    old_vector.delete.assert_not_called()
+
+
+def test_cancelled_rebuild_is_not_switched(vectors):
+    shadow_vector, old_vector, mock_db = vectors
+    # the conditional update of the rebuild matched no row
+    mock_db.session.query.return_value.filter.return_value.update.return_value = 0
+    rebuild = _rebuild()
+
+    DatasetVectorRebuildService._switch(_dataset(), rebuild)
+
+    mock_db.session.query.return_value.filter.return_value.update.assert_called_once()
+    mock_db.session.rollback.assert_called_once()
+    assert rebuild.status == "rebuilding"
+    old_vector.delete.assert_not_called()
+
+
+def test_cancel_deletes_the_shadow_collection():
+    dataset = _dataset()
+    rebuild = _rebuild()
+    mock_db = MagicMock()
+    mock_db.session.query.return_value.filter.return_value.first.return_value = rebuild
+    mock_db.session.query.return_value.filter.return_value.update.return_value = 1
+
+    with (
+        patch.object(dataset_vector_rebuild_service, "db", mock_db),
+        patch.object(dataset_vector_rebuild_service, "Vector") as mock_vector,
+    ):
+        DatasetVectorRebuildService.cancel(dataset)
+
+    update = mock_db.session.query.return_value.filter.return_value.update
+    assert update.call_args.args[0]["status"] == "cancelled"
+    assert mock_vector.call_args.args[0].index_struct == rebuild.index_struct
+    mock_vector.return_value.delete.assert_called_once()
+
+
+@pytest.mark.parametrize(("status", "shadow_deleted"), [("rebuilding", True), ("failed", True), ("completed", False)])
+def test_deleted_dataset_loses_its_rebuild_and_shadow_collection(status, shadow_deleted):
+    rebuild = _rebuild()
+    rebuild.status = status
+    mock_db = MagicMock()
+    mock_db.session.query.return_value.filter.return_value.first.return_value = rebuild
+
+    with (
+        patch.object(dataset_vector_rebuild_service, "db", mock_db),
+        patch.object(dataset_vector_rebuild_service, "Vector") as mock_vector,
+    ):
+        DatasetVectorRebuildService.delete(_dataset())
+
+    # the collection of a completed rebuild is the index of the dataset, deleted with it
+    assert mock_vector.return_value.delete.called == shadow_deleted
+    mock_db.session.delete.assert_called_once_with(rebuild)
+    mock_db.session.commit.assert_called_once()
@@ -1,49 +1,121 @@
 # test for api/services/feature_service.py
+from unittest.mock import MagicMock, patch
+
 import pytest
-from unittest.mock import patch
-from services.feature_service import FeatureService, FeatureModel
-
-@patch('services.billing_service.BillingService.get_current_plan_info')
-def test_fulfill_params_from_billing_api(mock_get_current_plan_info):
-    # Simulação de retorno da API de billing
-    mock_get_current_plan_info.return_value = {
-        "billing": {
-            "enabled": True,
-            "subscription": {"plan": "team"}
-        },
-        "members": {"size": 5, "limit": 10},
-        "apps": {"size": 2, "limit": 10},
-        "vector_space": {"size": 3, "limit": 5},
-        "can_replace_logo": "true",
-        "model_load_balancing_enabled": "true",
-        "dataset_operator_enabled": "false"
-    }
-    
-    tenant_id = "test-tenant-id"
-    features = FeatureService.get_features(tenant_id)
-    
+
+from services.feature_service import FeatureModel, FeatureService
+
+
+@pytest.fixture
+def billing_enabled():
+    with patch("services.feature_service.dify_config") as mock_config:
+        mock_config.BILLING_ENABLED = True
+        mock_config.BILLING_ENTITLEMENT_CACHE_TTL = 600
+        mock_config.CAN_REPLACE_LOGO = False
+        mock_config.MODEL_LB_ENABLED = False
+        mock_config.DATASET_OPERATOR_ENABLED = False
+        yield mock_config
+
+
+@pytest.fixture
+def stripe_stub():
+    # Stub local do Stripe: qualquer chamada não simulada abaixo deve falhar o teste
+    with (
+        patch("services.billing_service.BillingService.find_customer_by_email_and_tenant") as find_customer,
+        patch("services.billing_service.BillingService.get_info") as get_info,
+        patch("services.billing_service.BillingService.get_subscription") as get_subscription,
+        patch("services.billing_service.BillingService.get_product_metadata") as get_product_metadata,
+    ):
+        find_customer.return_value = MagicMock(email="owner@example.com")
+        get_info.return_value = {"enabled": True, "subscription": {"plan": "team", "interval": "month"}}
+        get_subscription.return_value = {"id": "sub_1", "status": "active", "plan": "team", "interval": "month"}
+        get_product_metadata.return_value = {
+            "members_limit": "10",
+            "apps_limit": "50",
+            "can_replace_logo": "true",
+            "model_load_balancing_enabled": "true",
+        }
+        yield {
+            "find_customer": find_customer,
+            "get_info": get_info,
+            "get_subscription": get_subscription,
+            "get_product_metadata": get_product_metadata,
+        }
+
+
+def test_get_features_reads_snapshot_without_calling_stripe(billing_enabled, stripe_stub):
+    snapshot = FeatureModel()
+    snapshot.billing.subscription.plan = "team"
+    snapshot.members.limit = 10
+    snapshot.can_replace_logo = True
+
+    with patch("redis.Redis.get", return_value=snapshot.model_dump_json()):
+        features = FeatureService.get_features("test-tenant-id")
+
+    assert features.billing.subscription.plan == "team"
+    assert features.members.limit == 10
+    assert features.can_replace_logo is True
+    for stub in stripe_stub.values():
+        stub.assert_not_called()
+
+
+def test_get_features_without_snapshot_uses_defaults_and_schedules_refresh(billing_enabled, stripe_stub):
+    with (
+        patch.object(FeatureService, "get_billing_entitlement", return_value=None),
+        patch.object(FeatureService, "_schedule_billing_entitlement_refresh") as mock_schedule,
+    ):
+        features = FeatureService.get_features("test-tenant-id")
+
+    assert features.billing.subscription.plan == "sandbox"
+    assert features.members.limit == 1
+    assert features.apps.limit == 10
+    assert features.can_replace_logo is False
+    mock_schedule.assert_called_once_with("test-tenant-id")
+    for stub in stripe_stub.values():
+        stub.assert_not_called()
+
+
+def test_refresh_billing_entitlement_persists_snapshot(billing_enabled, stripe_stub):
+    with (
+        patch("services.feature_service.db") as mock_db,
+        patch("redis.Redis.setex") as mock_setex,
+    ):
+        mock_db.session.query.return_value.filter.return_value.first.return_value = None
+        features = FeatureService.refresh_billing_entitlement("test-tenant-id")
+
     assert features.billing.enabled is True
     assert features.billing.subscription.plan == "team"
-    assert features.members.size == 5
-    assert features.apps.size == 2
-    assert features.vector_space.size == 3
+    assert features.members.limit == 10
+    assert features.apps.limit == 50
     assert features.can_replace_logo is True
     assert features.model_load_balancing_enabled is True
     assert features.dataset_operator_enabled is False
 
-@patch('services.billing_service.BillingService.get_current_plan_info')
-def test_fulfill_params_with_invalid_data(mock_get_current_plan_info):
-    # Simulação de retorno da API com dados faltantes
-    mock_get_current_plan_info.return_value = {}
+    tenant_billing_entitlement = mock_db.session.add.call_args[0][0]
+    assert tenant_billing_entitlement.tenant_id == "test-tenant-id"
+    assert FeatureModel.model_validate(tenant_billing_entitlement.entitlements_dict) == features
+    mock_db.session.commit.assert_called_once()
+    mock_setex.assert_called_once_with(
+        "billing_entitlement:test-tenant-id", 600, tenant_billing_entitlement.entitlements
+    )
+
 
-    tenant_id = "test-tenant-id"
-    features = FeatureService.get_features(tenant_id)
+def test_refresh_billing_entitlement_with_missing_customer_persists_sandbox_snapshot(billing_enabled, stripe_stub):
+    stripe_stub["find_customer"].return_value = None
+
+    with (
+        patch("services.feature_service.db") as mock_db,
+        patch("redis.Redis.setex") as mock_setex,
+    ):
+        mock_db.session.query.return_value.filter.return_value.first.return_value = None
+        features = FeatureService.refresh_billing_entitlement("test-tenant-id")
 
-    assert features.billing.enabled is False
     assert features.billing.subscription.plan == "sandbox"
-    assert features.members.size == 0
-    assert features.apps.size == 0
-    assert features.vector_space.size == 0
-    assert features.can_replace_logo is False
-    assert features.model_load_balancing_enabled is False
-    assert features.dataset_operator_enabled is False
+    assert features.members.limit == 1
+    assert features.apps.limit == 10
+    tenant_billing_entitlement = mock_db.session.add.call_args[0][0]
+    assert FeatureModel.model_validate(tenant_billing_entitlement.entitlements_dict) == features
+    mock_db.session.commit.assert_called_once()
+    mock_setex.assert_called_once()
+    stripe_stub["get_info"].assert_not_called()
+    stripe_stub["get_subscription"].assert_not_called()
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from core.rag.models.document import Document
+from services import hit_testing_service
+from services.hit_testing_service import HitTestingService
+
+SEGMENTS = {f"node-{i}": SimpleNamespace(id=f"segment-{i}", index_node_id=f"node-{i}") for i in range(1, 5)}
+
+# documents each retrieval setting returns for each query, by top_k
+RETRIEVED = {
+    2: {"first": ["node-1", "node-2"], "second": ["node-3", "node-1"]},
+    4: {"first": ["node-2", "node-1", "node-3", "node-4"], "second": ["node-4", "node-2", "node-3", "node-1"]},
+}
+
+
+def _retrieve_documents(dataset_id, query, retrieval_model, stage_timer=None):
+    with stage_timer.measure("vector_search"):
+        return [
+            Document(page_content="", metadata={"doc_id": node_id, "score": 0.5})
+            for node_id in RETRIEVED[retrieval_model["top_k"]][query]
+        ]
+
+
+def _get_segments(dataset_id, documents):
+    return [(SEGMENTS[document.metadata["doc_id"]], document.metadata["score"]) for document in documents]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with (
+        app.app_context(),
+        patch.object(hit_testing_service, "dify_config", MagicMock(HIT_TESTING_BATCH_MAX_WORKERS=2)),
+        patch.object(HitTestingService, "_retrieve_documents", side_effect=_retrieve_documents),
+        patch.object(HitTestingService, "_get_segments", side_effect=_get_segments),
+    ):
+        yield app
+
+
+def test_batch_retrieve_compares_retrieval_models_by_recall_and_mrr(app):
+    response = HitTestingService.batch_retrieve(
+        dataset=MagicMock(id="dataset"),
+        queries=[
+            {"content": "first", "expected_segment_ids": ["segment-1"]},
+            {"content": "second", "expected_segment_ids": ["segment-1", "segment-4"]},
+            {"content": "first"},
+        ],
+        retrieval_models=[{"top_k": 2}, {"top_k": 4}],
+    )
+
+    top_2, top_4 = response["results"]
+    assert top_2["metrics"] == {"k": 2, "evaluated_query_count": 2, "recall_at_k": 0.75, "mrr": 0.75}
+    assert top_4["metrics"] == {"k": 4, "evaluated_query_count": 2, "recall_at_k": 1.0, "mrr": 0.75}
+    assert top_2["queries"][1]["segment_ids"] == ["segment-3", "segment-1"]
+    assert top_2["queries"][2]["recall"] is None
+
+
+def test_batch_retrieve_reports_stage_latency_histograms(app):
+    response = HitTestingService.batch_retrieve(
+        dataset=MagicMock(id="dataset"),
+        queries=[{"content": "first"}, {"content": "second"}],
+        retrieval_models=[{"top_k": 2}],
+    )
+
+    timings = response["results"][0]["timings"]
+    assert set(timings) == {"vector_search", "segment_hydration", "total"}
+    for histogram in timings.values():
+        assert histogram["count"] == 2
+        assert sum(bucket["count"] for bucket in histogram["buckets"]) == 2
+        assert histogram["p50"] <= histogram["p95"] == histogram["max"]
+    assert timings["total"]["buckets"][-1]["le"] is None
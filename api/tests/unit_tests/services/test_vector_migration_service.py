@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock
+
+from core.rag.models.document import Document
+from services.vector_migration_service import VectorMigrationProgress, VectorMigrationService
+
+
+def _documents(*doc_ids: str) -> list[Document]:
+    return [Document(page_content=f"text of {doc_id}", metadata={"doc_id": doc_id}) for doc_id in doc_ids]
+
+
+def test_vectors_are_copied_from_the_source_store_and_the_others_embedded():
+    source_vector = MagicMock()
+    source_vector.get_embeddings_by_ids.return_value = {"a": [1.0], "c": [3.0]}
+    target_vector = MagicMock()
+    target_vector.embed_documents.return_value = [[2.0], [4.0]]
+
+    embeddings, copied_count = VectorMigrationService._get_embeddings(
+        source_vector, target_vector, _documents("a", "b", "c", "d")
+    )
+
+    assert embeddings == [[1.0], [2.0], [3.0], [4.0]]
+    assert copied_count == 2
+    source_vector.get_embeddings_by_ids.assert_called_once_with(["a", "b", "c", "d"])
+    target_vector.embed_documents.assert_called_once_with(["text of b", "text of d"])
+
+
+def test_vectors_are_embedded_when_the_source_store_fails():
+    source_vector = MagicMock()
+    source_vector.get_embeddings_by_ids.side_effect = ConnectionError()
+    target_vector = MagicMock()
+    target_vector.embed_documents.return_value = [[1.0], [2.0]]
+
+    embeddings, copied_count = VectorMigrationService._get_embeddings(
+        source_vector, target_vector, _documents("a", "b")
+    )
+
+    assert embeddings == [[1.0], [2.0]]
+    assert copied_count == 0
+
+
+def test_progress_estimates_the_time_left_from_the_throughput():
+    progress = VectorMigrationProgress(total_segments=300)
+    assert progress.eta_seconds is None
+
+    progress.started_at -= 10
+    progress.add_batch(100, copied_count=60)
+    progress.add_dataset(migrated=True)
+
+    assert round(progress.segments_per_second) == 10
+    assert round(progress.eta_seconds) == 20
+    assert "1 datasets migrated" in str(progress)
+    assert "60 vectors copied, 40 embedded" in str(progress)
@@ -0,0 +1,125 @@
+"""
+Benchmark the clients against a local mock of the Service-API.
+
+    python benchmark.py --calls 2000 --concurrency 32 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from dify_client.async_client import AsyncDifyClient
+from dify_client.client import WorkflowClient
+from dify_client.sse import iter_events
+
+STREAM_EVENTS = 2000
+
+
+class MockServiceAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class MockServiceAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # the headers and the body are written separately, which Nagle's algorithm would delay on a kept-alive connection
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        if data.get("response_mode") == "streaming":
+            body = b"".join(
+                b'data: {"event": "message", "answer": "token %d", "message_id": "m"}\n\n' % i
+                for i in range(STREAM_EVENTS)
+            )
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps({"data": {"status": "succeeded", "outputs": data["inputs"]}}).encode()
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _report(name: str, calls: int, elapsed: float):
+    print(f"{name:<40} {calls / elapsed:>10.1f} calls/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="Workflow runs per client.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Runs in flight of the async client.")
+    parser.add_argument("--latency-ms", type=int, default=20, help="Latency of the mock API.")
+    args = parser.parse_args()
+
+    MockServiceAPIHandler.latency = args.latency_ms / 1000
+    server = MockServiceAPIServer(("127.0.0.1", 0), MockServiceAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    inputs_list = [{"n": n} for n in range(args.calls)]
+
+    # a new connection for every call, as the client did before it kept a session
+    sequential_calls = min(args.calls, 200)
+    start = time.perf_counter()
+    for inputs in inputs_list[:sequential_calls]:
+        requests.request(
+            "POST",
+            f"{base_url}/workflows/run",
+            json={"inputs": inputs, "response_mode": "blocking", "user": "benchmark"},
+            headers={"Authorization": "Bearer key"},
+        ).json()
+    _report("requests.request, sequential", sequential_calls, time.perf_counter() - start)
+
+    with WorkflowClient("key", base_url=base_url) as client:
+        start = time.perf_counter()
+        for inputs in inputs_list[:sequential_calls]:
+            client.run(inputs, response_mode="blocking", user="benchmark").json()
+        _report("WorkflowClient session, sequential", sequential_calls, time.perf_counter() - start)
+
+    async def run_bulk():
+        async with AsyncDifyClient("key", base_url=base_url, max_connections=args.concurrency) as client:
+            start = time.perf_counter()
+            responses = await client.bulk_run_workflows(inputs_list, user="benchmark", concurrency=args.concurrency)
+            elapsed = time.perf_counter() - start
+            assert [response.json()["data"]["outputs"] for response in responses] == inputs_list
+            return elapsed
+
+    _report(f"AsyncDifyClient, {args.concurrency} concurrent", args.calls, asyncio.run(run_bulk()))
+
+    MockServiceAPIHandler.latency = 0
+    with WorkflowClient("key", base_url=base_url) as client:
+        start = time.perf_counter()
+        response = client.run({}, response_mode="streaming", user="benchmark")
+        # the parsing the README showed before the client parsed events
+        answers = [
+            json.loads(line.split("data:", 1)[-1].strip())["answer"]
+            for line in response.iter_lines(decode_unicode=True)
+            if line.split("data:", 1)[-1].strip()
+        ]
+        line_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = client.run({}, response_mode="streaming", user="benchmark")
+        events = [event.data["answer"] for event in iter_events(response.iter_content(chunk_size=None))]
+        event_elapsed = time.perf_counter() - start
+        assert events == answers
+    print(f"{'iter_lines and json, streaming':<40} {STREAM_EVENTS / line_elapsed:>10.1f} events/s")
+    print(f"{'iter_events, streaming':<40} {STREAM_EVENTS / event_elapsed:>10.1f} events/s")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
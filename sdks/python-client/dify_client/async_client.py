@@ -0,0 +1,217 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, TypeVar
+
+import httpx
+
+from dify_client.client import RETRY_STATUSES
+from dify_client.sse import StreamEvent, aiter_events
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class AsyncDifyClient:
+    def __init__(
+        self,
+        api_key,
+        base_url: str = "https://api.dify.ai/v1",
+        max_connections: int = 100,
+        max_retries: int = 3,
+        timeout=None,
+        client: httpx.AsyncClient = None,
+    ):
+        """
+        Construct an asyncio client of the Dify Service-API, built on httpx (`pip install dify-client[async]`).
+
+        The client keeps up to `max_connections` connections open and reuses them across calls. Close it when done,
+        or use it as an async context manager.
+
+        Args:
+            api_key (str): API key of Dify.
+            base_url (str, optional): Base URL of Dify API. Defaults to 'https://api.dify.ai/v1'.
+            max_connections (int, optional): Connections open at the same time, further requests wait for one.
+                Defaults to 100.
+            max_retries (int, optional): Retries of the requests which failed to connect or were rejected with 429 or
+                503, with an exponential backoff honoring Retry-After. Defaults to 3.
+            timeout (float, optional): Timeout of the requests in seconds. Defaults to None, which waits forever.
+            client (httpx.AsyncClient, optional): Client to send the requests with, instead of a new one.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=httpx.AsyncHTTPTransport(retries=max_retries),
+            timeout=timeout,
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _send_request(self, method, endpoint, json=None, params=None) -> httpx.Response:
+        request = self._build_request(method, endpoint, json, params)
+        for attempt in range(self.max_retries + 1):
+            response = await self.client.send(request)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            await response.aclose()
+            await asyncio.sleep(self._get_retry_delay(response, attempt))
+        return response
+
+    async def _stream_events(self, method, endpoint, json=None) -> AsyncIterator[StreamEvent]:
+        request = self._build_request(method, endpoint, json)
+        for attempt in range(self.max_retries + 1):
+            response = await self.client.send(request, stream=True)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            await response.aclose()
+            await asyncio.sleep(self._get_retry_delay(response, attempt))
+
+        try:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for event in aiter_events(response.aiter_bytes()):
+                yield event
+        finally:
+            await response.aclose()
+
+    def _build_request(self, method, endpoint, json=None, params=None) -> httpx.Request:
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        return self.client.build_request(
+            method, f"{self.base_url}{endpoint}", json=json, params=params, headers=headers
+        )
+
+    @staticmethod
+    def _get_retry_delay(response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return 0.5 * 2**attempt
+
+    async def message_feedback(self, message_id, rating, user) -> httpx.Response:
+        data = {"rating": rating, "user": user}
+        return await self._send_request("POST", f"/messages/{message_id}/feedbacks", data)
+
+    async def get_application_parameters(self, user) -> httpx.Response:
+        params = {"user": user}
+        return await self._send_request("GET", "/parameters", params=params)
+
+    async def create_completion_message(self, inputs, user, files=None) -> httpx.Response:
+        """
+        Create a completion message in blocking mode
+        """
+        data = {"inputs": inputs, "response_mode": "blocking", "user": user, "files": files}
+        return await self._send_request("POST", "/completion-messages", data)
+
+    def stream_completion_message(self, inputs, user, files=None) -> AsyncIterator[StreamEvent]:
+        """
+        Create a completion message in streaming mode
+
+        :return: async iterator of the events of the message, as they are received
+        """
+        data = {"inputs": inputs, "response_mode": "streaming", "user": user, "files": files}
+        return self._stream_events("POST", "/completion-messages", data)
+
+    async def create_chat_message(self, inputs, query, user, conversation_id=None, files=None) -> httpx.Response:
+        """
+        Create a chat message in blocking mode
+        """
+        data = self._get_chat_message_data(inputs, query, user, "blocking", conversation_id, files)
+        return await self._send_request("POST", "/chat-messages", data)
+
+    def stream_chat_message(self, inputs, query, user, conversation_id=None, files=None) -> AsyncIterator[StreamEvent]:
+        """
+        Create a chat message in streaming mode
+
+        :return: async iterator of the events of the message, as they are received
+        """
+        data = self._get_chat_message_data(inputs, query, user, "streaming", conversation_id, files)
+        return self._stream_events("POST", "/chat-messages", data)
+
+    async def run_workflow(self, inputs: dict, user: str) -> httpx.Response:
+        """
+        Run a workflow in blocking mode
+        """
+        data = {"inputs": inputs, "response_mode": "blocking", "user": user}
+        return await self._send_request("POST", "/workflows/run", data)
+
+    def stream_workflow_run(self, inputs: dict, user: str) -> AsyncIterator[StreamEvent]:
+        """
+        Run a workflow in streaming mode
+
+        :return: async iterator of the events of the run, as they are received
+        """
+        data = {"inputs": inputs, "response_mode": "streaming", "user": user}
+        return self._stream_events("POST", "/workflows/run", data)
+
+    async def stop_workflow(self, task_id, user) -> httpx.Response:
+        data = {"user": user}
+        return await self._send_request("POST", f"/workflows/tasks/{task_id}/stop", data)
+
+    async def get_workflow_result(self, workflow_run_id) -> httpx.Response:
+        return await self._send_request("GET", f"/workflows/run/{workflow_run_id}")
+
+    async def bulk_create_completion_messages(
+        self, inputs_list: Iterable[dict], user: str, concurrency: int = 10
+    ) -> List[httpx.Response]:
+        """
+        Create a completion message in blocking mode for each inputs, with at most `concurrency` in flight
+
+        :return: response of each inputs, in order
+        """
+        return await self.map_bounded(
+            lambda inputs: self.create_completion_message(inputs, user), inputs_list, concurrency
+        )
+
+    async def bulk_run_workflows(
+        self, inputs_list: Iterable[dict], user: str, concurrency: int = 10
+    ) -> List[httpx.Response]:
+        """
+        Run the workflow in blocking mode for each inputs, with at most `concurrency` runs in flight
+
+        :return: response of each inputs, in order
+        """
+        return await self.map_bounded(lambda inputs: self.run_workflow(inputs, user), inputs_list, concurrency)
+
+    @staticmethod
+    async def map_bounded(func: Callable[[T], Awaitable[R]], items: Iterable[T], concurrency: int = 10) -> List[R]:
+        """
+        Await `func` for each item, with at most `concurrency` of them in flight.
+
+        Items are taken from the iterable as workers free up, so that a large batch is not turned into as many
+        pending tasks at once. An exception cancels the calls in flight and is raised.
+
+        :return: result of each item, in order
+        """
+        results: List[Any] = []
+        item_iterator = iter(enumerate(items))
+
+        async def worker():
+            for index, item in item_iterator:
+                result = await func(item)
+                if index >= len(results):
+                    results.extend([None] * (index + 1 - len(results)))
+                results[index] = result
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(concurrency, 1))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+        return results
+
+    @staticmethod
+    def _get_chat_message_data(inputs, query, user, response_mode, conversation_id=None, files=None) -> dict:
+        data = {"inputs": inputs, "query": query, "user": user, "response_mode": response_mode, "files": files}
+        if conversation_id:
+            data["conversation_id"] = conversation_id
+        return data
@@ -1,18 +1,89 @@
 import json
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from dify_client.sse import iter_events
+
+# statuses returned before a request is processed, which are safe to retry for every method
+RETRY_STATUSES = (429, 503)
 
 
 class DifyClient:
-    def __init__(self, api_key, base_url: str = "https://api.dify.ai/v1"):
+    def __init__(
+        self,
+        api_key,
+        base_url: str = "https://api.dify.ai/v1",
+        max_retries: int = 3,
+        pool_maxsize: int = 10,
+        timeout=None,
+        session: requests.Session = None,
+    ):
+        """
+        Construct a client of the Dify Service-API.
+
+        The client keeps its connections open in a pool and reuses them across calls. Share a client between the
+        threads of a job rather than constructing one per call, and close it when done, or use it as a context manager.
+
+        Args:
+            api_key (str): API key of Dify.
+            base_url (str, optional): Base URL of Dify API. Defaults to 'https://api.dify.ai/v1'.
+            max_retries (int, optional): Retries of the requests which failed to connect or were rejected with 429 or
+                503, with an exponential backoff honoring Retry-After. Defaults to 3.
+            pool_maxsize (int, optional): Connections kept open, set it to the number of threads using the client.
+                Defaults to 10.
+            timeout (float or tuple, optional): Timeout of the requests in seconds, as accepted by requests.
+                Defaults to None, which waits forever.
+            session (requests.Session, optional): Session to send the requests with, instead of a new one.
+        """
         self.api_key = api_key
         self.base_url = base_url
+        self.timeout = timeout
+        self.session = session or self._create_session(max_retries, pool_maxsize)
+
+    @staticmethod
+    def _create_session(max_retries: int, pool_maxsize: int) -> requests.Session:
+        retry = Retry(
+            total=max_retries,
+            # a request which was sent may have been processed, so only failed connections are retried
+            read=0,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,
+            backoff_factor=0.5,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def iter_events(response: requests.Response):
+        """
+        Parse the events of a streaming response as they are received
+
+        :return: iterator of StreamEvent
+        """
+        return iter_events(response.iter_content(chunk_size=None))
 
     def _send_request(self, method, endpoint, json=None, params=None, stream=False):
         headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
         url = f"{self.base_url}{endpoint}"
-        response = requests.request(method, url, json=json, params=params, headers=headers, stream=stream)
+        response = self.session.request(
+            method, url, json=json, params=params, headers=headers, stream=stream, timeout=self.timeout
+        )
 
         return response
 
@@ -20,7 +91,7 @@ class DifyClient:
         headers = {"Authorization": f"Bearer {self.api_key}"}
 
         url = f"{self.base_url}{endpoint}"
-        response = requests.request(method, url, data=data, headers=headers, files=files)
+        response = self.session.request(method, url, data=data, headers=headers, files=files, timeout=self.timeout)
 
         return response
 
@@ -104,7 +175,9 @@ class ChatClient(DifyClient):
 class WorkflowClient(DifyClient):
     def run(self, inputs: dict, response_mode: str = "streaming", user: str = "abc-123"):
         data = {"inputs": inputs, "response_mode": response_mode, "user": user}
-        return self._send_request("POST", "/workflows/run", data)
+        return self._send_request(
+            "POST", "/workflows/run", data, stream=True if response_mode == "streaming" else False
+        )
 
     def stop(self, task_id, user):
         data = {"user": user}
@@ -115,7 +188,7 @@ class WorkflowClient(DifyClient):
 
 
 class KnowledgeBaseClient(DifyClient):
-    def __init__(self, api_key, base_url: str = "https://api.dify.ai/v1", dataset_id: str = None):
+    def __init__(self, api_key, base_url: str = "https://api.dify.ai/v1", dataset_id: str = None, **kwargs):
         """
         Construct a KnowledgeBaseClient object.
 
@@ -124,8 +197,9 @@ class KnowledgeBaseClient(DifyClient):
             base_url (str, optional): Base URL of Dify API. Defaults to 'https://api.dify.ai/v1'.
             dataset_id (str, optional): ID of the dataset. Defaults to None. You don't need this if you just want to
                 create a new dataset. or list datasets. otherwise you need to set this.
+            **kwargs: connection options of DifyClient, such as max_retries, pool_maxsize, timeout or session.
         """
-        super().__init__(api_key=api_key, base_url=base_url)
+        super().__init__(api_key=api_key, base_url=base_url, **kwargs)
         self.dataset_id = dataset_id
 
     def _get_dataset_id(self):
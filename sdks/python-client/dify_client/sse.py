@@ -0,0 +1,108 @@
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, NamedTuple, Optional
+
+
+class StreamEvent(NamedTuple):
+    """
+    An event of a streaming response, such as message, message_end, workflow_started, node_finished or error.
+
+    :param event: name of the event
+    :param data: payload of the event, empty for the ping events
+    """
+
+    event: str
+    data: dict
+
+
+class SSEParser:
+    """
+    Incremental parser of the server-sent events of a streaming response.
+
+    Chunks are appended to a single buffer and every line is decoded once, straight out of it, as soon as its end is
+    received. The consumed lines are dropped once per chunk, so a long stream is never scanned or copied again.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._event_name: Optional[str] = None
+        self._data_lines: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[StreamEvent]:
+        """
+        Parse a chunk of the response body
+
+        :return: events completed by the chunk
+        """
+        self._buffer += chunk
+        events = []
+        start = 0
+        with memoryview(self._buffer) as view:
+            while True:
+                end = self._buffer.find(b"\n", start)
+                if end == -1:
+                    break
+                line_end = end - 1 if end > start and self._buffer[end - 1] == 0x0D else end
+                event = self._parse_line(str(view[start:line_end], "utf-8"))
+                if event is not None:
+                    events.append(event)
+                start = end + 1
+        del self._buffer[:start]
+        return events
+
+    def close(self) -> List[StreamEvent]:
+        """
+        Parse the end of a stream which is not terminated by a blank line
+        """
+        events = self.feed(b"\n\n") if self._buffer or self._data_lines else []
+        self._buffer.clear()
+        return events
+
+    def _parse_line(self, line: str) -> Optional[StreamEvent]:
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            # comment
+            return None
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data_lines.append(value)
+        elif field == "event":
+            self._event_name = value
+        return None
+
+    def _dispatch(self) -> Optional[StreamEvent]:
+        event_name, data_lines = self._event_name, self._data_lines
+        self._event_name, self._data_lines = None, []
+        if not data_lines:
+            return StreamEvent(event_name, {}) if event_name else None
+
+        data = json.loads("\n".join(data_lines))
+        if not isinstance(data, dict):
+            data = {"data": data}
+        return StreamEvent(event_name or data.get("event", "message"), data)
+
+
+def iter_events(chunks: Iterable[bytes]) -> Iterator[StreamEvent]:
+    """
+    Parse the events of the chunks of a streaming response as they are received, such as the
+    `response.iter_content(chunk_size=None)` of a response of the client
+    """
+    parser = SSEParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_events(chunks: AsyncIterable[bytes]) -> AsyncIterator[StreamEvent]:
+    """
+    Parse the events of the chunks of an asynchronous streaming response as they are received
+    """
+    parser = SSEParser()
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.close():
+        yield event
@@ -5,7 +5,7 @@ with open("README.md", "r", encoding="utf-8") as fh:
 
 setup(
     name="dify-client",
-    version="0.1.12",
+    version="0.1.13",
     author="Dify",
     author_email="hello@dify.ai",
     description="A package for interacting with the Dify Service-API",
@@ -21,8 +21,12 @@ setup(
     ],
     python_requires=">=3.6",
     install_requires=[
-        "requests"
+        "requests",
+        "urllib3>=1.26"
     ],
+    extras_require={
+        "async": ["httpx"]
+    },
     keywords='dify nlp ai language-processing',
     include_package_data=True,
 )
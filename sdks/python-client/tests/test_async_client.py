@@ -0,0 +1,73 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+
+from dify_client.async_client import AsyncDifyClient
+from dify_client.sse import StreamEvent
+
+
+class TestAsyncDifyClient(unittest.TestCase):
+    def _run(self, handler, func):
+        async def main():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            async with AsyncDifyClient("api-key", base_url="http://dify.test/v1", client=client) as dify_client:
+                return await func(dify_client)
+
+        return asyncio.run(main())
+
+    def test_bulk_runs_keep_the_order_and_bound_the_concurrency(self):
+        in_flight = []
+        max_in_flight = []
+
+        async def handler(request):
+            in_flight.append(request)
+            max_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(request)
+            inputs = json.loads(request.content)["inputs"]
+            return httpx.Response(200, json={"data": {"outputs": inputs}})
+
+        responses = self._run(
+            handler,
+            lambda client: client.bulk_run_workflows(({"n": n} for n in range(20)), user="user", concurrency=4),
+        )
+
+        self.assertEqual([{"n": n} for n in range(20)], [r.json()["data"]["outputs"] for r in responses])
+        self.assertEqual(4, max(max_in_flight))
+
+    def test_rate_limited_requests_are_retried(self):
+        statuses = [429, 429, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0), headers={"Retry-After": "0"}, json={})
+
+        response = self._run(handler, lambda client: client.get_application_parameters(user="user"))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], statuses)
+
+    def test_streamed_events_are_parsed(self):
+        def handler(request):
+            self.assertEqual("Bearer api-key", request.headers["Authorization"])
+            return httpx.Response(
+                200,
+                content=b'data: {"event": "message", "answer": "Hi"}\n\ndata: {"event": "message_end"}\n\n',
+                headers={"Content-Type": "text/event-stream"},
+            )
+
+        async def stream(client):
+            return [event async for event in client.stream_chat_message({}, "Hello", user="user")]
+
+        self.assertEqual(
+            [
+                StreamEvent("message", {"event": "message", "answer": "Hi"}),
+                StreamEvent("message_end", {"event": "message_end"}),
+            ],
+            self._run(handler, stream),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from dify_client.sse import SSEParser, StreamEvent, iter_events
+
+STREAM = (
+    b'data: {"event": "message", "answer": "Hel"}\n\n'
+    b"event: ping\n\n"
+    b'data: {"event": "message", "answer": "lo \xe4\xbd\xa0\xe5\xa5\xbd"}\r\n\r\n'
+    b": comment\n"
+    b'data: {"event": "message_end",\ndata:  "id": "m1"}\n\n'
+)
+
+
+class TestSSEParser(unittest.TestCase):
+    def test_events_are_parsed_whatever_the_chunk_boundaries(self):
+        expected = [
+            StreamEvent("message", {"event": "message", "answer": "Hel"}),
+            StreamEvent("ping", {}),
+            StreamEvent("message", {"event": "message", "answer": "lo 你好"}),
+            StreamEvent("message_end", {"event": "message_end", "id": "m1"}),
+        ]
+        for chunk_size in (1, 3, 7, len(STREAM)):
+            chunks = [STREAM[i : i + chunk_size] for i in range(0, len(STREAM), chunk_size)]
+            self.assertEqual(expected, list(iter_events(chunks)), f"chunk size {chunk_size}")
+
+    def test_events_are_returned_as_soon_as_they_end(self):
+        parser = SSEParser()
+        self.assertEqual([], parser.feed(b'data: {"event": "message", "answer": "a"}\n'))
+        self.assertEqual([StreamEvent("message", {"event": "message", "answer": "a"})], parser.feed(b"\n"))
+
+    def test_unterminated_last_event_is_parsed_on_close(self):
+        parser = SSEParser()
+        parser.feed(b'data: {"event": "error", "message": "failed"}')
+        self.assertEqual([StreamEvent("error", {"event": "error", "message": "failed"})], parser.close())
+
+
+if __name__ == "__main__":
+    unittest.main()